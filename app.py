@@ -1,6 +1,6 @@
 
 
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, send_from_directory
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, send_from_directory, Response, stream_with_context
 from flask_socketio import SocketIO
 import random
 import secrets
@@ -19,7 +19,8 @@ from extensions import mail
 from db_utils import get_db_connection
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from models.recommendation import get_recommended_users, get_recommended_jobs
+from models.recommendation import (get_recommended_users, get_recommended_jobs, notify_interaction,
+                                   invalidate_recommendations, mark_profile_changed)
 from flask_apscheduler import APScheduler
 from urllib.parse import quote
 from utils.decorators import role_required
@@ -29,7 +30,14 @@ from utils.helpers import (
     sanitize_html, validate_password, extract_job_form_data,
     PASSWORD_MIN_LENGTH, OTP_EXPIRY_SECONDS
 )
-from services.admin_service import get_all_connections, get_connection_activity, get_user_statistics
+from services.admin_service import (get_all_connections, get_connection_activity, get_user_statistics,
+                                    get_role_counts, get_yearly_stats, get_admin_job_stats)
+from services.directory import list_directory, directory_counts
+from services.user_table import list_users
+from services.stats_counters import install_stats_counters, get_by_dimension, get_counter
+from services.csv_export import iter_csv, export_filename, submit_export
+from services.db_backup import backup_database, export_role_database, iter_file_chunks, remove_file
+from services.user_deletion import migrate_user_foreign_keys, delete_users
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
@@ -60,7 +68,8 @@ mail.init_app(app)
 # Initialize Scheduler
 scheduler = APScheduler()
 scheduler.init_app(app)
-scheduler.start()
+if app.config.get('SCHEDULER_ENABLED', True):
+    scheduler.start()
 
 DB_NAME = app.config['DB_NAME']
 
@@ -299,6 +308,17 @@ def init_db():
     """Initialize the database with all required tables"""
     conn = None
     try:
+        # Free pages are reclaimed by the nightly incremental vacuum. auto_vacuum
+        # only takes effect before the header is written, so a new file gets it
+        # on a plain connection ahead of get_db_connection()'s WAL switch; older
+        # files keep theirs until the 'convert' maintenance task rebuilds them.
+        raw = sqlite3.connect(DB_NAME)
+        try:
+            raw.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            raw.execute('PRAGMA journal_mode=WAL')
+        finally:
+            raw.close()
+
         conn = get_db_connection()
         c = conn.cursor()
 
@@ -537,29 +557,303 @@ def init_db():
                 user_id INTEGER NOT NULL,
                 target_user_id INTEGER NOT NULL,
                 interaction_type TEXT NOT NULL,
+                event_count INTEGER DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id),
                 FOREIGN KEY (target_user_id) REFERENCES users(id)
             )
         ''')
 
+        # Migration: buffered logging writes one row per (user, target, type) batch
+        try:
+            c.execute('ALTER TABLE user_interactions ADD COLUMN event_count INTEGER DEFAULT 1')
+        except sqlite3.OperationalError as e:
+            if 'duplicate column name' not in str(e).lower():
+                print(f"⚠ Warning adding event_count: {e}")
+
+        # Last change to each user's connections / pending requests —
+        # invalidates cached recommendations across all workers
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS user_graph_changes (
+                user_id INTEGER PRIMARY KEY,
+                changed_at REAL NOT NULL
+            )
+        ''')
+
+        # Last profile-text edit per user — content recommender re-vectorises
+        # these users in every worker
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS profile_changes (
+                user_id INTEGER PRIMARY KEY,
+                changed_at REAL NOT NULL
+            )
+        ''')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_profile_changes_changed ON profile_changes(changed_at)')
+
+        # Daily rollup of user_interactions (maintained by interaction_rollup job)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS user_interaction_daily (
+                user_id INTEGER NOT NULL,
+                target_user_id INTEGER NOT NULL,
+                interaction_type TEXT NOT NULL,
+                day TEXT NOT NULL,
+                event_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, target_user_id, interaction_type, day)
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS rollup_watermarks (
+                source TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        # Daily activity time series for admin reports (services/timeseries.py)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS stats_daily (
+                metric TEXT NOT NULL,
+                day TEXT NOT NULL,
+                dimension TEXT NOT NULL DEFAULT '',
+                value INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (metric, day, dimension)
+            ) WITHOUT ROWID
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS stats_login_days (
+                day TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                PRIMARY KEY (day, user_id)
+            ) WITHOUT ROWID
+        ''')
+
+        # Recommendation retrain jobs (status polled by admins, any worker)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS recommendation_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                trigger TEXT,
+                requested_by INTEGER,
+                stage TEXT,
+                stages TEXT,
+                version TEXT,
+                error TEXT,
+                created_at REAL,
+                started_at REAL,
+                finished_at REAL,
+                updated_at REAL
+            )
+        ''')
+
+        # Maintenance task runs with file sizes (services/db_maintenance.py)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS maintenance_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task TEXT NOT NULL,
+                status TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                duration_ms REAL,
+                db_bytes_before INTEGER,
+                wal_bytes_before INTEGER,
+                db_bytes_after INTEGER,
+                wal_bytes_after INTEGER,
+                detail TEXT
+            )
+        ''')
+
+        # Outgoing notification emails sent in batches (services/email_queue.py)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS email_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                to_email TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                html TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at REAL,
+                claimed_at REAL,
+                next_attempt_at REAL,
+                sent_at REAL
+            )
+        ''')
+        try:
+            c.execute('ALTER TABLE email_queue ADD COLUMN next_attempt_at REAL')
+        except sqlite3.OperationalError as e:
+            if 'duplicate column name' not in str(e).lower():
+                print(f"⚠ Warning adding email_queue.next_attempt_at: {e}")
+        c.execute('CREATE INDEX IF NOT EXISTS idx_email_queue_status ON email_queue(status, id)')
+
+        # Semester-end student → alumni upgrade jobs (services/alumni_upgrade.py)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS alumni_upgrade_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                filters TEXT,
+                pass_year INTEGER,
+                total INTEGER,
+                processed INTEGER NOT NULL DEFAULT 0,
+                upgraded INTEGER NOT NULL DEFAULT 0,
+                skipped INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                requested_by INTEGER,
+                created_at REAL,
+                started_at REAL,
+                finished_at REAL,
+                heartbeat_at REAL
+            )
+        ''')
+        try:
+            c.execute('ALTER TABLE alumni_upgrade_jobs ADD COLUMN heartbeat_at REAL')
+        except sqlite3.OperationalError as e:
+            if 'duplicate column name' not in str(e).lower():
+                print(f"⚠ Warning adding alumni_upgrade_jobs.heartbeat_at: {e}")
+
+        # Background CSV exports (services/csv_export.py)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS export_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                compressed INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'queued',
+                filename TEXT,
+                path TEXT,
+                rows INTEGER,
+                size_bytes INTEGER,
+                error TEXT,
+                requested_by INTEGER,
+                created_at REAL,
+                started_at REAL,
+                finished_at REAL
+            )
+        ''')
+
+        # Materialised hybrid recommendations (refreshed by recommendation_batch job)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS user_recommendations (
+                user_id INTEGER NOT NULL,
+                rank INTEGER NOT NULL,
+                rec_user_id INTEGER NOT NULL,
+                score REAL,
+                reason TEXT,
+                source TEXT,
+                PRIMARY KEY (user_id, rank)
+            ) WITHOUT ROWID
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS user_recommendation_state (
+                user_id INTEGER PRIMARY KEY,
+                computed_at REAL NOT NULL
+            )
+        ''')
+
+        # Mentorship: mentor capacity/topics, student requests, declined proposals
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS mentor_profiles (
+                user_id INTEGER PRIMARY KEY,
+                capacity INTEGER NOT NULL DEFAULT 2,
+                topics TEXT,
+                is_active INTEGER NOT NULL DEFAULT 1,
+                updated_at REAL,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS mentorship_requests (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id INTEGER NOT NULL,
+                mentor_id INTEGER,
+                topics TEXT,
+                message TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                match_score REAL,
+                created_at REAL NOT NULL,
+                matched_at REAL,
+                responded_at REAL,
+                ended_at REAL,
+                FOREIGN KEY (student_id) REFERENCES users(id),
+                FOREIGN KEY (mentor_id) REFERENCES users(id)
+            )
+        ''')
+        try:
+            c.execute('ALTER TABLE mentorship_requests ADD COLUMN ended_at REAL')
+        except sqlite3.OperationalError as e:
+            if 'duplicate column name' not in str(e).lower():
+                print(f"⚠ Warning adding mentorship_requests.ended_at: {e}")
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS mentorship_declines (
+                request_id INTEGER NOT NULL,
+                mentor_id INTEGER NOT NULL,
+                PRIMARY KEY (request_id, mentor_id),
+                FOREIGN KEY (request_id) REFERENCES mentorship_requests(id) ON DELETE CASCADE,
+                FOREIGN KEY (mentor_id) REFERENCES users(id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+        ''')
+
+        # Job fan-out: inverted student skill index and per-student job notifications
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS user_skills (
+                skill TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                PRIMARY KEY (skill, user_id)
+            ) WITHOUT ROWID
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS job_notifications (
+                user_id INTEGER NOT NULL,
+                job_id INTEGER NOT NULL,
+                match_count INTEGER,
+                created_at REAL NOT NULL,
+                read_at REAL,
+                PRIMARY KEY (user_id, job_id)
+            ) WITHOUT ROWID
+        ''')
+
         # --- Performance Indexes ---
         index_statements = [
             'CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)',
             'CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)',
             'CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at)',
+            'CREATE INDEX IF NOT EXISTS idx_users_role_name ON users(role, name, id)',
+            'CREATE INDEX IF NOT EXISTS idx_users_name ON users(name)',
+            'CREATE INDEX IF NOT EXISTS idx_users_role_created ON users(role, created_at)',
+            'CREATE INDEX IF NOT EXISTS idx_users_pending ON users(created_at) WHERE is_approved = 0',
+            'CREATE INDEX IF NOT EXISTS idx_alumni_profile_pass_year ON alumni_profile(pass_year, user_id)',
+            'CREATE INDEX IF NOT EXISTS idx_alumni_profile_department ON alumni_profile(department, pass_year, user_id)',
+            'CREATE INDEX IF NOT EXISTS idx_student_profile_department ON student_profile(department)',
+            'CREATE INDEX IF NOT EXISTS idx_faculty_profile_department ON faculty_profile(department)',
             'CREATE INDEX IF NOT EXISTS idx_connection_requests_receiver ON connection_requests(receiver_id, status)',
             'CREATE INDEX IF NOT EXISTS idx_connection_requests_sender ON connection_requests(sender_id, status)',
             'CREATE INDEX IF NOT EXISTS idx_connections_user1 ON connections(user_id_1)',
             'CREATE INDEX IF NOT EXISTS idx_connections_user2 ON connections(user_id_2)',
             'CREATE INDEX IF NOT EXISTS idx_user_interactions_user ON user_interactions(user_id)',
             'CREATE INDEX IF NOT EXISTS idx_user_interactions_target ON user_interactions(target_user_id)',
+            'CREATE INDEX IF NOT EXISTS idx_user_interactions_created ON user_interactions(created_at)',
+            'CREATE INDEX IF NOT EXISTS idx_user_interaction_daily_day ON user_interaction_daily(day)',
+            'CREATE INDEX IF NOT EXISTS idx_recommendation_jobs_status ON recommendation_jobs(status)',
+            'CREATE INDEX IF NOT EXISTS idx_user_skills_user ON user_skills(user_id)',
+            'CREATE INDEX IF NOT EXISTS idx_job_notifications_job ON job_notifications(job_id)',
+            'CREATE INDEX IF NOT EXISTS idx_mentorship_requests_status ON mentorship_requests(status)',
+            'CREATE INDEX IF NOT EXISTS idx_mentorship_requests_student ON mentorship_requests(student_id, status)',
+            'CREATE INDEX IF NOT EXISTS idx_mentorship_requests_mentor ON mentorship_requests(mentor_id, status)',
             'CREATE INDEX IF NOT EXISTS idx_password_resets_email ON password_resets(email)',
             'CREATE INDEX IF NOT EXISTS idx_user_activity_last_login ON user_activity(last_login)',
             'CREATE INDEX IF NOT EXISTS idx_student_profile_user ON student_profile(user_id)',
             'CREATE INDEX IF NOT EXISTS idx_alumni_profile_user ON alumni_profile(user_id)',
             'CREATE INDEX IF NOT EXISTS idx_faculty_profile_user ON faculty_profile(user_id)',
             'CREATE INDEX IF NOT EXISTS idx_registration_log_user ON registration_log(user_id)',
+            # Child columns of ON DELETE foreign keys (services/user_deletion.py)
+            'CREATE INDEX IF NOT EXISTS idx_alumni_meet_registration_user ON alumni_meet_registration(user_id)',
+            'CREATE INDEX IF NOT EXISTS idx_private_messages_sender ON private_messages(sender_id)',
+            'CREATE INDEX IF NOT EXISTS idx_private_messages_receiver ON private_messages(receiver_id)',
+            'CREATE INDEX IF NOT EXISTS idx_conversations_user2 ON conversations(user_id_2)',
+            'CREATE INDEX IF NOT EXISTS idx_conversations_last_message ON conversations(last_message_id)',
+            'CREATE INDEX IF NOT EXISTS idx_public_messages_sender ON public_messages(sender_id)',
+            'CREATE INDEX IF NOT EXISTS idx_public_messages_deleted_by ON public_messages(deleted_by) WHERE deleted_by IS NOT NULL',
+            'CREATE INDEX IF NOT EXISTS idx_user_interaction_daily_target ON user_interaction_daily(target_user_id)',
+            'CREATE INDEX IF NOT EXISTS idx_user_recommendations_rec ON user_recommendations(rec_user_id)',
+            'CREATE INDEX IF NOT EXISTS idx_mentorship_declines_mentor ON mentorship_declines(mentor_id)',
+            'CREATE INDEX IF NOT EXISTS idx_job_applications_student ON job_applications(student_id)',
+            'CREATE INDEX IF NOT EXISTS idx_job_applications_job ON job_applications(job_id)',
         ]
         for idx_sql in index_statements:
             try:
@@ -637,8 +931,16 @@ def init_db():
             UPDATE jobs SET approval_status = 'approved'
             WHERE approval_status IS NULL OR approval_status = ''
         """)
+        c.execute('CREATE INDEX IF NOT EXISTS idx_jobs_approval_deadline ON jobs(approval_status, deadline)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_jobs_posted_by ON jobs(posted_by)')
         conn.commit()
 
+        # Every reference to users gets an ON DELETE action (services/user_deletion.py)
+        migrate_user_foreign_keys(conn)
+
+        # Admin statistics counters, maintained by triggers (services/stats_counters.py)
+        install_stats_counters(conn)
+
     except sqlite3.Error as e:
         print(f"Database error: {e}")
         if conn:
@@ -1383,17 +1685,13 @@ def admin_view_users(role):
     if current_user.role != 'admin':
         return redirect(url_for('home'))
 
-    conn = None
+    # First page only; the table pages, sorts and filters through /api/admin/users
     try:
-        conn = get_db_connection()
-        if role == 'all':
-            users = conn.execute('SELECT * FROM users ORDER BY id DESC').fetchall()
-        else:
-            users = conn.execute('SELECT * FROM users WHERE role = ? ORDER BY id DESC', (role,)).fetchall()
-        return render_template('admin/admin_view_users.html', users=users, role=role)
-    finally:
-        if conn:
-            conn.close()
+        page = list_users(role=role, limit=50)
+    except ValueError:
+        return redirect(url_for('admin_view_users', role='all'))
+    return render_template('admin/admin_view_users.html', users=page['items'], role=role,
+                           next_cursor=page['next_cursor'], totals=page['totals'])
 
 @app.route('/admin/approve-requests')
 @login_required
@@ -1401,15 +1699,41 @@ def admin_approve_requests():
     if current_user.role != 'admin':
         return redirect(url_for('home'))
 
-    conn = None
+    # Pending users (is_approved = 0), newest first
+    page = list_users(status='pending', sort='created_at', limit=50)
+    return render_template('admin/admin_view_users.html', users=page['items'], role='pending',
+                           next_cursor=page['next_cursor'], totals=page['totals'])
+
+@app.route('/api/admin/users')
+@login_required
+def api_admin_users():
+    """
+    Admin user table: one keyset page per request.
+
+    Query: cursor, limit, sort (id | name | created_at), dir (asc | desc), role,
+    status (pending | active | suspended), department, created_from, created_to, q
+    """
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    args = request.args
     try:
-        conn = get_db_connection()
-        # Fetch pending users (is_approved = 0)
-        users = conn.execute('SELECT * FROM users WHERE is_approved = 0 ORDER BY created_at DESC').fetchall()
-        return render_template('admin/admin_view_users.html', users=users, role='pending')
-    finally:
-        if conn:
-            conn.close()
+        return jsonify(list_users(
+            cursor=args.get('cursor') or None,
+            limit=args.get('limit', type=int),
+            sort=args.get('sort') or 'id',
+            direction=args.get('dir') or 'desc',
+            role=args.get('role') or None,
+            status=args.get('status') or None,
+            department=args.get('department') or None,
+            created_from=args.get('created_from') or None,
+            created_to=args.get('created_to') or None,
+            q=(args.get('q') or '').strip() or None,
+        ))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Admin user table error: {e}")
+        return jsonify({'error': 'User table unavailable'}), 500
 
 
 
@@ -1425,26 +1749,10 @@ def dashboard_student():
     try:
         conn = get_db_connection()
 
-        # Fetch alumni with all details
-        alumni = conn.execute("""
-            SELECT u.id, u.name, u.email, u.phone,
-                   a.enrollment_no, a.department, a.degree, a.pass_year,
-                   a.company_name, a.designation, a.work_location, a.experience_years
-            FROM users u
-            JOIN alumni_profile a ON u.id = a.user_id
-            WHERE u.role='alumni'
-            ORDER BY a.pass_year DESC
-        """).fetchall()
-
-        # Fetch faculty members
-        faculty = conn.execute("""
-            SELECT u.id, u.name, u.email, u.phone,
-                   f.department, f.designation, f.office_location
-            FROM users u
-            JOIN faculty_profile f ON u.id = f.user_id
-            WHERE u.role='faculty'
-            ORDER BY f.department
-        """).fetchall()
+        # Directories: first page only, further pages come from /api/directory/<role>
+        alumni_page = list_directory('alumni')
+        faculty_page = list_directory('faculty')
+        students_page = list_directory('student', exclude_user_id=current_user.id)
 
         # Get current student profile
         student = conn.execute(
@@ -1462,24 +1770,18 @@ def dashboard_student():
             ORDER BY cr.created_at DESC
         """, (current_user.id,)).fetchall()
 
-        # Fetch other students for the directory
-        other_students = conn.execute("""
-            SELECT u.id, u.name, u.email, u.phone, u.profile_pic,
-                   s.department, s.degree, s.semester
-            FROM users u
-            LEFT JOIN student_profile s ON u.id = s.user_id
-            WHERE u.role='student' AND u.id != ?
-            ORDER BY u.name ASC
-        """, (current_user.id,)).fetchall()
-
         # Fetch recommendations
         recommendations = get_recommended_users(current_user)
 
         return render_template('student/dashboard.html',
-                             alumni=alumni,
-                             faculty=faculty,
+                             alumni=alumni_page['items'],
+                             faculty=faculty_page['items'],
                              student=student,
-                             other_students=other_students,
+                             other_students=students_page['items'],
+                             directory_cursors={'alumni': alumni_page['next_cursor'],
+                                                'student': students_page['next_cursor'],
+                                                'faculty': faculty_page['next_cursor']},
+                             directory_counts=directory_counts(),
                              pending_requests=pending_requests,
                              pending_count=len(pending_requests),
                              recommendations=recommendations)
@@ -1558,44 +1860,22 @@ def dashboard_faculty():
             ORDER BY cr.created_at DESC
         """, (current_user.id,)).fetchall()
 
-        # Fetch alumni for directory
-        alumni = conn.execute("""
-            SELECT u.id, u.name, u.email, u.phone, u.profile_pic,
-                   a.enrollment_no, a.department, a.degree, a.pass_year,
-                   a.company_name, a.designation, a.work_location, a.experience_years
-            FROM users u
-            JOIN alumni_profile a ON u.id = a.user_id
-            WHERE u.role='alumni'
-            ORDER BY a.pass_year DESC
-        """).fetchall()
-
-        # Fetch all students for directory
-        students = conn.execute("""
-            SELECT u.id, u.name, u.email, u.phone, u.profile_pic,
-                   s.department, s.degree, s.semester, s.skills, s.cgpa
-            FROM users u
-            JOIN student_profile s ON u.id = s.user_id
-            WHERE u.role='student'
-            ORDER BY u.name ASC
-        """).fetchall()
-
-        # Fetch other faculty members (colleagues)
-        faculty_members = conn.execute("""
-            SELECT u.id, u.name, u.email, u.phone, u.profile_pic,
-                   f.department, f.designation, f.office_location, f.specialization
-            FROM users u
-            JOIN faculty_profile f ON u.id = f.user_id
-            WHERE u.role='faculty' AND u.id != ?
-            ORDER BY f.department
-        """, (current_user.id,)).fetchall()
+        # Directories: first page only, further pages come from /api/directory/<role>
+        students_page = list_directory('student')
+        alumni_page = list_directory('alumni')
+        faculty_page = list_directory('faculty', exclude_user_id=current_user.id)
 
         return render_template('faculty/dashboard.html',
                              profile=profile,
                              pending_requests=pending_requests,
                              pending_count=len(pending_requests),
-                             alumni=alumni,
-                             students=students,
-                             faculty=faculty_members)
+                             alumni=alumni_page['items'],
+                             students=students_page['items'],
+                             faculty=faculty_page['items'],
+                             directory_cursors={'alumni': alumni_page['next_cursor'],
+                                                'student': students_page['next_cursor'],
+                                                'faculty': faculty_page['next_cursor']},
+                             directory_counts=directory_counts())
 
     except Exception as e:
         print(f"Dashboard faculty error: {e}")
@@ -1615,74 +1895,30 @@ def dashboard_admin():
     try:
         conn = get_db_connection()
         
-        # Fetch users with their profile data (department, batch/pass_year)
-        users_query = """
-            SELECT 
-                u.id, u.name, u.email, u.role, u.created_at, u.profile_pic,
-                COALESCE(s.department, a.department, f.department, 'N/A') as department,
-                COALESCE(s.semester, a.pass_year, NULL) as batch_info,
-                u.role as user_role
-            FROM users u
-            LEFT JOIN student_profile s ON u.id = s.user_id AND u.role = 'student'
-            LEFT JOIN alumni_profile a ON u.id = a.user_id AND u.role = 'alumni'
-            LEFT JOIN faculty_profile f ON u.id = f.user_id AND u.role = 'faculty'
-            ORDER BY u.id DESC
-        """
-        users = conn.execute(users_query).fetchall()
-        
-        # Optimized: Single GROUP BY query instead of 3 separate COUNT queries
-        role_counts_raw = conn.execute(
-            "SELECT role, COUNT(*) as cnt FROM users GROUP BY role"
-        ).fetchall()
-        role_counts = {row['role']: row['cnt'] for row in role_counts_raw}
+        # First page of the user table; more pages come from /api/admin/users
+        users_page = list_users(limit=15)
+        users = users_page['items']
+        role_counts = users_page['totals']
         a_count = role_counts.get('alumni', 0)
         s_count = role_counts.get('student', 0)
         f_count = role_counts.get('faculty', 0)
         
-        # Dynamic Chart Data Calculation
-        current_year = datetime.now().year
-        years = [str(y) for y in range(current_year - 4, current_year + 1)]
-        
-        # Optimized: Single query for all yearly role counts instead of 15+ queries in a loop
-        yearly_raw = conn.execute("""
-            SELECT strftime('%Y', created_at) as year, role, COUNT(*) as cnt
-            FROM users
-            WHERE strftime('%Y', created_at) >= ?
-            GROUP BY year, role
-        """, (years[0],)).fetchall()
-        yearly_map = {}
-        for row in yearly_raw:
-            yearly_map.setdefault(row['year'], {})[row['role']] = row['cnt']
-        
-        students_data = [yearly_map.get(y, {}).get('student', 0) for y in years]
-        alumni_data = [yearly_map.get(y, {}).get('alumni', 0) for y in years]
-        faculty_data = [yearly_map.get(y, {}).get('faculty', 0) for y in years]
-        
-        # Event registrations by year (single query)
-        try:
-            events_raw = conn.execute("""
-                SELECT strftime('%Y', created_at) as year, COUNT(*) as cnt
-                FROM alumni_meet_registration
-                WHERE strftime('%Y', created_at) >= ?
-                GROUP BY year
-            """, (years[0],)).fetchall()
-            events_map = {row['year']: row['cnt'] for row in events_raw}
-        except sqlite3.OperationalError:
-            events_map = {}
-        events_data = [events_map.get(y, 0) for y in years]
-
+        # Chart data: registrations per year and role from the maintained counters
+        yearly = get_yearly_stats(conn)
         chart_data = {
-            'years': years,
-            'students': students_data,
-            'alumni': alumni_data,
-            'faculty': faculty_data
+            'years': yearly['years'],
+            'students': yearly['students'],
+            'alumni': yearly['alumni'],
+            'faculty': yearly['faculty']
         }
+        events_data = yearly['events']
         
         # Total event registrations for stat card
         event_total = sum(events_data)
         
         return render_template('admin/dashboard_admin.html', 
                                users=users, 
+                               users_cursor=users_page['next_cursor'],
                                a_count=a_count, 
                                s_count=s_count, 
                                f_count=f_count, 
@@ -1954,7 +2190,10 @@ def alumni_messages():
 @login_required
 def alumni_mentorship():
     if current_user.role != 'alumni': return redirect(url_for('home'))
-    return render_template('alumni/mentorship.html')
+    from services.mentorship_matcher import get_mentor_profile, get_mentor_requests
+    return render_template('alumni/mentorship.html',
+                           mentor_profile=get_mentor_profile(current_user.id),
+                           mentees=get_mentor_requests(current_user.id))
 
 @app.route('/alumni/post-job')
 @login_required
@@ -2073,6 +2312,7 @@ def edit_student_profile(user_id):
                 (cgpa, skills, achievements, resume_link, semester, user_id))
 
             conn.commit()
+            mark_profile_changed(user_id)
             flash('Profile updated successfully!', 'success')
             return redirect(url_for('student_profile', user_id=user_id))
 
@@ -2150,6 +2390,7 @@ def edit_alumni_profile(user_id):
                  linkedin_url, achievements, bio, user_id))
 
             conn.commit()
+            mark_profile_changed(user_id)
             flash('Profile updated successfully!', 'success')
             return redirect(url_for('alumni_profile', user_id=user_id))
 
@@ -2606,8 +2847,11 @@ def verify_user(user_id, action):
             conn.execute('UPDATE users SET is_approved = 1 WHERE id = ?', (user_id,))
             flash('User verified successfully!', 'success')
         elif action == 'block':
-            conn.execute('DELETE FROM users WHERE id = ?', (user_id,))
-            flash('User blocked/removed!', 'warning')
+            result = delete_users([user_id], acting_user_id=current_user.id)
+            if user_id in result['skipped']:
+                flash(f"Cannot block user: {result['skipped'][user_id]}", 'danger')
+            else:
+                flash('User blocked/removed!', 'warning')
 
         conn.commit()
         return redirect(url_for('admin_view_users', role='student'))
@@ -2632,14 +2876,15 @@ def admin_analytics():
     try:
         conn = get_db_connection()
 
-        # Gather statistics
+        # Gather statistics (counter lookups, see services/stats_counters.py)
+        role_counts = get_role_counts(conn)
         stats = {
-            'total_users': conn.execute("SELECT COUNT(*) FROM users").fetchone()[0],
-            'students': conn.execute("SELECT COUNT(*) FROM users WHERE role='student'").fetchone()[0],
-            'alumni': conn.execute("SELECT COUNT(*) FROM users WHERE role='alumni'").fetchone()[0],
-            'faculty': conn.execute("SELECT COUNT(*) FROM users WHERE role='faculty'").fetchone()[0],
-            'admin': conn.execute("SELECT COUNT(*) FROM users WHERE role='admin'").fetchone()[0],
-            'meet_registrations': conn.execute("SELECT COUNT(*) FROM alumni_meet_registration").fetchone()[0],
+            'total_users': role_counts['total'],
+            'students': role_counts['student'],
+            'alumni': role_counts['alumni'],
+            'faculty': role_counts['faculty'],
+            'admin': role_counts['admin'],
+            'meet_registrations': sum(get_by_dimension(conn, 'meet_registrations').values()),
         }
 
         return render_template('admin/admin_analytics.html', stats=stats)
@@ -2684,12 +2929,13 @@ def admin_registrations():
 
         registrations = c.execute(query, params).fetchall()
 
-        # Get statistics
+        # Get statistics (counter lookups)
+        registered = get_by_dimension(conn, 'registrations')
         stats = {
-            'students': c.execute("SELECT COUNT(*) FROM registration_log WHERE role='student'").fetchone()[0],
-            'alumni': c.execute("SELECT COUNT(*) FROM registration_log WHERE role='alumni'").fetchone()[0],
-            'faculty': c.execute("SELECT COUNT(*) FROM registration_log WHERE role='faculty'").fetchone()[0],
-            'total': c.execute("SELECT COUNT(*) FROM registration_log").fetchone()[0],
+            'students': registered.get('student', 0),
+            'alumni': registered.get('alumni', 0),
+            'faculty': registered.get('faculty', 0),
+            'total': sum(registered.values()),
         }
 
         return render_template('admin/admin_registrations.html',
@@ -2705,6 +2951,24 @@ def admin_registrations():
         if conn:
             conn.close()
 
+def _csv_export_response(kind):
+    """Stream an export (?gzip=1 compresses it, ?background=1 queues it as a file)."""
+    compress = request.args.get('gzip', '0').lower() in ('1', 'true', 'yes')
+    if request.args.get('background', '0').lower() in ('1', 'true', 'yes'):
+        job = submit_export(kind, compress=compress, requested_by=current_user.id)
+        return jsonify({'success': True, 'export': job}), 202
+
+    response = Response(stream_with_context(iter_csv(kind, compress=compress)),
+                        mimetype='application/gzip' if compress else 'text/csv')
+    if not compress:
+        response.headers['Content-Type'] = 'text/csv; charset=utf-8'
+    response.headers['Content-Disposition'] = f'attachment; filename="{export_filename(kind, compress)}"'
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    return response
+
+
 @app.route('/admin/export/registrations')
 @login_required
 def admin_export_registrations():
@@ -2712,188 +2976,26 @@ def admin_export_registrations():
     if current_user.role != 'admin':
         return jsonify({'error': 'Unauthorized access to encrypted data'}), 403
 
-    import csv
-    from io import StringIO
-    from flask import make_response
-
-    conn = None
     try:
-        conn = get_db_connection()
-        c = conn.cursor()
-        
-        # Fetch all registration records
-        c.execute('SELECT * FROM registration_log ORDER BY registered_at DESC')
-        rows = c.fetchall()
-
-        # Prepare CSV Buffer
-        output = StringIO()
-        writer = csv.writer(output)
-
-        # Header Definition
-        writer.writerow([
-            'Record ID', 'Full Name', 'Email Address', 'Primary Phone', 
-            'System Classification', 'Core Department', 'Academic Degree', 
-            'Temporal Stamp (Registration)'
-        ])
-
-        # Data Row Mapping
-        for row in rows:
-            writer.writerow([
-                row['id'],
-                row['name'],
-                row['email'],
-                row['phone'],
-                row['role'].upper() if row['role'] else 'N/A',
-                row['department'] or 'General',
-                row['degree'] or 'N/A',
-                row['registered_at']
-            ])
-
-        csv_data = output.getvalue()
-        response = make_response(csv_data)
-        
-        # Set headers for professional download
-        filename = f"community_matrix_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
-        response.headers["Content-type"] = "text/csv; charset=utf-8"
-        
-        return response
-
+        return _csv_export_response('registrations')
     except Exception as e:
         print(f"Export Error: {e}")
         flash(f"System Error during matrix orchestration: {str(e)}", "danger")
         return redirect(url_for('admin_registrations'))
-    finally:
-        if conn:
-            conn.close()
 
 @app.route('/api/download-csv/<role>')
 @login_required
 def download_csv(role):
-    """Download user data as CSV by role"""
+    """Download user data as CSV by role (streamed in batches)"""
     if current_user.role != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
 
-    import csv
-    from io import StringIO
-    from flask import make_response
+    role = role.lower()
+    if role not in ('student', 'alumni', 'faculty', 'all'):
+        return jsonify({'error': 'Invalid role'}), 400
 
     try:
-        conn = get_db_connection()
-        c = conn.cursor()
-
-        # Prepare CSV
-        output = StringIO()
-        writer = csv.writer(output)
-
-        if role.lower() == 'student':
-            # Student data with profiles
-            c.execute('''
-                SELECT u.id, u.name, u.email, u.phone, u.role,
-                       s.enrollment_no, s.semester, s.cgpa, s.skills, s.department
-                FROM users u
-                LEFT JOIN student_profile s ON u.id = s.user_id
-                WHERE u.role = 'student'
-                ORDER BY u.id DESC
-            ''')
-
-            writer.writerow(['ID', 'Name', 'Email', 'Phone', 'Role',
-                           'Enrollment No', 'Semester', 'CGPA', 'Skills', 'Department'])
-
-            for row in c.fetchall():
-                writer.writerow([
-                    row['id'], row['name'], row['email'], row['phone'],
-                    row['role'], row['enrollment_no'] or '', row['semester'] or '',
-                    row['cgpa'] or '', row['skills'] or '', row['department'] or ''
-                ])
-
-        elif role.lower() == 'alumni':
-            # Alumni data with profiles
-            c.execute('''
-                SELECT u.id, u.name, u.email, u.phone, u.role,
-                       a.enrollment_no, a.degree, a.pass_year, a.company_name,
-                       a.designation, a.experience_years, a.department
-                FROM users u
-                LEFT JOIN alumni_profile a ON u.id = a.user_id
-                WHERE u.role = 'alumni'
-                ORDER BY u.id DESC
-            ''')
-
-            writer.writerow(['ID', 'Name', 'Email', 'Phone', 'Role',
-                           'Enrollment No', 'Degree', 'Pass Year', 'Company',
-                           'Designation', 'Experience (Years)', 'Department'])
-
-            for row in c.fetchall():
-                writer.writerow([
-                    row['id'], row['name'], row['email'], row['phone'],
-                    row['role'], row['enrollment_no'] or '', row['degree'] or '',
-                    row['pass_year'] or '', row['company_name'] or '',
-                    row['designation'] or '', row['experience_years'] or '',
-                    row['department'] or ''
-                ])
-
-        elif role.lower() == 'faculty':
-            # Faculty data with profiles
-            c.execute('''
-                SELECT u.id, u.name, u.email, u.phone, u.role,
-                       f.employee_id, f.designation, f.specialization, f.experience_years,
-                       f.office_hours, f.department
-                FROM users u
-                LEFT JOIN faculty_profile f ON u.id = f.user_id
-                WHERE u.role = 'faculty'
-                ORDER BY u.id DESC
-            ''')
-
-            writer.writerow(['ID', 'Name', 'Email', 'Phone', 'Role',
-                           'Employee ID', 'Designation', 'Specialization',
-                           'Experience (Years)', 'Office Hours', 'Department'])
-
-            for row in c.fetchall():
-                writer.writerow([
-                    row['id'], row['name'], row['email'], row['phone'],
-                    row['role'], row['employee_id'] or '', row['designation'] or '',
-                    row['specialization'] or '', row['experience_years'] or '',
-                    row['office_hours'] or '', row['department'] or ''
-                ])
-
-        elif role.lower() == 'all':
-            # All users combined
-            c.execute('''
-                SELECT u.id, u.name, u.email, u.phone, u.role
-                FROM users u
-                ORDER BY u.id DESC
-            ''')
-
-            writer.writerow(['ID', 'Name', 'Email', 'Phone', 'Role'])
-
-            for row in c.fetchall():
-                writer.writerow([
-                    row['id'], row['name'], row['email'],
-                    row['phone'], row['role']
-                ])
-
-        else:
-            return jsonify({'error': 'Invalid role'}), 400
-
-        conn.close()
-
-        # Get CSV content
-        csv_data = output.getvalue()
-
-        # Create response with proper headers
-        response = make_response(csv_data)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'{role.upper()}_Users_{timestamp}.csv'
-
-        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response.headers['Content-Type'] = 'text/csv; charset=utf-8'
-        response.headers['Content-Length'] = len(csv_data)
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
-
-        return response, 200
-
+        return _csv_export_response(role)
     except Exception as e:
         print(f"Error generating CSV: {e}")
         import traceback
@@ -2909,50 +3011,46 @@ def download_database(db_type):
     if current_user.role != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
 
-    import shutil
     import tempfile
-    from flask import send_file
 
-    try:
-        db_types = {
-            'college_pro': 'Complete College Database (All Users)',
-            'student': 'Student Database Only',
-            'alumni': 'Alumni Database Only',
-            'faculty': 'Faculty Database Only'
-        }
-
-        if db_type not in db_types:
-            return jsonify({'error': 'Invalid database type'}), 400
-
-        # For now, we'll send the complete database file
-        # In the future, you can create filtered databases
-        db_file = DB_NAME  # alumni_hub.db
+    db_types = {
+        'college_pro': 'Complete College Database (All Users)',
+        'student': 'Student Database Only',
+        'alumni': 'Alumni Database Only',
+        'faculty': 'Faculty Database Only'
+    }
 
-        if not os.path.exists(db_file):
-            return jsonify({'error': 'Database file not found'}), 404
+    if db_type not in db_types:
+        return jsonify({'error': 'Invalid database type'}), 400
 
-        # Create a temporary copy
-        temp_fd, temp_path = tempfile.mkstemp(suffix='.db')
-        os.close(temp_fd)
+    if not os.path.exists(DB_NAME):
+        return jsonify({'error': 'Database file not found'}), 404
 
-        try:
-            shutil.copy2(db_file, temp_path)
+    temp_fd, temp_path = tempfile.mkstemp(suffix='.db')
+    os.close(temp_fd)
+    try:
+        # Online backup of everything, or only the role's users and profiles
+        if db_type == 'college_pro':
+            backup_database(temp_path)
+        else:
+            os.unlink(temp_path)
+            export_role_database(db_type, temp_path)
 
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'{db_type.upper()}_Database_{timestamp}.db'
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f'{db_type.upper()}_Database_{timestamp}.db'
 
-            return send_file(
-                temp_path,
-                mimetype='application/x-sqlite3',
-                as_attachment=True,
-                download_name=filename
-            )
-        except Exception as copy_error:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            raise copy_error
+        response = Response(stream_with_context(iter_file_chunks(temp_path)),
+                            mimetype='application/x-sqlite3')
+        # The generator's cleanup never runs if the body is not iterated (HEAD)
+        response.call_on_close(lambda: remove_file(temp_path))
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers['Content-Length'] = os.path.getsize(temp_path)
+        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+        return response
 
     except Exception as e:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
         print(f"Error downloading database: {e}")
         import traceback
         traceback.print_exc()
@@ -2969,100 +3067,100 @@ def delete_user(user_id):
 
     try:
         conn = get_db_connection()
-        c = conn.cursor()
-
-        # Get user details first for logging
-        user = c.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+        try:
+            user = conn.execute('SELECT name, email, role FROM users WHERE id = ?', (user_id,)).fetchone()
+        finally:
+            conn.close()
 
         if not user:
-            conn.close()
             return jsonify({'error': 'User not found'}), 404
 
         # PROTECTION: Prevent deletion of super admin account
         if user['email'] == 'admindbit195@college.edu':
-            conn.close()
             return jsonify({'error': 'Cannot delete the Super Admin account. This account is protected.'}), 403
 
-        user_role = user['role']
-        user_name = user['name']
-        user_email = user['email']
-
-        print(f"[DELETE DEBUG] Starting deletion for User ID: {user_id}, Role: {user_role}")
-
-        # Delete from profile tables first (cascading)
-        if user_role == 'student':
-            result = c.execute('DELETE FROM student_profile WHERE user_id = ?', (user_id,))
-            print(f"[DELETE DEBUG] student_profile rows deleted: {result.rowcount}")
-        elif user_role == 'alumni':
-            result = c.execute('DELETE FROM alumni_profile WHERE user_id = ?', (user_id,))
-            print(f"[DELETE DEBUG] alumni_profile rows deleted: {result.rowcount}")
-        elif user_role == 'faculty':
-            result = c.execute('DELETE FROM faculty_profile WHERE user_id = ?', (user_id,))
-            print(f"[DELETE DEBUG] faculty_profile rows deleted: {result.rowcount}")
+        # Profiles, messages, connections, ... follow through ON DELETE CASCADE
+        result = delete_users([user_id], acting_user_id=current_user.id)
+        if user_id in result['skipped']:
+            return jsonify({'error': f"Cannot delete user: {result['skipped'][user_id]}"}), 403
 
-        # Delete from alumni_meet_registration (can be deleted for any user)
-        result_amr = c.execute('DELETE FROM alumni_meet_registration WHERE user_id = ?', (user_id,))
-        print(f"[DELETE DEBUG] alumni_meet_registration rows deleted: {result_amr.rowcount}")
-
-        # Delete from registration_log (can be deleted for any user)
-        try:
-            result_reglog = c.execute('DELETE FROM registration_log WHERE user_id = ?', (user_id,))
-            print(f"[DELETE DEBUG] registration_log rows deleted: {result_reglog.rowcount}")
-        except Exception as e:
-            print(f"[DELETE DEBUG] registration_log table error: {e}")
-
-        # Delete from connection tables
-        result1 = c.execute('DELETE FROM connection_requests WHERE sender_id = ? OR receiver_id = ?', (user_id, user_id))
-        print(f"[DELETE DEBUG] connection_requests rows deleted: {result1.rowcount}")
-
-        try:
-            result2 = c.execute('DELETE FROM connections WHERE user_id_1 = ? OR user_id_2 = ?', (user_id, user_id))
-            print(f"[DELETE DEBUG] connections rows deleted: {result2.rowcount}")
-        except Exception as e:
-            print(f"[DELETE DEBUG] connections table error (may not exist or different schema): {e}")
+        logger.info(f"[ADMIN DELETE] Deleted user {user_id} ({user['email']}, {user['role']}): {result['tables']}")
 
+        return jsonify({
+            'success': True,
+            'message': f'User "{user["name"]}" ({user["email"]}) has been permanently deleted from the database',
+            'user_id': user_id,
+            'user_name': user['name'],
+            'tables': result['tables']
+        }), 200
 
-        # Delete from other related tables (if they exist)
-        try:
-            result3 = c.execute('DELETE FROM posts WHERE user_id = ?', (user_id,))
-            print(f"[DELETE DEBUG] posts rows deleted: {result3.rowcount}")
-        except Exception as e:
-            print(f"[DELETE DEBUG] posts table error (may not exist): {e}")
+    except Exception as e:
+        logger.error(f"[ADMIN DELETE] Error deleting user {user_id}: {e}")
+        return jsonify({'error': f'Error deleting user: {str(e)}'}), 500
 
-        try:
-            result4 = c.execute('DELETE FROM comments WHERE user_id = ?', (user_id,))
-            print(f"[DELETE DEBUG] comments rows deleted: {result4.rowcount}")
-        except Exception as e:
-            print(f"[DELETE DEBUG] comments table error (may not exist): {e}")
+@app.route('/api/admin/users/bulk-delete', methods=['POST'])
+@login_required
+def bulk_delete_users():
+    """
+    Delete many users in one transaction.
 
-        try:
-            result5 = c.execute('DELETE FROM likes WHERE user_id = ?', (user_id,))
-            print(f"[DELETE DEBUG] likes rows deleted: {result5.rowcount}")
-        except Exception as e:
-            print(f"[DELETE DEBUG] likes table error (may not exist): {e}")
+    Body: {"user_ids": [1, 2, ...]}
+    Returns the deleted and skipped ids and the rows removed per table.
+    """
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
 
-        # Finally, delete the user record
-        result6 = c.execute('DELETE FROM users WHERE id = ?', (user_id,))
-        print(f"[DELETE DEBUG] users rows deleted: {result6.rowcount}")
+    data = request.get_json(silent=True) or {}
+    try:
+        result = delete_users(data.get('user_ids') or [], acting_user_id=current_user.id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"[ADMIN DELETE] Bulk delete failed: {e}")
+        return jsonify({'error': 'Bulk delete failed'}), 500
+    return jsonify({'success': True, **result})
 
-        conn.commit()
-        conn.close()
+@app.route('/api/admin/users/bulk-review', methods=['POST'])
+@login_required
+def bulk_review_registrations():
+    """
+    Approve or reject pending registrations in bulk (services/user_review.py).
 
-        # Log the deletion
-        print(f"[ADMIN DELETE] ✅ Successfully deleted User ID: {user_id}, Name: {user_name}, Email: {user_email}, Role: {user_role}")
+    Body: {"action": "approve" | "reject", "user_ids": [1, 2, ...]}
+      or  {"action": ..., "filters": {"role", "department", "created_from", "created_to", "q"}}
+    Notification emails are queued and sent in the background; admins get
+    one aggregated 'admin_user_review' socket update.
+    """
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
 
-        return jsonify({
-            'success': True,
-            'message': f'User "{user_name}" ({user_email}) has been permanently deleted from the database',
-            'user_id': user_id,
-            'user_name': user_name
-        }), 200
+    from services.user_review import bulk_review_users
+    from services.email_queue import submit_email_flush
 
+    data = request.get_json(silent=True) or {}
+    filters = data.get('filters')
+    if filters is not None and not isinstance(filters, dict):
+        return jsonify({'error': 'filters must be an object'}), 400
+    try:
+        result = bulk_review_users(data.get('action'), user_ids=data.get('user_ids'), filters=filters,
+                                   acting_user_id=current_user.id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        print(f"[ADMIN DELETE] ❌ Error deleting user: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': f'Error deleting user: {str(e)}'}), 500
+        logger.error(f"[Users] Bulk review failed: {e}")
+        return jsonify({'error': 'Bulk review failed'}), 500
+
+    if result['count']:
+        socketio.emit('admin_user_review', {
+            'action': result['action'],
+            'count': result['count'],
+            'by_role': result['by_role'],
+            'admin': current_user.name,
+            'timestamp': datetime.now().isoformat()
+        }, room='admin_monitor')
+    if result['emails_queued']:
+        submit_email_flush()
+    return jsonify({'success': True, **result})
 
 # --- ADMIN JOB MANAGEMENT ---
 
@@ -3095,13 +3193,12 @@ def admin_jobs():
             ORDER BY j.created_at DESC
         ''').fetchall()
         
-        total_jobs = conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
-        active_jobs = conn.execute(
-            "SELECT COUNT(*) FROM jobs WHERE is_active = 1 AND approval_status = 'approved'"
-        ).fetchone()[0]
-        pending_count = conn.execute(
-            "SELECT COUNT(*) FROM jobs WHERE approval_status = 'pending'"
-        ).fetchone()[0]
+        # Totals from the maintained counters; "expired" depends on today, so it
+        # stays a query (a range scan of idx_jobs_approval_deadline)
+        job_stats = get_admin_job_stats(conn)
+        total_jobs = job_stats['total']
+        active_jobs = job_stats['active']
+        pending_count = job_stats['pending']
         expired_jobs = conn.execute(
             "SELECT COUNT(*) FROM jobs WHERE deadline < ? AND deadline != '' AND deadline IS NOT NULL AND approval_status = 'approved'",
             (today,)
@@ -3141,6 +3238,9 @@ def admin_approve_job(job_id):
                 'job_id': job_id,
                 'job_title': job['title'],
             }, room=f"user_{job['posted_by']}")
+        # Notify matching students (indexed skill lookup, batched rows, online push)
+        from services.job_fanout import submit_job_fanout
+        submit_job_fanout(job_id)
         return jsonify({'success': True, 'message': 'Job approved and is now visible to students.'})
     except Exception as e:
         logger.error(f"Error approving job: {e}")
@@ -3181,6 +3281,34 @@ def admin_reject_job(job_id):
             conn.close()
 
 
+@app.route('/api/job-notifications', methods=['GET'])
+@login_required
+def api_job_notifications():
+    """New jobs matching the current student's skills (unread unless ?all=1)."""
+    if current_user.role != 'student':
+        return jsonify({'notifications': [], 'unread': 0})
+    from services.job_fanout import get_job_notifications
+    notifications = get_job_notifications(current_user.id, unread_only=request.args.get('all') != '1',
+                                          limit=min(request.args.get('limit', 20, type=int), 100))
+    return jsonify({'notifications': notifications,
+                    'unread': sum(1 for n in notifications if n['read_at'] is None)})
+
+@app.route('/api/job-notifications/read', methods=['POST'])
+@login_required
+def api_job_notifications_read():
+    if current_user.role != 'student':
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    from services.job_fanout import mark_job_notifications_read
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict) or ('job_ids' in data and data['job_ids'] is None):
+        return jsonify({'success': False, 'error': 'job_ids must be a list of integers'}), 400
+    try:
+        # No job_ids key marks every notification read
+        marked = mark_job_notifications_read(current_user.id, data.get('job_ids'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'marked': marked})
+
 @app.route('/api/admin/jobs/pending-count', methods=['GET'])
 @login_required
 def api_pending_jobs_count():
@@ -3189,7 +3317,7 @@ def api_pending_jobs_count():
     conn = None
     try:
         conn = get_db_connection()
-        count = conn.execute("SELECT COUNT(*) FROM jobs WHERE approval_status = 'pending'").fetchone()[0]
+        count = get_counter(conn, 'jobs', 'pending')
         return jsonify({'count': count})
     except Exception as e:
         logger.error(f"Error fetching pending jobs count: {e}")
@@ -3309,8 +3437,12 @@ def admin_add_job():
             apply_method, apply_link, openings, selection_process, category,
             target_role, skill_level, current_user.id, logo_path, 'Open'
         ))
+        job_id = c.lastrowid
         conn.commit()
         conn.close()
+
+        from services.job_fanout import submit_job_fanout
+        submit_job_fanout(job_id)
         
         flash('Job added successfully!', 'success')
         return redirect(url_for('admin_jobs'))
@@ -3636,6 +3768,7 @@ def upgrade_to_alumni():
                  pass_year, company_name, designation))
 
             conn.commit()
+            mark_profile_changed(current_user.id)
 
             flash('Successfully upgraded to Alumni! Your role has been changed.', 'success')
             return redirect(url_for('alumni_profile', user_id=current_user.id))
@@ -3862,6 +3995,8 @@ def send_connection_request():
             conn.execute('INSERT INTO connections (user_id_1, user_id_2) VALUES (?, ?)',
                      (min(current_user.id, receiver_id), max(current_user.id, receiver_id)))
             conn.commit()
+            notify_interaction(current_user.id, receiver_id)
+            invalidate_recommendations(current_user.id, receiver_id)
 
             try:
                 send_connection_email(receiver['email'], receiver['name'], current_user.name, current_user.role, 'mutual')
@@ -3876,6 +4011,8 @@ def send_connection_request():
             VALUES (?, ?, 'pending')
         ''', (current_user.id, receiver_id))
         conn.commit()
+        notify_interaction(current_user.id, receiver_id)
+        invalidate_recommendations(current_user.id, receiver_id)
 
         try:
             send_connection_email(receiver['email'], receiver['name'], current_user.name, current_user.role, 'request')
@@ -3934,6 +4071,8 @@ def accept_connection_request(sender_id):
         ''', (min(sender_id, current_user.id), max(sender_id, current_user.id)))
 
         conn.commit()
+        notify_interaction(sender_id, current_user.id)
+        invalidate_recommendations(sender_id, current_user.id)
 
         try:
             if sender:
@@ -3986,6 +4125,7 @@ def reject_connection_request(sender_id):
         ''', (sender_id, current_user.id))
 
         conn.commit()
+        invalidate_recommendations(sender_id, current_user.id)
 
         try:
             if sender:
@@ -4525,7 +4665,9 @@ def mentorship():
     if current_user.role != 'student':
         flash('Access denied!', 'danger')
         return redirect(url_for('home'))
-    return render_template('student/mentorship.html')
+    from services.mentorship_matcher import get_student_requests
+    return render_template('student/mentorship.html',
+                           mentorship_requests=get_student_requests(current_user.id))
 
 @app.route('/notifications')
 @login_required
@@ -4653,6 +4795,13 @@ def list_jobs():
     # Use modular recommendation logic
     recommended = get_recommended_jobs(current_user)
     conn.close()
+
+    if current_user.role == 'student':
+        try:
+            from services.job_fanout import mark_job_notifications_read
+            mark_job_notifications_read(current_user.id)
+        except Exception as e:
+            logger.warning(f"Could not mark job notifications read: {e}")
     
     if current_user.role == 'alumni':
         return render_template('alumni/jobs.html',
@@ -4699,6 +4848,49 @@ def reports():
     flash('Access denied!', 'danger')
     return redirect(url_for('home'))
 
+@app.route('/api/admin/timeseries')
+@login_required
+def api_admin_timeseries():
+    """
+    Activity time series from the daily rollup.
+
+    Query: metrics (comma-separated), start, end (YYYY-MM-DD),
+    granularity (day | week | month), by_dimension (0 | 1)
+    """
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    from services.timeseries import get_timeseries, METRICS
+
+    args = request.args
+    metrics = [m.strip() for m in args.get('metrics', '').split(',') if m.strip()] or list(METRICS)
+    try:
+        return jsonify(get_timeseries(metrics, start=args.get('start') or None, end=args.get('end') or None,
+                                      granularity=args.get('granularity', 'day'),
+                                      by_dimension=args.get('by_dimension') in ('1', 'true')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/admin/maintenance')
+@login_required
+def api_admin_maintenance():
+    """Database / WAL sizes, backups and recent maintenance runs"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    from services.db_maintenance import get_maintenance_status
+    return jsonify(get_maintenance_status())
+
+@app.route('/api/admin/maintenance/<task>', methods=['POST'])
+@login_required
+def api_admin_run_maintenance(task):
+    """Run one maintenance task (checkpoint | optimize | vacuum | backup | convert) now"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    from services.db_maintenance import run_maintenance_task
+    try:
+        return jsonify(run_maintenance_task(task))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
 # --- ADMIN ROUTES ---
 
 
@@ -4726,20 +4918,17 @@ def reject_user(user_id):
     if current_user.role != 'admin':
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
         
-    conn = get_db_connection()
     try:
-        # Delete user and their profile (profile tables have CASCADE or we manually delete if needed)
-        # Based on schema, we might need manual delete for profiles if not CASCADE
-        conn.execute('DELETE FROM student_profile WHERE user_id = ?', (user_id,))
-        conn.execute('DELETE FROM alumni_profile WHERE user_id = ?', (user_id,))
-        conn.execute('DELETE FROM faculty_profile WHERE user_id = ?', (user_id,))
-        conn.execute('DELETE FROM users WHERE id = ?', (user_id,))
-        conn.commit()
+        # Profiles and everything else follow through ON DELETE CASCADE
+        # pending_only: a user another admin approved meanwhile is left alone
+        result = delete_users([user_id], acting_user_id=current_user.id, pending_only=True)
+        if user_id in result['skipped']:
+            reason = result['skipped'][user_id]
+            status = 404 if reason == 'not found' else 400
+            return jsonify({'success': False, 'error': f'Cannot reject user: {reason}'}), status
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        conn.close()
 
 @app.route('/admin/events')
 @login_required
@@ -4758,6 +4947,99 @@ def admin_stats():
     return render_template('admin/admin_stats.html')
 
 
+# Background Tasks: SQLite maintenance (services/db_maintenance.py) — WAL
+# checkpoints in quiet periods, planner statistics, and a nightly incremental
+# vacuum followed by a rotating online backup (maintenance lock owner only)
+@scheduler.task('interval', id='db_checkpoint', minutes=app.config.get('MAINTENANCE_CHECKPOINT_MINUTES', 10),
+                misfire_grace_time=300)
+def db_checkpoint():
+    with app.app_context():
+        try:
+            from services.db_maintenance import run_scheduled_maintenance
+            run_scheduled_maintenance('checkpoint')
+        except Exception as e:
+            logger.error(f"DB checkpoint failed: {e}")
+
+
+@scheduler.task('interval', id='db_optimize', hours=app.config.get('MAINTENANCE_OPTIMIZE_HOURS', 6),
+                misfire_grace_time=900)
+def db_optimize():
+    with app.app_context():
+        try:
+            from services.db_maintenance import run_scheduled_maintenance
+            run_scheduled_maintenance('optimize')
+        except Exception as e:
+            logger.error(f"DB optimize failed: {e}")
+
+
+@scheduler.task('cron', id='db_nightly_maintenance', hour=app.config.get('MAINTENANCE_HOUR', 3),
+                minute=0, misfire_grace_time=3600)
+def db_nightly_maintenance():
+    with app.app_context():
+        try:
+            from services.db_maintenance import run_scheduled_maintenance
+            run_scheduled_maintenance('vacuum', 'backup', 'checkpoint')
+        except Exception as e:
+            logger.error(f"Nightly DB maintenance failed: {e}")
+
+
+# Background Task: Every 15 minutes, fold new activity rows into the daily
+# admin time series (idempotent per worker, watermark-based)
+@scheduler.task('interval', id='timeseries_rollup', minutes=15, misfire_grace_time=300)
+def timeseries_rollup():
+    with app.app_context():
+        try:
+            from services.timeseries import rollup_timeseries
+            rollup_timeseries()
+        except Exception as e:
+            logger.error(f"Time series rollup failed: {e}")
+
+
+# Background Task: Every 15 minutes, fold new user_interactions into the daily
+# rollup and prune raw rows past the retention window (idempotent per worker)
+@scheduler.task('interval', id='interaction_rollup', minutes=15, misfire_grace_time=300)
+def interaction_rollup():
+    with app.app_context():
+        try:
+            from services.interaction_rollup import run_interaction_maintenance
+            result = run_interaction_maintenance()
+            logger.info(f"Interaction rollup finished: {result}")
+        except Exception as e:
+            logger.error(f"Interaction rollup failed: {e}")
+
+
+@scheduler.task('interval', id='recommendation_batch', minutes=10, misfire_grace_time=300)
+def recommendation_batch():
+    with app.app_context():
+        try:
+            from services.recommendation_batch import run_scheduled_batch
+            run_scheduled_batch()
+        except Exception as e:
+            logger.error(f"Recommendation batch failed: {e}")
+
+
+# Background Task: Every minute, send queued notification emails (services/email_queue.py)
+@scheduler.task('interval', id='email_queue_flush', minutes=1, misfire_grace_time=60)
+def email_queue_flush():
+    with app.app_context():
+        try:
+            from services.email_queue import drain_email_queue
+            drain_email_queue()
+        except Exception as e:
+            logger.error(f"Email queue flush failed: {e}")
+
+
+# Background Task: Every 5 minutes, propose mentors for pending mentorship requests
+@scheduler.task('interval', id='mentorship_matching', minutes=5, misfire_grace_time=300)
+def mentorship_matching():
+    with app.app_context():
+        try:
+            from services.mentorship_matcher import run_scheduled_matching
+            run_scheduled_matching()
+        except Exception as e:
+            logger.error(f"Mentorship matching failed: {e}")
+
+
 # Background Task: Every 2 days, remind all users to update their profile
 @scheduler.task('interval', id='periodic_profile_reminder', days=2, misfire_grace_time=900)
 def periodic_profile_reminder():
@@ -4831,6 +5113,10 @@ try:
     from routes.social_routes import social_bp
     from routes.connection_routes import connection_bp
     from routes.recommendation_routes import recommendation_bp
+    from routes.mentorship_routes import mentorship_bp
+    from routes.directory_routes import directory_bp
+    from routes.export_routes import export_bp
+    from routes.alumni_upgrade_routes import alumni_upgrade_bp
 
     if messaging_bp.name not in app.blueprints:
         app.register_blueprint(messaging_bp, url_prefix='/api')
@@ -4845,6 +5131,18 @@ try:
         
     if recommendation_bp.name not in app.blueprints:
         app.register_blueprint(recommendation_bp)
+
+    if mentorship_bp.name not in app.blueprints:
+        app.register_blueprint(mentorship_bp)
+
+    if directory_bp.name not in app.blueprints:
+        app.register_blueprint(directory_bp)
+
+    if export_bp.name not in app.blueprints:
+        app.register_blueprint(export_bp)
+
+    if alumni_upgrade_bp.name not in app.blueprints:
+        app.register_blueprint(alumni_upgrade_bp)
         
 except Exception as e:
     logger.warning(f"Blueprint registration error: {e}")
@@ -0,0 +1,19 @@
+"""
+benchmarks
+==========
+Reproducible offline evaluation and latency benchmarks for the
+recommendation engine.
+
+Every run builds a fresh synthetic SQLite database (never the live one),
+profiles the engine on it and writes one JSON report, so results can be
+diffed run to run:
+
+    python -m benchmarks --users 10000 --output bench.json
+    python -m benchmarks --users 1000000 --eval-users 500 --skip-eval
+
+Modules:
+    synthetic  — users, connections, requests, messages, jobs, applications
+    profiling  — wall-time / peak-memory measurement helpers
+    evaluate   — holdout precision@k, recall@k and coverage
+    run        — CLI entry point producing the JSON report
+"""
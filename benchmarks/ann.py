@@ -0,0 +1,107 @@
+"""
+benchmarks/ann.py
+==================
+Recall / latency of the LSH index against brute-force cosine search.
+
+For a seeded sample of rows of the published (L2-normalised) KNN matrix
+the exact top-k is computed by scoring every row; each LSH configuration
+is then built over the same matrix and queried for the same rows.
+
+Reported per configuration:
+  build time, per-query latency, recall@k against brute force, mean
+  candidates scored per query, speed-up over brute force, and the cost
+  of incremental insert / delete.
+"""
+
+import re
+import time
+
+import numpy as np
+
+from benchmarks.profiling import profile_call, profile_per_user
+from services.ann_index import RandomProjectionLSH
+
+DEFAULT_CONFIGS = '8x12p0,16x8p0,16x8p1,24x6p1'
+UPDATE_SAMPLE = 200   # rows deleted and re-inserted to time updates
+
+
+def parse_configs(spec):
+    """'8x12p1,16x10p0' → [(tables, bits, probes), ...]"""
+    configs = []
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        match = re.fullmatch(r'(\d+)x(\d+)(?:p(\d+))?', part)
+        if not match:
+            raise ValueError(f"Bad LSH config '{part}' (expected TABLESxBITS[pPROBES])")
+        tables, bits, probes = match.groups()
+        configs.append((int(tables), int(bits), int(probes or 0)))
+    return configs
+
+
+def _brute_top_k(matrix, row, k):
+    sims = np.asarray((matrix @ matrix[row].T).todense()).ravel()
+    k = min(k, len(sims))
+    top = np.argpartition(-sims, k - 1)[:k]
+    return top[sims[top] > 0]
+
+
+def benchmark_ann(matrix, configs, n_queries=200, k=20, seed=42):
+    """
+    Compare LSH configurations with brute force on the same queries.
+
+    Args:
+        matrix: n × n L2-normalised CSR matrix (the KNN model's rows).
+        configs: [(tables, bits, probes), ...]
+        n_queries: Rows queried (sampled with `seed`).
+        k: Neighbours per query.
+
+    Returns:
+        {'queries', 'k', 'brute': latency stats, 'lsh': [per-config results]}
+    """
+    n = matrix.shape[0]
+    rng = np.random.default_rng(seed)
+    queries = [int(q) for q in rng.choice(n, min(n_queries, n), replace=False)]
+
+    exact = {}
+    brute = profile_per_user(lambda q: exact.__setitem__(q, _brute_top_k(matrix, q, k)), queries)
+    report = {'queries': len(queries), 'k': k, 'brute': brute, 'lsh': []}
+
+    for tables, bits, probes in configs:
+        index = RandomProjectionLSH(n_tables=tables, n_bits=bits, probes=probes, seed=seed)
+        _, build = profile_call(index.fit, np.arange(n), matrix)
+
+        found, candidates = {}, []
+
+        def query(q):
+            found[q] = index.query(matrix[q], k)[0]
+
+        latency = profile_per_user(query, queries)
+        for q in queries:
+            candidates.append(len(index.candidates(matrix[q])))
+        recalls = [
+            len(np.intersect1d(found[q], exact[q])) / len(exact[q])
+            for q in queries if len(exact[q])
+        ]
+
+        updated = queries[:UPDATE_SAMPLE]
+        start = time.perf_counter()
+        for q in updated:
+            index.delete(q)
+        delete_ms = (time.perf_counter() - start) * 1000 / max(len(updated), 1)
+        start = time.perf_counter()
+        for q in updated:
+            index.insert(q, matrix[q])
+        insert_ms = (time.perf_counter() - start) * 1000 / max(len(updated), 1)
+
+        report['lsh'].append({
+            'tables': tables, 'bits': bits, 'probes': probes,
+            'build': build,
+            'latency': latency,
+            'recall_at_k': round(float(np.mean(recalls)), 4) if recalls else None,
+            'mean_candidates': round(float(np.mean(candidates)), 1),
+            'speedup_vs_brute': round(brute['mean_ms'] / latency['mean_ms'], 2)
+                                if latency.get('mean_ms') else None,
+            'insert_ms': round(insert_ms, 4),
+            'delete_ms': round(delete_ms, 4),
+            'index': index.stats(),
+        })
+    return report
@@ -0,0 +1,155 @@
+"""
+benchmarks/evaluate.py
+=======================
+Offline holdout evaluation of the recommenders.
+
+Protocol:
+  1. Pick evaluation users with at least MIN_CROSS_ROLE_CONNECTIONS
+     student↔alumni connections (recommendations are cross-role).
+  2. Hide a fraction of those connections — the connection row and the
+     messages exchanged along it — from the database.
+  3. Retrain on what is left and ask every method for top-k.
+  4. precision@k = hits / k, recall@k = hits / hidden, averaged over
+     users; coverage = distinct users recommended / eligible users.
+
+Step 2 mutates the database, so only run this on a benchmark copy
+(copy_database).
+"""
+
+import os
+import time
+import sqlite3
+import logging
+from collections import defaultdict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MIN_CROSS_ROLE_CONNECTIONS = 3
+
+METHODS = ('rule', 'knn', 'hybrid')
+ALL_METHODS = ('rule', 'knn', 'als', 'graph', 'hybrid')
+
+
+def copy_database(src, dst):
+    """Online copy of src into dst (replaced), for the holdout to mutate."""
+    for path in (dst, dst + '-wal', dst + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+    source, target = sqlite3.connect(src), sqlite3.connect(dst)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def hold_out_connections(db_path, n_eval_users, fraction=0.2, seed=42):
+    """
+    Remove a random share of each evaluation user's cross-role connections.
+
+    Returns:
+        {user_id: set(hidden neighbour ids)}
+    """
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+
+    rows = c.execute('''
+        SELECT c.user_id_1, c.user_id_2
+        FROM connections c
+        JOIN users u1 ON u1.id = c.user_id_1
+        JOIN users u2 ON u2.id = c.user_id_2
+        WHERE u1.role IN ('student', 'alumni') AND u2.role IN ('student', 'alumni')
+          AND u1.role != u2.role
+    ''').fetchall()
+
+    neighbours = defaultdict(list)
+    for a, b in rows:
+        neighbours[a].append(b)
+        neighbours[b].append(a)
+
+    eligible = sorted(uid for uid, ns in neighbours.items() if len(ns) >= MIN_CROSS_ROLE_CONNECTIONS)
+    chosen = rng.choice(eligible, min(n_eval_users, len(eligible)), replace=False) if eligible else []
+
+    holdout, removed = {}, set()
+    for uid in map(int, chosen):
+        ns = sorted(n for n in neighbours[uid] if (min(uid, n), max(uid, n)) not in removed)
+        n_hide = max(1, int(round(len(neighbours[uid]) * fraction)))
+        if len(ns) <= n_hide:
+            continue
+        hidden = {int(n) for n in rng.choice(ns, n_hide, replace=False)}
+        holdout[uid] = hidden
+        removed.update((min(uid, n), max(uid, n)) for n in hidden)
+
+    pairs = sorted(removed)
+    c.executemany('DELETE FROM connections WHERE user_id_1 = ? AND user_id_2 = ?', pairs)
+    c.executemany('DELETE FROM private_messages WHERE (sender_id = ? AND receiver_id = ?) '
+                  'OR (sender_id = ? AND receiver_id = ?)',
+                  [(a, b, b, a) for a, b in pairs])
+    conn.commit()
+    conn.close()
+
+    logger.info(f"[Bench] Held out {len(pairs)} connections for {len(holdout)} users")
+    return holdout
+
+
+def _recommenders():
+    from models.recommendation import get_rule_based_recommendations
+    from services.recommendation_engine import get_ml_recommendations, hybrid_recommendation
+    from services.als_engine import get_als_recommendations
+    from services.graph_engine import get_graph_recommendations
+
+    return {
+        'rule': get_rule_based_recommendations,
+        'knn': get_ml_recommendations,
+        'als': get_als_recommendations,
+        'graph': get_graph_recommendations,
+        'hybrid': hybrid_recommendation,
+    }
+
+
+def evaluate_methods(holdout, methods=METHODS, k=5):
+    """
+    Score each method against the hidden connections (needs an app context
+    and models trained on the held-out database).
+
+    Returns:
+        {method: {precision_at_k, recall_at_k, coverage, users_with_recs, seconds}}
+    """
+    from db_utils import get_db_connection
+
+    conn = get_db_connection()
+    n_eligible = conn.execute(
+        "SELECT COUNT(*) FROM users WHERE role IN ('student', 'alumni')").fetchone()[0]
+    conn.close()
+
+    recommenders = _recommenders()
+    results = {}
+    for method in methods:
+        fn = recommenders[method]
+        precision, recall, served = [], [], 0
+        recommended = set()
+        start = time.perf_counter()
+
+        for uid, hidden in holdout.items():
+            recs = [r['id'] for r in fn(uid, limit=k)][:k]
+            hits = len(hidden.intersection(recs))
+            precision.append(hits / k)
+            recall.append(hits / len(hidden))
+            served += bool(recs)
+            recommended.update(recs)
+
+        n = max(len(holdout), 1)
+        results[method] = {
+            'k': k,
+            'users': len(holdout),
+            'precision_at_k': round(float(np.mean(precision)) if precision else 0.0, 4),
+            'recall_at_k': round(float(np.mean(recall)) if recall else 0.0, 4),
+            'coverage': round(len(recommended) / max(n_eligible, 1), 4),
+            'users_with_recs': round(served / n, 4),
+            'seconds': round(time.perf_counter() - start, 3),
+        }
+        logger.info(f"[Bench] {method}: {results[method]}")
+    return results
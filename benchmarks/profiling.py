@@ -0,0 +1,82 @@
+"""
+benchmarks/profiling.py
+========================
+Wall-time and memory measurement helpers.
+
+Peak memory is measured with tracemalloc (numpy/scipy allocations are
+reported to it), so it is the peak *extra* Python-heap usage of the call,
+not the process RSS. Process max RSS is reported separately where the
+platform supports it.
+"""
+
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def max_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / 1024, 1)  # Linux reports KB
+
+
+def _summary(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {
+        'runs': len(ms),
+        'mean_ms': round(float(ms.mean()), 3),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'max_ms': round(float(ms.max()), 3),
+    }
+
+
+def profile_call(fn, *args, repeat=1, **kwargs):
+    """
+    Time `fn(*args, **kwargs)` `repeat` times and record peak memory of
+    the first run.
+
+    Returns:
+        (last result, stats dict)
+    """
+    gc.collect()
+    tracemalloc.start()
+    seconds = []
+    result = None
+    peak = 0
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        seconds.append(time.perf_counter() - start)
+        if i == 0:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    stats = _summary(seconds)
+    stats['peak_alloc_mb'] = round(peak / (1024 * 1024), 2)
+    return result, stats
+
+
+def profile_per_user(fn, user_ids, **kwargs):
+    """
+    Per-call latency distribution of `fn(user_id, **kwargs)` over many users.
+
+    Returns:
+        stats dict (no memory tracing — it would distort short calls)
+    """
+    seconds = []
+    for uid in user_ids:
+        start = time.perf_counter()
+        fn(uid, **kwargs)
+        seconds.append(time.perf_counter() - start)
+    return _summary(seconds) if seconds else {'runs': 0}
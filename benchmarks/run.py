@@ -0,0 +1,168 @@
+"""
+benchmarks/run.py
+==================
+Command-line entry point: generate → profile → evaluate → JSON report.
+
+    python -m benchmarks --users 10000 --output bench.json
+
+The app is imported only after DB_NAME, MODEL_STORE_DIR and LOCK_DIR
+point into the benchmark work directory, with the scheduler and the
+background trainer disabled so no maintenance, rollup, batch, matching
+or email job competes with the measured runs. The holdout evaluation
+deletes connections, so it runs on a copy (eval.db) of the generated
+database, which stays as generated.
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.synthetic import generate_dataset
+from benchmarks.profiling import profile_call, profile_per_user, max_rss_mb
+from benchmarks import evaluate
+from benchmarks.ann import DEFAULT_CONFIGS, parse_configs, benchmark_ann
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Recommendation engine benchmarks')
+    parser.add_argument('--users', type=int, default=10000, help='synthetic users (1k – 1M)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--avg-connections', type=int, default=8)
+    parser.add_argument('--avg-messages', type=int, default=6)
+    parser.add_argument('--k', type=int, default=5, help='recommendations per user')
+    parser.add_argument('--eval-users', type=int, default=200, help='users in the holdout set')
+    parser.add_argument('--latency-users', type=int, default=200, help='users timed per path')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of matrix build / training')
+    parser.add_argument('--holdout-fraction', type=float, default=0.2)
+    parser.add_argument('--methods', default=','.join(evaluate.METHODS),
+                        help=f"comma-separated subset of {','.join(evaluate.ALL_METHODS)}")
+    parser.add_argument('--model', choices=['knn', 'als'], default='knn',
+                        help='RECOMMENDER_MODEL used by the hybrid path')
+    parser.add_argument('--skip-eval', action='store_true', help='latency/memory only')
+    parser.add_argument('--ann-configs', default=DEFAULT_CONFIGS,
+                        help='LSH configs compared with brute force, TABLESxBITS[pPROBES],...')
+    parser.add_argument('--skip-ann', action='store_true', help='no LSH recall/latency report')
+    parser.add_argument('--workdir', help='keep the database and models here (default: temp dir)')
+    parser.add_argument('--output', help='JSON report path (default: stdout)')
+    return parser.parse_args(argv)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    args = _parse_args(argv if argv is not None else sys.argv[1:])
+    methods = [m.strip() for m in args.methods.split(',') if m.strip()]
+    unknown = set(methods) - set(evaluate.ALL_METHODS)
+    if unknown:
+        raise SystemExit(f"Unknown methods: {', '.join(sorted(unknown))}")
+    ann_configs = [] if args.skip_ann else parse_configs(args.ann_configs)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='alumni-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, 'bench.db')
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    os.environ.update({
+        'DB_NAME': db_path,
+        'MODEL_STORE_DIR': os.path.join(workdir, 'models'),
+        'LOCK_DIR': os.path.join(workdir, 'locks'),
+        'SCHEDULER_ENABLED': 'False',
+        'RECOMMENDATION_TRAINER_ENABLED': 'False',
+        'RECOMMENDER_MODEL': args.model,
+    })
+
+    from app import app  # runs init_db() on the empty benchmark database
+    from services import recommendation_engine as engine
+    from services.als_engine import train_als_model
+    from services.graph_engine import get_graph
+
+    report = {
+        'meta': {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args),
+        },
+    }
+
+    report['dataset'] = generate_dataset(
+        db_path, args.users, seed=args.seed,
+        avg_connections=args.avg_connections, avg_messages=args.avg_messages,
+    )
+
+    with app.app_context():
+        latency = {}
+        _, latency['build_interaction_matrix'] = profile_call(
+            engine.build_interaction_matrix, repeat=args.repeat)
+        trained, latency['train_knn_model'] = profile_call(
+            engine.train_knn_model, force=True, repeat=args.repeat)
+        if args.model == 'als' or 'als' in methods:
+            _, latency['train_als_model'] = profile_call(train_als_model)
+
+        conn = engine.get_db_connection()
+        user_ids = [row['id'] for row in conn.execute(
+            "SELECT id FROM users WHERE role IN ('student', 'alumni') ORDER BY id").fetchall()]
+        conn.close()
+        rng = np.random.default_rng(args.seed)
+        sample = [int(uid) for uid in rng.choice(user_ids, min(args.latency_users, len(user_ids)),
+                                                 replace=False)]
+
+        # cold = first request per user (graph PPR computed), warm = cached paths
+        latency['hybrid_recommendation_cold'] = profile_per_user(
+            engine.hybrid_recommendation, sample, limit=args.k)
+        latency['hybrid_recommendation_warm'] = profile_per_user(
+            engine.hybrid_recommendation, sample, limit=args.k)
+        latency['get_ml_recommendations'] = profile_per_user(
+            engine.get_ml_recommendations, sample, limit=args.k)
+        report['latency'] = latency
+        report['model_trained'] = bool(trained)
+        report['engine_stats'] = engine.get_engine_stats()
+
+        model = engine.get_active_model()
+        if ann_configs and model is not None:
+            report['ann'] = benchmark_ann(model['matrix'], ann_configs, n_queries=args.latency_users,
+                                          k=engine.NEIGHBOUR_TABLE_K, seed=args.seed)
+
+        if not args.skip_eval:
+            eval_path = os.path.join(workdir, 'eval.db')
+            evaluate.copy_database(db_path, eval_path)
+            app.config['DB_NAME'] = eval_path
+            holdout = evaluate.hold_out_connections(
+                eval_path, args.eval_users, fraction=args.holdout_fraction, seed=args.seed)
+            engine.train_knn_model(force=True)
+            get_graph(force_check=True)  # don't serve the pre-holdout graph from cache
+            if args.model == 'als' or 'als' in methods:
+                train_als_model()
+            report['evaluation'] = evaluate.evaluate_methods(holdout, methods, k=args.k)
+
+    report['memory'] = {'max_rss_mb': max_rss_mb()}
+    report['meta']['finished_at'] = datetime.now().isoformat(timespec='seconds')
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
@@ -0,0 +1,202 @@
+"""
+benchmarks/synthetic.py
+========================
+Synthetic data generator for recommendation benchmarks.
+
+Users are spread over "communities" (branch × skill cluster) so the graph
+has structure a recommender can recover: most connections, messages and
+job applications stay inside a community, a few cross it at random.
+Everything is drawn from a seeded numpy generator — the same arguments
+always produce the same database.
+
+The target database must already have the app schema (run init_db on it
+first); missing optional tables (private_messages, job_applications) are
+created here with the same definitions as scripts/.
+"""
+
+import time
+import sqlite3
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BRANCHES = ['Computer Science', 'Information Technology', 'Mechanical Engineering',
+            'Civil Engineering', 'Electronics & Communication', 'Management']
+SKILLS = ['python', 'java', 'sql', 'react', 'machine learning', 'cloud', 'c++',
+          'data analysis', 'design', 'marketing', 'finance', 'autocad', 'embedded',
+          'networking', 'devops', 'android']
+CITIES = ['Mumbai', 'Pune', 'Thane', 'Navi Mumbai', 'Nashik', 'Bangalore']
+DOMAINS = ['Software', 'Data', 'Core Engineering', 'Consulting', 'Finance', 'Research']
+
+USERS_PER_COMMUNITY = 200
+INSERT_CHUNK = 50000
+
+_OPTIONAL_TABLES = (
+    '''CREATE TABLE IF NOT EXISTS private_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sender_id INTEGER NOT NULL,
+        receiver_id INTEGER NOT NULL,
+        content TEXT NOT NULL,
+        is_read BOOLEAN DEFAULT 0,
+        read_at TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        deleted_by_sender BOOLEAN DEFAULT 0,
+        deleted_by_receiver BOOLEAN DEFAULT 0,
+        FOREIGN KEY(sender_id) REFERENCES users(id),
+        FOREIGN KEY(receiver_id) REFERENCES users(id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS job_applications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id INTEGER,
+        student_id INTEGER,
+        status TEXT DEFAULT 'applied',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE,
+        FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE
+    )''',
+)
+
+
+def _insert_chunked(c, sql, rows):
+    for start in range(0, len(rows), INSERT_CHUNK):
+        c.executemany(sql, rows[start:start + INSERT_CHUNK])
+
+
+def _community_pairs(rng, community, n_pairs, p_within):
+    """
+    Draw (a, b) index pairs, a ≠ b; with probability p_within b is taken
+    from a's community, otherwise uniformly from all users.
+    """
+    n = len(community)
+    order = np.argsort(community, kind='stable')
+    starts = np.searchsorted(community[order], np.arange(community.max() + 1))
+    sizes = np.diff(np.append(starts, n))
+
+    a = rng.integers(0, n, n_pairs)
+    b = rng.integers(0, n, n_pairs)
+    within = rng.random(n_pairs) < p_within
+    ca = community[a[within]]
+    b[within] = order[starts[ca] + (rng.random(within.sum()) * sizes[ca]).astype(np.int64)]
+    keep = a != b
+    return a[keep], b[keep]
+
+
+def generate_dataset(db_path, n_users, seed=42, avg_connections=8, avg_messages=6,
+                     pending_per_user=1, jobs_per_alumni=0.1, applications_per_student=2,
+                     p_within=0.8):
+    """
+    Fill a database with a synthetic alumni network.
+
+    Args:
+        db_path: SQLite database with the app schema.
+        n_users: Number of users (60% students, 40% alumni).
+        seed: Random seed.
+        avg_connections: Mean accepted connections per user.
+        avg_messages: Mean private messages sent per user.
+        pending_per_user: Mean pending connection requests sent per user.
+        jobs_per_alumni: Jobs posted per alumni.
+        applications_per_student: Job applications per student.
+        p_within: Share of edges that stay inside a community.
+
+    Returns:
+        Dict of row counts per table and the generation time.
+    """
+    start = time.time()
+    rng = np.random.default_rng(seed)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=OFF')
+    c = conn.cursor()
+    for ddl in _OPTIONAL_TABLES:
+        c.execute(ddl)
+
+    # ----- Users -----
+    n_communities = max(1, n_users // USERS_PER_COMMUNITY)
+    community = rng.integers(0, n_communities, n_users)
+    is_student = rng.random(n_users) < 0.6
+    branch_of = community % len(BRANCHES)
+    skill_base = (community * 3) % len(SKILLS)
+    first_id = (c.execute('SELECT COALESCE(MAX(id), 0) FROM users').fetchone()[0]) + 1
+
+    users = []
+    for i in range(n_users):
+        skills = {SKILLS[(skill_base[i] + k) % len(SKILLS)] for k in range(3)
+                  if rng.random() < 0.8} | {SKILLS[rng.integers(len(SKILLS))]}
+        role = 'student' if is_student[i] else 'alumni'
+        users.append((
+            f'Synthetic User {i}', f'synthetic{i}@bench.local', 'x', role,
+            BRANCHES[branch_of[i]], ', '.join(sorted(skills)),
+            int(2027 - rng.integers(0, 4) if is_student[i] else 2023 - rng.integers(0, 15)),
+            CITIES[(community[i] + rng.integers(0, 2)) % len(CITIES)],
+            DOMAINS[community[i] % len(DOMAINS)], 1, 1,
+        ))
+    _insert_chunked(c, '''INSERT INTO users (name, email, password, role, branch, skills,
+                              passing_year, city, current_domain, is_verified, is_approved)
+                          VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', users)
+    del users
+    ids = np.arange(first_id, first_id + n_users, dtype=np.int64)
+
+    # ----- Accepted connections (undirected, unique, stored low→high) -----
+    a, b = _community_pairs(rng, community, n_users * avg_connections // 2, p_within)
+    pairs = np.unique(np.sort(np.stack([ids[a], ids[b]], axis=1), axis=1), axis=0)
+    _insert_chunked(c, 'INSERT OR IGNORE INTO connections (user_id_1, user_id_2) VALUES (?, ?)',
+                    pairs.tolist())
+
+    # ----- Pending requests (skip pairs that are already connected) -----
+    a, b = _community_pairs(rng, community, int(n_users * pending_per_user), p_within)
+    requests = np.stack([ids[a], ids[b]], axis=1)
+    connected = set(map(tuple, pairs.tolist()))
+    requests = [(int(s), int(r)) for s, r in requests.tolist()
+                if (min(s, r), max(s, r)) not in connected]
+    _insert_chunked(c, "INSERT OR IGNORE INTO connection_requests (sender_id, receiver_id, status) "
+                       "VALUES (?, ?, 'pending')", requests)
+
+    # ----- Messages (mostly along existing connections) -----
+    n_messages = n_users * avg_messages
+    along = pairs[rng.integers(0, len(pairs), n_messages)] if len(pairs) else np.empty((0, 2), np.int64)
+    flip = rng.random(len(along)) < 0.5
+    along[flip] = along[flip][:, ::-1]
+    _insert_chunked(c, "INSERT INTO private_messages (sender_id, receiver_id, content) VALUES (?, ?, 'hi')",
+                    along.tolist())
+
+    # ----- Jobs posted by alumni, applications by students -----
+    alumni_idx = np.flatnonzero(~is_student)
+    student_idx = np.flatnonzero(is_student)
+    n_jobs = int(len(alumni_idx) * jobs_per_alumni)
+    jobs = []
+    if n_jobs:
+        posters = rng.choice(alumni_idx, n_jobs)
+        first_job = (c.execute('SELECT COALESCE(MAX(id), 0) FROM jobs').fetchone()[0]) + 1
+        _insert_chunked(c, "INSERT INTO jobs (title, company, posted_by, is_active) VALUES (?, 'Synthetic Co', ?, 1)",
+                        [(f'Job {j}', int(ids[p])) for j, p in enumerate(posters)])
+        jobs = np.arange(first_job, first_job + n_jobs)
+
+        # students apply to jobs from their own community when one exists
+        job_community = community[posters]
+        order = np.argsort(job_community, kind='stable')
+        n_apps = int(len(student_idx) * applications_per_student)
+        applicants = rng.choice(student_idx, n_apps)
+        lo = np.searchsorted(job_community[order], community[applicants], 'left')
+        hi = np.searchsorted(job_community[order], community[applicants], 'right')
+        random_job = rng.integers(0, n_jobs, n_apps)
+        has_local = hi > lo
+        pick = random_job.copy()
+        pick[has_local] = order[lo[has_local] + (rng.random(has_local.sum())
+                                                  * (hi - lo)[has_local]).astype(np.int64)]
+        _insert_chunked(c, 'INSERT INTO job_applications (job_id, student_id) VALUES (?, ?)',
+                        [(int(jobs[j]), int(ids[s])) for j, s in zip(pick, applicants)])
+
+    conn.commit()
+    counts = {
+        table: c.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        for table in ('users', 'connections', 'connection_requests', 'private_messages',
+                      'jobs', 'job_applications')
+    }
+    conn.close()
+
+    counts['generation_seconds'] = round(time.time() - start, 2)
+    logger.info(f"[Bench] Synthetic dataset ready: {counts}")
+    return counts
@@ -8,6 +8,49 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-key-change-in-production')
     DEBUG = False
     DB_NAME = os.getenv('DB_NAME', 'data/college_pro.db')
+    MODEL_STORE_DIR = os.getenv('MODEL_STORE_DIR', 'data/models')  # published recommendation models
+    LOCK_DIR = os.getenv('LOCK_DIR', 'data/locks')                  # single-owner process locks
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'True') == 'True'  # False = no periodic jobs in this process
+    EXPORT_DIR = os.getenv('EXPORT_DIR', 'data/exports')            # background CSV exports
+    EXPORT_RETENTION_HOURS = float(os.getenv('EXPORT_RETENTION_HOURS', 24))
+    BACKUP_PAGES_PER_STEP = int(os.getenv('BACKUP_PAGES_PER_STEP', 1024))  # online backup batch size
+    UPGRADE_CHUNK_SIZE = int(os.getenv('UPGRADE_CHUNK_SIZE', 200))       # students per alumni-upgrade transaction
+    UPGRADE_CHUNK_PAUSE = float(os.getenv('UPGRADE_CHUNK_PAUSE', 0.05))  # seconds without the writer lock between chunks
+    BACKUP_DIR = os.getenv('BACKUP_DIR', 'data/backups')            # nightly rotating backups
+    BACKUP_KEEP = int(os.getenv('BACKUP_KEEP', 7))
+    MAINTENANCE_ENABLED = os.getenv('MAINTENANCE_ENABLED', 'True') == 'True'
+    MAINTENANCE_HOUR = int(os.getenv('MAINTENANCE_HOUR', 3))                    # nightly vacuum + backup
+    MAINTENANCE_CHECKPOINT_MINUTES = int(os.getenv('MAINTENANCE_CHECKPOINT_MINUTES', 10))
+    MAINTENANCE_QUIET_SECONDS = int(os.getenv('MAINTENANCE_QUIET_SECONDS', 60))  # no writes → checkpoint
+    MAINTENANCE_WAL_MAX_MB = int(os.getenv('MAINTENANCE_WAL_MAX_MB', 64))        # ... or WAL this large
+    MAINTENANCE_OPTIMIZE_HOURS = int(os.getenv('MAINTENANCE_OPTIMIZE_HOURS', 6))
+    MAINTENANCE_ANALYSIS_LIMIT = int(os.getenv('MAINTENANCE_ANALYSIS_LIMIT', 1000))
+    MAINTENANCE_VACUUM_PAGES = int(os.getenv('MAINTENANCE_VACUUM_PAGES', 10000))  # per nightly run
+    MAINTENANCE_CONVERT_MAX_MB = int(os.getenv('MAINTENANCE_CONVERT_MAX_MB', 50))  # larger → admin 'convert' task
+    RECOMMENDATION_TRAINER_ENABLED = os.getenv('RECOMMENDATION_TRAINER_ENABLED', 'True') == 'True'
+    RECOMMENDER_MODEL = os.getenv('RECOMMENDER_MODEL', 'knn')        # 'knn' or 'als'
+    ALS_FACTORS = int(os.getenv('ALS_FACTORS', 32))
+    ALS_ITERATIONS = int(os.getenv('ALS_ITERATIONS', 10))
+    ALS_REGULARIZATION = float(os.getenv('ALS_REGULARIZATION', 0.1))
+    ALS_ALPHA = float(os.getenv('ALS_ALPHA', 2.0))
+    ALS_WORKERS = int(os.getenv('ALS_WORKERS', 0))                   # 0 = one per CPU
+    INTERACTION_FLUSH_EVENTS = int(os.getenv('INTERACTION_FLUSH_EVENTS', 200))  # flush after N events
+    INTERACTION_FLUSH_MS = int(os.getenv('INTERACTION_FLUSH_MS', 1000))         # ... or T milliseconds
+    INTERACTION_BUFFER_MAX = int(os.getenv('INTERACTION_BUFFER_MAX', 10000))    # distinct tuples held
+    INTERACTION_RAW_RETENTION_DAYS = int(os.getenv('INTERACTION_RAW_RETENTION_DAYS', 90))
+    INTERACTION_ARCHIVE_DB = os.getenv('INTERACTION_ARCHIVE_DB', '')    # archive pruned raw rows here
+    INTERACTION_HALF_LIFE_DAYS = float(os.getenv('INTERACTION_HALF_LIFE_DAYS', 0))  # 0 = no decay
+    RECOMMENDATION_BATCH_ENABLED = os.getenv('RECOMMENDATION_BATCH_ENABLED', 'True') == 'True'
+    RECOMMENDATION_BATCH_WORKERS = int(os.getenv('RECOMMENDATION_BATCH_WORKERS', 0))  # 0 = one per CPU
+    RECOMMENDATION_BATCH_SIZE = int(os.getenv('RECOMMENDATION_BATCH_SIZE', 10))        # stored per user
+    RECOMMENDATION_BATCH_FULL_HOURS = float(os.getenv('RECOMMENDATION_BATCH_FULL_HOURS', 24))
+    KNN_INDEX = os.getenv('KNN_INDEX', 'brute')                     # 'brute' or 'lsh' (approximate)
+    LSH_TABLES = int(os.getenv('LSH_TABLES', 16))
+    LSH_BITS = int(os.getenv('LSH_BITS', 8))
+    LSH_PROBES = int(os.getenv('LSH_PROBES', 1))                    # multi-probe Hamming radius (0–2)
+    MENTORSHIP_MATCHING_ENABLED = os.getenv('MENTORSHIP_MATCHING_ENABLED', 'True') == 'True'
+    MENTORSHIP_CANDIDATES = int(os.getenv('MENTORSHIP_CANDIDATES', 30))           # mentor edges per student
+    MENTORSHIP_FULL_REMATCH_HOURS = float(os.getenv('MENTORSHIP_FULL_REMATCH_HOURS', 0))  # 0 = admin only
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
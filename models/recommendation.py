@@ -193,7 +193,8 @@ def get_rule_based_recommendations(user_id, limit=5):
 def get_recommended_users(user):
     """
     Backward-compatible wrapper called from dashboard routes.
-    Delegates to hybrid_recommendation when ML engine is available,
+    Serves the materialised recommendations when they are current, else
+    the cached hybrid_recommendation when ML engine is available,
     otherwise falls back to rule-based only.
     """
     if not user or not hasattr(user, 'id') or not user.id:
@@ -202,14 +203,67 @@ def get_recommended_users(user):
         return []
 
     try:
-        # Try hybrid (ML + rule-based) first
-        from services.recommendation_engine import hybrid_recommendation
-        return hybrid_recommendation(user.id)
+        # Materialised by the batch job; otherwise hybrid from the per-user cache
+        from services.recommendation_batch import get_materialised_recommendations
+        recs = get_materialised_recommendations(user.id)
+        if recs is not None:
+            return recs
+        from services.recommendation_cache import get_cached_recommendations
+        return get_cached_recommendations(user.id)
     except Exception as e:
         logger.warning(f"ML engine unavailable, falling back to rule-based: {e}")
         return get_rule_based_recommendations(user.id)
 
 
+def notify_interaction(user_id, target_user_id):
+    """
+    Tell the ML engine that an interaction (connection, message, ...) was
+    just committed so the affected users are refreshed incrementally.
+    Safe to call from any route — never raises.
+    """
+    try:
+        from services.recommendation_engine import notify_interaction_event
+        notify_interaction_event(user_id, target_user_id)
+    except Exception as e:
+        logger.debug(f"Incremental recommendation update skipped: {e}")
+
+
+def invalidate_recommendations(*user_ids):
+    """
+    Drop cached recommendations of users whose connections or pending
+    requests just changed. Safe to call from any route — never raises.
+    """
+    try:
+        from services.recommendation_cache import invalidate_user_recommendations
+        invalidate_user_recommendations(*user_ids)
+    except Exception as e:
+        logger.debug(f"Recommendation cache invalidation skipped: {e}")
+
+
+def forget_deleted_users(*user_ids):
+    """
+    Remove deleted users from the recommender's in-memory indexes.
+    Safe to call from any route — never raises.
+    """
+    try:
+        from services.recommendation_engine import forget_deleted_users as _forget
+        _forget(*user_ids)
+    except Exception as e:
+        logger.debug(f"Recommender index cleanup skipped: {e}")
+
+
+def mark_profile_changed(*user_ids):
+    """
+    Re-vectorise users' profile text for content recommendations after an
+    edit. Safe to call from any route — never raises.
+    """
+    try:
+        from services.content_engine import mark_profile_changed as _mark
+        _mark(*user_ids)
+    except Exception as e:
+        logger.debug(f"Profile change not recorded: {e}")
+
+
 def get_recommended_jobs(user):
     """
     Job Recommendation Engine
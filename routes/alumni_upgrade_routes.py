@@ -0,0 +1,64 @@
+"""
+routes/alumni_upgrade_routes.py
+================================
+Semester-end student → alumni upgrades for admins (services/alumni_upgrade.py).
+
+Endpoints:
+  POST /api/admin/alumni-upgrades/preview   → matching students, body {"degree", "semester", "department"?}
+  POST /api/admin/alumni-upgrades           → start a job, body as preview + {"pass_year"}
+  GET  /api/admin/alumni-upgrades           → the most recent jobs
+  GET  /api/admin/alumni-upgrades/<id>      → status and progress (total / processed / upgraded / skipped)
+"""
+
+from flask import Blueprint, jsonify, request
+from flask_login import login_required, current_user
+import logging
+
+from services.alumni_upgrade import preview_upgrade, submit_upgrade, get_upgrade_job, get_recent_upgrade_jobs
+
+logger = logging.getLogger(__name__)
+
+alumni_upgrade_bp = Blueprint('alumni_upgrade_api', __name__, url_prefix='/api/admin/alumni-upgrades')
+
+
+@alumni_upgrade_bp.before_request
+@login_required
+def _admin_only():
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+
+@alumni_upgrade_bp.route('/preview', methods=['POST'])
+def preview():
+    data = request.get_json(silent=True) or {}
+    try:
+        return jsonify(preview_upgrade(data.get('degree'), data.get('semester'), data.get('department')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@alumni_upgrade_bp.route('', methods=['POST'])
+def create_upgrade():
+    data = request.get_json(silent=True) or {}
+    try:
+        job = submit_upgrade(data.get('degree'), data.get('semester'), data.get('pass_year'),
+                             department=data.get('department'), requested_by=current_user.id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"[Users] Could not start alumni upgrade: {e}")
+        return jsonify({'error': 'Could not start upgrade'}), 500
+    return jsonify({'success': True, 'job': job}), 202
+
+
+@alumni_upgrade_bp.route('', methods=['GET'])
+def list_upgrades():
+    return jsonify({'jobs': get_recent_upgrade_jobs(max(1, min(request.args.get('limit', 10, type=int), 50)))})
+
+
+@alumni_upgrade_bp.route('/<int:job_id>')
+def upgrade_status(job_id):
+    job = get_upgrade_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Upgrade job not found'}), 404
+    return jsonify(job)
@@ -5,6 +5,7 @@ from extensions import mail
 from flask_mail import Message
 from datetime import datetime
 from db_utils import get_db_connection
+from models.recommendation import notify_interaction, invalidate_recommendations
 
 connection_bp = Blueprint('connection_request_api', __name__, url_prefix='/api/connection-request')
 
@@ -71,6 +72,10 @@ def send_connection_request():
             except sqlite3.IntegrityError:
                 conn.close()
                 return jsonify({'success': False, 'error': 'Request already exists'}), 400
+
+        # Recommender hooks (common for both: a resend moves created_at too)
+        notify_interaction(current_user.id, receiver_id)
+        invalidate_recommendations(current_user.id, receiver_id)
         
         # Send email (Common for both)
         try:
@@ -154,6 +159,8 @@ def accept_connection_request(request_id):
         )
         
         conn.commit()
+        notify_interaction(req['sender_id'], current_user.id)
+        invalidate_recommendations(req['sender_id'], current_user.id)
         
         # Send email notification
         sender = c.execute('SELECT * FROM users WHERE id = ?', (req['sender_id'],)).fetchone()
@@ -222,6 +229,7 @@ def reject_connection_request(request_id):
         )
         
         conn.commit()
+        invalidate_recommendations(req['sender_id'], current_user.id)
         
         # Send email notification
         sender = c.execute('SELECT * FROM users WHERE id = ?', (req['sender_id'],)).fetchone()
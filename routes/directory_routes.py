@@ -0,0 +1,62 @@
+"""
+routes/directory_routes.py
+===========================
+Paginated people directory behind the student and faculty dashboards.
+
+Endpoints:
+  GET /api/directory/<role>   → one page of alumni / student / faculty
+
+Query parameters:
+  cursor      next_cursor of the previous page (omit for the first page)
+  limit       page size (default 24, max 100)
+  sort        alumni: pass_year | name — students, faculty: name
+  department  exact department
+  year        alumni pass year
+  semester    student semester
+  q           substring of name / department / company or skills
+  fields      comma-separated columns to return
+
+Returns JSON:
+  { "items": [ {id, ...fields}, ... ], "next_cursor": "..." | null, "sort": "name" }
+"""
+
+from flask import Blueprint, jsonify, request
+from flask_login import login_required, current_user
+import logging
+
+from services.directory import list_directory, DIRECTORY_ROLES
+
+logger = logging.getLogger(__name__)
+
+directory_bp = Blueprint('directory_api', __name__, url_prefix='/api/directory')
+
+
+@directory_bp.route('/<role>')
+@login_required
+def directory_page(role):
+    if current_user.role not in ('student', 'faculty', 'alumni', 'admin'):
+        return jsonify({'error': 'Unauthorized'}), 403
+    if role not in DIRECTORY_ROLES:
+        return jsonify({'error': f'Unknown directory: {role}'}), 404
+
+    args = request.args
+    fields = [f.strip() for f in args.get('fields', '').split(',') if f.strip()] or None
+    try:
+        page = list_directory(
+            role,
+            cursor=args.get('cursor') or None,
+            limit=args.get('limit', type=int),
+            sort=args.get('sort') or None,
+            filters={'department': args.get('department'),
+                     'year': args.get('year', type=int),
+                     'semester': args.get('semester', type=int)},
+            q=(args.get('q') or '').strip() or None,
+            fields=fields,
+            exclude_user_id=current_user.id,
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Directory error ({role}): {e}")
+        return jsonify({'error': 'Directory unavailable'}), 500
+    return jsonify(page)
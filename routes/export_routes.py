@@ -0,0 +1,69 @@
+"""
+routes/export_routes.py
+========================
+Background CSV exports for admins (services/csv_export.py).
+
+Endpoints:
+  POST /api/admin/exports                 → queue an export, body {"kind": "...", "gzip": false}
+  GET  /api/admin/exports                 → the most recent exports
+  GET  /api/admin/exports/<id>            → status, row count and size of one export
+  GET  /api/admin/exports/<id>/download   → the finished file
+
+kind is one of student | alumni | faculty | all | registrations. The
+streaming endpoints (/api/download-csv/<role>, /admin/export/registrations)
+queue the same jobs when called with ?background=1.
+"""
+
+from flask import Blueprint, jsonify, request, send_file
+from flask_login import login_required, current_user
+import logging
+
+from services.csv_export import EXPORTS, submit_export, get_export, get_export_path, get_recent_exports
+
+logger = logging.getLogger(__name__)
+
+export_bp = Blueprint('export_api', __name__, url_prefix='/api/admin/exports')
+
+
+@export_bp.before_request
+@login_required
+def _admin_only():
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+
+@export_bp.route('', methods=['POST'])
+def create_export():
+    data = request.get_json(silent=True) or {}
+    kind = data.get('kind') or request.args.get('kind')
+    if kind not in EXPORTS:
+        return jsonify({'error': f"kind must be one of {', '.join(EXPORTS)}"}), 400
+    try:
+        job = submit_export(kind, compress=bool(data.get('gzip')), requested_by=current_user.id)
+    except Exception as e:
+        logger.error(f"[Export] Could not queue {kind} export: {e}")
+        return jsonify({'error': 'Could not queue export'}), 500
+    return jsonify({'success': True, 'export': job}), 202
+
+
+@export_bp.route('', methods=['GET'])
+def list_exports():
+    return jsonify({'exports': get_recent_exports(max(1, min(request.args.get('limit', 10, type=int), 50)))})
+
+
+@export_bp.route('/<int:export_id>')
+def export_status(export_id):
+    job = get_export(export_id)
+    if job is None:
+        return jsonify({'error': 'Export not found'}), 404
+    return jsonify(job)
+
+
+@export_bp.route('/<int:export_id>/download')
+def download_export(export_id):
+    found = get_export_path(export_id)
+    if found is None:
+        return jsonify({'error': 'Export not ready'}), 404
+    path, filename = found
+    return send_file(path, as_attachment=True, download_name=filename,
+                     mimetype='application/gzip' if filename.endswith('.gz') else 'text/csv')
@@ -0,0 +1,153 @@
+"""
+routes/mentorship_routes.py
+============================
+JSON API of the mentorship subsystem (see services/mentorship_matcher.py).
+
+Endpoints:
+  POST /api/mentorship/requests                → student opens a request {topics, message}
+  GET  /api/mentorship/requests                → student's requests with proposed / accepted mentor
+  POST /api/mentorship/requests/<id>/cancel    → student cancels an open request
+  GET  /api/mentorship/mentor-profile          → alumnus' capacity, topics and load
+  POST /api/mentorship/mentor-profile          → alumnus sets {capacity, topics, is_active}
+  GET  /api/mentorship/mentees                 → alumnus' proposed and accepted mentees
+  POST /api/mentorship/requests/<id>/respond   → alumnus accepts / declines {action}
+  POST /api/mentorship/requests/<id>/complete  → student or mentor ends an accepted mentorship
+  POST /api/mentorship/match                   → run the matcher now {full} (admin only)
+  GET  /api/mentorship/stats                   → request counts and last run (admin only)
+"""
+
+from flask import Blueprint, jsonify, request
+from flask_login import login_required, current_user
+import logging
+
+from services import mentorship_matcher as matcher
+
+logger = logging.getLogger(__name__)
+
+mentorship_bp = Blueprint('mentorship_api', __name__, url_prefix='/api/mentorship')
+
+
+def _forbidden(role):
+    return jsonify({'success': False, 'error': f'Only {role} can do this'}), 403
+
+
+@mentorship_bp.route('/requests', methods=['POST'])
+@login_required
+def create_request():
+    """Open a mentorship request; matching runs in the background."""
+    if current_user.role != 'student':
+        return _forbidden('students')
+
+    data = request.get_json(silent=True) or {}
+    topics = matcher.parse_topics(data.get('topics', ''))
+    if not topics:
+        return jsonify({'success': False, 'error': 'Please name at least one topic'}), 400
+
+    try:
+        request_id = matcher.create_request(current_user.id, topics, data.get('message', ''))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Mentorship request error: {e}")
+        return jsonify({'success': False, 'error': 'Could not create request'}), 500
+    return jsonify({'success': True, 'request_id': request_id}), 201
+
+
+@mentorship_bp.route('/requests', methods=['GET'])
+@login_required
+def my_requests():
+    if current_user.role != 'student':
+        return _forbidden('students')
+    return jsonify({'success': True, 'requests': matcher.get_student_requests(current_user.id)})
+
+
+@mentorship_bp.route('/requests/<int:request_id>/cancel', methods=['POST'])
+@login_required
+def cancel_request(request_id):
+    if current_user.role != 'student':
+        return _forbidden('students')
+    if not matcher.cancel_request(current_user.id, request_id):
+        return jsonify({'success': False, 'error': 'No open request found'}), 404
+    return jsonify({'success': True})
+
+
+@mentorship_bp.route('/mentor-profile', methods=['GET', 'POST'])
+@login_required
+def mentor_profile():
+    """Read or update the current alumnus' mentoring capacity and topics."""
+    if current_user.role != 'alumni':
+        return _forbidden('alumni')
+
+    if request.method == 'GET':
+        return jsonify({'success': True, 'profile': matcher.get_mentor_profile(current_user.id)})
+
+    data = request.get_json(silent=True) or {}
+    try:
+        capacity = int(data.get('capacity', 2))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Capacity must be a number'}), 400
+    if not 0 <= capacity <= matcher.MAX_CAPACITY:
+        return jsonify({'success': False,
+                        'error': f'Capacity must be between 0 and {matcher.MAX_CAPACITY}'}), 400
+
+    profile = matcher.save_mentor_profile(current_user.id, capacity, data.get('topics', ''),
+                                          is_active=bool(data.get('is_active', True)))
+    matcher.request_rematch()
+    return jsonify({'success': True, 'profile': profile})
+
+
+@mentorship_bp.route('/mentees')
+@login_required
+def my_mentees():
+    if current_user.role != 'alumni':
+        return _forbidden('alumni')
+    return jsonify({'success': True, 'mentees': matcher.get_mentor_requests(current_user.id)})
+
+
+@mentorship_bp.route('/requests/<int:request_id>/respond', methods=['POST'])
+@login_required
+def respond(request_id):
+    """Mentor accepts or declines a proposed mentee."""
+    if current_user.role != 'alumni':
+        return _forbidden('alumni')
+
+    action = (request.get_json(silent=True) or {}).get('action')
+    if action not in ('accept', 'decline'):
+        return jsonify({'success': False, 'error': "Action must be 'accept' or 'decline'"}), 400
+    if not matcher.respond_to_proposal(current_user.id, request_id, accept=action == 'accept'):
+        return jsonify({'success': False, 'error': 'No such proposal'}), 404
+    return jsonify({'success': True, 'status': 'accepted' if action == 'accept' else 'declined'})
+
+
+@mentorship_bp.route('/requests/<int:request_id>/complete', methods=['POST'])
+@login_required
+def complete(request_id):
+    """Student or mentor ends an accepted mentorship."""
+    if current_user.role not in ('student', 'alumni'):
+        return _forbidden('students and alumni')
+    if not matcher.end_mentorship(current_user.id, request_id):
+        return jsonify({'success': False, 'error': 'No active mentorship found'}), 404
+    return jsonify({'success': True, 'status': 'completed'})
+
+
+@mentorship_bp.route('/match', methods=['POST'])
+@login_required
+def run_match():
+    """Run the matcher synchronously. Admin-only endpoint."""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized — admin only'}), 403
+
+    full = bool((request.get_json(silent=True) or {}).get('full', False))
+    try:
+        return jsonify({'success': True, 'result': matcher.run_matching(full=full)})
+    except Exception as e:
+        logger.error(f"Mentorship matching error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@mentorship_bp.route('/stats')
+@login_required
+def stats():
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized — admin only'}), 403
+    return jsonify(matcher.get_matching_stats())
@@ -24,6 +24,7 @@ from database.messaging_db import (
     # Suspension functions
     is_user_suspended, suspend_user, unsuspend_user, get_suspended_users
 )
+from models.recommendation import notify_interaction
 
 messaging_bp = Blueprint('messaging', __name__)
 
@@ -186,6 +187,7 @@ def send_private_msg():
     message_id = send_private_message(current_user.id, receiver_id, content)
 
     if message_id:
+        notify_interaction(current_user.id, receiver_id)
         return jsonify({
             'success': True,
             'message_id': message_id,
@@ -6,7 +6,9 @@ Flask API endpoints for the Recommendation System.
 Endpoints:
   GET /recommendations              → current user's recommendations (backward compat)
   GET /recommendations/<user_id>    → recommendations for a specific user (JSON)
-  POST /recommendations/retrain     → retrain the ML model (admin only)
+  POST /recommendations/retrain     → queue a background retrain job (admin only)
+  GET /recommendations/retrain/<id> → retrain job status, stage and durations (admin only)
+  GET /recommendations/stats        → model versions, timings, cache counters (admin only)
   POST /recommendations/log         → log a user interaction
 
 FUTURE SCOPE:
@@ -65,8 +67,11 @@ def recommendations_for_user(user_id):
         return jsonify({'error': 'Unauthorized'}), 403
 
     try:
-        from services.recommendation_engine import hybrid_recommendation
-        recs = hybrid_recommendation(user_id, limit=5)
+        from services.recommendation_batch import get_materialised_recommendations
+        from services.recommendation_cache import get_cached_recommendations
+        recs = get_materialised_recommendations(user_id, limit=5)
+        if recs is None:
+            recs = get_cached_recommendations(user_id, limit=5)
     except Exception as e:
         logger.warning(f"ML engine unavailable for user {user_id}, falling back: {e}")
         recs = get_rule_based_recommendations(user_id, limit=5)
@@ -82,24 +87,67 @@ def recommendations_for_user(user_id):
 @login_required
 def retrain_model():
     """
-    Retrain the ML recommendation model.
-    Admin-only endpoint.
+    Queue a retrain of the ML recommendation models (KNN, plus ALS when
+    selected) as a background job. Admin-only endpoint.
+
+    Returns 202 with the job; if a retrain is already queued or running,
+    that job is returned instead of starting another one.
     """
     if current_user.role != 'admin':
         return jsonify({'error': 'Unauthorized — admin only'}), 403
 
     try:
-        from services.recommendation_engine import train_knn_model
-        success = train_knn_model(force=True)
-        if success:
-            return jsonify({'status': 'success', 'message': 'Model retrained successfully'})
-        else:
-            return jsonify({'status': 'warning', 'message': 'Not enough data to train model'}), 200
+        from services.training_jobs import submit_retrain_job
+        job, created = submit_retrain_job(requested_by=current_user.id)
+        return jsonify({
+            'status': 'queued' if created else 'already_running',
+            'job': job,
+            'status_url': f"/recommendations/retrain/{job['id']}",
+        }), 202
     except Exception as e:
         logger.error(f"Retrain error: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+@recommendation_bp.route('/recommendations/retrain/<int:job_id>')
+@login_required
+def retrain_status(job_id):
+    """
+    Status of a retrain job: status, current stage, per-stage seconds,
+    total duration and the published version. Admin-only endpoint.
+    """
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized — admin only'}), 403
+
+    try:
+        from services.training_jobs import get_job
+        job = get_job(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job)
+    except Exception as e:
+        logger.error(f"Retrain status error: {e}")
+        return jsonify({'status': 'error', 'message': 'Status unavailable'}), 500
+
+
+@recommendation_bp.route('/recommendations/stats')
+@login_required
+def model_stats():
+    """
+    Active model version and timing stats: last full retrain duration vs
+    last incremental update latency. Admin-only endpoint.
+    """
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized — admin only'}), 403
+
+    try:
+        from services.recommendation_engine import get_engine_stats
+        return jsonify(get_engine_stats())
+    except Exception as e:
+        logger.error(f"Model stats error: {e}")
+        return jsonify({'status': 'error', 'message': 'Stats unavailable'}), 500
+
+
 @recommendation_bp.route('/recommendations/log', methods=['POST'])
 @login_required
 def log_user_interaction():
@@ -15,6 +15,7 @@ from database.messaging_db import (
     send_public_message, is_messaging_locked, get_messaging_lock_status,
     mark_conversation_as_read, is_user_suspended
 )
+from models.recommendation import notify_interaction
 
 # Global dict to track online users
 online_users = {}
@@ -231,6 +232,7 @@ def setup_websocket_handlers(socketio):
         message_id = send_private_message(current_user.id, receiver_id, content)
 
         if message_id:
+            notify_interaction(current_user.id, receiver_id)
             message_data = {
                 'id': message_id,
                 'sender_id': current_user.id,
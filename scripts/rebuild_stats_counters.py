@@ -0,0 +1,25 @@
+"""
+Recompute the admin statistics counters (stats_counters) from the source
+tables. Needed only after rows were written without the counter triggers,
+e.g. by an external import or a restored backup of an older schema.
+
+    python scripts/rebuild_stats_counters.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    from app import app
+    from services.stats_counters import rebuild_stats_counters
+
+    with app.app_context():
+        rows = rebuild_stats_counters()
+    print(f"✅ Statistics counters rebuilt ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,15 @@ Business logic for admin dashboard operations.
 Consolidates repeated COUNT queries into single efficient queries.
 
 Functions:
-    get_role_counts()        — Single query for all role counts
-    get_yearly_stats()       — Yearly registration chart data in one query
-    get_admin_job_stats()    — Job statistics in one query
+    get_role_counts()        — User counts per role (stats_counters)
+    get_yearly_stats()       — Yearly registration chart data (stats_counters)
+    get_admin_job_stats()    — Job statistics (stats_counters)
 """
 
 import logging
 from datetime import datetime
 from db_utils import get_db_connection
+from services.stats_counters import get_by_dimension, get_counter, get_metric
 
 logger = logging.getLogger(__name__)
 
@@ -189,30 +190,21 @@ def get_connection_activity(conn, role_filter: str = "all", search: str = "") ->
 
 def get_role_counts(conn) -> dict:
     """
-    Get user counts per role in a SINGLE query instead of 3-4 separate ones.
+    Get user counts per role from the maintained counters (no table scan).
 
     Returns:
         {'student': int, 'alumni': int, 'faculty': int, 'admin': int, 'total': int}
     """
-    rows = conn.execute(
-        "SELECT role, COUNT(*) as cnt FROM users GROUP BY role"
-    ).fetchall()
-
-    counts = {'student': 0, 'alumni': 0, 'faculty': 0, 'admin': 0, 'total': 0}
-    for row in rows:
-        role = row['role']
-        cnt = row['cnt']
-        if role in counts:
-            counts[role] = cnt
-        counts['total'] += cnt
-
+    by_role = get_by_dimension(conn, 'users')
+    counts = {role: by_role.get(role, 0) for role in ('student', 'alumni', 'faculty', 'admin')}
+    counts['total'] = sum(by_role.values())
     return counts
 
 
 def get_yearly_stats(conn, num_years: int = 5) -> dict:
     """
-    Get yearly registration data for charts in ONE query with GROUP BY,
-    instead of 20 separate COUNT queries (4 roles × 5 years).
+    Get yearly registration data for charts from the users_by_year and
+    meet_registrations counters.
 
     Returns:
         {
@@ -226,68 +218,33 @@ def get_yearly_stats(conn, num_years: int = 5) -> dict:
     current_year = datetime.now().year
     years = [str(y) for y in range(current_year - num_years + 1, current_year + 1)]
 
-    # Single query: group by year and role
-    rows = conn.execute("""
-        SELECT strftime('%Y', created_at) as reg_year, role, COUNT(*) as cnt
-        FROM users
-        WHERE strftime('%Y', created_at) >= ?
-        GROUP BY reg_year, role
-    """, (years[0],)).fetchall()
-
-    # Build year→role→count map
-    year_map = {y: {'student': 0, 'alumni': 0, 'faculty': 0} for y in years}
-    for row in rows:
-        yr = row['reg_year']
-        role = row['role']
-        if yr in year_map and role in year_map[yr]:
-            year_map[yr][role] = row['cnt']
-
-    # Events (alumni_meet_registration) separately but also grouped
-    event_rows = conn.execute("""
-        SELECT strftime('%Y', created_at) as reg_year, COUNT(*) as cnt
-        FROM alumni_meet_registration
-        WHERE strftime('%Y', created_at) >= ?
-        GROUP BY reg_year
-    """, (years[0],)).fetchall()
-
-    event_map = {y: 0 for y in years}
-    for row in event_rows:
-        yr = row['reg_year']
-        if yr in event_map:
-            event_map[yr] = row['cnt']
+    by_year = get_metric(conn, 'users_by_year')          # (role, year) → count
+    events = get_metric(conn, 'meet_registrations')      # ('', year) → count
 
     return {
         'years': years,
-        'students': [year_map[y]['student'] for y in years],
-        'alumni': [year_map[y]['alumni'] for y in years],
-        'faculty': [year_map[y]['faculty'] for y in years],
-        'events': [event_map[y] for y in years],
+        'students': [by_year.get(('student', y), 0) for y in years],
+        'alumni': [by_year.get(('alumni', y), 0) for y in years],
+        'faculty': [by_year.get(('faculty', y), 0) for y in years],
+        'events': [events.get(('', y), 0) for y in years],
     }
 
 
 def get_admin_job_stats(conn) -> dict:
     """
-    Get job statistics in a single query instead of 4 separate ones.
+    Get job statistics from the maintained counters.
 
     Returns:
-        {'total': int, 'active': int, 'closed': int, 'applications': int}
+        {'total': int, 'active': int, 'closed': int, 'pending': int, 'applications': int}
+        (active = approved and open)
     """
-    stats = {'total': 0, 'active': 0, 'closed': 0, 'applications': 0}
-
-    row = conn.execute("""
-        SELECT
-            COUNT(*) as total,
-            SUM(CASE WHEN is_active = 1 THEN 1 ELSE 0 END) as active,
-            SUM(CASE WHEN is_active = 0 THEN 1 ELSE 0 END) as closed
-        FROM jobs
-    """).fetchone()
-
-    if row:
-        stats['total'] = row['total'] or 0
-        stats['active'] = row['active'] or 0
-        stats['closed'] = row['closed'] or 0
-
-    app_row = conn.execute("SELECT COUNT(*) as cnt FROM job_applications").fetchone()
-    stats['applications'] = app_row['cnt'] if app_row else 0
-
-    return stats
+    by_status = get_by_dimension(conn, 'jobs')
+    total = sum(by_status.values())
+    active = get_counter(conn, 'jobs_active', 'approved')
+    return {
+        'total': total,
+        'active': active,
+        'closed': total - sum(get_by_dimension(conn, 'jobs_active').values()),
+        'pending': by_status.get('pending', 0),
+        'applications': get_counter(conn, 'job_applications'),
+    }
@@ -0,0 +1,371 @@
+"""
+services/als_engine.py
+=======================
+Implicit-feedback matrix factorisation (ALS) recommender.
+
+Runs alongside the KNN engine on the same interaction matrix. Following
+Hu, Koren & Volinsky ("Collaborative Filtering for Implicit Feedback
+Datasets"), every weighted interaction r_ui becomes
+
+    preference  p_ui = 1            (0 for unobserved pairs)
+    confidence  c_ui = 1 + alpha · r_ui
+
+and the model learns user factors X (n × f) and item factors Y (n × f) —
+here the "items" are the users being interacted with.
+
+TRAINING:
+  Each half-step fixes one side and solves every row of the other with a
+  few conjugate-gradient steps (warm-started from the previous solution),
+  so no f × f system is ever inverted per row. CG is batched over blocks
+  of rows with sparse products only. Blocks are spread over a thread
+  pool sharing the factor matrices: the sparse products, gathers and
+  einsums release the GIL. (A process pool would have to fork the
+  multithreaded server — socket, scheduler and BLAS threads — and could
+  inherit locks held by those threads; spawned workers would re-import
+  the app module.)
+
+SERVING:
+  The factors are published to the model store (name 'als') and mapped
+  by every worker. Recommending is one dot product of the user's factor
+  with the n × f item factors followed by a top-K selection.
+
+Config (see config.py):
+  ALS_FACTORS, ALS_ITERATIONS, ALS_REGULARIZATION, ALS_ALPHA, ALS_WORKERS
+"""
+
+import os
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import sparse
+from flask import current_app
+
+from db_utils import get_db_connection
+from services import model_store
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'als'
+
+# Conjugate-gradient steps per row and half-step (3 is enough with warm starts)
+CG_STEPS = 3
+
+# Rows solved per block (bounds the nnz × factors temporaries)
+BLOCK_ROWS = 4096
+
+# Below this many users a worker pool costs more than it saves
+MIN_USERS_FOR_POOL = 5000
+
+RANDOM_SEED = 42
+
+_als_cache = {
+    'active': None,         # mapped factors of the current version
+    'last_checked': 0,      # last time the store's CURRENT pointer was read
+    'lock': threading.Lock(),  # serialises training within this process
+    'stats': {},            # last training timings
+}
+
+
+def _setting(key, default):
+    return current_app.config.get(key, default)
+
+
+# =====================================================================
+# Conjugate-gradient solver
+# =====================================================================
+def _solve_block(fixed, yty, data, indices, indptr, x0, alpha, reg, cg_steps):
+    """
+    Solve a block of rows against fixed factors with batched CG.
+
+    For every row u the system is
+        (YᵀY + Yᵤᵀ(Cᵤ − I)Yᵤ + λI) xᵤ = Yᵤᵀ Cᵤ pᵤ
+
+    Args:
+        fixed: Fixed factor matrix (n × f).
+        yty: Precomputed YᵀY (f × f).
+        data, indices, indptr: CSR arrays of the block's raw interactions.
+        x0: Current factors of the block (warm start).
+        alpha, reg, cg_steps: Confidence scale, L2 regularisation, CG steps.
+
+    Returns:
+        Updated factors for the block (rows × f, float32).
+    """
+    n_rows = len(indptr) - 1
+    row_of_nnz = np.repeat(np.arange(n_rows), np.diff(indptr))
+    y_nnz = np.asarray(fixed[indices], dtype=np.float32)   # Yᵤ rows, stacked
+    conf_minus_one = (alpha * data).astype(np.float32)     # cᵤᵢ − 1
+
+    def weighted(values):
+        return sparse.csr_matrix((values, indices, indptr), shape=(n_rows, fixed.shape[0]))
+
+    def a_times(v):
+        dots = np.einsum('ij,ij->i', y_nnz, v[row_of_nnz])
+        return v @ yty + reg * v + weighted(conf_minus_one * dots) @ fixed
+
+    b = np.asarray(weighted(1.0 + conf_minus_one) @ fixed, dtype=np.float32)
+
+    x = np.array(x0, dtype=np.float32)
+    r = b - a_times(x)
+    p = r.copy()
+    rs_old = np.einsum('ij,ij->i', r, r)
+
+    for _ in range(cg_steps):
+        if not np.any(rs_old > 1e-10):
+            break
+        ap = a_times(p)
+        denom = np.einsum('ij,ij->i', p, ap)
+        step = np.divide(rs_old, denom, out=np.zeros_like(rs_old), where=denom > 1e-12)
+        x += step[:, None] * p
+        r -= step[:, None] * ap
+        rs_new = np.einsum('ij,ij->i', r, r)
+        beta = np.divide(rs_new, rs_old, out=np.zeros_like(rs_new), where=rs_old > 1e-12)
+        p = r + beta[:, None] * p
+        rs_old = rs_new
+
+    return x.astype(np.float32)
+
+
+def _half_step(matrix, solve, fixed, alpha, reg, pool):
+    """Recompute every row of `solve` against `fixed` (in place)."""
+    fixed = np.ascontiguousarray(fixed, dtype=np.float32)
+    yty = fixed.T @ fixed
+
+    jobs = []
+    for start in range(0, matrix.shape[0], BLOCK_ROWS):
+        block = matrix[start:start + BLOCK_ROWS]
+        args = (fixed, yty, block.data, block.indices, block.indptr,
+                solve[start:start + BLOCK_ROWS], alpha, reg, CG_STEPS)
+        jobs.append((start, pool.submit(_solve_block, *args) if pool else _solve_block(*args)))
+
+    for start, result in jobs:
+        block_factors = result.result() if pool else result
+        solve[start:start + len(block_factors)] = block_factors
+
+
+def fit_als(matrix, factors, iterations, regularization, alpha, workers=1, heartbeat=None):
+    """
+    Factorise a CSR interaction matrix with implicit-feedback ALS.
+
+    Args:
+        matrix: n × n CSR matrix of raw interaction weights.
+        factors: Latent dimensions f.
+        iterations: Full ALS sweeps (users then items).
+        regularization: L2 penalty λ.
+        alpha: Confidence scale.
+        workers: Thread pool size; <= 1 solves in the calling thread.
+        heartbeat: Optional callable, called after every half-step.
+
+    Returns:
+        (user_factors, item_factors) — float32 arrays of shape n × f.
+    """
+    n_users, n_items = matrix.shape
+    rng = np.random.default_rng(RANDOM_SEED)
+    user_factors = (rng.standard_normal((n_users, factors)) * 0.01).astype(np.float32)
+    item_factors = (rng.standard_normal((n_items, factors)) * 0.01).astype(np.float32)
+
+    matrix = matrix.tocsr().astype(np.float32)
+    matrix_t = matrix.T.tocsr()
+
+    pool = None
+    if workers > 1 and n_users >= MIN_USERS_FOR_POOL:
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='als')
+
+    try:
+        for iteration in range(iterations):
+            for rows, solve, fixed in ((matrix, user_factors, item_factors),
+                                       (matrix_t, item_factors, user_factors)):
+                _half_step(rows, solve, fixed, alpha, regularization, pool)
+                if heartbeat:
+                    heartbeat()
+            logger.debug(f"[ALS] iteration {iteration + 1}/{iterations} done")
+    finally:
+        if pool:
+            pool.shutdown()
+
+    return user_factors, item_factors
+
+
+# =====================================================================
+# Training + publishing
+# =====================================================================
+def train_als_model(snapshot=None, heartbeat=None):
+    """
+    Fit ALS on an interaction-matrix snapshot and publish the factors.
+
+    Args:
+        snapshot: Result of _build_matrix_snapshot() to reuse (e.g. the one
+                  the KNN retrain just built); a fresh one is built if None.
+        heartbeat: Passed to fit_als().
+
+    Returns:
+        True if a new version was published, False otherwise.
+    """
+    from services.recommendation_engine import _build_matrix_snapshot, _store_dir
+
+    if not _als_cache['lock'].acquire(blocking=False):
+        logger.info("[ALS] Training already in progress — skipped")
+        return False
+
+    try:
+        start = time.time()
+        factors = int(_setting('ALS_FACTORS', 32))
+        iterations = int(_setting('ALS_ITERATIONS', 10))
+        regularization = float(_setting('ALS_REGULARIZATION', 0.1))
+        alpha = float(_setting('ALS_ALPHA', 2.0))
+        workers = int(_setting('ALS_WORKERS', 0)) or (os.cpu_count() or 1)
+
+        matrix, user_ids, watermarks, decay = snapshot or _build_matrix_snapshot()
+        if matrix.shape[0] < 2 or matrix.nnz == 0:
+            logger.warning("[ALS] Not enough data to train model")
+            return False
+
+        user_factors, item_factors = fit_als(matrix, factors, iterations,
+                                             regularization, alpha, workers, heartbeat)
+
+        conn = get_db_connection()
+        try:
+            alumni_ids = np.array(
+                [row[0] for row in conn.execute(
+                    "SELECT id FROM users WHERE role = 'alumni'").fetchall()],
+                dtype=np.int64,
+            )
+        finally:
+            conn.close()
+
+        version = model_store.publish_artifacts(_store_dir(), MODEL_NAME, {
+            'user_ids': user_ids,
+            'user_factors': user_factors,
+            'item_factors': item_factors,
+            'is_alumni': np.isin(user_ids, alumni_ids),
+            'interaction_counts': matrix.getnnz(axis=1).astype(np.int32),
+        }, meta={'n_users': int(len(user_ids)), 'factors': factors, 'iterations': iterations,
+                 'regularization': regularization, 'alpha': alpha, 'watermarks': watermarks,
+                 'decay': decay})
+
+        _activate(*model_store.load_artifacts(_store_dir(), MODEL_NAME, version))
+
+        elapsed = round(time.time() - start, 2)
+        _als_cache['stats'].update({'als_train_seconds': elapsed, 'als_workers': workers})
+        logger.info(f"[ALS] Model trained in {elapsed}s — {len(user_ids)} users, "
+                    f"f={factors}, iterations={iterations}, version={version}")
+        return True
+
+    except Exception as e:
+        logger.error(f"[ALS] Training failed: {e}")
+        return False
+    finally:
+        _als_cache['lock'].release()
+
+
+def _activate(version, arrays, manifest):
+    """Swap the process-wide ALS snapshot to a mapped version."""
+    if not version:
+        return None
+    snapshot = {
+        'version': version,
+        'user_ids': arrays['user_ids'],
+        'user_factors': arrays['user_factors'],
+        'item_factors': arrays['item_factors'],
+        'is_alumni': arrays['is_alumni'],
+        # Versions published before counts were stored serve no one
+        'interaction_counts': arrays.get('interaction_counts'),
+    }
+    _als_cache['active'] = snapshot
+    logger.info(f"[ALS] Activated model version {version} ({len(arrays['user_ids'])} users)")
+    return snapshot
+
+
+def get_active_als_model(force_check=False):
+    """Mapped ALS snapshot (hot-swapped on new versions), or None if unpublished."""
+    from services.recommendation_engine import MODEL_POLL_INTERVAL, _store_dir
+
+    now = time.time()
+    active = _als_cache['active']
+    if not force_check and now - _als_cache['last_checked'] < MODEL_POLL_INTERVAL:
+        return active
+
+    _als_cache['last_checked'] = now
+    try:
+        latest = model_store.current_version(_store_dir(), MODEL_NAME)
+        if latest and (active is None or latest != active['version']):
+            return _activate(*model_store.load_artifacts(_store_dir(), MODEL_NAME, latest))
+    except Exception as e:
+        logger.error(f"[ALS] Could not load published model: {e}")
+    return active
+
+
+def get_als_stats():
+    """Active ALS version and last training timings."""
+    model = _als_cache['active']
+    return {'als_version': model['version'] if model else None, **_als_cache['stats']}
+
+
+# =====================================================================
+# Serving
+# =====================================================================
+def get_als_recommendations(user_id, limit=5):
+    """
+    Recommend users by predicted preference xᵤ · yᵢ.
+
+    Already-connected / pending users and users of the wrong role are
+    masked before the top-K selection.
+
+    Returns:
+        List of recommendation dicts (same shape as get_ml_recommendations);
+        empty when no ALS model is published, the user is unknown to it or
+        has fewer than MIN_INTERACTIONS interactions (cold start).
+    """
+    from services.recommendation_engine import (
+        MIN_INTERACTIONS, _user_index, load_exclusions, build_recommendations,
+    )
+
+    model = get_active_als_model()
+    if model is None:
+        return []
+
+    user_idx = _user_index(model, user_id)
+    if user_idx is None:
+        return []
+
+    # Cold start: CG leaves near-zero factors for users without interactions,
+    # which would score half the catalogue just above 0 — leave them to the
+    # graph/content/rule fallbacks like the KNN engine does.
+    counts = model['interaction_counts']
+    if counts is None or counts[user_idx] < MIN_INTERACTIONS:
+        return []
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        c = conn.cursor()
+
+        excluded_ids, target_role = load_exclusions(c, user_id)
+        if target_role is None:
+            return []
+
+        scores = model['item_factors'] @ model['user_factors'][user_idx]
+        scores[model['is_alumni'] != (target_role == 'alumni')] = -np.inf
+        excluded = np.searchsorted(model['user_ids'], np.fromiter(excluded_ids, dtype=np.int64))
+        excluded = excluded[excluded < len(scores)]
+        scores[excluded[np.isin(model['user_ids'][excluded], list(excluded_ids))]] = -np.inf
+
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        candidates = [
+            (int(model['user_ids'][idx]), float(min(scores[idx], 1.0)))
+            for idx in top if scores[idx] > 0
+        ]
+        return build_recommendations(c, candidates, target_role, limit,
+                                     reason='ML: matrix factorisation')
+
+    except Exception as e:
+        logger.error(f"[ALS] get_als_recommendations error: {e}")
+        return []
+    finally:
+        if conn:
+            conn.close()
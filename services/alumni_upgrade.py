@@ -0,0 +1,266 @@
+"""
+services/alumni_upgrade.py
+===========================
+Semester-end upgrade of graduating students to alumni, as an admin batch job.
+
+/student/upgrade-to-alumni converts one student through a form. At the
+end of a semester an admin instead selects the graduating students by
+degree, semester (and optionally department) and upgrades them all with
+one passing year:
+
+  alumni_profile   created from student_profile (enrollment_no,
+                   department, degree, achievements) + pass_year.
+                   The student_profile row is kept, as in the form.
+  users.role       'student' → 'alumni'. The user id does not change, so
+                   connections, messages, mentorships and activity stay
+                   attached; the stats counter triggers move the counts.
+
+CHUNKING:
+  The matching ids are read once, then upgraded UPGRADE_CHUNK_SIZE at a
+  time, each chunk one short IMMEDIATE transaction (profiles inserted,
+  roles flipped, job progress updated) followed by UPGRADE_CHUNK_PAUSE
+  seconds without the writer lock, so chat messages and logins queued
+  behind it run between chunks instead of waiting for the whole batch.
+  A student whose profile cannot be copied (enrollment number already
+  used by an alumni profile, missing department or degree) is skipped
+  and stays a student; already-upgraded students are skipped too, so a
+  failed job can simply be submitted again.
+
+Jobs run on a background thread, one at a time, and report progress in
+`alumni_upgrade_jobs` (GET /api/admin/alumni-upgrades/<id>). Every chunk
+also refreshes heartbeat_at; a queued or running job without a heartbeat
+for STALE_JOB_SECONDS died with its process and no longer blocks a new one.
+"""
+
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+
+from flask import current_app
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 200
+DEFAULT_CHUNK_PAUSE = 0.05
+PREVIEW_SAMPLE = 10
+STALE_JOB_SECONDS = 600     # no heartbeat for this long: the job died with its process
+
+
+def _setting(name, default):
+    return current_app.config.get(name, default)
+
+
+def _validate(degree, semester, pass_year=None, department=None):
+    degree = (degree or '').strip()
+    if not degree:
+        raise ValueError('degree is required')
+    try:
+        semester = int(semester)
+    except (TypeError, ValueError):
+        raise ValueError('semester must be a number')
+    if not 1 <= semester <= 12:
+        raise ValueError('semester must be between 1 and 12')
+    if pass_year is not None:
+        try:
+            pass_year = int(pass_year)
+        except (TypeError, ValueError):
+            raise ValueError('pass_year must be a year')
+        if not 1950 <= pass_year <= datetime.now().year + 1:
+            raise ValueError('pass_year is out of range')
+    return degree, semester, pass_year, (department or '').strip() or None
+
+
+def _candidates_sql(department):
+    # semester holds both 6 and '6th Semester'; CAST keeps the leading number
+    sql = '''
+        FROM users u JOIN student_profile sp ON sp.user_id = u.id
+        WHERE u.role = 'student' AND sp.degree = ? COLLATE NOCASE
+          AND CAST(sp.semester AS INTEGER) = ?
+          AND NOT EXISTS (SELECT 1 FROM alumni_profile ap WHERE ap.user_id = u.id)
+    '''
+    if department:
+        sql += ' AND sp.department = ? COLLATE NOCASE'
+    return sql
+
+
+def _candidate_params(degree, semester, department):
+    return [degree, semester] + ([department] if department else [])
+
+
+def preview_upgrade(degree, semester, department=None):
+    """
+    Students an upgrade with these filters would convert.
+
+    Returns:
+        {'count': n, 'sample': [{'id', 'name', 'email', 'enrollment_no', 'department'}]}
+
+    Raises:
+        ValueError: missing degree or bad semester.
+    """
+    degree, semester, _, department = _validate(degree, semester, department=department)
+    sql, params = _candidates_sql(department), _candidate_params(degree, semester, department)
+    conn = get_db_connection()
+    try:
+        count = conn.execute(f'SELECT COUNT(*) {sql}', params).fetchone()[0]
+        sample = conn.execute(
+            f'SELECT u.id, u.name, u.email, sp.enrollment_no, sp.department {sql} ORDER BY u.id LIMIT ?',
+            params + [PREVIEW_SAMPLE]
+        ).fetchall()
+    finally:
+        conn.close()
+    return {'count': count, 'sample': [dict(row) for row in sample]}
+
+
+# =====================================================================
+# Jobs
+# =====================================================================
+def _update_job(job_id, **fields):
+    conn = get_db_connection()
+    try:
+        conn.execute(f"UPDATE alumni_upgrade_jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+                     list(fields.values()) + [job_id])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_upgrade_job(job_id):
+    conn = get_db_connection()
+    try:
+        row = conn.execute('SELECT * FROM alumni_upgrade_jobs WHERE id = ?', (job_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    job = dict(row)
+    job['filters'] = json.loads(job['filters']) if job['filters'] else {}
+    return job
+
+
+def get_recent_upgrade_jobs(limit=10):
+    conn = get_db_connection()
+    try:
+        ids = [row[0] for row in conn.execute('SELECT id FROM alumni_upgrade_jobs ORDER BY id DESC LIMIT ?',
+                                              (limit,))]
+    finally:
+        conn.close()
+    return [get_upgrade_job(job_id) for job_id in ids]
+
+
+def submit_upgrade(degree, semester, pass_year, department=None, requested_by=None):
+    """
+    Queue an upgrade job and start it on a background thread.
+
+    Returns:
+        Job dict (status 'queued').
+
+    Raises:
+        ValueError: bad filters / pass_year, or another upgrade still running.
+    """
+    degree, semester, pass_year, department = _validate(degree, semester, pass_year, department)
+    if pass_year is None:
+        raise ValueError('pass_year is required')
+    filters = {'degree': degree, 'semester': semester, 'department': department}
+
+    conn = get_db_connection()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        now = time.time()
+        conn.execute(
+            "UPDATE alumni_upgrade_jobs SET status = 'failed', error = 'interrupted', finished_at = ? "
+            "WHERE status IN ('queued', 'running') AND COALESCE(heartbeat_at, created_at) < ?",
+            (now, now - STALE_JOB_SECONDS)
+        )
+        if conn.execute("SELECT 1 FROM alumni_upgrade_jobs WHERE status IN ('queued', 'running')").fetchone():
+            conn.rollback()
+            raise ValueError('Another alumni upgrade is still running')
+        cur = conn.execute(
+            "INSERT INTO alumni_upgrade_jobs (status, filters, pass_year, requested_by, created_at, heartbeat_at) "
+            "VALUES ('queued', ?, ?, ?, ?, ?)",
+            (json.dumps(filters), pass_year, requested_by, now, now)
+        )
+        conn.commit()
+        job_id = cur.lastrowid
+    finally:
+        conn.close()
+
+    app = current_app._get_current_object()
+
+    def _target():
+        with app.app_context():
+            _run_upgrade(job_id, degree, semester, pass_year, department)
+
+    threading.Thread(target=_target, daemon=True, name=f'alumni-upgrade-{job_id}').start()
+    return get_upgrade_job(job_id)
+
+
+def _upgrade_chunk(conn, job_id, chunk, pass_year):
+    ids = json.dumps(chunk)
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # OR IGNORE: a duplicate enrollment_no or missing department / degree skips the student
+        conn.execute('''
+            INSERT OR IGNORE INTO alumni_profile
+                (user_id, enrollment_no, department, degree, pass_year, achievements)
+            SELECT sp.user_id, sp.enrollment_no, sp.department, sp.degree, ?, sp.achievements
+            FROM student_profile sp JOIN users u ON u.id = sp.user_id
+            WHERE sp.user_id IN (SELECT value FROM json_each(?)) AND u.role = 'student'
+        ''', (pass_year, ids))
+        upgraded = [row[0] for row in conn.execute('''
+            UPDATE users SET role = 'alumni'
+            WHERE id IN (SELECT value FROM json_each(?)) AND role = 'student'
+              AND EXISTS (SELECT 1 FROM alumni_profile ap WHERE ap.user_id = users.id)
+            RETURNING id
+        ''', (ids,)).fetchall()]
+        conn.execute('''
+            UPDATE alumni_upgrade_jobs
+            SET processed = processed + ?, upgraded = upgraded + ?, skipped = skipped + ?, heartbeat_at = ?
+            WHERE id = ?
+        ''', (len(chunk), len(upgraded), len(chunk) - len(upgraded), time.time(), job_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return upgraded
+
+
+def _run_upgrade(job_id, degree, semester, pass_year, department):
+    from models.recommendation import mark_profile_changed
+
+    started = time.time()
+    chunk_size = max(1, int(_setting('UPGRADE_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)))
+    pause = float(_setting('UPGRADE_CHUNK_PAUSE', DEFAULT_CHUNK_PAUSE))
+    try:
+        conn = get_db_connection()
+        try:
+            ids = [row[0] for row in conn.execute(
+                f'SELECT u.id {_candidates_sql(department)} ORDER BY u.id',
+                _candidate_params(degree, semester, department)
+            )]
+        finally:
+            conn.close()
+        _update_job(job_id, status='running', total=len(ids), processed=0, upgraded=0, skipped=0,
+                    started_at=started, heartbeat_at=time.time())
+
+        conn = get_db_connection()
+        conn.isolation_level = None
+        try:
+            for start in range(0, len(ids), chunk_size):
+                upgraded = _upgrade_chunk(conn, job_id, ids[start:start + chunk_size], pass_year)
+                if upgraded:
+                    mark_profile_changed(*upgraded)
+                time.sleep(pause)
+        finally:
+            conn.close()
+
+        _update_job(job_id, status='succeeded', finished_at=time.time())
+        job = get_upgrade_job(job_id)
+        logger.info(f"[Users] Alumni upgrade {job_id} ({degree}, semester {semester}, {pass_year}): "
+                    f"{job['upgraded']} upgraded, {job['skipped']} skipped in {time.time() - started:.2f}s")
+    except Exception as e:
+        logger.error(f"[Users] Alumni upgrade {job_id} failed: {e}")
+        _update_job(job_id, status='failed', error=str(e), finished_at=time.time())
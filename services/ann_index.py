@@ -0,0 +1,209 @@
+"""
+services/ann_index.py
+======================
+Approximate nearest-neighbour index: multi-table random-projection LSH
+for cosine similarity, in numpy.
+
+Brute-force KNN scores every user for every query (O(n·d)). The index
+hashes each vector with `n_bits` random hyperplanes in each of
+`n_tables` tables (bit = sign of the projection, SimHash); vectors with
+a small angle between them agree on most bits and land in the same
+bucket in at least one table. A query only scores the union of its
+buckets exactly and returns the top k.
+
+TUNING (recall ↔ speed):
+  - more tables      → higher recall, more memory and candidates
+  - more bits        → smaller buckets, faster queries, lower recall
+  - probes (0–2)     → also look in buckets whose key differs in up to
+                       `probes` bits (multi-probe): recall without more tables
+
+HYPERPLANES:
+  Plane entries are ±1 values derived from a hash of (column, plane), so
+  no d × planes matrix is stored and the dimension may grow (new users
+  become new columns of the interaction matrix). Sparse rows are
+  projected with one sparse × dense product over their non-zero columns.
+
+UPDATES:
+  insert() (also used to replace a vector) and delete() touch only the
+  item's n_tables buckets.
+"""
+
+from itertools import combinations
+
+import numpy as np
+from scipy import sparse
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _splitmix64(z):
+    """Vectorised SplitMix64 finaliser (uint64 in, uint64 out; wraps on overflow)."""
+    z = z + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return (z ^ (z >> np.uint64(31))) & _MASK64
+
+
+class RandomProjectionLSH:
+    """
+    Cosine-similarity LSH index over sparse (CSR) or dense row vectors.
+
+    Items are identified by integer ids chosen by the caller.
+    """
+
+    def __init__(self, n_tables=8, n_bits=12, probes=1, seed=42):
+        if not 1 <= n_bits <= 30:
+            raise ValueError('n_bits must be between 1 and 30')
+        self.n_tables = int(n_tables)
+        self.n_bits = int(n_bits)
+        self.probes = int(probes)
+        self.seed = np.uint64(seed)
+        self._buckets = [dict() for _ in range(self.n_tables)]  # key → set of ids
+        self._keys = {}           # id → tuple of per-table keys
+        self._base_ids = np.empty(0, dtype=np.int64)  # sorted ids of the bulk-loaded rows
+        self._base = None         # their vectors (row i ↔ _base_ids[i])
+        self._extra = {}          # id → vector inserted or replaced after fit()
+        self._probe_masks = [0] + [
+            sum(1 << b for b in flips)
+            for r in range(1, self.probes + 1)
+            for flips in combinations(range(self.n_bits), r)
+        ]
+
+    # -----------------------------------------------------------------
+    # Hashing
+    # -----------------------------------------------------------------
+    def _signs(self, columns):
+        """±1 plane entries for the given columns: (len(columns), tables × bits)."""
+        planes = self.n_tables * self.n_bits
+        z = (np.asarray(columns, dtype=np.uint64)[:, None] * np.uint64(planes)
+             + np.arange(planes, dtype=np.uint64)[None, :]) ^ self.seed
+        return np.where(_splitmix64(z) >> np.uint64(63), 1.0, -1.0).astype(np.float32)
+
+    def _project(self, vectors):
+        """Projections of row vectors onto every hyperplane."""
+        if sparse.issparse(vectors):
+            vectors = sparse.csr_matrix(vectors)
+            columns, compact = np.unique(vectors.indices, return_inverse=True)
+            local = sparse.csr_matrix((vectors.data, compact.ravel(), vectors.indptr),
+                                      shape=(vectors.shape[0], len(columns)))
+            return np.asarray(local @ self._signs(columns))
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        return vectors @ self._signs(np.arange(vectors.shape[1]))
+
+    def hash(self, vectors):
+        """Per-table bucket keys: int64 array (rows × n_tables)."""
+        bits = self._project(vectors).reshape(-1, self.n_tables, self.n_bits) > 0
+        return bits.astype(np.int64) @ (np.int64(1) << np.arange(self.n_bits, dtype=np.int64))
+
+    # -----------------------------------------------------------------
+    # Building and updates
+    # -----------------------------------------------------------------
+    def fit(self, ids, vectors):
+        """Bulk-load the index (replaces all content). `ids` must be unique."""
+        ids = np.asarray(ids, dtype=np.int64)
+        order = np.argsort(ids)
+        self._base_ids = ids[order]
+        self._base = vectors[order]
+        self._extra = {}
+
+        keys = self.hash(self._base)
+        self._keys = dict(zip(self._base_ids.tolist(), map(tuple, keys.tolist())))
+        for t in range(self.n_tables):
+            by_key = np.argsort(keys[:, t], kind='stable')
+            unique_keys, starts = np.unique(keys[by_key, t], return_index=True)
+            groups = np.split(self._base_ids[by_key], starts[1:])
+            self._buckets[t] = {int(k): set(g.tolist()) for k, g in zip(unique_keys, groups)}
+        return self
+
+    def insert(self, item_id, vector):
+        """Add an item, or replace the vector of an existing one."""
+        item_id = int(item_id)
+        self.delete(item_id)
+        keys = tuple(self.hash(vector)[0].tolist())
+        for table, key in zip(self._buckets, keys):
+            table.setdefault(key, set()).add(item_id)
+        self._keys[item_id] = keys
+        self._extra[item_id] = vector
+
+    def delete(self, item_id):
+        """Remove an item; returns False if it was not indexed."""
+        keys = self._keys.pop(int(item_id), None)
+        if keys is None:
+            return False
+        for table, key in zip(self._buckets, keys):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(int(item_id))
+                if not bucket:
+                    del table[key]
+        self._extra.pop(int(item_id), None)
+        return True
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, item_id):
+        return int(item_id) in self._keys
+
+    # -----------------------------------------------------------------
+    # Queries
+    # -----------------------------------------------------------------
+    def candidates(self, vector):
+        """Ids sharing a (probed) bucket with the vector in any table."""
+        found = set()
+        for table, key in zip(self._buckets, self.hash(vector)[0].tolist()):
+            for mask in self._probe_masks:
+                bucket = table.get(key ^ mask)
+                if bucket:
+                    found |= bucket
+        return np.fromiter(found, dtype=np.int64, count=len(found))
+
+    def _scores(self, ids, vector):
+        """Exact dot products between the vector and indexed items."""
+        scores = np.empty(len(ids), dtype=np.float32)
+        in_extra = np.isin(ids, np.fromiter(self._extra, dtype=np.int64, count=len(self._extra)))
+        if (~in_extra).any():
+            rows = np.searchsorted(self._base_ids, ids[~in_extra])
+            scores[~in_extra] = np.asarray(self._dot(self._base[rows], vector)).ravel()
+        for pos in np.flatnonzero(in_extra):
+            scores[pos] = np.asarray(self._dot(self._extra[int(ids[pos])], vector)).ravel()[0]
+        return scores
+
+    @staticmethod
+    def _dot(rows, vector):
+        product = rows @ (vector.T if sparse.issparse(vector) else np.ravel(vector))
+        return product.toarray() if sparse.issparse(product) else product
+
+    def query(self, vector, k, exclude=None):
+        """
+        Approximate top-k items by cosine (vectors are expected L2-normalised).
+
+        Returns:
+            (ids, scores) — best first; fewer than k when the probed
+            buckets hold fewer items.
+        """
+        ids = self.candidates(vector)
+        if exclude:
+            ids = ids[~np.isin(ids, np.fromiter(exclude, dtype=np.int64))]
+        if len(ids) == 0:
+            return ids, np.empty(0, dtype=np.float32)
+
+        scores = self._scores(ids, vector)
+        if len(ids) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            ids, scores = ids[top], scores[top]
+        order = np.argsort(-scores, kind='stable')
+        return ids[order], scores[order]
+
+    def stats(self):
+        """Size and bucket occupancy."""
+        sizes = [len(b) for table in self._buckets for b in table.values()]
+        return {
+            'items': len(self),
+            'tables': self.n_tables,
+            'bits': self.n_bits,
+            'probes': self.probes,
+            'buckets': len(sizes),
+            'max_bucket': max(sizes) if sizes else 0,
+            'mean_bucket': round(float(np.mean(sizes)), 2) if sizes else 0,
+        }
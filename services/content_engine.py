@@ -0,0 +1,446 @@
+"""
+services/content_engine.py
+===========================
+Content-based recommendations from profile text (TF-IDF).
+
+Users without interactions get nothing from KNN/ALS and little from the
+graph, so they used to fall straight through to the rule-based scan of
+50 candidates. This engine compares what people wrote about themselves.
+
+DOCUMENTS:
+  One document per student / alumnus built from
+    users          skills, interests, bio, current_domain, company
+    student_profile skills
+    alumni_profile  company_name, designation, bio
+  Tokens are lower-cased words (keeping `c++`, `c#`, `node.js`); common
+  English stop words are dropped.
+
+VECTORS:
+  Sublinear TF (1 + log tf) × smoothed IDF, L2-normalised, stored as one
+  sparse CSR matrix — cosine similarity is a sparse dot product.
+
+TRAINING:
+  The top CONTENT_TOP_K most similar users of the *opposite* role (the
+  only ones ever recommended) are precomputed for every user, CONTENT_BLOCK_ROWS
+  rows at a time: one sparse block × sparseᵀ product, then argpartition
+  on the dense block — the full n × n similarity matrix never exists.
+  Vectors, vocabulary, IDF and the neighbour table are published to the
+  model store (name 'content') and memory-mapped by every worker.
+
+INCREMENTAL UPDATES:
+  Profile edits call mark_profile_changed(), which stamps the user in
+  `profile_changes`. Workers poll that table and re-vectorise changed
+  users against the published vocabulary/IDF into a small overlay; the
+  overlay is scored directly at serving time, so edits are visible
+  without a rebuild. Users newer than the model are vectorised on the
+  fly. The next full retrain folds everything in (and refreshes IDF).
+"""
+
+import re
+import time
+import logging
+import threading
+
+import numpy as np
+from scipy import sparse
+
+from db_utils import get_db_connection
+from services import model_store
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'content'
+CONTENT_TOP_K = 50           # precomputed neighbours per user
+CONTENT_BLOCK_ROWS = 1024    # rows per block of the all-pairs product
+CONTENT_POLL_INTERVAL = 10   # seconds between version / profile-change checks
+
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+
+STOP_WORDS = frozenset('''
+    a an and are as at be but by for from has have i in is it its me my of on or our
+    so that the their this to was we with you your am been will also very about into
+'''.split())
+
+_PROFILE_SQL = '''
+    SELECT u.id, u.role,
+           u.skills, u.interests, u.bio, u.current_domain, u.company,
+           sp.skills, ap.company_name, ap.designation, ap.bio
+    FROM users u
+    LEFT JOIN student_profile sp ON sp.user_id = u.id
+    LEFT JOIN alumni_profile ap ON ap.user_id = u.id
+    WHERE u.role IN ('student', 'alumni') {where}
+    ORDER BY u.id
+'''
+
+_content_cache = {
+    'active': None,            # mapped artifacts of the current version
+    'overlay': {},             # user_id → (is_alumni, 1 × V CSR row) for edited profiles
+    'changes_seen': 0.0,       # newest profile_changes stamp applied to the overlay
+    'last_checked': 0,
+    'lock': threading.Lock(),  # serialises training within this process
+    'stats': {},
+}
+
+
+# =====================================================================
+# Text → sparse TF-IDF
+# =====================================================================
+def _tokenise(fields):
+    """Tokens of a profile's text fields (None-safe)."""
+    text = ' '.join(f for f in fields if f).lower()
+    return [t for t in _TOKEN_RE.findall(text) if t not in STOP_WORDS and len(t) > 1]
+
+
+def _term_counts(docs, term_index):
+    """
+    Sparse term-count matrix for tokenised documents.
+
+    Args:
+        docs: List of token lists.
+        term_index: Callable mapping an array of tokens to column indices (−1 = unknown).
+
+    Returns:
+        (rows, cols, counts) for a COO matrix.
+    """
+    lengths = np.fromiter((len(d) for d in docs), dtype=np.int64, count=len(docs))
+    rows = np.repeat(np.arange(len(docs)), lengths)
+    cols = term_index(np.array([t for d in docs for t in d])) if lengths.sum() else rows
+    keep = cols >= 0
+    if not keep.any():
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float32)
+
+    width = int(cols.max()) + 1
+    keys, counts = np.unique(rows[keep] * width + cols[keep], return_counts=True)
+    return keys // width, keys % width, counts.astype(np.float32)
+
+
+def _tfidf(rows, cols, counts, n_docs, idf):
+    """Sublinear TF × IDF, L2-normalised CSR (n_docs × len(idf))."""
+    from sklearn.preprocessing import normalize
+
+    values = (1.0 + np.log(counts)) * idf[cols]
+    matrix = sparse.csr_matrix((values.astype(np.float32), (rows, cols)),
+                               shape=(n_docs, len(idf)))
+    return normalize(matrix, norm='l2', axis=1).tocsr().astype(np.float32)
+
+
+def _vocab_lookup(vocab):
+    """Token array → column indices in a sorted vocabulary (−1 when absent)."""
+    def lookup(tokens):
+        pos = np.searchsorted(vocab, tokens)
+        pos = np.minimum(pos, len(vocab) - 1)
+        return np.where(vocab[pos] == tokens, pos, -1)
+    return lookup
+
+
+def _load_profiles(c, user_ids=None):
+    """(user ids, is_alumni flags, token lists) of students and alumni."""
+    if user_ids is None:
+        rows = c.execute(_PROFILE_SQL.format(where='')).fetchall()
+    else:
+        ph = ','.join(['?'] * len(user_ids))
+        rows = c.execute(_PROFILE_SQL.format(where=f'AND u.id IN ({ph})'), list(user_ids)).fetchall()
+
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    is_alumni = np.array([row[1] == 'alumni' for row in rows], dtype=bool)
+    docs = [_tokenise(tuple(row)[2:]) for row in rows]
+    return ids, is_alumni, docs
+
+
+# =====================================================================
+# Training: vectors + blocked all-pairs top-K
+# =====================================================================
+def _top_k_blocked(source, target, k):
+    """
+    Top-k cosine neighbours in `target` for every row of `source`.
+
+    Returns:
+        (indices into target rows, scores) — both (n_source × k); padded
+        with index 0 / score 0 when target has fewer than k rows.
+    """
+    n = source.shape[0]
+    k_eff = min(k, target.shape[0])
+    idx = np.zeros((n, k), dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if k_eff == 0:
+        return idx, scores
+
+    target_t = target.T.tocsr()
+    for start in range(0, n, CONTENT_BLOCK_ROWS):
+        block = (source[start:start + CONTENT_BLOCK_ROWS] @ target_t).toarray()
+        top = np.argpartition(-block, k_eff - 1, axis=1)[:, :k_eff]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        idx[start:start + len(block), :k_eff] = np.take_along_axis(top, order, axis=1)
+        scores[start:start + len(block), :k_eff] = np.take_along_axis(top_scores, order, axis=1)
+    return idx, scores
+
+
+def train_content_model():
+    """
+    Vectorise every student / alumni profile, precompute cross-role
+    neighbours and publish the model.
+
+    Returns:
+        True if a new version was published, False otherwise.
+    """
+    from services.recommendation_engine import _store_dir
+
+    if not _content_cache['lock'].acquire(blocking=False):
+        logger.info("[Content] Training already in progress — skipped")
+        return False
+
+    try:
+        start = time.time()
+        conn = get_db_connection()
+        try:
+            built_at = time.time()   # profile edits after this go to the overlay
+            user_ids, is_alumni, docs = _load_profiles(conn.cursor())
+        finally:
+            conn.close()
+
+        all_tokens = np.array([t for d in docs for t in d])
+        if len(user_ids) < 2 or len(all_tokens) == 0:
+            logger.warning("[Content] Not enough profile text to train model")
+            return False
+
+        vocab = np.unique(all_tokens)
+        rows, cols, counts = _term_counts(docs, _vocab_lookup(vocab))
+        df = np.bincount(cols, minlength=len(vocab))
+        idf = (np.log((1 + len(docs)) / (1 + df)) + 1).astype(np.float32)
+        vectors = _tfidf(rows, cols, counts, len(docs), idf)
+
+        # Neighbours of the opposite role only (students ↔ alumni)
+        neighbour_ids = np.zeros((len(user_ids), CONTENT_TOP_K), dtype=np.int64)
+        neighbour_scores = np.zeros((len(user_ids), CONTENT_TOP_K), dtype=np.float32)
+        for src_mask in (~is_alumni, is_alumni):
+            src_rows, dst_rows = np.flatnonzero(src_mask), np.flatnonzero(~src_mask)
+            idx, scores = _top_k_blocked(vectors[src_rows], vectors[dst_rows], CONTENT_TOP_K)
+            neighbour_ids[src_rows] = user_ids[dst_rows][idx] if len(dst_rows) else 0
+            neighbour_scores[src_rows] = scores
+
+        version = model_store.publish_artifacts(_store_dir(), MODEL_NAME, {
+            'user_ids': user_ids,
+            'is_alumni': is_alumni,
+            'vocab': vocab,
+            'idf': idf,
+            'vector_data': vectors.data,
+            'vector_indices': vectors.indices,
+            'vector_indptr': vectors.indptr,
+            'neighbour_ids': neighbour_ids,
+            'neighbour_scores': neighbour_scores,
+        }, meta={'n_users': int(len(user_ids)), 'vocab_size': int(len(vocab)),
+                 'nnz': int(vectors.nnz), 'k': CONTENT_TOP_K, 'built_at': built_at})
+
+        _activate(*model_store.load_artifacts(_store_dir(), MODEL_NAME, version))
+
+        elapsed = round(time.time() - start, 2)
+        _content_cache['stats']['content_train_seconds'] = elapsed
+        logger.info(f"[Content] Model trained in {elapsed}s — {len(user_ids)} users, "
+                    f"{len(vocab)} terms, version={version}")
+        return True
+
+    except Exception as e:
+        logger.error(f"[Content] Training failed: {e}")
+        return False
+    finally:
+        _content_cache['lock'].release()
+
+
+# =====================================================================
+# Model store → worker, profile-change overlay
+# =====================================================================
+def _activate(version, arrays, manifest):
+    """Swap the process-wide content snapshot to a mapped version."""
+    if not version:
+        return None
+    vectors = sparse.csr_matrix(
+        (arrays['vector_data'], arrays['vector_indices'], arrays['vector_indptr']),
+        shape=(len(arrays['user_ids']), len(arrays['vocab'])),
+    )
+    snapshot = {
+        'version': version,
+        'user_ids': arrays['user_ids'],
+        'is_alumni': arrays['is_alumni'],
+        'vocab': arrays['vocab'],
+        'idf': arrays['idf'],
+        'vectors': vectors,
+        'neighbour_ids': arrays['neighbour_ids'],
+        'neighbour_scores': arrays['neighbour_scores'],
+    }
+    _content_cache.update(active=snapshot, overlay={},
+                          changes_seen=manifest.get('meta', {}).get('built_at', 0.0))
+    logger.info(f"[Content] Activated model version {version} ({len(arrays['user_ids'])} users)")
+    return snapshot
+
+
+def _vectorise_users(model, c, user_ids):
+    """
+    TF-IDF rows for users, from their current profiles, against the
+    published vocabulary and IDF (new terms are ignored until retrain).
+
+    Returns:
+        {user_id: (is_alumni, 1 × V CSR row)} — users that are no longer
+        students / alumni are absent.
+    """
+    ids, is_alumni, docs = _load_profiles(c, user_ids)
+    if len(ids) == 0:
+        return {}
+    rows, cols, counts = _term_counts(docs, _vocab_lookup(model['vocab']))
+    vectors = _tfidf(rows, cols, counts, len(ids), model['idf'])
+    return {int(uid): (bool(alum), vectors[i]) for i, (uid, alum) in enumerate(zip(ids, is_alumni))}
+
+
+def _apply_profile_changes(model):
+    """Re-vectorise users whose profile changed since the last check."""
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        rows = c.execute('SELECT user_id, changed_at FROM profile_changes WHERE changed_at > ?',
+                         (_content_cache['changes_seen'],)).fetchall()
+        if not rows:
+            return
+        changed = [row[0] for row in rows]
+        fresh = _vectorise_users(model, c, changed)
+    finally:
+        conn.close()
+
+    overlay = dict(_content_cache['overlay'])
+    for uid in changed:
+        overlay[uid] = fresh.get(uid)   # None → no longer recommendable
+    _content_cache['overlay'] = overlay
+    _content_cache['changes_seen'] = max(row[1] for row in rows)
+    _content_cache['stats']['content_overlay_users'] = len(overlay)
+
+
+def get_active_content_model(force_check=False):
+    """Mapped content snapshot (hot-swapped, overlay refreshed), or None if unpublished."""
+    from services.recommendation_engine import _store_dir
+
+    now = time.time()
+    active = _content_cache['active']
+    if not force_check and now - _content_cache['last_checked'] < CONTENT_POLL_INTERVAL:
+        return active
+
+    _content_cache['last_checked'] = now
+    try:
+        latest = model_store.current_version(_store_dir(), MODEL_NAME)
+        if latest and (active is None or latest != active['version']):
+            active = _activate(*model_store.load_artifacts(_store_dir(), MODEL_NAME, latest))
+        if active is not None:
+            _apply_profile_changes(active)
+    except Exception as e:
+        logger.error(f"[Content] Could not refresh model: {e}")
+    return active
+
+
+def mark_profile_changed(*user_ids):
+    """
+    Record that users' profile text changed; every worker re-vectorises
+    them on its next poll.
+    """
+    user_ids = [int(uid) for uid in user_ids if uid]
+    if not user_ids:
+        return
+
+    now = time.time()
+    conn = get_db_connection()
+    try:
+        conn.executemany(
+            'INSERT INTO profile_changes (user_id, changed_at) VALUES (?, ?) '
+            'ON CONFLICT(user_id) DO UPDATE SET changed_at = excluded.changed_at',
+            [(uid, now) for uid in user_ids]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    _content_cache['last_checked'] = 0   # apply on this worker's next request
+
+
+def get_content_stats():
+    """Active content version, overlay size and last training timings."""
+    model = _content_cache['active']
+    return {'content_version': model['version'] if model else None,
+            'content_overlay_users': len(_content_cache['overlay']),
+            **_content_cache['stats']}
+
+
+# =====================================================================
+# Serving
+# =====================================================================
+def _content_candidates(model, c, user_id):
+    """
+    (user_id, cosine) candidates for a user, best first: the precomputed
+    neighbour row when the user's profile is unchanged, otherwise one
+    sparse mat-vec against all published vectors; edited profiles in the
+    overlay are re-scored against the user's current vector.
+    """
+    overlay = _content_cache['overlay']
+    idx = np.searchsorted(model['user_ids'], user_id)
+    in_model = idx < len(model['user_ids']) and model['user_ids'][idx] == user_id
+
+    if user_id in overlay:
+        entry = overlay[user_id]
+    elif in_model:
+        entry = (bool(model['is_alumni'][idx]), model['vectors'][idx])
+    else:
+        entry = _vectorise_users(model, c, [user_id]).get(user_id)
+    if entry is None or entry[1].nnz == 0:
+        return []
+    is_alumni, vector = entry
+
+    if in_model and user_id not in overlay:
+        scores = {int(uid): float(s) for uid, s in
+                  zip(model['neighbour_ids'][idx], model['neighbour_scores'][idx]) if s > 0}
+    else:
+        sims = np.asarray((model['vectors'] @ vector.T).todense()).ravel()
+        sims[model['is_alumni'] == is_alumni] = 0
+        k = min(CONTENT_TOP_K, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k]
+        scores = {int(model['user_ids'][i]): float(sims[i]) for i in top if sims[i] > 0}
+
+    for uid, other in overlay.items():
+        scores.pop(uid, None)
+        if uid != user_id and other is not None and other[0] != is_alumni:
+            sim = float(vector.multiply(other[1]).sum())
+            if sim > 0:
+                scores[uid] = sim
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def get_content_recommendations(user_id, limit=5):
+    """
+    Recommend users whose profile text is most similar (TF-IDF cosine).
+
+    Returns:
+        List of recommendation dicts (same shape as get_ml_recommendations);
+        empty when no content model is published or the profile has no text.
+    """
+    from services.recommendation_engine import load_exclusions, build_recommendations
+
+    model = get_active_content_model()
+    if model is None:
+        return []
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        c = conn.cursor()
+
+        excluded_ids, target_role = load_exclusions(c, user_id)
+        if target_role is None:
+            return []
+
+        candidates = [(uid, score) for uid, score in _content_candidates(model, c, user_id)
+                      if uid not in excluded_ids]
+        return build_recommendations(c, candidates, target_role, limit,
+                                     reason='Content: similar profile')
+
+    except Exception as e:
+        logger.error(f"[Content] get_content_recommendations error: {e}")
+        return []
+    finally:
+        if conn:
+            conn.close()
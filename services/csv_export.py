@@ -0,0 +1,306 @@
+"""
+services/csv_export.py
+=======================
+Streaming CSV exports of users and registration logs.
+
+/api/download-csv/<role> and /admin/export/registrations used to build
+the whole file in a StringIO before sending the first byte. The rows now
+come from a cursor in `fetchmany` batches of EXPORT_BATCH_ROWS and every
+batch is written, encoded and yielded before the next one is read, so the
+memory needed is one batch regardless of the table size:
+
+    iter_csv(kind)                  → bytes chunks of the CSV
+    iter_csv(kind, compress=True)   → the same, as one gzip stream
+
+BACKGROUND EXPORTS:
+  submit_export() writes the file to EXPORT_DIR on a background thread
+  and tracks it in `export_jobs` (queued → running → succeeded | failed,
+  plus the row count), so the admin can poll any worker and download the
+  file when it is ready. Files and job rows older than
+  EXPORT_RETENTION_HOURS are removed when a new export is submitted.
+"""
+
+import os
+import csv
+import io
+import time
+import zlib
+import logging
+import threading
+from datetime import datetime
+
+from flask import current_app
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_ROWS = 1000
+DEFAULT_RETENTION_HOURS = 24
+
+
+def _v(value):
+    return value or ''
+
+
+EXPORTS = {
+    'student': {
+        'filename': 'STUDENT_Users',
+        'sql': '''
+            SELECT u.id, u.name, u.email, u.phone, u.role,
+                   s.enrollment_no, s.semester, s.cgpa, s.skills, s.department
+            FROM users u
+            LEFT JOIN student_profile s ON u.id = s.user_id
+            WHERE u.role = 'student'
+            ORDER BY u.id DESC
+        ''',
+        'header': ['ID', 'Name', 'Email', 'Phone', 'Role',
+                   'Enrollment No', 'Semester', 'CGPA', 'Skills', 'Department'],
+        'row': lambda r: [r['id'], r['name'], r['email'], r['phone'], r['role'],
+                          _v(r['enrollment_no']), _v(r['semester']), _v(r['cgpa']),
+                          _v(r['skills']), _v(r['department'])],
+    },
+    'alumni': {
+        'filename': 'ALUMNI_Users',
+        'sql': '''
+            SELECT u.id, u.name, u.email, u.phone, u.role,
+                   a.enrollment_no, a.degree, a.pass_year, a.company_name,
+                   a.designation, a.experience_years, a.department
+            FROM users u
+            LEFT JOIN alumni_profile a ON u.id = a.user_id
+            WHERE u.role = 'alumni'
+            ORDER BY u.id DESC
+        ''',
+        'header': ['ID', 'Name', 'Email', 'Phone', 'Role',
+                   'Enrollment No', 'Degree', 'Pass Year', 'Company',
+                   'Designation', 'Experience (Years)', 'Department'],
+        'row': lambda r: [r['id'], r['name'], r['email'], r['phone'], r['role'],
+                          _v(r['enrollment_no']), _v(r['degree']), _v(r['pass_year']),
+                          _v(r['company_name']), _v(r['designation']),
+                          _v(r['experience_years']), _v(r['department'])],
+    },
+    'faculty': {
+        'filename': 'FACULTY_Users',
+        'sql': '''
+            SELECT u.id, u.name, u.email, u.phone, u.role,
+                   f.employee_id, f.designation, f.specialization, f.experience_years,
+                   f.office_hours, f.department
+            FROM users u
+            LEFT JOIN faculty_profile f ON u.id = f.user_id
+            WHERE u.role = 'faculty'
+            ORDER BY u.id DESC
+        ''',
+        'header': ['ID', 'Name', 'Email', 'Phone', 'Role',
+                   'Employee ID', 'Designation', 'Specialization',
+                   'Experience (Years)', 'Office Hours', 'Department'],
+        'row': lambda r: [r['id'], r['name'], r['email'], r['phone'], r['role'],
+                          _v(r['employee_id']), _v(r['designation']), _v(r['specialization']),
+                          _v(r['experience_years']), _v(r['office_hours']), _v(r['department'])],
+    },
+    'all': {
+        'filename': 'ALL_Users',
+        'sql': 'SELECT u.id, u.name, u.email, u.phone, u.role FROM users u ORDER BY u.id DESC',
+        'header': ['ID', 'Name', 'Email', 'Phone', 'Role'],
+        'row': lambda r: [r['id'], r['name'], r['email'], r['phone'], r['role']],
+    },
+    'registrations': {
+        'filename': 'community_matrix_export',
+        'sql': 'SELECT * FROM registration_log ORDER BY registered_at DESC',
+        'header': ['Record ID', 'Full Name', 'Email Address', 'Primary Phone',
+                   'System Classification', 'Core Department', 'Academic Degree',
+                   'Temporal Stamp (Registration)'],
+        'row': lambda r: [r['id'], r['name'], r['email'], r['phone'],
+                          r['role'].upper() if r['role'] else 'N/A',
+                          r['department'] or 'General', r['degree'] or 'N/A', r['registered_at']],
+    },
+}
+
+
+def export_filename(kind, compress=False):
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f"{EXPORTS[kind]['filename']}_{timestamp}.csv{'.gz' if compress else ''}"
+
+
+def iter_csv(kind, compress=False, batch_rows=EXPORT_BATCH_ROWS, counter=None):
+    """
+    Generate an export as encoded chunks (one per fetchmany batch).
+
+    Args:
+        kind: A key of EXPORTS.
+        compress: Yield a gzip stream instead of plain CSV.
+        counter: Optional dict whose 'rows' is kept up to date.
+
+    Raises:
+        ValueError: unknown kind (before the first chunk).
+    """
+    spec = EXPORTS.get(kind)
+    if spec is None:
+        raise ValueError(f'Unknown export: {kind}')
+    return _generate(spec, compress, batch_rows, counter if counter is not None else {})
+
+
+def _generate(spec, compress, batch_rows, counter):
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None   # wbits 31 = gzip container
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    counter['rows'] = 0
+
+    def drain():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return gzip.compress(data) if gzip else data
+
+    conn = get_db_connection()
+    try:
+        cur = conn.execute(spec['sql'])
+        writer.writerow(spec['header'])
+        while True:
+            rows = cur.fetchmany(batch_rows)
+            if not rows:
+                break
+            writer.writerows(spec['row'](row) for row in rows)
+            counter['rows'] += len(rows)
+            chunk = drain()
+            if chunk:
+                yield chunk
+        chunk = drain()
+        if gzip:
+            chunk += gzip.flush()
+        if chunk:
+            yield chunk
+    finally:
+        conn.close()
+
+
+# =====================================================================
+# Background exports
+# =====================================================================
+def _export_dir():
+    path = current_app.config.get('EXPORT_DIR', 'data/exports')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _update_export(export_id, **fields):
+    assignments = ', '.join(f'{key} = ?' for key in fields)
+    conn = get_db_connection()
+    try:
+        conn.execute(f'UPDATE export_jobs SET {assignments} WHERE id = ?', list(fields.values()) + [export_id])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_export(export_id):
+    """Export job dict or None (the file path is not exposed)."""
+    conn = get_db_connection()
+    try:
+        row = conn.execute('SELECT * FROM export_jobs WHERE id = ?', (export_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    job = dict(row)
+    job['ready'] = job['status'] == 'succeeded' and bool(job['path']) and os.path.exists(job['path'])
+    job.pop('path')
+    return job
+
+
+def get_export_path(export_id):
+    """(path, filename) of a finished export, or None."""
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT path, filename FROM export_jobs WHERE id = ? AND status = 'succeeded'",
+                           (export_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None or not row['path'] or not os.path.exists(row['path']):
+        return None
+    return row['path'], row['filename']
+
+
+def get_recent_exports(limit=10):
+    conn = get_db_connection()
+    try:
+        ids = [row[0] for row in conn.execute('SELECT id FROM export_jobs ORDER BY id DESC LIMIT ?', (limit,))]
+    finally:
+        conn.close()
+    return [get_export(export_id) for export_id in ids]
+
+
+def _run_export(export_id, kind, compress, path):
+    counter = {'rows': 0}
+    started = time.time()
+    _update_export(export_id, status='running', started_at=started)
+    try:
+        with open(path + '.part', 'wb') as f:
+            for chunk in iter_csv(kind, compress=compress, counter=counter):
+                f.write(chunk)
+        os.replace(path + '.part', path)
+        _update_export(export_id, status='succeeded', rows=counter['rows'], path=path,
+                       size_bytes=os.path.getsize(path), finished_at=time.time())
+        logger.info(f"[Export] {kind} export {export_id}: {counter['rows']} rows "
+                    f"in {time.time() - started:.2f}s")
+    except Exception as e:
+        logger.error(f"[Export] {kind} export {export_id} failed: {e}")
+        if os.path.exists(path + '.part'):
+            os.remove(path + '.part')
+        _update_export(export_id, status='failed', error=str(e), rows=counter['rows'],
+                       finished_at=time.time())
+
+
+def cleanup_exports(retention_hours=None):
+    """Delete export files and job rows older than the retention window."""
+    if retention_hours is None:
+        retention_hours = current_app.config.get('EXPORT_RETENTION_HOURS', DEFAULT_RETENTION_HOURS)
+    cutoff = time.time() - retention_hours * 3600
+    conn = get_db_connection()
+    try:
+        old = conn.execute('SELECT id, path FROM export_jobs WHERE created_at < ?', (cutoff,)).fetchall()
+        for row in old:
+            if row['path'] and os.path.exists(row['path']):
+                os.remove(row['path'])
+        conn.execute('DELETE FROM export_jobs WHERE created_at < ?', (cutoff,))
+        conn.commit()
+    finally:
+        conn.close()
+    return len(old)
+
+
+def submit_export(kind, compress=False, requested_by=None):
+    """
+    Write an export to EXPORT_DIR on a background thread.
+
+    Returns:
+        Export job dict (status 'queued').
+
+    Raises:
+        ValueError: unknown kind.
+    """
+    if kind not in EXPORTS:
+        raise ValueError(f'Unknown export: {kind}')
+    cleanup_exports()
+
+    filename = export_filename(kind, compress)
+    conn = get_db_connection()
+    try:
+        cur = conn.execute(
+            "INSERT INTO export_jobs (kind, compressed, status, filename, requested_by, created_at) "
+            "VALUES (?, ?, 'queued', ?, ?, ?)",
+            (kind, int(compress), filename, requested_by, time.time())
+        )
+        conn.commit()
+        export_id = cur.lastrowid
+    finally:
+        conn.close()
+
+    path = os.path.join(_export_dir(), f'{export_id}_{filename}')
+    app = current_app._get_current_object()
+
+    def _target():
+        with app.app_context():
+            _run_export(export_id, kind, compress, path)
+
+    threading.Thread(target=_target, daemon=True, name=f'csv-export-{export_id}').start()
+    return get_export(export_id)
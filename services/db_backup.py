@@ -0,0 +1,162 @@
+"""
+services/db_backup.py
+======================
+Consistent copies of the live database for downloads and backups.
+
+/api/download-db/<db_type> used to shutil.copy2 the main database file.
+In WAL mode the newest commits live in the -wal file, and a copy taken
+during a checkpoint can be torn, so those downloads could be stale or
+corrupt. They now come from:
+
+  backup_database(dest)       sqlite3 online backup API, BACKUP_PAGES_PER_STEP
+                              pages per step. The source holds one read
+                              transaction for the whole copy: writers carry
+                              on (WAL) and, unlike an unpinned stepped
+                              backup, their commits cannot restart it.
+
+  export_role_database(role, dest)
+                              a fresh database with the schema of `users`
+                              and the role's profile table, filled by
+                              ATTACH + INSERT ... SELECT of that role's rows
+                              only, inside one read transaction.
+
+iter_file_chunks() streams a finished copy and deletes it afterwards;
+remove_file() is the same cleanup for responses whose body is never
+iterated (HEAD requests, clients gone before the first chunk).
+"""
+
+import os
+import time
+import sqlite3
+import logging
+
+from flask import current_app
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGES_PER_STEP = 1024
+STREAM_CHUNK_BYTES = 256 * 1024
+
+# role → tables copied besides `users` (all keyed by user_id)
+ROLE_TABLES = {
+    'student': ('student_profile',),
+    'alumni': ('alumni_profile',),
+    'faculty': ('faculty_profile',),
+}
+
+
+def backup_database(dest_path, pages=None):
+    """
+    Copy the live database to dest_path with the online backup API.
+
+    Returns:
+        Size of the copy in bytes.
+    """
+    if pages is None:
+        pages = current_app.config.get('BACKUP_PAGES_PER_STEP', DEFAULT_PAGES_PER_STEP)
+    started = time.time()
+    source = get_db_connection()
+    source.isolation_level = None
+    target = sqlite3.connect(dest_path)
+    try:
+        # Pin the snapshot every step reads from
+        source.execute('BEGIN')
+        source.execute('SELECT 1 FROM sqlite_master LIMIT 1').fetchone()
+        source.backup(target, pages=pages, sleep=0.005)
+        source.execute('COMMIT')
+        # A standalone file: no -wal beside it
+        target.execute('PRAGMA journal_mode=DELETE')
+    finally:
+        target.close()
+        source.close()
+    size = os.path.getsize(dest_path)
+    logger.info(f"[Backup] {dest_path}: {size} bytes in {time.time() - started:.2f}s")
+    return size
+
+
+def _schema_statements(conn, tables):
+    """CREATE TABLE / INDEX statements of the given tables (no triggers)."""
+    ph = ','.join(['?'] * len(tables))
+    rows = conn.execute(f'''
+        SELECT type, sql FROM sqlite_master
+        WHERE tbl_name IN ({ph}) AND type IN ('table', 'index') AND sql IS NOT NULL
+        ORDER BY type = 'index'
+    ''', tables).fetchall()
+    return [row[1] for row in rows]
+
+
+def export_role_database(role, dest_path):
+    """
+    Write the users of one role and their profiles to a new database.
+
+    Returns:
+        {table: rows copied}
+
+    Raises:
+        ValueError: unknown role.
+    """
+    if role not in ROLE_TABLES:
+        raise ValueError(f'Unknown role: {role}')
+    started = time.time()
+    conn = get_db_connection()
+    try:
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        tables = ['users'] + [t for t in ROLE_TABLES[role] if t in existing]
+
+        target = sqlite3.connect(dest_path)
+        try:
+            for statement in _schema_statements(conn, tables):
+                target.execute(statement)
+            target.commit()
+        finally:
+            target.close()
+
+        conn.execute('ATTACH DATABASE ? AS export', (dest_path,))
+        copied = {}
+        try:
+            conn.execute('BEGIN')
+            for table in tables:
+                columns = ', '.join(f'"{row[1]}"' for row in conn.execute(f'PRAGMA main.table_info({table})'))
+                if table == 'users':
+                    sql = f'INSERT INTO export.users ({columns}) SELECT {columns} FROM main.users WHERE role = ?'
+                else:
+                    sql = (f'INSERT INTO export.{table} ({columns}) SELECT {columns} FROM main.{table} '
+                           f'WHERE user_id IN (SELECT id FROM main.users WHERE role = ?)')
+                copied[table] = conn.execute(sql, (role,)).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute('DETACH DATABASE export')
+    finally:
+        conn.close()
+    logger.info(f"[Backup] {role} export {copied} in {time.time() - started:.2f}s")
+    return copied
+
+
+def remove_file(path):
+    """Delete a streamed copy if it is still there."""
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def iter_file_chunks(path, chunk_bytes=STREAM_CHUNK_BYTES, remove=True):
+    """
+    Yield a file in chunks, deleting it once sent (or abandoned mid-way).
+
+    The cleanup only runs once iteration has started — register
+    remove_file() with response.call_on_close() as well.
+    """
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_bytes)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        if remove:
+            remove_file(path)
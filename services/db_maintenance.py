@@ -0,0 +1,240 @@
+"""
+services/db_maintenance.py
+===========================
+Scheduled SQLite maintenance: checkpoints, planner statistics, vacuum
+and rotating backups.
+
+TASKS (scheduled in app.py, run only in the process owning the
+'db-maintenance' lock):
+
+  checkpoint   every MAINTENANCE_CHECKPOINT_MINUTES. wal_checkpoint(TRUNCATE)
+               when nothing was written for MAINTENANCE_QUIET_SECONDS (WAL
+               mtime) or the WAL is over MAINTENANCE_WAL_MAX_MB; otherwise
+               skipped, leaving SQLite's passive auto-checkpoint to it.
+  optimize     every MAINTENANCE_OPTIMIZE_HOURS. PRAGMA optimize with an
+               analysis_limit, or a full ANALYZE when no statistics exist.
+  vacuum       nightly at MAINTENANCE_HOUR. PRAGMA incremental_vacuum of up
+               to MAINTENANCE_VACUUM_PAGES free pages. A database created
+               before auto_vacuum=INCREMENTAL is converted by one VACUUM
+               only while it is under MAINTENANCE_CONVERT_MAX_MB; larger
+               ones are skipped until an admin runs 'convert'.
+  backup       nightly, after vacuum. Online backup (services/db_backup.py)
+               into BACKUP_DIR, keeping the newest BACKUP_KEEP files.
+  convert      never scheduled (POST /api/admin/maintenance/convert). Full
+               VACUUM switching an older database to auto_vacuum=INCREMENTAL;
+               it rewrites the whole file and holds the writer lock meanwhile.
+
+Every run that did work is recorded in `maintenance_runs` with its duration, status
+and the database / WAL sizes before and after, so growth and the effect
+of each task can be followed in GET /api/admin/maintenance.
+"""
+
+import os
+import glob
+import json
+import time
+import logging
+from datetime import datetime
+
+from flask import current_app
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_LOCK = 'db-maintenance'
+TASKS = ('checkpoint', 'optimize', 'vacuum', 'backup', 'convert')
+RUN_HISTORY_DAYS = 30
+BACKUP_PREFIX = 'college_pro_'
+
+
+def _setting(name, default):
+    return current_app.config.get(name, default)
+
+
+def _db_path():
+    return _setting('DB_NAME', 'data/alumni.db')
+
+
+def _file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def _sizes():
+    path = _db_path()
+    return _file_size(path), _file_size(path + '-wal')
+
+
+# =====================================================================
+# Tasks — each returns a detail dict ('status': 'skipped' for a no-op)
+# =====================================================================
+def _checkpoint(conn):
+    wal_path = _db_path() + '-wal'
+    wal_bytes = _file_size(wal_path)
+    if not wal_bytes:
+        return {'status': 'skipped', 'reason': 'empty'}
+    quiet = time.time() - os.path.getmtime(wal_path) >= _setting('MAINTENANCE_QUIET_SECONDS', 60)
+    oversized = wal_bytes > _setting('MAINTENANCE_WAL_MAX_MB', 64) * 1024 * 1024
+    if not (quiet or oversized):
+        return {'status': 'skipped', 'reason': 'busy'}
+    conn.execute('PRAGMA busy_timeout = 2000')
+    busy, log_frames, checkpointed = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+    return {'status': 'busy' if busy else 'ok', 'reason': 'oversized' if oversized else 'quiet',
+            'log_frames': log_frames, 'checkpointed': checkpointed}
+
+
+def _optimize(conn):
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone() is not None
+    if not has_stats:
+        conn.execute('ANALYZE')
+        return {'mode': 'analyze'}
+    conn.execute(f"PRAGMA analysis_limit = {int(_setting('MAINTENANCE_ANALYSIS_LIMIT', 1000))}")
+    conn.execute('PRAGMA optimize')
+    return {'mode': 'optimize'}
+
+
+def _vacuum(conn):
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+        if _file_size(_db_path()) > _setting('MAINTENANCE_CONVERT_MAX_MB', 50) * 1024 * 1024:
+            return {'status': 'skipped', 'reason': 'auto_vacuum not incremental, run convert'}
+        return _convert(conn)
+    freelist = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    if not freelist:
+        return {'status': 'skipped', 'reason': 'no free pages'}
+    pages = min(freelist, int(_setting('MAINTENANCE_VACUUM_PAGES', 10000)))
+    # execute() would step the pragma once (one page); executescript runs it to completion
+    conn.executescript(f'PRAGMA incremental_vacuum({pages})')
+    left = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    return {'mode': 'incremental', 'freed_pages': freelist - left, 'free_pages_left': left}
+
+
+def _convert(conn):
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+        return {'status': 'skipped', 'reason': 'already incremental'}
+    freelist = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    # auto_vacuum only changes with a full rebuild of the file
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+    return {'mode': 'converted', 'freed_pages': freelist}
+
+
+def _backup(conn):
+    from services.db_backup import backup_database
+
+    backup_dir = _setting('BACKUP_DIR', 'data/backups')
+    os.makedirs(backup_dir, exist_ok=True)
+    path = os.path.join(backup_dir, f"{BACKUP_PREFIX}{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
+    try:
+        size = backup_database(path + '.part')
+        os.replace(path + '.part', path)
+    finally:
+        if os.path.exists(path + '.part'):
+            os.remove(path + '.part')
+
+    # Rotate: the names sort by timestamp
+    backups = sorted(glob.glob(os.path.join(backup_dir, f'{BACKUP_PREFIX}*.db')))
+    removed = backups[:-max(1, int(_setting('BACKUP_KEEP', 7)))]
+    for old in removed:
+        os.remove(old)
+    return {'file': os.path.basename(path), 'backup_bytes': size, 'rotated_out': len(removed)}
+
+
+_TASK_FUNCS = {'checkpoint': _checkpoint, 'optimize': _optimize, 'vacuum': _vacuum, 'backup': _backup,
+               'convert': _convert}
+
+
+def run_maintenance_task(task):
+    """
+    Run one task now and record it in maintenance_runs.
+
+    Returns:
+        The recorded run as a dict.
+
+    Raises:
+        ValueError: unknown task.
+    """
+    if task not in _TASK_FUNCS:
+        raise ValueError(f"Unknown maintenance task: {task}")
+    db_before, wal_before = _sizes()
+    started = time.time()
+    status, detail = 'ok', {}
+    conn = get_db_connection()
+    try:
+        detail = _TASK_FUNCS[task](conn) or {}
+        status = detail.pop('status', 'ok')
+    except Exception as e:
+        status, detail = 'failed', {'error': str(e)}
+        logger.error(f"[Maintenance] {task} failed: {e}")
+    finally:
+        conn.close()
+    duration = time.time() - started
+    if status == 'skipped':
+        return {'task': task, 'status': status, 'detail': detail}
+    db_after, wal_after = _sizes()
+
+    run = {'task': task, 'status': status, 'started_at': started, 'duration_ms': round(duration * 1000, 1),
+           'db_bytes_before': db_before, 'wal_bytes_before': wal_before,
+           'db_bytes_after': db_after, 'wal_bytes_after': wal_after, 'detail': json.dumps(detail)}
+    conn = get_db_connection()
+    try:
+        conn.execute(f"INSERT INTO maintenance_runs ({', '.join(run)}) VALUES ({', '.join(['?'] * len(run))})",
+                     list(run.values()))
+        conn.execute('DELETE FROM maintenance_runs WHERE started_at < ?',
+                     (time.time() - RUN_HISTORY_DAYS * 86400,))
+        conn.commit()
+    finally:
+        conn.close()
+
+    logger.info(f"[Maintenance] {task} {status} in {duration:.2f}s "
+                f"(db {db_before} → {db_after} bytes, wal {wal_before} → {wal_after} bytes) {detail}")
+    return {**run, 'detail': detail}
+
+
+def run_scheduled_maintenance(*tasks):
+    """Scheduler entry point — runs in the process owning the maintenance lock only."""
+    from services.recommendation_engine import _lock_dir
+    from utils.process_lock import acquire_process_lock
+
+    if not _setting('MAINTENANCE_ENABLED', True):
+        return None
+    if not acquire_process_lock(MAINTENANCE_LOCK, _lock_dir()):
+        return None
+    return [run_maintenance_task(task) for task in tasks]
+
+
+# =====================================================================
+# Reading
+# =====================================================================
+def get_maintenance_status(history=20):
+    """Current file sizes, the last run of every task and the recent history."""
+    conn = get_db_connection()
+    try:
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+        rows = conn.execute('SELECT * FROM maintenance_runs ORDER BY id DESC LIMIT ?', (history,)).fetchall()
+        last = {}
+        for task in TASKS:
+            row = conn.execute('SELECT * FROM maintenance_runs WHERE task = ? ORDER BY id DESC LIMIT 1',
+                               (task,)).fetchone()
+            last[task] = _run_dict(row) if row else None
+    finally:
+        conn.close()
+    db_bytes, wal_bytes = _sizes()
+    backup_dir = _setting('BACKUP_DIR', 'data/backups')
+    backups = sorted(glob.glob(os.path.join(backup_dir, f'{BACKUP_PREFIX}*.db')), reverse=True)
+    return {
+        'db_bytes': db_bytes, 'wal_bytes': wal_bytes, 'free_bytes': free_pages * page_size,
+        'auto_vacuum': {0: 'none', 1: 'full', 2: 'incremental'}.get(auto_vacuum, auto_vacuum),
+        'backups': [{'file': os.path.basename(b), 'bytes': _file_size(b)} for b in backups],
+        'last_runs': last,
+        'history': [_run_dict(row) for row in rows],
+    }
+
+
+def _run_dict(row):
+    run = dict(row)
+    run['detail'] = json.loads(run['detail']) if run['detail'] else {}
+    return run
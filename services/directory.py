@@ -0,0 +1,185 @@
+"""
+services/directory.py
+======================
+Keyset-paginated people directory (alumni, students, faculty).
+
+The student and faculty dashboards used to render every alumnus, student
+and faculty member into one page. They now render the first page only
+and fetch further pages from `/api/directory/<role>` while scrolling.
+
+PAGINATION:
+  Pages are ordered by a sort key plus the user id as tie-breaker and
+  continue strictly after the last row of the previous page:
+
+      WHERE (sort_key, u.id) > (:last_key, :last_id) ORDER BY sort_key, u.id LIMIT n
+
+  The cursor is that (sort, key, id) triple, base64-encoded. Unlike
+  OFFSET, the cost of a page does not grow with its depth, and rows
+  inserted meanwhile do not shift pages. Supported keys:
+    alumni    pass_year (newest first, default) or name
+    students  name
+    faculty   name
+  Each has a matching index: users(role, name, id) and
+  alumni_profile(pass_year, user_id).
+
+FILTERS / PROJECTION:
+  department (all roles), year (alumni pass year), semester (students),
+  q (substring of name / department / company) and `fields` — a subset
+  of the role's columns (id and the sort key are always included).
+"""
+
+import json
+import base64
+import binascii
+
+from db_utils import get_db_connection
+from services.stats_counters import get_by_dimension
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+_DIRECTORY_SPECS = {
+    'alumni': {
+        'from': 'users u JOIN alumni_profile p ON p.user_id = u.id',
+        'columns': {
+            'name': 'u.name', 'email': 'u.email', 'phone': 'u.phone', 'profile_pic': 'u.profile_pic',
+            'enrollment_no': 'p.enrollment_no', 'department': 'p.department', 'degree': 'p.degree',
+            'pass_year': 'p.pass_year', 'company_name': 'p.company_name', 'designation': 'p.designation',
+            'work_location': 'p.work_location', 'experience_years': 'p.experience_years',
+        },
+        # pass_year pages walk alumni_profile(pass_year, user_id); CROSS JOIN
+        # keeps SQLite from driving the join from users and sorting afterwards
+        'sorts': {'pass_year': ('p.pass_year', 'DESC', 'p.user_id',
+                                'alumni_profile p CROSS JOIN users u ON u.id = p.user_id'),
+                  'name': ('u.name', 'ASC', 'u.id', None)},
+        'default_sort': 'pass_year',
+        'filters': {'department': 'p.department = ?', 'year': 'p.pass_year = ?'},
+        'search': ('u.name', 'p.department', 'p.company_name'),
+    },
+    'student': {
+        'from': 'users u LEFT JOIN student_profile p ON p.user_id = u.id',
+        'columns': {
+            'name': 'u.name', 'email': 'u.email', 'phone': 'u.phone', 'profile_pic': 'u.profile_pic',
+            'department': 'p.department', 'degree': 'p.degree', 'semester': 'p.semester',
+            'skills': 'COALESCE(p.skills, u.skills)', 'cgpa': 'p.cgpa',
+        },
+        'sorts': {'name': ('u.name', 'ASC', 'u.id', None)},
+        'default_sort': 'name',
+        'filters': {'department': 'p.department = ?', 'semester': 'p.semester = ?'},
+        'search': ('u.name', 'p.department', 'p.skills'),
+    },
+    'faculty': {
+        'from': 'users u JOIN faculty_profile p ON p.user_id = u.id',
+        'columns': {
+            'name': 'u.name', 'email': 'u.email', 'phone': 'u.phone', 'profile_pic': 'u.profile_pic',
+            'department': 'p.department', 'designation': 'p.designation',
+            'office_location': 'p.office_location', 'specialization': 'p.specialization',
+        },
+        'sorts': {'name': ('u.name', 'ASC', 'u.id', None)},
+        'default_sort': 'name',
+        'filters': {'department': 'p.department = ?'},
+        'search': ('u.name', 'p.department', 'p.designation'),
+    },
+}
+
+DIRECTORY_ROLES = tuple(_DIRECTORY_SPECS)
+
+
+def encode_cursor(sort, key, user_id):
+    raw = json.dumps([sort, key, user_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Cursor string → (sort, key, user_id). Raises ValueError when malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort, key, user_id = json.loads(raw)
+        return sort, key, int(user_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError(f'Invalid cursor: {e}')
+
+
+def list_directory(role, cursor=None, limit=DEFAULT_PAGE_SIZE, sort=None, filters=None,
+                   q=None, fields=None, exclude_user_id=None):
+    """
+    One page of the directory of a role.
+
+    Args:
+        role: 'alumni', 'student' or 'faculty'.
+        cursor: next_cursor of the previous page (None = first page).
+        sort: A key of the role's sorts (default per role).
+        filters: {filter name: value} — unknown names are ignored.
+        fields: Iterable of column names to return (default: all).
+
+    Returns:
+        {'items': [dict], 'next_cursor': str or None, 'sort': sort}
+
+    Raises:
+        ValueError: unknown role / sort / field, or a malformed cursor.
+    """
+    spec = _DIRECTORY_SPECS.get(role)
+    if spec is None:
+        raise ValueError(f'Unknown directory: {role}')
+    sort = sort or spec['default_sort']
+    if sort not in spec['sorts']:
+        raise ValueError(f"Cannot sort {role} by '{sort}'")
+    sort_expr, direction, id_expr, from_clause = spec['sorts'][sort]
+    limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+
+    fields = list(fields) if fields else list(spec['columns'])
+    unknown = [f for f in fields if f not in spec['columns']]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    if sort not in fields:
+        fields.append(sort)
+    select = ', '.join(f'{spec["columns"][f]} AS {f}' for f in fields)
+
+    where = ["u.role = ?"]
+    params = [role]
+    if exclude_user_id is not None:
+        where.append('u.id != ?')
+        params.append(exclude_user_id)
+    for name, value in (filters or {}).items():
+        if name in spec['filters'] and value not in (None, ''):
+            where.append(spec['filters'][name])
+            params.append(value)
+    if q:
+        where.append('(' + ' OR '.join(f'{col} LIKE ?' for col in spec['search']) + ')')
+        params.extend([f'%{q}%'] * len(spec['search']))
+    if cursor:
+        cursor_sort, key, last_id = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise ValueError('Cursor belongs to a different sort order')
+        op = '<' if direction == 'DESC' else '>'
+        where.append(f'({sort_expr}, {id_expr}) {op} (?, ?)')
+        params.extend([key, last_id])
+
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(f'''
+            SELECT u.id AS id, {select}
+            FROM {from_clause or spec['from']}
+            WHERE {' AND '.join(where)}
+            ORDER BY {sort_expr} {direction}, {id_expr} {direction}
+            LIMIT ?
+        ''', params + [limit + 1]).fetchall()
+    finally:
+        conn.close()
+
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(sort, last[sort], last['id'])
+    return {'items': items, 'next_cursor': next_cursor, 'sort': sort}
+
+
+def directory_counts():
+    """Users per directory role (from the maintained stats_counters)."""
+    conn = get_db_connection()
+    try:
+        counts = get_by_dimension(conn, 'users')
+    finally:
+        conn.close()
+    return {role: counts.get(role, 0) for role in DIRECTORY_ROLES}
@@ -0,0 +1,187 @@
+"""
+services/email_queue.py
+========================
+Outgoing email queue for notifications sent in bulk.
+
+send_email() in app.py opens an SMTP connection per message inside the
+request. Batch operations (e.g. approving hundreds of registrations)
+instead insert their messages into `email_queue` in the same transaction
+as the change they announce, and a sender drains the queue over one SMTP
+session per batch:
+
+    enqueue_emails(conn, [(to, subject, html), ...])   executemany, caller commits
+    flush_email_queue()                                 claim + send a batch
+    drain_email_queue()                                 batches until empty (scheduler, every minute)
+
+CLAIMING:
+  A flush marks up to EMAIL_BATCH_SIZE queued rows 'sending' in one
+  IMMEDIATE transaction before talking to SMTP, so concurrent flushes
+  (scheduler ticks in several workers, the kick after a bulk action)
+  never send the same message twice. Rows left 'sending' by a crashed
+  process are requeued after EMAIL_CLAIM_TIMEOUT seconds.
+
+RETRIES:
+  Only rows whose next_attempt_at is due are claimed. A message the
+  server refuses is retried after EMAIL_RETRY_BASE_SECONDS · 2^(attempts-1)
+  and kept as 'failed' after EMAIL_MAX_ATTEMPTS. When the SMTP connection
+  itself fails, the batch is released untouched (no attempt counted) and
+  tried again after EMAIL_RETRY_BASE_SECONDS, so a mail server outage
+  delays the queue instead of discarding it.
+"""
+
+import time
+import smtplib
+import logging
+import threading
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+from flask import current_app
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+EMAIL_BATCH_SIZE = 100
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_CLAIM_TIMEOUT = 600
+EMAIL_RETRY_BASE_SECONDS = 60
+
+
+def enqueue_emails(conn, messages):
+    """
+    Queue (to_email, subject, html) messages on the caller's connection.
+
+    Returns:
+        Number of messages queued.
+    """
+    now = time.time()
+    rows = [(to, subject, html, now) for to, subject, html in messages if to]
+    conn.executemany(
+        "INSERT INTO email_queue (to_email, subject, html, status, attempts, created_at) "
+        "VALUES (?, ?, ?, 'queued', 0, ?)", rows
+    )
+    return len(rows)
+
+
+def _claim(limit):
+    now = time.time()
+    conn = get_db_connection()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute("UPDATE email_queue SET status = 'queued' WHERE status = 'sending' AND claimed_at < ?",
+                     (now - EMAIL_CLAIM_TIMEOUT,))
+        rows = conn.execute(
+            "SELECT id, to_email, subject, html, attempts FROM email_queue "
+            "WHERE status = 'queued' AND COALESCE(next_attempt_at, 0) <= ? ORDER BY id LIMIT ?", (now, limit)
+        ).fetchall()
+        conn.executemany("UPDATE email_queue SET status = 'sending', claimed_at = ? WHERE id = ?",
+                         [(now, row['id']) for row in rows])
+        conn.commit()
+    finally:
+        conn.close()
+    return rows
+
+
+def _smtp_session():
+    config = current_app.config
+    password = config['MAIL_PASSWORD'].strip('"\'')
+    server = smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=10)
+    if config.get('MAIL_USE_TLS', True):
+        server.starttls()
+    server.login(config['MAIL_USERNAME'], password)
+    return server
+
+
+def flush_email_queue(limit=EMAIL_BATCH_SIZE):
+    """
+    Send one batch of queued emails over a single SMTP session.
+
+    Returns:
+        {'sent': n, 'failed': n, 'released': n} (None when nothing was due).
+    """
+    rows = _claim(limit)
+    if not rows:
+        return None
+
+    try:
+        server = _smtp_session()
+    except Exception as e:
+        logger.error(f"[Email] SMTP connection failed, {len(rows)} emails released: {e}")
+        _release(rows, str(e))
+        return {'sent': 0, 'failed': 0, 'released': len(rows)}
+
+    sent, retry = [], []
+    sender = current_app.config['MAIL_USERNAME']
+    try:
+        for row in rows:
+            msg = MIMEMultipart('alternative')
+            msg['Subject'] = row['subject']
+            msg['From'] = f'DBIT ALUMNI HUB <{sender}>'
+            msg['To'] = row['to_email']
+            msg.attach(MIMEText(row['html'], 'html'))
+            try:
+                server.send_message(msg)
+                sent.append(row)
+            except Exception as e:
+                retry.append((row, str(e)))
+    finally:
+        try:
+            server.quit()
+        except Exception:
+            pass
+
+    now = time.time()
+    conn = get_db_connection()
+    try:
+        conn.executemany("UPDATE email_queue SET status = 'sent', sent_at = ?, attempts = attempts + 1 WHERE id = ?",
+                         [(now, row['id']) for row in sent])
+        conn.executemany(
+            "UPDATE email_queue SET status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'queued' END, "
+            "attempts = attempts + 1, next_attempt_at = ?, error = ? WHERE id = ?",
+            [(EMAIL_MAX_ATTEMPTS, now + EMAIL_RETRY_BASE_SECONDS * 2 ** row['attempts'], error, row['id'])
+             for row, error in retry]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    logger.info(f"[Email] Sent {len(sent)} queued emails, {len(retry)} failed")
+    return {'sent': len(sent), 'failed': len(retry), 'released': 0}
+
+
+def _release(rows, error):
+    """Hand claimed rows back to the queue without counting an attempt."""
+    conn = get_db_connection()
+    try:
+        conn.executemany(
+            "UPDATE email_queue SET status = 'queued', next_attempt_at = ?, error = ? WHERE id = ?",
+            [(time.time() + EMAIL_RETRY_BASE_SECONDS, error, row['id']) for row in rows]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def drain_email_queue():
+    """Send batch after batch until the queue is empty or a batch sends nothing."""
+    total = 0
+    while True:
+        result = flush_email_queue()
+        if not result or not result['sent']:
+            return total
+        total += result['sent']
+
+
+def submit_email_flush():
+    """Drain the queue on a background thread."""
+    app = current_app._get_current_object()
+
+    def _target():
+        with app.app_context():
+            try:
+                drain_email_queue()
+            except Exception as e:
+                logger.error(f"[Email] Queue flush failed: {e}")
+
+    threading.Thread(target=_target, daemon=True, name='email-queue-flush').start()
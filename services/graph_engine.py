@@ -0,0 +1,303 @@
+"""
+services/graph_engine.py
+=========================
+Graph-based recommendations via personalised PageRank (random walk
+with restart) on the connection graph.
+
+GRAPH:
+  Nodes are students and alumni. Accepted connections are undirected
+  edges of weight 1.0; pending requests add an undirected edge of weight
+  GRAPH_PENDING_WEIGHT. The adjacency is row-normalised into a CSR
+  transition matrix P.
+
+SCORING:
+  For a source user s, the walk restarts at s with probability
+  GRAPH_RESTART at every step:
+
+      r = GRAPH_RESTART · e_s + (1 − GRAPH_RESTART) · Pᵀ r
+
+  Power iteration runs on a dense n × b block of sources at once, so b
+  users cost one sparse matrix–matrix product per step instead of b
+  mat-vecs. Walk mass that reaches a node without edges restarts at its
+  source.
+
+CACHING:
+  Each worker keeps the graph and a bounded per-user cache of top-K
+  candidates (K grows with the user's degree, since direct neighbours
+  are filtered out when serving). Both are dropped when the graph
+  signature (connection and request counts / ids) changes, so results
+  are refreshed on graph changes without any retraining.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+GRAPH_RESTART = 0.15         # restart probability α
+GRAPH_PENDING_WEIGHT = 0.5   # edge weight of a pending request
+GRAPH_MAX_ITER = 50
+GRAPH_TOL = 1e-6             # L1 change per source at which iteration stops
+GRAPH_BATCH_SIZE = 256       # sources per matrix–matrix power iteration
+GRAPH_TOP_K = 50             # candidates cached per user
+GRAPH_CACHE_SIZE = 10000     # users kept in the per-process result cache
+GRAPH_POLL_INTERVAL = 10     # seconds between graph-signature checks
+
+_graph_cache = {
+    'graph': None,           # {'signature', 'user_ids', 'transition_t', 'dangling', 'degree'}
+    'results': OrderedDict(),  # user_id → (neighbour ids, scores), LRU order
+    'last_checked': 0,
+    'lock': threading.Lock(),
+    'stats': {},
+}
+
+
+# =====================================================================
+# Graph construction
+# =====================================================================
+def _graph_signature(c):
+    """Cheap fingerprint that changes whenever an edge is added or removed."""
+    return tuple(c.execute('''
+        SELECT (SELECT MAX(id) FROM connections),
+               (SELECT COUNT(*) FROM connections),
+               (SELECT MAX(id) FROM connection_requests),
+               (SELECT COUNT(*) FROM connection_requests WHERE status = 'pending')
+    ''').fetchone())
+
+
+def _build_graph(c, signature):
+    """Load the connection graph into a transposed CSR transition matrix."""
+    from services.recommendation_engine import _pair_indices, _fetch_pairs
+
+    user_ids = np.array(
+        [row[0] for row in c.execute(
+            "SELECT id FROM users WHERE role IN ('student', 'alumni') ORDER BY id"
+        ).fetchall()],
+        dtype=np.int64,
+    )
+    n = len(user_ids)
+
+    rows, cols, vals = [], [], []
+    for sql, weight in (
+        ('SELECT user_id_1, user_id_2 FROM connections', 1.0),
+        ("SELECT sender_id, receiver_id FROM connection_requests "
+         "WHERE status = 'pending' AND sender_id IS NOT NULL AND receiver_id IS NOT NULL",
+         GRAPH_PENDING_WEIGHT),
+    ):
+        r, k, _ = _pair_indices(user_ids, _fetch_pairs(c, sql))
+        rows += [r, k]
+        cols += [k, r]
+        vals += [np.full(len(r), weight, dtype=np.float32)] * 2
+
+    adjacency = sparse.coo_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n, n), dtype=np.float32,
+    ).tocsr()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+
+    out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+    inv = np.divide(1.0, out_weight, out=np.zeros_like(out_weight), where=out_weight > 0)
+    transition = sparse.diags(inv.astype(np.float32)) @ adjacency
+
+    logger.info(f"[Graph] Connection graph loaded: {n} users, {adjacency.nnz // 2} edges")
+    return {
+        'signature': signature,
+        'user_ids': user_ids,
+        'transition_t': transition.T.tocsr(),
+        'dangling': out_weight == 0,
+        'degree': np.diff(adjacency.indptr),
+    }
+
+
+def get_graph(force_check=False):
+    """
+    Return the current connection graph, reloading it (and clearing the
+    per-user cache) when the graph signature changed since the last poll.
+    """
+    now = time.time()
+    graph = _graph_cache['graph']
+    if not force_check and graph is not None and now - _graph_cache['last_checked'] < GRAPH_POLL_INTERVAL:
+        return graph
+
+    conn = get_db_connection()
+    c = conn.cursor()
+    c.row_factory = None
+    try:
+        c.execute('BEGIN')
+        signature = _graph_signature(c)
+        _graph_cache['last_checked'] = now
+        if graph is not None and graph['signature'] == signature:
+            return graph
+
+        with _graph_cache['lock']:
+            start = time.time()
+            graph = _build_graph(c, signature)
+            _graph_cache['graph'] = graph
+            _graph_cache['results'] = OrderedDict()
+            _graph_cache['stats']['graph_build_ms'] = round((time.time() - start) * 1000, 1)
+        return graph
+    finally:
+        conn.close()
+
+
+# =====================================================================
+# Personalised PageRank (batched power iteration)
+# =====================================================================
+def personalized_pagerank(graph, sources, restart=GRAPH_RESTART,
+                          max_iter=GRAPH_MAX_ITER, tol=GRAPH_TOL):
+    """
+    Random-walk-with-restart scores for a batch of source nodes.
+
+    Args:
+        graph: Graph dict from get_graph().
+        sources: Row indices of the source users (one column each).
+
+    Returns:
+        Dense float32 array (n × len(sources)); column j sums to 1.
+    """
+    n = len(graph['user_ids'])
+    b = len(sources)
+    restart_matrix = np.zeros((n, b), dtype=np.float32)
+    restart_matrix[sources, np.arange(b)] = 1.0
+
+    transition_t = graph['transition_t']
+    dangling = graph['dangling']
+    scores = restart_matrix.copy()
+
+    for iteration in range(max_iter):
+        lost = scores[dangling].sum(axis=0)  # mass stuck on nodes without edges
+        updated = (1 - restart) * (transition_t @ scores)
+        updated += restart_matrix * (restart + (1 - restart) * lost)
+        delta = np.abs(updated - scores).sum(axis=0).max()
+        scores = updated
+        if delta < tol:
+            break
+
+    logger.debug(f"[Graph] PPR for {b} sources converged after {iteration + 1} iterations")
+    return scores
+
+
+def graph_candidates(user_ids):
+    """
+    Top-K PageRank candidates for many users, computed GRAPH_BATCH_SIZE
+    sources per power iteration and cached per user.
+
+    Returns:
+        {user_id: (candidate ids, scores)} — users not in the graph or
+        without any edge map to empty arrays.
+    """
+    graph = get_graph()
+    results = _graph_cache['results']
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+
+    out, missing = {}, []
+    for uid in user_ids:
+        cached = results.get(uid)
+        if cached is not None:
+            results.move_to_end(uid)
+            out[uid] = cached
+        else:
+            missing.append(uid)
+    if not missing:
+        return out
+
+    graph_ids = graph['user_ids']
+    pos = np.searchsorted(graph_ids, np.asarray(missing, dtype=np.int64))
+    pos = np.minimum(pos, max(len(graph_ids) - 1, 0))
+    sources = []
+    for uid, idx in zip(missing, pos):
+        if len(graph_ids) and graph_ids[idx] == uid and not graph['dangling'][idx]:
+            sources.append((uid, int(idx)))
+        else:
+            out[uid] = empty
+
+    start = time.time()
+    for b in range(0, len(sources), GRAPH_BATCH_SIZE):
+        batch = sources[b:b + GRAPH_BATCH_SIZE]
+        scores = personalized_pagerank(graph, [idx for _, idx in batch])
+        for j, (uid, idx) in enumerate(batch):
+            column = scores[:, j]
+            column[idx] = 0  # never recommend the source itself
+            # direct neighbours rank highest but are excluded at serve time
+            k = min(GRAPH_TOP_K + int(graph['degree'][idx]), len(column) - 1)
+            top = np.argpartition(-column, k)[:k] if k > 0 else np.empty(0, dtype=np.int64)
+            top = top[column[top] > 0]
+            top = top[np.argsort(-column[top])]
+            out[uid] = (graph_ids[top], column[top].astype(np.float32))
+
+    with _graph_cache['lock']:
+        if _graph_cache['graph'] is graph:  # graph not swapped meanwhile
+            for uid, _ in sources:
+                results[uid] = out[uid]
+            while len(results) > GRAPH_CACHE_SIZE:
+                results.popitem(last=False)
+
+    if sources:
+        _graph_cache['stats']['ppr_ms_per_batch'] = round(
+            (time.time() - start) * 1000 / -(-len(sources) // GRAPH_BATCH_SIZE), 1)
+    return out
+
+
+def get_graph_stats():
+    """Graph size and PageRank timings."""
+    graph = _graph_cache['graph']
+    return {
+        'graph_users': len(graph['user_ids']) if graph else 0,
+        'graph_cached_users': len(_graph_cache['results']),
+        **_graph_cache['stats'],
+    }
+
+
+# =====================================================================
+# Serving
+# =====================================================================
+def get_graph_recommendations(user_id, limit=5):
+    """
+    Recommend users that a random walk from `user_id` visits most often.
+
+    Scores are scaled so the strongest eligible candidate is 100.
+
+    Returns:
+        List of recommendation dicts (same shape as get_ml_recommendations).
+    """
+    from services.recommendation_engine import load_exclusions, build_recommendations
+
+    conn = None
+    try:
+        candidate_ids, scores = graph_candidates([user_id])[user_id]
+        if len(candidate_ids) == 0:
+            return []
+
+        conn = get_db_connection()
+        c = conn.cursor()
+
+        excluded_ids, target_role = load_exclusions(c, user_id)
+        if target_role is None:
+            return []
+
+        candidates = [
+            (int(uid), float(score))
+            for uid, score in zip(candidate_ids, scores)
+            if int(uid) not in excluded_ids
+        ]
+        if not candidates:
+            return []
+        best = candidates[0][1]
+        candidates = [(uid, score / best) for uid, score in candidates]
+        return build_recommendations(c, candidates, target_role, limit,
+                                     reason='Graph: close in your network')
+
+    except Exception as e:
+        logger.error(f"[Graph] get_graph_recommendations error: {e}")
+        return []
+    finally:
+        if conn:
+            conn.close()
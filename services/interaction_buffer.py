@@ -0,0 +1,171 @@
+"""
+services/interaction_buffer.py
+===============================
+In-memory write buffer for `user_interactions`.
+
+Profile views and job clicks used to cost one connection, one INSERT and
+one commit each — every one of them queuing for SQLite's single writer
+lock alongside chat messages. Events are now collected in memory and
+written by a per-process flusher thread:
+
+  - Repeated (user, target, type) tuples are pre-aggregated into one row
+    with `event_count`.
+  - A flush happens every INTERACTION_FLUSH_EVENTS events or every
+    INTERACTION_FLUSH_MS milliseconds, whichever comes first, as one
+    `executemany` in a single transaction.
+  - At most INTERACTION_BUFFER_MAX distinct tuples are held; events for
+    new tuples beyond that are dropped and counted (the buffer never
+    grows without bound when the database is slow or locked).
+  - The buffer is drained at interpreter shutdown (atexit).
+
+Until start_interaction_buffer() has run (scripts, tests), events are
+written straight through.
+"""
+
+import time
+import atexit
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_EVENTS = 200
+DEFAULT_FLUSH_MS = 1000
+DEFAULT_BUFFER_MAX = 10000
+
+_buffer = {}                 # (user_id, target_user_id, type) → count
+_buffer_lock = threading.Lock()
+_flush_lock = threading.Lock()  # one flush at a time (thread vs atexit drain)
+_flush_event = threading.Event()
+_state = {
+    'app': None,
+    'flush_events': DEFAULT_FLUSH_EVENTS,
+    'flush_ms': DEFAULT_FLUSH_MS,
+    'max_keys': DEFAULT_BUFFER_MAX,
+    'pending_events': 0,
+}
+_stats = {'buffered_events': 0, 'dropped_events': 0, 'flushes': 0, 'flushed_rows': 0,
+          'flushed_events': 0, 'failed_flushes': 0, 'last_flush_ms': 0}
+
+
+def buffer_interaction(user_id, target_user_id, interaction_type):
+    """
+    Queue one interaction event.
+
+    Returns:
+        True if buffered, False if the buffer is full (event dropped) or
+        not running (caller should write directly).
+    """
+    if _state['app'] is None:
+        return False
+
+    key = (int(user_id), int(target_user_id), interaction_type)
+    with _buffer_lock:
+        if key not in _buffer and len(_buffer) >= _state['max_keys']:
+            _stats['dropped_events'] += 1
+            return False
+        _buffer[key] = _buffer.get(key, 0) + 1
+        _state['pending_events'] += 1
+        _stats['buffered_events'] += 1
+        full = _state['pending_events'] >= _state['flush_events']
+
+    if full:
+        _flush_event.set()
+    return True
+
+
+def is_buffering():
+    """True once the flusher thread runs in this process."""
+    return _state['app'] is not None
+
+
+def flush_interactions():
+    """
+    Write everything buffered so far in one transaction.
+
+    Returns:
+        Number of rows written.
+    """
+    from db_utils import get_db_connection
+    from services.recommendation_engine import notify_interaction_event
+
+    with _flush_lock:
+        with _buffer_lock:
+            if not _buffer:
+                return 0
+            batch = list(_buffer.items())
+            _buffer.clear()
+            _state['pending_events'] = 0
+
+        start = time.time()
+        rows = [(uid, target, itype, count) for (uid, target, itype), count in batch]
+        try:
+            with _state['app'].app_context():
+                conn = get_db_connection()
+                try:
+                    conn.executemany(
+                        'INSERT INTO user_interactions (user_id, target_user_id, interaction_type, event_count) '
+                        'VALUES (?, ?, ?, ?)', rows
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+        except Exception as e:
+            _stats['failed_flushes'] += 1
+            _requeue(batch)
+            logger.warning(f"[Interactions] Flush of {len(rows)} rows failed, re-queued: {e}")
+            return 0
+
+        _stats['flushes'] += 1
+        _stats['flushed_rows'] += len(rows)
+        _stats['flushed_events'] += sum(count for _, count in batch)
+        _stats['last_flush_ms'] = round((time.time() - start) * 1000, 2)
+
+    notify_interaction_event()  # let the delta worker pick the rows up
+    return len(rows)
+
+
+def _requeue(batch):
+    """Put a failed batch back, dropping what no longer fits."""
+    with _buffer_lock:
+        for key, count in batch:
+            if key in _buffer or len(_buffer) < _state['max_keys']:
+                _buffer[key] = _buffer.get(key, 0) + count
+                _state['pending_events'] += count
+            else:
+                _stats['dropped_events'] += count
+
+
+def get_buffer_stats():
+    """Buffer size and flush / drop counters of this process."""
+    with _buffer_lock:
+        buffered_keys = len(_buffer)
+    return {'interaction_buffer_keys': buffered_keys,
+            **{f'interaction_{k}': v for k, v in _stats.items()}}
+
+
+def start_interaction_buffer(app):
+    """Start the per-process flusher thread (idempotent)."""
+    if _state['app'] is not None:
+        return
+
+    _state.update(
+        app=app,
+        flush_events=int(app.config.get('INTERACTION_FLUSH_EVENTS', DEFAULT_FLUSH_EVENTS)),
+        flush_ms=int(app.config.get('INTERACTION_FLUSH_MS', DEFAULT_FLUSH_MS)),
+        max_keys=int(app.config.get('INTERACTION_BUFFER_MAX', DEFAULT_BUFFER_MAX)),
+    )
+
+    def _run():
+        while True:
+            _flush_event.wait(_state['flush_ms'] / 1000)
+            _flush_event.clear()
+            try:
+                flush_interactions()
+            except Exception as e:
+                logger.error(f"[Interactions] Flusher error: {e}")
+
+    threading.Thread(target=_run, daemon=True, name='interaction-flusher').start()
+    atexit.register(flush_interactions)
+    logger.info(f"[Interactions] Buffered logging on (every {_state['flush_events']} events "
+                f"or {_state['flush_ms']} ms, max {_state['max_keys']} keys)")
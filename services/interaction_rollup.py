@@ -0,0 +1,194 @@
+"""
+services/interaction_rollup.py
+===============================
+Daily rollup and retention for `user_interactions`.
+
+The raw table gets one row per (buffered) event batch and grows without
+bound, while the recommender only needs per-pair counts. A scheduled job
+folds new raw rows into
+
+    user_interaction_daily (user_id, target_user_id, interaction_type, day, event_count)
+
+incrementally: a watermark in `rollup_watermarks` remembers the highest
+raw id already counted, so each run only aggregates rows added since the
+previous one (idempotent — concurrent runs in several workers serialise
+on the write lock and the later one finds nothing new).
+
+The matrix builder reads the rollup plus the few raw rows not rolled up
+yet (decayed by day when INTERACTION_HALF_LIFE_DAYS is set), so retrain
+cost follows the number of active (pair, day) rows, not the number of
+events ever logged.
+
+RETENTION:
+  Raw rows older than INTERACTION_RAW_RETENTION_DAYS that are already
+  rolled up are deleted — first copied into INTERACTION_ARCHIVE_DB when
+  that is set. With time decay on, rollup days whose weight fell below
+  DECAY_FLOOR are dropped as well.
+"""
+
+import time
+import logging
+
+import numpy as np
+from flask import current_app
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_SOURCE = 'user_interactions'
+DEFAULT_RETENTION_DAYS = 90
+DECAY_FLOOR = 0.001   # rollup rows weighted below this are pruned
+
+
+def _watermark(c):
+    row = c.execute('SELECT last_id FROM rollup_watermarks WHERE source = ?', (ROLLUP_SOURCE,)).fetchone()
+    return row[0] if row else 0
+
+
+def rollup_interactions():
+    """
+    Aggregate raw interactions added since the last run into daily counts.
+
+    Returns:
+        Number of raw rows folded in.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        last_id = _watermark(conn)
+        max_id, n_rows = conn.execute(
+            'SELECT MAX(id), COUNT(*) FROM user_interactions WHERE id > ?', (last_id,)
+        ).fetchone()
+        if not max_id:
+            conn.commit()
+            return 0
+
+        conn.execute('''
+            INSERT INTO user_interaction_daily
+                (user_id, target_user_id, interaction_type, day, event_count)
+            SELECT user_id, target_user_id, interaction_type, date(created_at),
+                   SUM(COALESCE(event_count, 1))
+            FROM user_interactions
+            WHERE id > ? AND id <= ?
+            GROUP BY user_id, target_user_id, interaction_type, date(created_at)
+            ON CONFLICT(user_id, target_user_id, interaction_type, day)
+            DO UPDATE SET event_count = event_count + excluded.event_count
+        ''', (last_id, max_id))
+        conn.execute(
+            'INSERT INTO rollup_watermarks (source, last_id) VALUES (?, ?) '
+            'ON CONFLICT(source) DO UPDATE SET last_id = excluded.last_id',
+            (ROLLUP_SOURCE, max_id)
+        )
+        conn.commit()
+        logger.info(f"[Rollup] Folded {n_rows} interaction rows (ids {last_id + 1}–{max_id})")
+        return n_rows
+    finally:
+        conn.close()
+
+
+def prune_interactions(retention_days=None, archive_db=None, half_life_days=None):
+    """
+    Delete raw rows that are rolled up and older than the retention window
+    (archiving them first when an archive database is configured), and
+    rollup days that time decay has made negligible.
+
+    Returns:
+        {'raw_archived': n, 'raw_deleted': n, 'rollup_deleted': n}
+    """
+    cfg = current_app.config
+    retention_days = retention_days if retention_days is not None else \
+        cfg.get('INTERACTION_RAW_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+    archive_db = archive_db if archive_db is not None else cfg.get('INTERACTION_ARCHIVE_DB', '')
+    half_life_days = half_life_days if half_life_days is not None else \
+        cfg.get('INTERACTION_HALF_LIFE_DAYS', 0)
+
+    result = {'raw_archived': 0, 'raw_deleted': 0, 'rollup_deleted': 0}
+    conn = get_db_connection()
+    try:
+        if archive_db:
+            conn.execute('ATTACH DATABASE ? AS archive', (archive_db,))
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS archive.user_interactions (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    target_user_id INTEGER NOT NULL,
+                    interaction_type TEXT NOT NULL,
+                    event_count INTEGER DEFAULT 1,
+                    created_at TIMESTAMP
+                )
+            ''')
+
+        conn.execute('BEGIN IMMEDIATE')
+        last_id = _watermark(conn)
+        cutoff = f'-{int(retention_days)} days'
+        where = "id <= ? AND created_at < datetime('now', ?)"
+
+        if archive_db:
+            result['raw_archived'] = conn.execute(f'''
+                INSERT OR IGNORE INTO archive.user_interactions
+                    (id, user_id, target_user_id, interaction_type, event_count, created_at)
+                SELECT id, user_id, target_user_id, interaction_type, event_count, created_at
+                FROM main.user_interactions WHERE {where}
+            ''', (last_id, cutoff)).rowcount
+
+        result['raw_deleted'] = conn.execute(
+            f'DELETE FROM main.user_interactions WHERE {where}', (last_id, cutoff)
+        ).rowcount
+
+        if half_life_days and half_life_days > 0:
+            horizon = int(np.ceil(half_life_days * np.log2(1 / DECAY_FLOOR)))
+            result['rollup_deleted'] = conn.execute(
+                "DELETE FROM user_interaction_daily WHERE day < date('now', ?)",
+                (f'-{horizon} days',)
+            ).rowcount
+
+        conn.commit()
+    finally:
+        conn.close()
+
+    if any(result.values()):
+        logger.info(f"[Rollup] Retention: {result}")
+    return result
+
+
+def run_interaction_maintenance():
+    """Scheduled entry point: roll up new rows, then apply retention."""
+    start = time.time()
+    rolled = rollup_interactions()
+    pruned = prune_interactions()
+    return {'rolled_up': rolled, **pruned, 'seconds': round(time.time() - start, 3)}
+
+
+def read_interaction_weights(c, type_weights):
+    """
+    Per-event-group interaction weights for the matrix build: the daily
+    rollup plus raw rows newer than the rollup watermark.
+
+    Args:
+        c: Cursor with row_factory=None (inside the snapshot transaction).
+        type_weights: {interaction_type: weight}; unknown types weigh 1.
+
+    Returns:
+        (pairs, weights, times) — (m, 2) int64 user ID pairs, float64
+        undecayed weights and julian-day timestamps (rollup rows: their day).
+    """
+    rows = c.execute('''
+        SELECT user_id, target_user_id, interaction_type, event_count, julianday(day)
+        FROM user_interaction_daily
+        UNION ALL
+        SELECT user_id, target_user_id, interaction_type, COALESCE(event_count, 1),
+               julianday(created_at)
+        FROM user_interactions
+        WHERE id > (SELECT COALESCE(MAX(last_id), 0) FROM rollup_watermarks WHERE source = ?)
+    ''', (ROLLUP_SOURCE,)).fetchall()
+
+    if not rows:
+        return np.empty((0, 2), dtype=np.int64), np.empty(0), np.empty(0)
+
+    users, targets, types, counts, times = zip(*rows)
+    pairs = np.column_stack([np.asarray(users, dtype=np.int64), np.asarray(targets, dtype=np.int64)])
+    unique_types, type_idx = np.unique(np.asarray(types, dtype=object).astype(str), return_inverse=True)
+    weights = np.array([type_weights.get(t, 1) for t in unique_types], dtype=np.float64)[type_idx]
+    weights *= np.asarray(counts, dtype=np.float64)
+    return pairs, weights, np.asarray(times, dtype=np.float64)
@@ -0,0 +1,287 @@
+"""
+services/job_fanout.py
+=======================
+Fan-out of newly approved jobs to the students whose skills match.
+
+Students used to discover matching jobs only by reloading /jobs, which
+scans every job. On approval the job is now pushed to its audience once:
+
+  1. Indexed skill lookup — `user_skills (skill, user_id)` is an inverted
+     index of the normalised comma-separated skills of every student
+     (users.skills ∪ student_profile.skills). A job's required skills
+     become one `WHERE skill IN (...) GROUP BY user_id` range scan; no job
+     or user table is scanned.
+  2. Notification rows — one `job_notifications (user_id, job_id)` row per
+     matching student, written with executemany in batches of
+     NOTIFY_BATCH rows (one short transaction each, so other writers are
+     not blocked for the whole fan-out).
+  3. Socket push — `job_match` events go to the personal rooms of the
+     matching students that are online in this process only.
+
+INDEX MAINTENANCE:
+  sync_skill_index() runs before every fan-out and re-indexes only users
+  registered after the last sync (id watermark) or stamped in
+  `profile_changes` since then (profile edits, role upgrades). Both
+  watermarks live in `rollup_watermarks`; the change watermark is stored
+  in milliseconds.
+"""
+
+import time
+import logging
+import threading
+
+from flask import current_app
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_BATCH = 1000
+USERS_WATERMARK = 'user_skills_users'
+CHANGES_WATERMARK = 'user_skills_changes_ms'
+
+
+def normalise_skills(*texts):
+    """Comma-separated skill strings → set of lower-case skills."""
+    return {s.strip().lower() for text in texts if text for s in text.split(',') if s.strip()}
+
+
+# =====================================================================
+# Inverted skill index
+# =====================================================================
+def _watermarks(c):
+    rows = dict(c.execute('SELECT source, last_id FROM rollup_watermarks WHERE source IN (?, ?)',
+                          (USERS_WATERMARK, CHANGES_WATERMARK)).fetchall())
+    return rows.get(USERS_WATERMARK, 0), rows.get(CHANGES_WATERMARK, 0)
+
+
+def _index_users(c, user_ids):
+    """Replace the index rows of users (students get their skills, others none)."""
+    for start in range(0, len(user_ids), 900):   # SQLite parameter limit
+        chunk = user_ids[start:start + 900]
+        ph = ','.join(['?'] * len(chunk))
+        c.execute(f'DELETE FROM user_skills WHERE user_id IN ({ph})', chunk)
+        rows = c.execute(f'''
+            SELECT u.id, u.skills, sp.skills
+            FROM users u
+            LEFT JOIN student_profile sp ON sp.user_id = u.id
+            WHERE u.id IN ({ph}) AND u.role = 'student'
+        ''', chunk).fetchall()
+        c.executemany('INSERT OR IGNORE INTO user_skills (skill, user_id) VALUES (?, ?)',
+                      [(skill, row[0]) for row in rows for skill in normalise_skills(row[1], row[2])])
+
+
+def sync_skill_index():
+    """
+    Bring the skill index up to date with new users and profile changes.
+
+    Returns:
+        Number of users re-indexed.
+    """
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        conn.execute('BEGIN IMMEDIATE')
+        last_user, last_change_ms = _watermarks(c)
+        max_user = c.execute('SELECT COALESCE(MAX(id), 0) FROM users').fetchone()[0]
+        max_change = c.execute('SELECT COALESCE(MAX(changed_at), 0) FROM profile_changes').fetchone()[0]
+
+        user_ids = [row[0] for row in c.execute(
+            'SELECT id FROM users WHERE id > ? '
+            'UNION SELECT user_id FROM profile_changes WHERE changed_at > ? / 1000.0',
+            (last_user, last_change_ms)
+        )]
+        _index_users(c, user_ids)
+        c.executemany(
+            'INSERT INTO rollup_watermarks (source, last_id) VALUES (?, ?) '
+            'ON CONFLICT(source) DO UPDATE SET last_id = excluded.last_id',
+            [(USERS_WATERMARK, max(max_user, last_user)),
+             (CHANGES_WATERMARK, max(int(max_change * 1000), last_change_ms))]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    if user_ids:
+        logger.info(f"[JobFanout] Skill index updated for {len(user_ids)} users")
+    return len(user_ids)
+
+
+def rebuild_skill_index():
+    """Drop and rebuild the whole index (e.g. after a bulk import)."""
+    conn = get_db_connection()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute('DELETE FROM user_skills')
+        conn.execute('DELETE FROM rollup_watermarks WHERE source IN (?, ?)',
+                     (USERS_WATERMARK, CHANGES_WATERMARK))
+        conn.commit()
+    finally:
+        conn.close()
+    return sync_skill_index()
+
+
+def find_matching_students(skills):
+    """
+    Active students having at least one of the skills.
+
+    Returns:
+        [(user_id, number of matching skills)], best match first.
+    """
+    skills = sorted(skills)
+    if not skills:
+        return []
+    ph = ','.join(['?'] * len(skills))
+    conn = get_db_connection()
+    try:
+        return [tuple(row) for row in conn.execute(f'''
+            SELECT s.user_id, COUNT(*) AS matched
+            FROM user_skills s
+            JOIN users u ON u.id = s.user_id
+            WHERE s.skill IN ({ph})
+              AND COALESCE(u.is_approved, 1) = 1 AND COALESCE(u.is_suspended, 0) = 0
+            GROUP BY s.user_id
+            ORDER BY matched DESC, s.user_id
+        ''', skills).fetchall()]
+    finally:
+        conn.close()
+
+
+# =====================================================================
+# Fan-out
+# =====================================================================
+def _online_user_ids():
+    try:
+        from routes.websocket_routes import online_users
+        return set(online_users)
+    except Exception:
+        return set()
+
+
+def fan_out_job(job_id):
+    """
+    Notify the students matching an approved job.
+
+    Returns:
+        {'job_id', 'skills', 'matched', 'notified', 'pushed', 'seconds'}
+    """
+    started = time.time()
+    sync_skill_index()
+
+    conn = get_db_connection()
+    try:
+        job = conn.execute(
+            'SELECT id, title, company, company_name, required_skills, skills_required '
+            "FROM jobs WHERE id = ? AND is_active = 1 AND COALESCE(approval_status, 'approved') = 'approved'",
+            (job_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if job is None:
+        return {'job_id': job_id, 'skills': 0, 'matched': 0, 'notified': 0, 'pushed': 0,
+                'seconds': round(time.time() - started, 3)}
+
+    skills = normalise_skills(job['required_skills'], job['skills_required'])
+    matches = find_matching_students(skills)
+
+    now = time.time()
+    conn = get_db_connection()
+    try:
+        # A re-approved job only reaches students not notified before
+        seen = {row[0] for row in conn.execute('SELECT user_id FROM job_notifications WHERE job_id = ?',
+                                               (job_id,))}
+        matches = [(uid, matched) for uid, matched in matches if uid not in seen]
+        for start in range(0, len(matches), NOTIFY_BATCH):
+            conn.executemany(
+                'INSERT OR IGNORE INTO job_notifications (user_id, job_id, match_count, created_at) '
+                'VALUES (?, ?, ?, ?)', [(uid, job_id, matched, now)
+                                        for uid, matched in matches[start:start + NOTIFY_BATCH]]
+            )
+            conn.commit()
+    finally:
+        conn.close()
+
+    pushed = 0
+    socketio = current_app.extensions.get('socketio')
+    online = _online_user_ids()
+    if socketio is not None and online:
+        payload = {'job_id': job_id, 'job_title': job['title'],
+                   'company': job['company_name'] or job['company']}
+        for uid, matched in matches:
+            if uid in online:
+                socketio.emit('job_match', dict(payload, match_count=matched), room=f'user_{uid}')
+                pushed += 1
+
+    result = {'job_id': job_id, 'skills': len(skills), 'matched': len(seen) + len(matches),
+              'notified': len(matches),
+              'pushed': pushed, 'seconds': round(time.time() - started, 3)}
+    logger.info(f"[JobFanout] {result}")
+    return result
+
+
+def submit_job_fanout(job_id):
+    """Run fan_out_job() in a background thread (keeps the approval request fast)."""
+    app = current_app._get_current_object()
+
+    def _target():
+        with app.app_context():
+            try:
+                fan_out_job(job_id)
+            except Exception as e:
+                logger.error(f"[JobFanout] Fan-out of job {job_id} failed: {e}")
+
+    threading.Thread(target=_target, daemon=True, name=f'job-fanout-{job_id}').start()
+
+
+# =====================================================================
+# Reading
+# =====================================================================
+def get_job_notifications(user_id, unread_only=True, limit=20):
+    """Newest matching-job notifications of a student."""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(f'''
+            SELECT n.job_id, n.match_count, n.created_at, n.read_at,
+                   j.title, COALESCE(j.company_name, j.company) AS company, j.location
+            FROM job_notifications n
+            JOIN jobs j ON j.id = n.job_id
+            WHERE n.user_id = ? {'AND n.read_at IS NULL' if unread_only else ''}
+              AND j.is_active = 1
+            ORDER BY n.created_at DESC
+            LIMIT ?
+        ''', (user_id, limit)).fetchall()
+    finally:
+        conn.close()
+    return [dict(row) for row in rows]
+
+
+def mark_job_notifications_read(user_id, job_ids=None):
+    """
+    Mark a student's notifications (all when job_ids is None, otherwise
+    those of the given jobs) as read.
+
+    Raises:
+        ValueError: job_ids is not a list of integers.
+    """
+    if job_ids is not None and (not isinstance(job_ids, list) or
+                                any(type(jid) is not int for jid in job_ids)):
+        raise ValueError('job_ids must be a list of integers')
+    if job_ids == []:
+        return 0
+
+    conn = get_db_connection()
+    try:
+        if job_ids is not None:
+            changed = conn.executemany(
+                'UPDATE job_notifications SET read_at = ? WHERE user_id = ? AND job_id = ? AND read_at IS NULL',
+                [(time.time(), user_id, jid) for jid in job_ids]
+            ).rowcount
+        else:
+            changed = conn.execute(
+                'UPDATE job_notifications SET read_at = ? WHERE user_id = ? AND read_at IS NULL',
+                (time.time(), user_id)
+            ).rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return changed
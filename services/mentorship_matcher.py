@@ -0,0 +1,634 @@
+"""
+services/mentorship_matcher.py
+===============================
+Mentorship requests and capacity-constrained mentor assignment.
+
+Students open a request (topics + message); alumni declare how many
+mentees they take and which topics they mentor in (`mentor_profiles`).
+A batch matcher proposes a mentor for every open request so that the
+*total* match score is maximal while no mentor exceeds their capacity;
+the mentor then accepts or declines the proposal.
+
+REQUEST LIFECYCLE (mentorship_requests.status):
+    pending → proposed → accepted → completed (ended by either side)
+                      ↘ declined by the mentor → pending (that mentor is excluded)
+    pending / proposed → cancelled by the student
+  A student has at most one request in ACTIVE_STATUSES; once it is
+  completed or cancelled they can open the next one, and a completed
+  mentorship no longer counts against the mentor's capacity.
+
+MATCH SCORE (reuses the content recommender's features):
+  Student and mentor documents are the content engine's profile tokens
+  plus the request / mentor topics (repeated TOPIC_WEIGHT times),
+  vectorised with the published TF-IDF vocabulary and IDF (or fitted on
+  the run's own documents before the first content model exists).
+    score = 100 × ((1 − BRANCH_WEIGHT) × cosine + BRANCH_WEIGHT × same_branch)
+  Only the MENTORSHIP_CANDIDATES most similar mentors of each student
+  (blocked sparse top-k, as in content training) become edges — more
+  candidates fill more capacity when many students want the same topics,
+  at a higher solve time.
+
+ASSIGNMENT:
+  Maximum-weight b-matching, solved exactly as min-cost flow on a
+  unit-capacity expansion: every mentor contributes one column per free
+  slot and every student a private "unmatched" column of weight 0
+  (shifted by +1 with real edges, since the matcher ignores zero entries),
+  so a full matching always exists. scipy's sparse LAPJV
+  (min_weight_full_bipartite_matching — successive shortest augmenting
+  paths) solves ~20k students × 5k mentors in seconds.
+
+INCREMENTAL RE-MATCHING:
+  A new request triggers an incremental run (and the scheduled job runs
+  one every few minutes): only *pending* requests are matched, against
+  the capacity left after accepted and proposed mentorships — existing
+  proposals never move under a mentor who is looking at them. A full
+  run (admin, or every MENTORSHIP_FULL_REMATCH_HOURS) re-optimises all
+  open requests together. Proposals over a mentor's capacity (capacity
+  lowered, mentor deactivated) are released back to pending first.
+  Writes re-check capacity inside the transaction, so concurrent runs in
+  several workers cannot overbook a mentor.
+"""
+
+import time
+import logging
+import threading
+
+import numpy as np
+from scipy import sparse
+from flask import current_app
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+MATCH_LOCK = 'mentorship-matching'
+DEFAULT_CANDIDATES = 30       # mentor edges per student in the assignment graph
+MAX_CAPACITY = 10             # mentees per mentor (bounds the slot expansion)
+MAX_TOPICS = 10
+TOPIC_WEIGHT = 3              # topic tokens count this many times in a document
+BRANCH_WEIGHT = 0.15
+OPEN_STATUSES = ('pending', 'proposed')
+ACTIVE_STATUSES = OPEN_STATUSES + ('accepted',)
+
+_match_state = {
+    'lock': threading.Lock(),  # one run at a time within this process
+    'rerun': False,            # a request arrived while a run was in progress
+    'last_full': 0.0,
+    'stats': {},
+}
+
+
+def _setting(key, default):
+    return current_app.config.get(key, default)
+
+
+def parse_topics(topics):
+    """List or comma-separated string → normalised 'topic, topic' string."""
+    if isinstance(topics, str):
+        topics = topics.split(',')
+    seen = []
+    for topic in topics or []:
+        topic = ' '.join(str(topic).split()).lower()[:40]
+        if topic and topic not in seen:
+            seen.append(topic)
+    return ', '.join(seen[:MAX_TOPICS])
+
+
+# =====================================================================
+# Mentors and requests
+# =====================================================================
+def save_mentor_profile(user_id, capacity, topics, is_active=True):
+    """Create or update an alumnus' mentoring capacity and topics."""
+    capacity = max(0, min(int(capacity), MAX_CAPACITY))
+    conn = get_db_connection()
+    try:
+        conn.execute('''
+            INSERT INTO mentor_profiles (user_id, capacity, topics, is_active, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET capacity = excluded.capacity,
+                topics = excluded.topics, is_active = excluded.is_active,
+                updated_at = excluded.updated_at
+        ''', (user_id, capacity, parse_topics(topics), 1 if is_active else 0, time.time()))
+        conn.commit()
+    finally:
+        conn.close()
+    return get_mentor_profile(user_id)
+
+
+def get_mentor_profile(user_id):
+    """Mentor settings with current load, or None if never declared."""
+    conn = get_db_connection()
+    try:
+        row = conn.execute('''
+            SELECT m.user_id, m.capacity, m.topics, m.is_active,
+                   SUM(r.status = 'accepted') AS accepted,
+                   SUM(r.status = 'proposed') AS proposed
+            FROM mentor_profiles m
+            LEFT JOIN mentorship_requests r ON r.mentor_id = m.user_id
+            WHERE m.user_id = ?
+            GROUP BY m.user_id
+        ''', (user_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return {'user_id': row['user_id'], 'capacity': row['capacity'], 'topics': row['topics'] or '',
+            'is_active': bool(row['is_active']),
+            'accepted': row['accepted'] or 0, 'proposed': row['proposed'] or 0}
+
+
+def create_request(student_id, topics, message=''):
+    """
+    Open a mentorship request and trigger an incremental match.
+
+    Raises:
+        ValueError: the student already has an open or accepted request.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        existing = conn.execute(
+            f"SELECT id FROM mentorship_requests WHERE student_id = ? "
+            f"AND status IN ({','.join(['?'] * len(ACTIVE_STATUSES))})", (student_id, *ACTIVE_STATUSES)
+        ).fetchone()
+        if existing:
+            conn.rollback()
+            raise ValueError('You already have an active mentorship request')
+        request_id = conn.execute(
+            'INSERT INTO mentorship_requests (student_id, topics, message, status, created_at) '
+            "VALUES (?, ?, ?, 'pending', ?)",
+            (student_id, parse_topics(topics), (message or '')[:1000], time.time())
+        ).lastrowid
+        conn.commit()
+    finally:
+        conn.close()
+
+    request_rematch()
+    return request_id
+
+
+def cancel_request(student_id, request_id):
+    """Cancel a student's own open request. Returns False if nothing changed."""
+    conn = get_db_connection()
+    try:
+        changed = conn.execute(
+            "UPDATE mentorship_requests SET status = 'cancelled', responded_at = ? "
+            "WHERE id = ? AND student_id = ? AND status IN ('pending', 'proposed')",
+            (time.time(), request_id, student_id)
+        ).rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return bool(changed)
+
+
+def end_mentorship(user_id, request_id):
+    """
+    End an accepted mentorship, as its student or its mentor. The mentor's
+    slot is free for the next match.
+
+    Returns:
+        False if the request is not an accepted mentorship of this user.
+    """
+    conn = get_db_connection()
+    try:
+        changed = conn.execute(
+            "UPDATE mentorship_requests SET status = 'completed', ended_at = ? "
+            "WHERE id = ? AND status = 'accepted' AND ? IN (student_id, mentor_id)",
+            (time.time(), request_id, user_id)
+        ).rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    if changed:
+        request_rematch()
+    return bool(changed)
+
+
+def respond_to_proposal(mentor_id, request_id, accept):
+    """
+    Mentor accepts or declines a proposed mentee. A declined request goes
+    back to pending and is never proposed to that mentor again.
+
+    Returns:
+        False if the request is not a proposal to this mentor.
+    """
+    now = time.time()
+    conn = get_db_connection()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        row = conn.execute(
+            "SELECT student_id FROM mentorship_requests WHERE id = ? AND mentor_id = ? AND status = 'proposed'",
+            (request_id, mentor_id)
+        ).fetchone()
+        if row is None:
+            conn.rollback()
+            return False
+        if accept:
+            conn.execute("UPDATE mentorship_requests SET status = 'accepted', responded_at = ? WHERE id = ?",
+                         (now, request_id))
+        else:
+            conn.execute('INSERT OR IGNORE INTO mentorship_declines (request_id, mentor_id) VALUES (?, ?)',
+                         (request_id, mentor_id))
+            conn.execute(
+                "UPDATE mentorship_requests SET status = 'pending', mentor_id = NULL, match_score = NULL, "
+                'matched_at = NULL, responded_at = ? WHERE id = ?', (now, request_id)
+            )
+        conn.commit()
+        student_id = row['student_id']
+    finally:
+        conn.close()
+
+    if accept:
+        try:
+            from services.recommendation_engine import log_interaction
+            log_interaction(student_id, mentor_id, 'mentorship_request')
+        except Exception as e:
+            logger.warning(f"[Mentorship] Could not log interaction: {e}")
+    else:
+        request_rematch()
+    return True
+
+
+_REQUEST_COLUMNS = '''
+    r.id, r.student_id, r.mentor_id, r.topics, r.message, r.status, r.match_score,
+    r.created_at, r.matched_at, r.responded_at, r.ended_at
+'''
+
+
+def _request_dict(row, other_prefix):
+    return {
+        'id': row['id'], 'student_id': row['student_id'], 'mentor_id': row['mentor_id'],
+        'topics': row['topics'] or '', 'message': row['message'] or '', 'status': row['status'],
+        'match_score': row['match_score'], 'created_at': row['created_at'],
+        'matched_at': row['matched_at'], 'responded_at': row['responded_at'], 'ended_at': row['ended_at'],
+        other_prefix: {
+            'name': row['name'], 'branch': row['branch'], 'email': row['email'],
+            'profile_pic': row['profile_pic'] or (
+                f"https://ui-avatars.com/api/?name={row['name']}&background=random"
+            ),
+        } if row['name'] is not None else None,
+    }
+
+
+def get_student_requests(student_id):
+    """A student's requests, newest first, with the proposed / accepted mentor."""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(f'''
+            SELECT {_REQUEST_COLUMNS}, u.name, u.branch, u.email, u.profile_pic
+            FROM mentorship_requests r
+            LEFT JOIN users u ON u.id = r.mentor_id
+            WHERE r.student_id = ?
+            ORDER BY r.created_at DESC
+        ''', (student_id,)).fetchall()
+    finally:
+        conn.close()
+    return [_request_dict(row, 'mentor') for row in rows]
+
+
+def get_mentor_requests(mentor_id):
+    """Proposed and accepted mentees of a mentor, best match first."""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(f'''
+            SELECT {_REQUEST_COLUMNS}, u.name, u.branch, u.email, u.profile_pic
+            FROM mentorship_requests r
+            JOIN users u ON u.id = r.student_id
+            WHERE r.mentor_id = ? AND r.status IN ('proposed', 'accepted')
+            ORDER BY r.status DESC, r.match_score DESC
+        ''', (mentor_id,)).fetchall()
+    finally:
+        conn.close()
+    return [_request_dict(row, 'student') for row in rows]
+
+
+# =====================================================================
+# Features and candidate edges
+# =====================================================================
+def _load_mentors(c, include_proposed):
+    """Active mentors with free slots → (user ids, free slots, topics, branches)."""
+    taken = "('accepted', 'proposed')" if include_proposed else "('accepted')"
+    rows = c.execute(f'''
+        SELECT m.user_id, m.capacity - COUNT(r.id) AS free, m.topics, u.branch
+        FROM mentor_profiles m
+        JOIN users u ON u.id = m.user_id
+        LEFT JOIN mentorship_requests r ON r.mentor_id = m.user_id AND r.status IN {taken}
+        WHERE m.is_active = 1 AND u.role = 'alumni'
+          AND COALESCE(u.is_approved, 1) = 1 AND COALESCE(u.is_suspended, 0) = 0
+        GROUP BY m.user_id
+        HAVING free > 0
+        ORDER BY m.user_id
+    ''').fetchall()
+    return ([row[0] for row in rows], np.array([row[1] for row in rows], dtype=np.int64),
+            [row[2] for row in rows], [row[3] for row in rows])
+
+
+def _load_open_requests(c, statuses):
+    """Open requests → (request ids, student ids, topics, branches)."""
+    ph = ','.join(['?'] * len(statuses))
+    rows = c.execute(f'''
+        SELECT r.id, r.student_id, r.topics, u.branch
+        FROM mentorship_requests r
+        JOIN users u ON u.id = r.student_id
+        WHERE r.status IN ({ph})
+        ORDER BY r.id
+    ''', list(statuses)).fetchall()
+    return ([row[0] for row in rows], [row[1] for row in rows],
+            [row[2] for row in rows], [row[3] for row in rows])
+
+
+def _documents(c, user_ids, topics):
+    """Content-engine profile tokens + weighted topic tokens, in `user_ids` order."""
+    from services.content_engine import _load_profiles, _tokenise
+
+    docs = {}
+    unique = sorted(set(user_ids))
+    for start in range(0, len(unique), 900):   # SQLite parameter limit
+        ids, _, tokens = _load_profiles(c, unique[start:start + 900])
+        docs.update(zip(ids.tolist(), tokens))
+    return [docs.get(uid, []) + _tokenise([t]) * TOPIC_WEIGHT for uid, t in zip(user_ids, topics)]
+
+
+def _vectorise(docs):
+    """TF-IDF rows with the published content vocabulary, else fitted on `docs`."""
+    from services.content_engine import get_active_content_model, _term_counts, _tfidf, _vocab_lookup
+
+    model = get_active_content_model()
+    if model is not None:
+        vocab, idf = model['vocab'], model['idf']
+    else:
+        all_tokens = np.array([t for d in docs for t in d])
+        vocab = np.unique(all_tokens) if len(all_tokens) else np.array(['_'])
+        df = np.bincount(_vocab_lookup(vocab)(all_tokens), minlength=len(vocab)) \
+            if len(all_tokens) else np.zeros(1)
+        idf = (np.log((1 + len(docs)) / (1 + df)) + 1).astype(np.float32)
+    rows, cols, counts = _term_counts(docs, _vocab_lookup(vocab))
+    return _tfidf(rows, cols, counts, len(docs), idf)
+
+
+def _declined_pairs(c, request_ids):
+    rows = c.execute('SELECT request_id, mentor_id FROM mentorship_declines').fetchall()
+    wanted = set(request_ids)
+    return {(row[0], row[1]) for row in rows if row[0] in wanted}
+
+
+def _candidate_edges(student_vecs, mentor_vecs, student_branches, mentor_branches, blocked, k):
+    """
+    Sparse student × mentor score matrix with the top candidates per student.
+
+    Args:
+        blocked: Set of (student row, mentor column) pairs to leave out.
+        k: Candidate mentors per student.
+    """
+    from services.content_engine import _top_k_blocked
+
+    n, m = student_vecs.shape[0], mentor_vecs.shape[0]
+    k = min(k, m)
+    idx, cosine = _top_k_blocked(student_vecs, mentor_vecs, k)
+    idx, cosine = idx[:, :k], cosine[:, :k]
+
+    branch_codes = {b: i for i, b in enumerate(sorted({str(b or '').lower() for b in
+                                                       list(student_branches) + list(mentor_branches)}))}
+    s_branch = np.array([branch_codes[str(b or '').lower()] for b in student_branches])
+    m_branch = np.array([branch_codes[str(b or '').lower()] for b in mentor_branches])
+    same = (s_branch[:, None] == m_branch[idx]) & (s_branch[:, None] != branch_codes.get('', -1))
+
+    scores = 100 * ((1 - BRANCH_WEIGHT) * cosine + BRANCH_WEIGHT * same)
+    rows = np.repeat(np.arange(n), k)
+    cols, scores = idx.ravel(), scores.ravel()
+    keep = scores > 0
+    if blocked:
+        keep &= np.array([(r, col) not in blocked for r, col in zip(rows.tolist(), cols.tolist())])
+    return sparse.csr_matrix((scores[keep].astype(np.float64), (rows[keep], cols[keep])), shape=(n, m))
+
+
+# =====================================================================
+# Assignment
+# =====================================================================
+def solve_assignment(scores, capacities):
+    """
+    Maximum-score assignment of students (rows) to mentors (columns).
+
+    Args:
+        scores: n × m sparse matrix of positive match scores (missing = not allowed).
+        capacities: Free slots per mentor (length m).
+
+    Returns:
+        int array (n,) — mentor column per student, −1 when unmatched.
+    """
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+    scores = sparse.coo_matrix(scores)
+    n = scores.shape[0]
+    capacities = np.maximum(np.asarray(capacities, dtype=np.int64), 0)
+    if n == 0 or scores.nnz == 0:
+        return np.full(n, -1, dtype=np.int64)
+
+    # Mentor j owns slot columns first_slot[j] .. first_slot[j] + capacity[j] − 1
+    first_slot = np.concatenate([[0], np.cumsum(capacities)[:-1]])
+    n_slots = int(capacities.sum())
+    reps = capacities[scores.col]
+    edge = np.repeat(np.arange(scores.nnz), reps)
+    offset = np.arange(len(edge)) - np.repeat(np.cumsum(reps) - reps, reps)
+
+    rows = np.concatenate([scores.row[edge], np.arange(n)])
+    cols = np.concatenate([first_slot[scores.col][edge] + offset, n_slots + np.arange(n)])
+    weights = np.concatenate([scores.data[edge] + 1.0, np.ones(n)])
+    graph = sparse.csr_matrix((weights, (rows, cols)), shape=(n, n_slots + n))
+
+    row_ind, col_ind = min_weight_full_bipartite_matching(graph, maximize=True)
+    slot_owner = np.repeat(np.arange(len(capacities)), capacities)
+    assigned = np.full(n, -1, dtype=np.int64)
+    real = col_ind < n_slots
+    assigned[row_ind[real]] = slot_owner[col_ind[real]]
+    return assigned
+
+
+def _release_overflow(c, now):
+    """Back to pending: proposals of inactive mentors or beyond a mentor's capacity."""
+    rows = c.execute('''
+        SELECT r.id, r.mentor_id, COALESCE(m.capacity, 0) * COALESCE(m.is_active, 0) AS capacity,
+               (SELECT COUNT(*) FROM mentorship_requests a
+                WHERE a.mentor_id = r.mentor_id AND a.status = 'accepted') AS accepted
+        FROM mentorship_requests r
+        LEFT JOIN mentor_profiles m ON m.user_id = r.mentor_id
+        WHERE r.status = 'proposed'
+        ORDER BY r.mentor_id, r.match_score DESC
+    ''').fetchall()
+    release, kept = [], {}
+    for row in rows:
+        kept[row['mentor_id']] = kept.get(row['mentor_id'], 0) + 1
+        if row['accepted'] + kept[row['mentor_id']] > row['capacity']:
+            release.append((now, row['id']))
+    c.executemany(
+        "UPDATE mentorship_requests SET status = 'pending', mentor_id = NULL, match_score = NULL, "
+        "matched_at = NULL, responded_at = ? WHERE id = ? AND status = 'proposed'", release
+    )
+    return len(release)
+
+
+def _store_assignment(conn, request_ids, mentor_ids, scores, full, now):
+    """
+    Write proposals; capacity is re-checked inside the transaction so a
+    concurrent run or acceptance cannot overbook a mentor.
+
+    Returns:
+        (proposals written, their total score)
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    previous = {}
+    if full:   # every open proposal is re-decided; unchanged ones keep their matched_at
+        previous = {row[0]: (row[1], row[2]) for row in conn.execute(
+            "SELECT id, mentor_id, matched_at FROM mentorship_requests WHERE status = 'proposed'")}
+        conn.execute(
+            "UPDATE mentorship_requests SET status = 'pending', mentor_id = NULL, match_score = NULL, "
+            "matched_at = NULL WHERE status = 'proposed'"
+        )
+
+    free = {row[0]: row[1] for row in conn.execute('''
+        SELECT m.user_id, m.capacity - COUNT(r.id)
+        FROM mentor_profiles m
+        LEFT JOIN mentorship_requests r ON r.mentor_id = m.user_id AND r.status IN ('accepted', 'proposed')
+        WHERE m.is_active = 1
+        GROUP BY m.user_id
+    ''')}
+    updates = []
+    for rid, mid, score in zip(request_ids, mentor_ids, scores):
+        if mid is not None and free.get(mid, 0) > 0:
+            free[mid] -= 1
+            old_mentor, old_matched_at = previous.get(rid, (None, None))
+            updates.append((mid, round(float(score), 4),
+                            old_matched_at if old_mentor == mid else now, rid))
+    written = 0
+    total = 0.0
+    for update in updates:
+        if conn.execute(
+            "UPDATE mentorship_requests SET status = 'proposed', mentor_id = ?, match_score = ?, matched_at = ? "
+            "WHERE id = ? AND status = 'pending'", update
+        ).rowcount:
+            written += 1
+            total += update[1]
+    conn.commit()
+    return written, round(total, 2)
+
+
+def run_matching(full=False):
+    """
+    Match open requests to mentors.
+
+    Args:
+        full: Re-optimise all pending and proposed requests together;
+            otherwise only pending requests use the capacity left.
+
+    Returns:
+        {'mode', 'requests', 'mentors', 'edges', 'proposed', 'released',
+         'total_score', 'seconds'}
+    """
+    started = time.time()
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        conn.execute('BEGIN IMMEDIATE')
+        released = _release_overflow(c, started)
+        conn.commit()
+
+        statuses = OPEN_STATUSES if full else ('pending',)
+        request_ids, student_ids, request_topics, student_branches = _load_open_requests(c, statuses)
+        mentor_ids, capacities, mentor_topics, mentor_branches = _load_mentors(c, include_proposed=not full)
+
+        result = {'mode': 'full' if full else 'incremental', 'requests': len(request_ids),
+                  'mentors': len(mentor_ids), 'edges': 0, 'proposed': 0, 'released': released,
+                  'total_score': 0.0}
+        if request_ids and mentor_ids:
+            vectors = _vectorise(_documents(c, student_ids + mentor_ids, request_topics + mentor_topics))
+            mentor_col = {mid: j for j, mid in enumerate(mentor_ids)}
+            row_of = {rid: i for i, rid in enumerate(request_ids)}
+            blocked = {(row_of[rid], mentor_col[mid]) for rid, mid in _declined_pairs(c, request_ids)
+                       if mid in mentor_col}
+            scores = _candidate_edges(vectors[:len(student_ids)], vectors[len(student_ids):],
+                                      student_branches, mentor_branches, blocked,
+                                      int(_setting('MENTORSHIP_CANDIDATES', DEFAULT_CANDIDATES)))
+
+            assigned = solve_assignment(scores, capacities)
+            matched = np.flatnonzero(assigned >= 0)
+            match_scores = np.zeros(len(request_ids))
+            if len(matched):
+                match_scores[matched] = np.asarray(scores[matched, assigned[matched]]).ravel()
+            result['edges'] = int(scores.nnz)
+            result['proposed'], result['total_score'] = _store_assignment(
+                conn, request_ids,
+                [mentor_ids[j] if j >= 0 else None for j in assigned.tolist()],
+                match_scores, full, time.time()
+            )
+    finally:
+        conn.close()
+
+    if full:
+        _match_state['last_full'] = started
+    result['seconds'] = round(time.time() - started, 3)
+    _match_state['stats'].update({f'mentorship_last_{k}': v for k, v in result.items()},
+                                 mentorship_last_run=started)
+    if result['requests'] or released:
+        logger.info(f"[Mentorship] Matching run: {result}")
+    return result
+
+
+def _run_exclusive(full=False):
+    """run_matching() unless this process is already matching (then flag a rerun)."""
+    if not _match_state['lock'].acquire(blocking=False):
+        _match_state['rerun'] = True
+        return None
+    try:
+        result = run_matching(full=full)
+        while _match_state['rerun']:
+            _match_state['rerun'] = False
+            run_matching()
+        return result
+    finally:
+        _match_state['lock'].release()
+
+
+def request_rematch():
+    """Incremental match in a background thread (new or declined request)."""
+    if not _setting('MENTORSHIP_MATCHING_ENABLED', True):
+        return
+    app = current_app._get_current_object()
+
+    def _target():
+        with app.app_context():
+            try:
+                _run_exclusive()
+            except Exception as e:
+                logger.error(f"[Mentorship] Incremental matching failed: {e}")
+
+    threading.Thread(target=_target, daemon=True, name='mentorship-rematch').start()
+
+
+def run_scheduled_matching():
+    """Scheduler entry point — runs in the process owning the matching lock only."""
+    from services.recommendation_engine import _lock_dir
+    from utils.process_lock import acquire_process_lock
+
+    if not _setting('MENTORSHIP_MATCHING_ENABLED', True):
+        return None
+    if not acquire_process_lock(MATCH_LOCK, _lock_dir()):
+        return None
+    full_hours = float(_setting('MENTORSHIP_FULL_REMATCH_HOURS', 0))
+    full = full_hours > 0 and time.time() - _match_state['last_full'] >= full_hours * 3600
+    return _run_exclusive(full=full)
+
+
+def get_matching_stats():
+    """Request counts by status, mentor capacity and the last run of this process."""
+    conn = get_db_connection()
+    try:
+        by_status = dict(conn.execute(
+            'SELECT status, COUNT(*) FROM mentorship_requests GROUP BY status').fetchall())
+        mentors, capacity = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(capacity), 0) FROM mentor_profiles WHERE is_active = 1'
+        ).fetchone()
+    finally:
+        conn.close()
+    return {'requests_by_status': by_status, 'active_mentors': mentors,
+            'mentor_capacity': capacity, **_match_state['stats']}
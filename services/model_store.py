@@ -0,0 +1,166 @@
+"""
+services/model_store.py
+========================
+Versioned, on-disk store for trained recommendation artifacts.
+
+Every training run publishes a new immutable version directory. Workers
+open the arrays with `np.load(mmap_mode='r')`, so all gunicorn workers
+share one copy of the model through the OS page cache instead of each
+holding its own in-process matrix.
+
+Layout (under MODEL_STORE_DIR, default `data/models`):
+
+    knn/
+      CURRENT                    ← name of the active version (atomic swap)
+      v1760000000123/
+        manifest.json            ← format, created_at, shapes, metadata
+        user_ids.npy             ← sorted user IDs (row i ↔ user_ids[i])
+        matrix_data.npy          ← L2-normalised CSR interaction matrix
+        matrix_indices.npy
+        matrix_indptr.npy
+        ...
+
+Publishing is atomic: arrays are written to a temporary directory which
+is renamed into place, then CURRENT is replaced with `os.replace`.
+Readers therefore never observe a half-written version.
+
+Functions:
+    publish_artifacts()  — write a new version and make it current
+    current_version()    — name of the active version (cheap file read)
+    load_artifacts()     — memory-map a version read-only
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+CURRENT_POINTER = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+KEEP_VERSIONS = 3   # older versions are pruned after each publish
+
+
+def _model_dir(store_dir: str, name: str) -> str:
+    return os.path.join(store_dir, name)
+
+
+def publish_artifacts(store_dir: str, name: str, arrays: dict, meta: dict = None) -> str:
+    """
+    Atomically publish a new version of a model.
+
+    Args:
+        store_dir: Root directory of the model store.
+        name: Model name (e.g. 'knn').
+        arrays: {artifact_name: np.ndarray} written as `<artifact_name>.npy`.
+        meta: Extra JSON-serialisable metadata stored in the manifest.
+
+    Returns:
+        The published version string (e.g. 'v1760000000123').
+    """
+    model_dir = _model_dir(store_dir, name)
+    os.makedirs(model_dir, exist_ok=True)
+
+    version = f"v{int(time.time() * 1000)}"
+    final_dir = os.path.join(model_dir, version)
+    while os.path.exists(final_dir):  # two publishes within the same millisecond
+        version = f"v{int(version[1:]) + 1}"
+        final_dir = os.path.join(model_dir, version)
+
+    tmp_dir = os.path.join(model_dir, f".tmp-{version}-{os.getpid()}")
+    os.makedirs(tmp_dir)
+
+    try:
+        for artifact, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f'{artifact}.npy'), np.ascontiguousarray(array))
+
+        manifest = {
+            'format': FORMAT_VERSION,
+            'version': version,
+            'created_at': time.time(),
+            'artifacts': {k: {'shape': list(v.shape), 'dtype': str(v.dtype)} for k, v in arrays.items()},
+            'meta': meta or {},
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.rename(tmp_dir, final_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    # Swap the CURRENT pointer atomically
+    pointer_tmp = os.path.join(model_dir, f'.{CURRENT_POINTER}.{os.getpid()}')
+    with open(pointer_tmp, 'w') as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer_tmp, os.path.join(model_dir, CURRENT_POINTER))
+
+    logger.info(f"[ModelStore] Published {name}/{version}")
+    _prune_old_versions(model_dir, keep=version)
+    return version
+
+
+def _prune_old_versions(model_dir: str, keep: str) -> None:
+    """Delete all but the newest KEEP_VERSIONS versions (never the active one)."""
+    versions = sorted(
+        (d for d in os.listdir(model_dir) if d.startswith('v') and d != keep),
+        key=lambda d: int(d[1:]) if d[1:].isdigit() else 0,
+        reverse=True,
+    )
+    for old in versions[KEEP_VERSIONS - 1:]:
+        # Workers that still have the old files mapped keep working: on POSIX
+        # the data stays alive until the last mapping is closed. On Windows the
+        # delete fails while mapped and is retried after the next publish.
+        try:
+            shutil.rmtree(os.path.join(model_dir, old))
+        except OSError as e:
+            logger.debug(f"[ModelStore] Could not prune {old}: {e}")
+
+
+def current_version(store_dir: str, name: str):
+    """Return the active version string for a model, or None if never published."""
+    try:
+        with open(os.path.join(_model_dir(store_dir, name), CURRENT_POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_artifacts(store_dir: str, name: str, version: str = None):
+    """
+    Memory-map every artifact of a model version read-only.
+
+    Args:
+        store_dir: Root directory of the model store.
+        name: Model name.
+        version: Version to load; defaults to the current one.
+
+    Returns:
+        (version, arrays, manifest) or (None, {}, {}) if nothing is published.
+    """
+    version = version or current_version(store_dir, name)
+    if not version:
+        return None, {}, {}
+
+    version_dir = os.path.join(_model_dir(store_dir, name), version)
+    with open(os.path.join(version_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != FORMAT_VERSION:
+        logger.warning(f"[ModelStore] {name}/{version} has unsupported format "
+                       f"{manifest.get('format')} — ignoring")
+        return None, {}, {}
+
+    arrays = {
+        artifact: np.load(os.path.join(version_dir, f'{artifact}.npy'), mmap_mode='r')
+        for artifact in manifest['artifacts']
+    }
+    return version, arrays, manifest
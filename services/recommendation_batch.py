@@ -0,0 +1,295 @@
+"""
+services/recommendation_batch.py
+=================================
+Materialised recommendations, refreshed by a scheduled batch job.
+
+Dashboards no longer run the hybrid pipeline on a page view: a scheduled
+job computes hybrid_recommendation() ahead of time and stores the lists in
+
+    user_recommendations (user_id, rank, rec_user_id, score, reason, source)
+    user_recommendation_state (user_id, computed_at)
+
+so a dashboard reads its recommendations with one primary-key range query
+(joined with `users` for names and photos).
+
+WHICH USERS ARE RECOMPUTED:
+  Only active (approved, not suspended) students and alumni that
+    - were never materialised, or not within RECOMMENDATION_BATCH_FULL_HOURS,
+    - or whose graph neighbourhood changed since their last computation:
+      they or one of their connections is stamped in `user_graph_changes`
+      (connection sent / accepted / rejected), or their profile text
+      changed (`profile_changes`).
+
+PARALLELISM:
+  Users are split into chunks computed by a process pool
+  (RECOMMENDATION_BATCH_WORKERS); each chunk's personalised PageRank
+  runs as one batched power iteration. The parent writes each finished chunk
+  in one transaction (delete old rows + executemany insert). Small runs
+  are computed in-process.
+
+  Workers are spawned, not forked: the server process is multithreaded
+  (socket, scheduler and BLAS threads) and a forked child could inherit
+  a lock one of them held. Each worker builds a bare Flask app with the
+  parent's config and maps the published models from the store. When
+  the app module itself is __main__ (`python app.py`), a spawned worker
+  would re-import and start it, so the batch then runs in-process.
+
+FRESHNESS:
+  A materialised list is served only while no graph change for the user
+  is newer than it — otherwise the reader falls back to the on-demand
+  cached path, so a just-connected user is never recommended.
+"""
+
+import os
+import time
+import pickle
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import Flask, current_app
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+BATCH_LOCK = 'recommendation-batch'
+CHUNK_SIZE = 200             # users per pool task / write transaction
+MIN_USERS_FOR_POOL = 400     # below this a pool costs more than it saves
+
+_pool_state = {'app': None}  # the worker's own app (set by _init_worker)
+_stats = {}
+
+
+def _setting(key, default):
+    return current_app.config.get(key, default)
+
+
+# =====================================================================
+# Dirty-user selection
+# =====================================================================
+_DIRTY_SQL = '''
+    SELECT u.id
+    FROM users u
+    LEFT JOIN user_recommendation_state s ON s.user_id = u.id
+    WHERE u.role IN ('student', 'alumni')
+      AND COALESCE(u.is_approved, 1) = 1 AND COALESCE(u.is_suspended, 0) = 0
+      AND (
+        s.user_id IS NULL
+        OR s.computed_at < :full_cutoff
+        OR EXISTS (SELECT 1 FROM user_graph_changes g
+                   WHERE g.user_id = u.id AND g.changed_at > s.computed_at)
+        OR EXISTS (SELECT 1 FROM profile_changes p
+                   WHERE p.user_id = u.id AND p.changed_at > s.computed_at)
+        OR EXISTS (SELECT 1 FROM connections c
+                   JOIN user_graph_changes g ON g.user_id = c.user_id_2
+                   WHERE c.user_id_1 = u.id AND g.changed_at > s.computed_at)
+        OR EXISTS (SELECT 1 FROM connections c
+                   JOIN user_graph_changes g ON g.user_id = c.user_id_1
+                   WHERE c.user_id_2 = u.id AND g.changed_at > s.computed_at)
+      )
+    ORDER BY u.id
+'''
+
+
+def find_dirty_users(full=False):
+    """IDs of users whose materialised recommendations must be recomputed."""
+    full_hours = float(_setting('RECOMMENDATION_BATCH_FULL_HOURS', 24))
+    full_cutoff = time.time() + 1 if full else time.time() - full_hours * 3600
+    conn = get_db_connection()
+    try:
+        return [row[0] for row in conn.execute(_DIRTY_SQL, {'full_cutoff': full_cutoff}).fetchall()]
+    finally:
+        conn.close()
+
+
+# =====================================================================
+# Computation (pool workers)
+# =====================================================================
+def _worker_config():
+    """The parent's config values that can be sent to a spawned worker."""
+    config = {}
+    for key, value in current_app.config.items():
+        try:
+            pickle.dumps(value)
+        except Exception:
+            continue
+        config[key] = value
+    return config
+
+
+def _init_worker(config):
+    """
+    Spawned worker setup: a bare app carrying the parent's config (DB_NAME,
+    MODEL_STORE_DIR, RECOMMENDER_MODEL, ...), and quiet per-user hybrid logs.
+    """
+    from services import recommendation_engine
+
+    app = Flask('recommendation_batch_worker')
+    app.config.update(config)
+    _pool_state['app'] = app
+    logging.getLogger(recommendation_engine.__name__).setLevel(logging.WARNING)
+
+
+def _compute_chunk(user_ids, limit, app=None):
+    """hybrid_recommendation() for a chunk of users → [(user_id, recs or None)]."""
+    from services.recommendation_engine import hybrid_recommendation
+    from services.graph_engine import graph_candidates
+
+    app = app or _pool_state['app']
+    results = []
+    with app.app_context():
+        try:
+            graph_candidates(user_ids)  # one batched PageRank run warms the graph cache
+        except Exception as e:
+            logger.warning(f"[Batch] Graph prefetch failed: {e}")
+        for uid in user_ids:
+            try:
+                results.append((uid, hybrid_recommendation(uid, limit=limit)))
+            except Exception as e:
+                logger.error(f"[Batch] Recommendations for user {uid} failed: {e}")
+                results.append((uid, None))
+    return results
+
+
+def _store_chunk(results, computed_at):
+    """Replace the materialised rows of a chunk of users in one transaction."""
+    done = [(uid, recs) for uid, recs in results if recs is not None]
+    if not done:
+        return 0
+
+    rows = [
+        (uid, rank, rec['id'], rec['score'], rec.get('reason'), rec.get('source'))
+        for uid, recs in done for rank, rec in enumerate(recs)
+    ]
+    conn = get_db_connection()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.executemany('DELETE FROM user_recommendations WHERE user_id = ?',
+                         [(uid,) for uid, _ in done])
+        conn.executemany(
+            'INSERT INTO user_recommendations (user_id, rank, rec_user_id, score, reason, source) '
+            'VALUES (?, ?, ?, ?, ?, ?)', rows
+        )
+        conn.executemany(
+            'INSERT INTO user_recommendation_state (user_id, computed_at) VALUES (?, ?) '
+            'ON CONFLICT(user_id) DO UPDATE SET computed_at = excluded.computed_at',
+            [(uid, computed_at) for uid, _ in done]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return len(done)
+
+
+def _pool_context():
+    """Spawn context, or None when a spawned worker would re-import the app as __main__."""
+    if current_app.import_name == '__main__':
+        return None
+    return multiprocessing.get_context('spawn')
+
+
+def refresh_materialised_recommendations(full=False, user_ids=None):
+    """
+    Recompute and store recommendations of dirty users (or the given ones).
+
+    Args:
+        full: Recompute every active student / alumnus.
+        user_ids: Explicit users to recompute (skips dirty-user selection).
+
+    Returns:
+        {'users': n, 'written': n, 'workers': n, 'seconds': s}
+    """
+    started = time.time()   # stamped before reading: changes during the run stay dirty
+    user_ids = list(user_ids) if user_ids is not None else find_dirty_users(full=full)
+    limit = int(_setting('RECOMMENDATION_BATCH_SIZE', 10))
+    workers = int(_setting('RECOMMENDATION_BATCH_WORKERS', 0)) or (os.cpu_count() or 1)
+    chunks = [user_ids[i:i + CHUNK_SIZE] for i in range(0, len(user_ids), CHUNK_SIZE)]
+
+    ctx = _pool_context() if workers > 1 and len(user_ids) >= MIN_USERS_FOR_POOL else None
+    written = 0
+    if ctx is None:
+        workers = 1
+        app = current_app._get_current_object()
+        for chunk in chunks:
+            written += _store_chunk(_compute_chunk(chunk, limit, app), started)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=(_worker_config(),)) as pool:
+            for results in pool.map(_compute_chunk, chunks, [limit] * len(chunks)):
+                written += _store_chunk(results, started)
+
+    result = {'users': len(user_ids), 'written': written, 'workers': workers,
+              'seconds': round(time.time() - started, 2)}
+    _stats.update({f'batch_last_{k}': v for k, v in result.items()}, batch_last_run=started)
+    if user_ids:
+        logger.info(f"[Batch] Materialised recommendations: {result}")
+    return result
+
+
+def run_scheduled_batch():
+    """Scheduler entry point — runs in the process owning the batch lock only."""
+    from services.recommendation_engine import _lock_dir
+    from utils.process_lock import acquire_process_lock
+
+    if not _setting('RECOMMENDATION_BATCH_ENABLED', True):
+        return None
+    if not acquire_process_lock(BATCH_LOCK, _lock_dir()):
+        return None
+    return refresh_materialised_recommendations()
+
+
+def get_batch_stats():
+    """Last batch run of this process and the number of materialised users."""
+    conn = get_db_connection()
+    try:
+        users = conn.execute('SELECT COUNT(*) FROM user_recommendation_state').fetchone()[0]
+    finally:
+        conn.close()
+    return {'batch_materialised_users': users, **_stats}
+
+
+# =====================================================================
+# Reading
+# =====================================================================
+def get_materialised_recommendations(user_id, limit=5):
+    """
+    Stored recommendations for a user — one indexed query.
+
+    Returns:
+        List of recommendation dicts, or None when the user has not been
+        materialised or their graph changed since (caller computes on demand).
+    """
+    conn = get_db_connection()
+    try:
+        rows = conn.execute('''
+            SELECT s.computed_at,
+                   (SELECT changed_at FROM user_graph_changes WHERE user_id = s.user_id) AS changed_at,
+                   r.score, r.reason, r.source,
+                   u.id, u.name, u.role, u.branch, u.skills, u.profile_pic
+            FROM user_recommendation_state s
+            LEFT JOIN user_recommendations r ON r.user_id = s.user_id
+            LEFT JOIN users u ON u.id = r.rec_user_id
+            WHERE s.user_id = ?
+            ORDER BY r.rank
+            LIMIT ?
+        ''', (user_id, limit)).fetchall()
+    finally:
+        conn.close()
+
+    if not rows or (rows[0]['changed_at'] or 0) > rows[0]['computed_at']:
+        return None
+
+    return [{
+        'id': row['id'],
+        'name': row['name'],
+        'role': row['role'],
+        'branch': row['branch'],
+        'skills': row['skills'],
+        'score': row['score'],
+        'reason': row['reason'],
+        'profile_pic': row['profile_pic'] or (
+            f"https://ui-avatars.com/api/?name={row['name']}&background=random"
+        ),
+        'source': row['source'],
+    } for row in rows if row['id'] is not None]
@@ -0,0 +1,163 @@
+"""
+services/recommendation_cache.py
+=================================
+Per-user cache of final recommendation lists.
+
+Dashboards and /recommendations call get_cached_recommendations() instead
+of running the hybrid pipeline on every visit.
+
+FRESHNESS:
+  - Fresh   (age < RECOMMENDATION_CACHE_TTL, same model version)
+            → served as is.
+  - Stale   (older than the TTL, or a new model version was activated,
+            but younger than RECOMMENDATION_CACHE_MAX_STALE)
+            → served immediately; a background thread recomputes it
+              (stale-while-revalidate), so dashboard latency stays flat.
+  - Invalid (the user's connections or pending requests changed)
+            → recomputed before responding — a user must never be shown
+              someone they just connected to or sent a request to.
+
+INVALIDATION ACROSS WORKERS:
+  Each gunicorn worker has its own cache, so connection endpoints call
+  invalidate_user_recommendations(), which stamps the affected users in
+  the `user_graph_changes` table. A read compares that stamp (one primary
+  key lookup) with the time its entry was computed.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDATION_CACHE_TTL = 300          # seconds an entry is fresh
+RECOMMENDATION_CACHE_MAX_STALE = 3600   # older entries are never served
+RECOMMENDATION_CACHE_SIZE = 10000       # users kept per worker (LRU)
+
+_cache = OrderedDict()   # user_id → {'recs', 'limit', 'computed_at', 'model_key'}
+_cache_lock = threading.Lock()
+_refreshing = set()      # user IDs with a background refresh in flight
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='recommendation-refresh')
+_stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'invalidations': 0, 'refreshes': 0}
+
+
+def _model_key():
+    """Versions of the published models — a change makes entries stale."""
+    from services.recommendation_engine import get_active_model
+    from services.als_engine import get_active_als_model
+
+    knn = get_active_model()
+    als = get_active_als_model()
+    return (knn['version'] if knn else None, als['version'] if als else None)
+
+
+def _last_graph_change(user_id):
+    """When the user's connections / pending requests last changed (epoch secs)."""
+    conn = get_db_connection()
+    try:
+        row = conn.execute('SELECT changed_at FROM user_graph_changes WHERE user_id = ?',
+                           (user_id,)).fetchone()
+        return row['changed_at'] if row else 0
+    finally:
+        conn.close()
+
+
+def _compute(user_id, limit):
+    from services.recommendation_engine import hybrid_recommendation
+
+    started = time.time()  # stamp before reading, so concurrent changes invalidate it
+    model_key = _model_key()
+    recs = hybrid_recommendation(user_id, limit=limit)
+    entry = {'recs': recs, 'limit': limit, 'computed_at': started, 'model_key': model_key}
+    with _cache_lock:
+        _cache[user_id] = entry
+        _cache.move_to_end(user_id)
+        while len(_cache) > RECOMMENDATION_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return recs
+
+
+def _refresh_in_background(user_id, limit):
+    with _cache_lock:
+        if user_id in _refreshing:
+            return
+        _refreshing.add(user_id)
+    app = current_app._get_current_object()
+
+    def _run():
+        try:
+            with app.app_context():
+                _compute(user_id, limit)
+                _stats['refreshes'] += 1
+        except Exception as e:
+            logger.error(f"[RecCache] Background refresh failed for user {user_id}: {e}")
+        finally:
+            with _cache_lock:
+                _refreshing.discard(user_id)
+
+    _refresher.submit(_run)
+
+
+def get_cached_recommendations(user_id, limit=5):
+    """
+    Recommendations for a user, served from the per-worker cache when
+    possible (see module docstring for the freshness rules).
+
+    Returns:
+        List of recommendation dicts (copies — safe to modify).
+    """
+    with _cache_lock:
+        entry = _cache.get(user_id)
+        if entry is not None:
+            _cache.move_to_end(user_id)
+
+    if entry is not None and entry['limit'] >= limit:
+        age = time.time() - entry['computed_at']
+        if age < RECOMMENDATION_CACHE_MAX_STALE and _last_graph_change(user_id) < entry['computed_at']:
+            if age < RECOMMENDATION_CACHE_TTL and entry['model_key'] == _model_key():
+                _stats['hits'] += 1
+            else:
+                _stats['stale_hits'] += 1
+                _refresh_in_background(user_id, entry['limit'])
+            return [dict(rec) for rec in entry['recs'][:limit]]
+
+    _stats['misses'] += 1
+    return [dict(rec) for rec in _compute(user_id, limit)]
+
+
+def invalidate_user_recommendations(*user_ids):
+    """
+    Drop cached recommendations of users whose connections or pending
+    requests just changed — in every worker, via `user_graph_changes`.
+    """
+    user_ids = [int(uid) for uid in user_ids if uid]
+    if not user_ids:
+        return
+
+    now = time.time()
+    conn = get_db_connection()
+    try:
+        conn.executemany(
+            'INSERT INTO user_graph_changes (user_id, changed_at) VALUES (?, ?) '
+            'ON CONFLICT(user_id) DO UPDATE SET changed_at = excluded.changed_at',
+            [(uid, now) for uid in user_ids]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    with _cache_lock:
+        for uid in user_ids:
+            _cache.pop(uid, None)
+    _stats['invalidations'] += len(user_ids)
+
+
+def get_cache_stats():
+    """Hit / stale / miss counters of this worker's cache."""
+    return {'cache_entries': len(_cache), **{f'cache_{k}': v for k, v in _stats.items()}}
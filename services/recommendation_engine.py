@@ -11,8 +11,52 @@ Interaction data (weighted scores):
   - Private message sent  : weight 4
   - Job application       : weight 2
 
-The model is trained ONCE and cached in memory. It is retrained
-only when explicitly requested or when the scheduler triggers it.
+Trained artifacts (normalised CSR matrix, user ID map, top-K neighbour
+table) are published as an immutable version in the on-disk model store
+(services/model_store.py). Every gunicorn worker memory-maps the current
+version read-only and hot-swaps when a newer one appears, so the model
+is shared through the page cache instead of being copied per worker.
+Exactly one process (the owner of the trainer lock) retrains; importing
+the app never triggers a retrain when a version is already published.
+
+TIME DECAY (forward decay):
+  With INTERACTION_HALF_LIFE_DAYS > 0 every event weight is multiplied by
+  2^((t − L) / half-life), where t is the event time and L the landmark
+  (the build time, stored in the version's manifest). Decay is computed
+  vectorised from the timestamps during matrix assembly. Ageing the whole
+  matrix later is one global factor 2^(−(now − L) / half-life) — it is
+  never rewritten, and cosine similarity is unaffected by it — so new
+  events are simply added with weight 2^((t − L) / half-life) ≥ 1.
+
+APPROXIMATE NEIGHBOURS:
+  With KNN_INDEX='lsh' the neighbour table is built, and incrementally
+  refreshed rows are re-queried, through a random-projection LSH index
+  (services/ann_index.py) instead of scoring every user. Each worker
+  builds its index from the mapped matrix on first use and keeps it
+  current with insert/delete.
+
+INCREMENTAL UPDATES:
+  Each published version records the highest row id it saw in every
+  event table. New connections, requests, messages, job applications and
+  logged interactions past those watermarks are tailed by every worker
+  and applied as weighted deltas to the affected rows only — those rows
+  are re-normalised and their neighbour lists recomputed with one sparse
+  mat-vec. The periodic full rebuild remains the consistency fallback
+  (e.g. for accepted requests, which stop counting as pending).
+
+MATRIX FACTORISATION:
+  An implicit-feedback ALS model (services/als_engine.py) is trained on
+  the same matrix and published next to KNN. RECOMMENDER_MODEL selects
+  which one hybrid_recommendation() serves ('knn' or 'als'); KNN stays
+  the fallback while no ALS version has been published.
+
+GRAPH SOURCE:
+  Personalised PageRank on the connection graph (services/graph_engine.py)
+  fills slots the ML model cannot, before the rule-based fallback.
+
+CONTENT SOURCE:
+  TF-IDF similarity of profile text (services/content_engine.py) serves
+  users with no interactions or connections, ahead of the rule-based scan.
 
 COLD START HANDLING:
   If a user has no interactions, the engine falls back to
@@ -21,9 +65,7 @@ COLD START HANDLING:
 =====================================================
 FUTURE SCOPE (planned enhancements):
   - Hybrid deep learning model (GNN on user graph)
-  - Real-time incremental model updates via streaming
   - Profile view / job click tracking for richer signals
-  - Matrix factorization (SVD / ALS) for implicit feedback
   - A/B testing framework for recommendation quality
 =====================================================
 """
@@ -32,9 +74,12 @@ import logging
 import threading
 import time
 import numpy as np
-from collections import defaultdict
+from scipy import sparse
+from flask import current_app
 
 from db_utils import get_db_connection
+from services import model_store
+from utils.process_lock import acquire_process_lock
 
 logger = logging.getLogger(__name__)
 
@@ -46,225 +91,866 @@ WEIGHT_CONN_REQUEST = 3     # sent a connection request
 WEIGHT_MESSAGE = 4          # sent a private message
 WEIGHT_JOB_APPLICATION = 2  # applied to a job posted by someone
 
+# Weights for rows of the user_interactions table (by interaction_type)
+INTERACTION_TYPE_WEIGHTS = {
+    'profile_view': 1,
+    'job_click': 2,
+    'mentorship_request': 4,
+    'message': 4,
+    'connection_request': 3,
+}
+
 # Minimum interactions required before ML kicks in (cold-start threshold)
 MIN_INTERACTIONS = 2
 
+# Neighbours precomputed per user in the published neighbour table
+NEIGHBOUR_TABLE_K = 20
+NEIGHBOUR_BATCH_ROWS = 4096   # rows searched between heartbeats
+
+# Trainer schedule and hot-swap polling (seconds)
+RETRAIN_INTERVAL = 300
+MODEL_POLL_INTERVAL = 10
+
+MODEL_NAME = 'knn'
+TRAINER_LOCK = 'recommendation-trainer'
+
 # =====================================================================
-# Global model cache  — trained once, reused across requests
+# Global model cache  — memory-mapped from the model store
 # =====================================================================
 _model_cache = {
-    'knn_model': None,
-    'interaction_matrix': None,
-    'user_id_to_idx': {},
-    'idx_to_user_id': {},
-    'last_trained': 0,
-    'lock': threading.Lock(),
+    'active': None,         # snapshot dict of the mapped version (swapped atomically)
+    'last_checked': 0,      # last time the store's CURRENT pointer was read
+    'last_trained': 0,      # last successful training in this process
+    'lock': threading.Lock(),  # serialises training within this process
+    'stats': {},            # timings: full retrain vs incremental updates
 }
 
+# Wakes the per-process delta worker when this worker commits an interaction
+_delta_event = threading.Event()
+_delta_worker_started = False
+
+
+def _store_dir():
+    return current_app.config.get('MODEL_STORE_DIR', 'data/models')
+
+
+def _lock_dir():
+    return current_app.config.get('LOCK_DIR', 'data/locks')
+
 
 # =====================================================================
 # STEP 1:  Build the user-user interaction matrix from real DB data
 # =====================================================================
-def build_interaction_matrix():
+def _pair_indices(user_ids, pairs):
     """
-    Query the existing SQLite tables and construct a user × user
-    interaction matrix with weighted scores.
+    Map an (m, 2) array of raw (source, target) user IDs to matrix indices.
 
-    Sources (all from existing tables):
-      - connections          → bidirectional, weight 5
-      - connection_requests  → directional,  weight 3
-      - private_messages     → directional,  weight 4
-      - job_applications     → student→poster, weight 2
+    Pairs where either side is not a student/alumni row are dropped.
+
+    Returns:
+        (rows, cols, valid) — index arrays for the kept pairs plus the
+        boolean mask over the input, for filtering per-pair weights.
+    """
+    if pairs.size == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=bool)
+
+    n = len(user_ids)
+    src = np.minimum(np.searchsorted(user_ids, pairs[:, 0]), n - 1)
+    dst = np.minimum(np.searchsorted(user_ids, pairs[:, 1]), n - 1)
+    valid = (user_ids[src] == pairs[:, 0]) & (user_ids[dst] == pairs[:, 1])
+    return src[valid], dst[valid], valid
+
+
+def _fetch_pairs(c, sql):
+    """Run a two-column integer query and return it as an (m, 2) int64 array."""
+    return np.array(c.execute(sql).fetchall(), dtype=np.int64).reshape(-1, 2)
+
+
+def _fetch_events(c, sql):
+    """
+    Run a (source, target, julian-day timestamp) query.
+
+    Returns:
+        (pairs, times) — (m, 2) int64 user IDs and float64 julian days
+        (NaN where the timestamp is NULL).
+    """
+    data = np.array(c.execute(sql).fetchall(), dtype=np.float64).reshape(-1, 3)
+    return data[:, :2].astype(np.int64), data[:, 2]
+
+
+def _decay_multiplier(times, decay):
+    """
+    Forward-decay multiplier 2^((t − landmark) / half-life) for julian-day
+    timestamps; 1.0 when decay is off. Missing timestamps count as the landmark.
+    """
+    half_life = (decay or {}).get('half_life_days') or 0
+    if half_life <= 0:
+        return 1.0
+    t = np.nan_to_num(np.asarray(times, dtype=np.float64), nan=decay['landmark'])
+    return np.exp2((t - decay['landmark']) / half_life)
+
+
+def _julian_now():
+    return time.time() / 86400.0 + 2440587.5
+
+
+# Append-only event sources tailed by autoincrement id for incremental updates:
+#   (watermark key, SQL returning (id, source, target, interaction_type, count, julian-day time),
+#    weight, bidirectional)
+# A weight of None means "look up interaction_type in INTERACTION_TYPE_WEIGHTS".
+_EVENT_SOURCES = (
+    ('connections',
+     'SELECT id, user_id_1, user_id_2, NULL, 1, julianday(connected_at) FROM connections WHERE id > ?',
+     WEIGHT_CONNECTION, True),
+    ('connection_requests',
+     "SELECT id, sender_id, receiver_id, NULL, 1, julianday(created_at) FROM connection_requests "
+     "WHERE id > ? AND status = 'pending' AND sender_id IS NOT NULL AND receiver_id IS NOT NULL",
+     WEIGHT_CONN_REQUEST, False),
+    ('private_messages',
+     'SELECT id, sender_id, receiver_id, NULL, 1, julianday(created_at) FROM private_messages WHERE id > ?',
+     WEIGHT_MESSAGE, False),
+    ('job_applications',
+     'SELECT ja.id, ja.student_id, j.posted_by, NULL, 1, julianday(ja.created_at) FROM job_applications ja '
+     'JOIN jobs j ON ja.job_id = j.id '
+     'WHERE ja.id > ? AND ja.student_id IS NOT NULL AND j.posted_by IS NOT NULL',
+     WEIGHT_JOB_APPLICATION, False),
+    ('user_interactions',
+     'SELECT id, user_id, target_user_id, interaction_type, COALESCE(event_count, 1), '
+     'julianday(created_at) FROM user_interactions WHERE id > ?',
+     None, False),
+)
+
+
+def _read_watermarks(c):
+    """Highest row id of every event source (0 if the table is missing)."""
+    watermarks = {}
+    for key, _, _, _ in _EVENT_SOURCES:
+        try:
+            watermarks[key] = c.execute(f'SELECT COALESCE(MAX(id), 0) FROM {key}').fetchone()[0]
+        except Exception:
+            watermarks[key] = 0
+    return watermarks
+
+
+def _build_matrix_snapshot():
+    """
+    Build the interaction matrix and the event watermarks it covers.
+
+    All reads run inside one read transaction, so the matrix reflects exactly
+    the events up to the returned watermarks (WAL snapshot isolation).
 
     Returns:
-        interaction_matrix (np.ndarray)  — shape (n_users, n_users)
-        user_id_to_idx     (dict)        — {user_id: matrix_index}
-        idx_to_user_id     (dict)        — {matrix_index: user_id}
+        (matrix, user_ids, watermarks, decay) — CSR matrix, sorted int64
+        user IDs, {event_source: max_id}, {'half_life_days', 'landmark'}.
     """
     conn = get_db_connection()
     c = conn.cursor()
+    c.row_factory = None  # plain tuples → straight into numpy
 
     try:
+        c.execute('BEGIN')
+        watermarks = _read_watermarks(c)
+        decay = {
+            'half_life_days': float(current_app.config.get('INTERACTION_HALF_LIFE_DAYS', 0) or 0),
+            'landmark': c.execute("SELECT julianday('now')").fetchone()[0],
+        }
+
         # ----- Collect all user IDs (students + alumni only) -----
-        users = c.execute(
-            "SELECT id FROM users WHERE role IN ('student', 'alumni') ORDER BY id"
-        ).fetchall()
+        user_ids = np.array(
+            [row[0] for row in c.execute(
+                "SELECT id FROM users WHERE role IN ('student', 'alumni') ORDER BY id"
+            ).fetchall()],
+            dtype=np.int64,
+        )
 
-        if not users:
-            return np.array([]), {}, {}
+        if user_ids.size == 0:
+            return sparse.csr_matrix((0, 0), dtype=np.float32), user_ids, watermarks, decay
 
-        user_ids = [u['id'] for u in users]
-        user_id_to_idx = {uid: idx for idx, uid in enumerate(user_ids)}
-        idx_to_user_id = {idx: uid for uid, idx in user_id_to_idx.items()}
         n = len(user_ids)
-
-        matrix = np.zeros((n, n), dtype=np.float32)
+        rows, cols, vals = [], [], []
+
+        def add(pairs, weights, bidirectional=False, times=None):
+            r, k, valid = _pair_indices(user_ids, pairs)
+            w = np.broadcast_to(np.asarray(weights, dtype=np.float64), valid.shape)
+            if times is not None:
+                w = w * _decay_multiplier(times, decay)
+            w = w[valid].astype(np.float32)
+            rows.append(r)
+            cols.append(k)
+            vals.append(w)
+            if bidirectional:
+                rows.append(k)
+                cols.append(r)
+                vals.append(w)
 
         # ----- 1. Accepted connections (weight 5, bidirectional) -----
-        connections = c.execute(
-            'SELECT user_id_1, user_id_2 FROM connections'
-        ).fetchall()
-        for row in connections:
-            u1, u2 = row['user_id_1'], row['user_id_2']
-            if u1 in user_id_to_idx and u2 in user_id_to_idx:
-                i, j = user_id_to_idx[u1], user_id_to_idx[u2]
-                matrix[i][j] += WEIGHT_CONNECTION
-                matrix[j][i] += WEIGHT_CONNECTION
+        pairs, times = _fetch_events(c, 'SELECT user_id_1, user_id_2, julianday(connected_at) FROM connections')
+        add(pairs, WEIGHT_CONNECTION, bidirectional=True, times=times)
 
         # ----- 2. Connection requests (weight 3, sender → receiver) -----
-        requests = c.execute(
-            "SELECT sender_id, receiver_id FROM connection_requests WHERE status = 'pending'"
-        ).fetchall()
-        for row in requests:
-            s, r = row['sender_id'], row['receiver_id']
-            if s in user_id_to_idx and r in user_id_to_idx:
-                matrix[user_id_to_idx[s]][user_id_to_idx[r]] += WEIGHT_CONN_REQUEST
+        pairs, times = _fetch_events(c,
+            "SELECT sender_id, receiver_id, julianday(created_at) FROM connection_requests "
+            "WHERE status = 'pending' AND sender_id IS NOT NULL AND receiver_id IS NOT NULL")
+        add(pairs, WEIGHT_CONN_REQUEST, times=times)
 
         # ----- 3. Private messages (weight 4, sender → receiver) -----
         try:
-            messages = c.execute(
-                'SELECT sender_id, receiver_id FROM private_messages'
-            ).fetchall()
-            for row in messages:
-                s, r = row['sender_id'], row['receiver_id']
-                if s in user_id_to_idx and r in user_id_to_idx:
-                    matrix[user_id_to_idx[s]][user_id_to_idx[r]] += WEIGHT_MESSAGE
+            pairs, times = _fetch_events(
+                c, 'SELECT sender_id, receiver_id, julianday(created_at) FROM private_messages')
+            add(pairs, WEIGHT_MESSAGE, times=times)
         except Exception:
             # private_messages table may not exist yet
             logger.debug("private_messages table not found – skipping message interactions")
 
         # ----- 4. Job applications (weight 2, student → job poster) -----
         try:
-            applications = c.execute('''
-                SELECT ja.student_id, j.posted_by
+            pairs, times = _fetch_events(c, '''
+                SELECT ja.student_id, j.posted_by, julianday(ja.created_at)
                 FROM job_applications ja
                 JOIN jobs j ON ja.job_id = j.id
-            ''').fetchall()
-            for row in applications:
-                s, p = row['student_id'], row['posted_by']
-                if s in user_id_to_idx and p in user_id_to_idx:
-                    matrix[user_id_to_idx[s]][user_id_to_idx[p]] += WEIGHT_JOB_APPLICATION
+                WHERE ja.student_id IS NOT NULL AND j.posted_by IS NOT NULL
+            ''')
+            add(pairs, WEIGHT_JOB_APPLICATION, times=times)
         except Exception:
             logger.debug("job_applications table not found – skipping job interactions")
 
-        # ----- 5. User interactions table (if exists) -----
+        # ----- 5. User interactions (daily rollup + raw rows not rolled up yet) -----
         try:
-            interactions = c.execute(
-                'SELECT user_id, target_user_id, interaction_type, COUNT(*) as cnt '
-                'FROM user_interactions GROUP BY user_id, target_user_id, interaction_type'
-            ).fetchall()
-            type_weights = {
-                'profile_view': 1,
-                'job_click': 2,
-                'mentorship_request': 4,
-                'message': 4,
-                'connection_request': 3,
-            }
-            for row in interactions:
-                uid, tid = row['user_id'], row['target_user_id']
-                itype = row['interaction_type']
-                cnt = row['cnt']
-                w = type_weights.get(itype, 1)
-                if uid in user_id_to_idx and tid in user_id_to_idx:
-                    matrix[user_id_to_idx[uid]][user_id_to_idx[tid]] += w * cnt
-        except Exception:
-            logger.debug("user_interactions table not found – skipping")
+            from services.interaction_rollup import read_interaction_weights
+            pairs, weights, times = read_interaction_weights(c, INTERACTION_TYPE_WEIGHTS)
+            add(pairs, weights, times=times)
+        except Exception as e:
+            logger.debug(f"user_interactions rollup not available – skipping ({e})")
+
+        matrix = sparse.coo_matrix(
+            (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n, n), dtype=np.float32,
+        ).tocsr()  # duplicate (row, col) entries are summed here
+        matrix.eliminate_zeros()
 
         logger.info(f"[ML] Interaction matrix built: {n} users, "
-                     f"{int(np.count_nonzero(matrix))} non-zero entries")
+                     f"{matrix.nnz} non-zero entries")
+
+        return matrix, user_ids, watermarks, decay
+    finally:
+        conn.close()
+
+
+def build_interaction_matrix():
+    """
+    Query the existing SQLite tables and construct a sparse user × user
+    interaction matrix with weighted scores.
 
-        return matrix, user_id_to_idx, idx_to_user_id
+    Sources (all from existing tables):
+      - connections          → bidirectional, weight 5
+      - connection_requests  → directional,  weight 3
+      - private_messages     → directional,  weight 4
+      - job_applications     → student→poster, weight 2
+
+    Rows are accumulated as (row, col, weight) triplets and summed into a
+    CSR matrix, so memory grows with the number of interacting pairs
+    rather than with n_users².
 
+    Returns:
+        interaction_matrix (scipy.sparse.csr_matrix) — shape (n_users, n_users)
+        user_id_to_idx     (dict)                    — {user_id: matrix_index}
+        idx_to_user_id     (dict)                    — {matrix_index: user_id}
+    """
+    try:
+        matrix, user_ids, _, _ = _build_matrix_snapshot()
     except Exception as e:
         logger.error(f"Error building interaction matrix: {e}")
-        return np.array([]), {}, {}
-    finally:
-        conn.close()
+        return sparse.csr_matrix((0, 0), dtype=np.float32), {}, {}
+
+    user_id_to_idx = {int(uid): idx for idx, uid in enumerate(user_ids)}
+    idx_to_user_id = {idx: uid for uid, idx in user_id_to_idx.items()}
+    return matrix, user_id_to_idx, idx_to_user_id
 
 
 # =====================================================================
-# STEP 2:  Train KNN model (Cosine similarity)
+# STEP 2:  Train KNN model (Cosine similarity) and publish it
 # =====================================================================
-def train_knn_model(force=False):
+def _compute_neighbour_table(matrix_norm, k, heartbeat=None):
+    """
+    Precompute the top-k cosine neighbours of every row.
+
+    sklearn's brute-force search works on the sparse matrix in memory-bounded
+    chunks, so the full n × n similarity matrix is never materialised. Rows
+    are queried NEIGHBOUR_BATCH_ROWS at a time, calling heartbeat() after
+    each batch.
+
+    Returns:
+        neighbour_idx    (np.ndarray int32,   shape (n, k)) — row indices
+        neighbour_scores (np.ndarray float32, shape (n, k)) — cosine similarity
+    """
+    from sklearn.neighbors import NearestNeighbors
+
+    knn = NearestNeighbors(
+        n_neighbors=k,
+        metric='cosine',
+        algorithm='brute'  # brute works well on sparse rows
+    )
+    knn.fit(matrix_norm)
+    n = matrix_norm.shape[0]
+    neighbour_idx = np.empty((n, k), dtype=np.int32)
+    neighbour_scores = np.empty((n, k), dtype=np.float32)
+    for start in range(0, n, NEIGHBOUR_BATCH_ROWS):
+        distances, indices = knn.kneighbors(matrix_norm[start:start + NEIGHBOUR_BATCH_ROWS])
+        neighbour_idx[start:start + len(indices)] = indices
+        neighbour_scores[start:start + len(indices)] = 1.0 - distances
+        if heartbeat:
+            heartbeat()
+    return neighbour_idx, neighbour_scores
+
+
+def _new_ann_index():
+    """LSH index configured from LSH_TABLES / LSH_BITS / LSH_PROBES."""
+    from services.ann_index import RandomProjectionLSH
+
+    cfg = current_app.config
+    return RandomProjectionLSH(n_tables=cfg.get('LSH_TABLES', 16), n_bits=cfg.get('LSH_BITS', 8),
+                               probes=cfg.get('LSH_PROBES', 1))
+
+
+def _compute_neighbour_table_lsh(matrix_norm, k, heartbeat=None):
+    """
+    Approximate top-k neighbour table through an LSH index — same output as
+    _compute_neighbour_table(), padded with score 0 where a row's buckets
+    hold fewer than k users.
     """
-    Train (or retrain) the KNN model on the interaction matrix.
+    n = matrix_norm.shape[0]
+    index = _new_ann_index().fit(np.arange(n), matrix_norm)
+    neighbour_idx = np.zeros((n, k), dtype=np.int32)
+    neighbour_scores = np.zeros((n, k), dtype=np.float32)
+    for row in range(n):
+        ids, scores = index.query(matrix_norm[row], k)
+        neighbour_idx[row, :len(ids)] = ids
+        neighbour_scores[row, :len(ids)] = scores
+        if heartbeat and (row + 1) % NEIGHBOUR_BATCH_ROWS == 0:
+            heartbeat()
+    return neighbour_idx, neighbour_scores
+
+
+def train_knn_model(force=False, progress=None, snapshot=None, heartbeat=None):
+    """
+    Train (or retrain) the KNN model on the interaction matrix and publish
+    it to the model store as a new version.
 
-    The model is stored in the global _model_cache and reused.
+    The published version is activated in this process immediately; other
+    workers pick it up on their next poll of the store.
     Thread-safe via a lock.
 
     Args:
-        force: If True, retrain even if a cached model exists.
+        force: If True, retrain even if this process trained recently.
+        progress: Optional callable, called with each stage name as it starts
+                  ('matrix_build', 'normalise', 'fit', 'publish').
+        snapshot: Result of _build_matrix_snapshot() to train on; built here
+                  (stage 'matrix_build') if None.
+        heartbeat: Optional callable, called between neighbour-search batches
+                   of the 'fit' stage.
 
     Returns:
         True if training succeeded, False otherwise.
     """
     global _model_cache
 
+    def stage(name):
+        if progress:
+            progress(name)
+
     with _model_cache['lock']:
         # Skip if recently trained (within last 5 minutes) and not forced
-        if (not force and _model_cache['knn_model'] is not None
-                and time.time() - _model_cache['last_trained'] < 300):
+        if (not force and _model_cache['active'] is not None
+                and time.time() - _model_cache['last_trained'] < RETRAIN_INTERVAL):
             return True
 
         try:
-            from sklearn.neighbors import NearestNeighbors
             from sklearn.preprocessing import normalize
 
             logger.info("[ML] Training KNN recommendation model...")
             start = time.time()
 
-            matrix, uid_to_idx, idx_to_uid = build_interaction_matrix()
+            if snapshot is None:
+                stage('matrix_build')
+                snapshot = _build_matrix_snapshot()
+            matrix, user_ids, watermarks, decay = snapshot
 
-            if matrix.size == 0 or matrix.shape[0] < 2:
+            if matrix.shape[0] < 2 or matrix.nnz == 0:
                 logger.warning("[ML] Not enough data to train model")
-                _model_cache['interaction_matrix'] = matrix
-                _model_cache['user_id_to_idx'] = uid_to_idx
-                _model_cache['idx_to_user_id'] = idx_to_uid
                 return False
 
             # Normalize rows (L2) for cosine similarity via KNN
-            matrix_norm = normalize(matrix, axis=1, norm='l2')
-
-            # n_neighbors = min(10, number_of_users - 1)
-            k = min(10, matrix_norm.shape[0] - 1)
-            if k < 1:
-                logger.warning("[ML] Too few users for KNN")
-                return False
-
-            knn = NearestNeighbors(
-                n_neighbors=k,
-                metric='cosine',
-                algorithm='brute'  # brute works well for moderate sizes
-            )
-            knn.fit(matrix_norm)
-
-            # Cache everything
-            _model_cache['knn_model'] = knn
-            _model_cache['interaction_matrix'] = matrix_norm
-            _model_cache['user_id_to_idx'] = uid_to_idx
-            _model_cache['idx_to_user_id'] = idx_to_uid
+            stage('normalise')
+            row_norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1))).ravel().astype(np.float32)
+            matrix_norm = normalize(matrix, axis=1, norm='l2').tocsr().astype(np.float32)
+
+            # k neighbours (+1 because every row is its own nearest neighbour)
+            k = min(NEIGHBOUR_TABLE_K + 1, matrix_norm.shape[0])
+            stage('fit')
+            index_kind = current_app.config.get('KNN_INDEX', 'brute')
+            if index_kind == 'lsh':
+                neighbour_idx, neighbour_scores = _compute_neighbour_table_lsh(matrix_norm, k, heartbeat)
+            else:
+                neighbour_idx, neighbour_scores = _compute_neighbour_table(matrix_norm, k, heartbeat)
+
+            stage('publish')
+            version = model_store.publish_artifacts(_store_dir(), MODEL_NAME, {
+                'user_ids': user_ids,
+                'matrix_data': matrix_norm.data,
+                'matrix_indices': matrix_norm.indices,
+                'matrix_indptr': matrix_norm.indptr,
+                'row_norms': row_norms,
+                'neighbour_idx': neighbour_idx,
+                'neighbour_scores': neighbour_scores,
+            }, meta={'n_users': int(matrix_norm.shape[0]), 'nnz': int(matrix_norm.nnz), 'k': k,
+                     'index': index_kind, 'watermarks': watermarks, 'decay': decay})
+
+            _activate_version(*model_store.load_artifacts(_store_dir(), MODEL_NAME, version))
             _model_cache['last_trained'] = time.time()
 
             elapsed = round(time.time() - start, 2)
+            _model_cache['stats']['full_train_seconds'] = elapsed
             logger.info(f"[ML] KNN model trained in {elapsed}s — "
-                         f"{matrix_norm.shape[0]} users, k={k}")
+                         f"{matrix_norm.shape[0]} users, k={k}, version={version}")
             return True
 
         except ImportError:
             logger.error("[ML] scikit-learn not installed. "
-                         "Run: pip install scikit-learn numpy")
+                         "Run: pip install scikit-learn numpy scipy")
             return False
         except Exception as e:
             logger.error(f"[ML] Training failed: {e}")
             return False
 
 
+def retrain_models(progress=None, heartbeat=None):
+    """
+    Retrain KNN, the content model and, when RECOMMENDER_MODEL is 'als',
+    the ALS model too.
+
+    Args:
+        progress: Optional stage callback (see train_knn_model); the ALS fit
+                  and the content model are reported as stages 'als_fit'
+                  and 'content_fit'.
+        heartbeat: Optional callable invoked periodically inside the long
+                   stages (neighbour-search batches, ALS half-steps).
+
+    The interaction matrix is built once and shared by KNN and ALS.
+
+    Returns:
+        True if the KNN model (the serving fallback) was published.
+    """
+    if progress:
+        progress('matrix_build')
+    snapshot = _build_matrix_snapshot()
+    trained = train_knn_model(force=True, progress=progress, snapshot=snapshot, heartbeat=heartbeat)
+    if trained and current_app.config.get('RECOMMENDER_MODEL', 'knn') == 'als':
+        from services.als_engine import train_als_model
+        if progress:
+            progress('als_fit')
+        train_als_model(snapshot=snapshot, heartbeat=heartbeat)
+
+    from services.content_engine import train_content_model
+    if progress:
+        progress('content_fit')
+    train_content_model()
+    return trained
+
+
+# =====================================================================
+# Model store → worker (memory-mapped, hot-swapped)
+# =====================================================================
+def _activate_version(version, arrays, manifest):
+    """Swap the process-wide model snapshot to a mapped version."""
+    if not version:
+        return None
+
+    n = len(arrays['user_ids'])
+    snapshot = {
+        'version': version,
+        'user_ids': arrays['user_ids'],
+        # CSR view over the mapped arrays — no copy is made
+        'matrix': sparse.csr_matrix(
+            (arrays['matrix_data'], arrays['matrix_indices'], arrays['matrix_indptr']),
+            shape=(n, n),
+        ),
+        'row_norms': arrays['row_norms'],
+        'neighbour_idx': arrays['neighbour_idx'],
+        'neighbour_scores': arrays['neighbour_scores'],
+        'created_at': manifest.get('created_at', 0),
+        # Incremental state on top of the immutable mapped version
+        'watermarks': dict(manifest.get('meta', {}).get('watermarks', {})),
+        'decay': manifest.get('meta', {}).get('decay') or {},
+        'overlay_rows': {},        # row idx → (raw csr row, normalised csr row)
+        'overlay_neighbours': {},  # row idx → (neighbour idx, scores)
+        'ann': None,               # LSH index over rows (KNN_INDEX='lsh'), built on first use
+        'sync_lock': threading.Lock(),
+    }
+    _model_cache['active'] = snapshot  # single reference swap → readers see old or new
+    logger.info(f"[ML] Activated model version {version} ({n} users)")
+    return snapshot
+
+
+def get_active_model(force_check=False):
+    """
+    Return the active model snapshot, hot-swapping to a newer published
+    version if one appeared since the last poll.
+
+    Never trains; returns None when no version has been published yet.
+    """
+    now = time.time()
+    active = _model_cache['active']
+    if not force_check and now - _model_cache['last_checked'] < MODEL_POLL_INTERVAL:
+        return active
+
+    _model_cache['last_checked'] = now
+    try:
+        latest = model_store.current_version(_store_dir(), MODEL_NAME)
+        if latest and (active is None or latest != active['version']):
+            return _activate_version(*model_store.load_artifacts(_store_dir(), MODEL_NAME, latest))
+    except Exception as e:
+        logger.error(f"[ML] Could not load published model: {e}")
+    return active
+
+
+def _user_index(model, user_id):
+    """Row index of a user in the mapped model, or None if absent."""
+    user_ids = model['user_ids']
+    idx = int(np.searchsorted(user_ids, user_id))
+    if idx < len(user_ids) and user_ids[idx] == user_id:
+        return idx
+    return None
+
+
+# =====================================================================
+# Incremental updates — refresh only the rows touched by new events
+# =====================================================================
+def _tail_events(c, watermarks, decay=None):
+    """
+    Fetch interaction events committed after the given watermarks.
+
+    Weights are forward-decayed against the model's landmark, so newer
+    events weigh more than the (never rewritten) published ones.
+
+    Returns:
+        (events, new_watermarks) — events as (source_uid, target_uid, weight).
+    """
+    events = []
+    new_watermarks = dict(watermarks)
+    for key, sql, weight, bidirectional in _EVENT_SOURCES:
+        try:
+            rows = c.execute(sql, (watermarks.get(key, 0),)).fetchall()
+        except Exception:
+            continue  # table not created yet
+        for row_id, src, dst, itype, count, event_time in rows:
+            w = (weight if weight is not None else INTERACTION_TYPE_WEIGHTS.get(itype, 1)) * count
+            w *= float(_decay_multiplier(np.nan if event_time is None else event_time, decay))
+            events.append((src, dst, w))
+            if bidirectional:
+                events.append((dst, src, w))
+            new_watermarks[key] = max(new_watermarks.get(key, 0), row_id)
+    return events, new_watermarks
+
+
+def _model_row(model, idx):
+    """(raw, normalised) CSR row for a user, preferring the overlay."""
+    if idx in model['overlay_rows']:
+        return model['overlay_rows'][idx]
+    normed = model['matrix'][idx]
+    return normed * float(model['row_norms'][idx]), normed
+
+
+def _ann_index(model):
+    """This worker's LSH index over the model's rows (overlay included), built lazily."""
+    if model['ann'] is None:
+        start = time.perf_counter()
+        index = _new_ann_index().fit(np.arange(len(model['user_ids'])), model['matrix'])
+        for idx, (_, normed) in model['overlay_rows'].items():
+            index.insert(idx, normed)
+        model['ann'] = index
+        _model_cache['stats']['ann_build_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return model['ann']
+
+
+def _refresh_neighbours(model, idx):
+    """Recompute one user's top-k neighbour list against the current rows."""
+    _, v = model['overlay_rows'][idx]
+    k = model['neighbour_idx'].shape[1]
+    use_ann = current_app.config.get('KNN_INDEX', 'brute') == 'lsh'
+    if v.nnz == 0:
+        if use_ann:
+            _ann_index(model).delete(idx)
+        model['overlay_neighbours'][idx] = (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32))
+        return
+
+    if use_ann:
+        index = _ann_index(model)
+        index.insert(idx, v)  # replaces the published vector
+        top, scores = index.query(v, k)
+        model['overlay_neighbours'][idx] = (top.astype(np.int32), scores.astype(np.float32))
+        return
+
+    # One sparse mat-vec against the mapped matrix ...
+    sims = np.asarray((model['matrix'] @ v.T).todense()).ravel()
+    # ... then correct the rows that were themselves updated since publish
+    for other, (_, other_normed) in model['overlay_rows'].items():
+        sims[other] = other_normed.multiply(v).sum()
+
+    k = min(k, len(sims))
+    top = np.argpartition(-sims, k - 1)[:k]
+    top = top[np.argsort(-sims[top])]
+    model['overlay_neighbours'][idx] = (top.astype(np.int32), sims[top].astype(np.float32))
+
+
+def _apply_deltas(model, events):
+    """
+    Add weighted deltas to the affected rows, re-normalise them and refresh
+    their neighbour lists. Users outside the published version (joined after
+    the last full rebuild) are picked up by the next rebuild.
+
+    Returns:
+        Number of rows refreshed.
+    """
+    n = len(model['user_ids'])
+    deltas = {}
+    for src, dst, weight in events:
+        i, j = _user_index(model, src), _user_index(model, dst)
+        if i is None or j is None:
+            continue
+        row = deltas.setdefault(i, {})
+        row[j] = row.get(j, 0.0) + weight
+
+    for i, row in deltas.items():
+        raw, _ = _model_row(model, i)
+        delta = sparse.csr_matrix(
+            (np.fromiter(row.values(), dtype=np.float32, count=len(row)),
+             (np.zeros(len(row), dtype=np.int32), np.fromiter(row.keys(), dtype=np.int32, count=len(row)))),
+            shape=(1, n),
+        )
+        raw = (raw + delta).tocsr().astype(np.float32)
+        norm = float(np.sqrt(raw.multiply(raw).sum()))
+        model['overlay_rows'][i] = (raw, raw / norm if norm > 0 else raw)
+
+    for i in deltas:
+        _refresh_neighbours(model, i)
+    return len(deltas)
+
+
+def sync_incremental_updates(model=None):
+    """
+    Apply every interaction committed since the active version's watermarks.
+
+    Each worker tails the same append-only tables, so all workers converge on
+    the same overlay; the next published full rebuild replaces it.
+
+    Returns:
+        Number of rows refreshed.
+    """
+    model = model or _model_cache['active']
+    if model is None:
+        return 0
+
+    with model['sync_lock']:
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            c.row_factory = None
+            events, watermarks = _tail_events(c, model['watermarks'], model['decay'])
+        finally:
+            conn.close()
+
+        if not events:
+            model['watermarks'] = watermarks
+            return 0
+
+        start = time.perf_counter()
+        refreshed = _apply_deltas(model, events)
+        model['watermarks'] = watermarks
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    _model_cache['stats'].update({
+        'incremental_ms': elapsed_ms,
+        'incremental_events': len(events),
+        'incremental_rows': refreshed,
+        'overlay_rows': len(model['overlay_rows']),
+    })
+    logger.info(f"[ML] Incremental update: {len(events)} events → "
+                f"{refreshed} rows refreshed in {elapsed_ms}ms "
+                f"(last full retrain {_model_cache['stats'].get('full_train_seconds', '?')}s)")
+    return refreshed
+
+
+def forget_deleted_users(*user_ids):
+    """
+    Drop deleted users from this worker's LSH index so they stop being
+    returned by incremental refreshes. Other workers never serve them
+    (recommendations are built from existing profiles only) and lose them
+    at the next published version.
+    """
+    model = _model_cache['active']
+    if model is None or model['ann'] is None:
+        return
+    with model['sync_lock']:
+        for uid in user_ids:
+            idx = _user_index(model, int(uid))
+            if idx is not None:
+                model['ann'].delete(idx)
+
+
+def notify_interaction_event(user_id=None, target_user_id=None):
+    """
+    Signal that an interaction was just committed by this worker.
+
+    The delta worker thread wakes up and tails the event tables, so the
+    request that logged the event never pays for the refresh.
+    """
+    _delta_event.set()
+
+
+def get_engine_stats():
+    """Model version and timing stats (full retrain vs incremental update)."""
+    from services.als_engine import get_als_stats
+    from services.graph_engine import get_graph_stats
+    from services.content_engine import get_content_stats
+    from services.recommendation_batch import get_batch_stats
+    from services.recommendation_cache import get_cache_stats
+    from services.interaction_buffer import get_buffer_stats
+
+    model = _model_cache['active']
+    decay = model['decay'] if model else {}
+    if decay.get('half_life_days'):
+        # stored weights × this factor = weights as of now (forward decay)
+        decay = {**decay, 'global_factor': float(np.exp2(
+            -(_julian_now() - decay['landmark']) / decay['half_life_days']))}
+    return {
+        'model': current_app.config.get('RECOMMENDER_MODEL', 'knn'),
+        'decay': decay,
+        'version': model['version'] if model else None,
+        'n_users': len(model['user_ids']) if model else 0,
+        'index': current_app.config.get('KNN_INDEX', 'brute'),
+        **({'ann': model['ann'].stats()} if model and model['ann'] is not None else {}),
+        **_model_cache['stats'],
+        **get_als_stats(),
+        **get_graph_stats(),
+        **get_content_stats(),
+        **get_cache_stats(),
+        **get_buffer_stats(),
+        **get_batch_stats(),
+    }
+
+
+def _start_delta_worker(app):
+    """
+    Per-process thread that hot-swaps published versions and applies
+    incremental updates — woken by notify_interaction_event() or every
+    MODEL_POLL_INTERVAL seconds.
+    """
+    global _delta_worker_started
+    if _delta_worker_started:
+        return
+    _delta_worker_started = True
+
+    def _run():
+        while True:
+            _delta_event.wait(MODEL_POLL_INTERVAL)
+            _delta_event.clear()
+            try:
+                with app.app_context():
+                    get_active_model(force_check=True)
+                    sync_incremental_updates()
+            except Exception as e:
+                logger.error(f"[ML] Incremental update failed: {e}")
+
+    threading.Thread(target=_run, daemon=True, name='recommendation-deltas').start()
+
+
+# =====================================================================
+# Shared serving helpers (used by every ML recommender)
+# =====================================================================
+def load_exclusions(c, user_id):
+    """
+    Users that must never be recommended to `user_id` and the role to match.
+
+    Returns:
+        (excluded_ids, target_role) — self + connected + pending, and
+        'alumni' for students / 'student' for alumni. target_role is None
+        when the user does not exist.
+    """
+    excluded_ids = {user_id}
+
+    connections = c.execute(
+        'SELECT user_id_1, user_id_2 FROM connections WHERE user_id_1 = ? OR user_id_2 = ?',
+        (user_id, user_id)
+    ).fetchall()
+    for row in connections:
+        excluded_ids.add(row['user_id_1'] if row['user_id_1'] != user_id else row['user_id_2'])
+
+    pending = c.execute(
+        "SELECT sender_id, receiver_id FROM connection_requests "
+        "WHERE (sender_id = ? OR receiver_id = ?) AND status = 'pending'",
+        (user_id, user_id)
+    ).fetchall()
+    for row in pending:
+        excluded_ids.add(row['sender_id'] if row['sender_id'] != user_id else row['receiver_id'])
+
+    # Get current user's role for cross-role matching
+    current_user_row = c.execute('SELECT role FROM users WHERE id = ?', (user_id,)).fetchone()
+    if not current_user_row:
+        return excluded_ids, None
+    target_role = 'alumni' if current_user_row['role'] == 'student' else 'student'
+    return excluded_ids, target_role
+
+
+def build_recommendations(c, candidates, target_role, limit, reason):
+    """
+    Turn ranked (user_id, similarity 0–1) candidates into recommendation dicts.
+
+    Candidates must already be sorted best-first and exclude connected users.
+    Profiles are fetched in one query; wrong-role candidates are skipped.
+    """
+    if not candidates:
+        return []
+
+    ph = ','.join(['?'] * len(candidates))
+    profiles = {
+        row['id']: row for row in c.execute(
+            f'SELECT id, name, role, branch, skills, profile_pic FROM users WHERE id IN ({ph})',
+            [uid for uid, _ in candidates]
+        ).fetchall()
+    }
+
+    recommendations = []
+    for neighbor_uid, similarity in candidates:
+        neighbor = profiles.get(neighbor_uid)
+        if not neighbor or neighbor['role'] != target_role:
+            continue
+
+        recommendations.append({
+            'id': neighbor['id'],
+            'name': neighbor['name'],
+            'role': neighbor['role'],
+            'branch': neighbor['branch'],
+            'skills': neighbor['skills'],
+            'score': round(similarity * 100, 2),  # similarity on a 0–100 scale
+            'reason': reason,
+            'profile_pic': neighbor['profile_pic'] or (
+                f"https://ui-avatars.com/api/?name={neighbor['name']}&background=random"
+            )
+        })
+
+        if len(recommendations) >= limit:
+            break
+
+    return recommendations
+
+
 # =====================================================================
 # STEP 3:  Get ML-based recommendations for a user
 # =====================================================================
 def get_ml_recommendations(user_id, limit=5):
     """
-    Use the trained KNN model to find the most similar users
+    Use the published neighbour table to find the most similar users
     based on their interaction patterns (collaborative filtering).
 
     Args:
@@ -275,123 +961,80 @@ def get_ml_recommendations(user_id, limit=5):
         List of dicts: [{id, name, role, branch, skills, score, profile_pic, reason}, ...]
         Empty list if user has no interactions (cold start).
     """
-    global _model_cache
-
-    # Ensure model is trained
-    if _model_cache['knn_model'] is None:
-        success = train_knn_model()
-        if not success:
-            return []
-
-    uid_to_idx = _model_cache['user_id_to_idx']
-    idx_to_uid = _model_cache['idx_to_user_id']
-    knn = _model_cache['knn_model']
-    matrix = _model_cache['interaction_matrix']
+    model = get_active_model()
+    if model is None:
+        return []  # nothing published yet → rule-based fallback
 
-    if user_id not in uid_to_idx:
+    user_idx = _user_index(model, user_id)
+    if user_idx is None:
         return []  # user not in matrix → cold start
 
-    user_idx = uid_to_idx[user_id]
-    user_vector = matrix[user_idx]
-
-    # Cold start check: if user has no interactions at all
-    if np.count_nonzero(user_vector) < MIN_INTERACTIONS:
+    # Cold start check: if user has too few interactions
+    raw, _ = _model_row(model, user_idx)
+    if raw.nnz < MIN_INTERACTIONS:
         return []  # fallback to rule-based in hybrid_recommendation
 
+    conn = None
     try:
-        # Query KNN for nearest neighbors
-        distances, indices = knn.kneighbors(
-            user_vector.reshape(1, -1),
-            n_neighbors=min(limit + 5, knn.n_neighbors)  # fetch extras to filter
-        )
+        if user_idx in model['overlay_neighbours']:
+            neighbour_idx, neighbour_scores = model['overlay_neighbours'][user_idx]
+        else:
+            neighbour_idx = model['neighbour_idx'][user_idx]
+            neighbour_scores = model['neighbour_scores'][user_idx]
+        candidates = [
+            (int(model['user_ids'][idx]), float(score))
+            for idx, score in zip(neighbour_idx, neighbour_scores)
+            if score > 0
+        ]
+        if not candidates:
+            return []
 
-        # ----- Build exclusion set (self + already connected + pending) -----
         conn = get_db_connection()
         c = conn.cursor()
 
-        excluded_ids = {user_id}
-
-        connections = c.execute(
-            'SELECT user_id_1, user_id_2 FROM connections WHERE user_id_1 = ? OR user_id_2 = ?',
-            (user_id, user_id)
-        ).fetchall()
-        for row in connections:
-            excluded_ids.add(row['user_id_1'] if row['user_id_1'] != user_id else row['user_id_2'])
-
-        pending = c.execute(
-            "SELECT sender_id, receiver_id FROM connection_requests "
-            "WHERE (sender_id = ? OR receiver_id = ?) AND status = 'pending'",
-            (user_id, user_id)
-        ).fetchall()
-        for row in pending:
-            excluded_ids.add(row['sender_id'] if row['sender_id'] != user_id else row['receiver_id'])
-
-        # Get current user's role for cross-role matching
-        current_user_row = c.execute('SELECT role FROM users WHERE id = ?', (user_id,)).fetchone()
-        if not current_user_row:
-            conn.close()
+        excluded_ids, target_role = load_exclusions(c, user_id)
+        if target_role is None:
             return []
-        target_role = 'alumni' if current_user_row['role'] == 'student' else 'student'
-
-        # ----- Build recommendations from KNN neighbors -----
-        recommendations = []
-        for rank, (dist, idx) in enumerate(zip(distances[0], indices[0])):
-            neighbor_uid = idx_to_uid.get(int(idx))
-            if neighbor_uid is None or neighbor_uid in excluded_ids:
-                continue
-
-            # Fetch neighbor profile
-            neighbor = c.execute(
-                'SELECT id, name, role, branch, skills, profile_pic FROM users WHERE id = ?',
-                (neighbor_uid,)
-            ).fetchone()
-            if not neighbor or neighbor['role'] != target_role:
-                continue
-
-            # Cosine distance → similarity score (0–100 scale)
-            similarity = max(0, round((1 - dist) * 100, 2))
-
-            recommendations.append({
-                'id': neighbor['id'],
-                'name': neighbor['name'],
-                'role': neighbor['role'],
-                'branch': neighbor['branch'],
-                'skills': neighbor['skills'],
-                'score': similarity,
-                'reason': 'ML: similar interactions',
-                'profile_pic': neighbor['profile_pic'] or (
-                    f"https://ui-avatars.com/api/?name={neighbor['name']}&background=random"
-                )
-            })
-
-            if len(recommendations) >= limit:
-                break
 
-        conn.close()
-        return recommendations
+        candidates = [(uid, s) for uid, s in candidates if uid not in excluded_ids]
+        return build_recommendations(c, candidates, target_role, limit,
+                                     reason='ML: similar interactions')
 
     except Exception as e:
         logger.error(f"[ML] get_ml_recommendations error: {e}")
         return []
+    finally:
+        if conn:
+            conn.close()
 
 
 # =====================================================================
 # STEP 4:  Hybrid recommendation (ML + Rule-based with cold-start)
 # =====================================================================
-def hybrid_recommendation(user_id, limit=5):
+SOURCE_PRIORITY = {'ml': 0, 'graph': 1, 'content': 2, 'rule': 3}
+
+
+def hybrid_recommendation(user_id, limit=5, model=None):
     """
     Combines ML collaborative filtering with rule-based recommendations.
 
     Strategy:
-      1. Try ML recommendations first.
-      2. If ML returns fewer than `limit` (cold start or sparse data),
-         fill remaining slots with rule-based recommendations.
-      3. Deduplicate by user ID, preferring ML scores.
-      4. Sort by score descending, return top `limit`.
+      1. Try ML recommendations first (ALS or KNN, per RECOMMENDER_MODEL).
+      2. If ML returns fewer than `limit`, add graph recommendations
+         (personalised PageRank on the connection graph).
+      3. If still short, add content recommendations (TF-IDF similarity
+         of profile text) — the fast cold-start source.
+      4. If still short, fill remaining slots with rule-based
+         recommendations.
+      5. Deduplicate by user ID, preferring ML, then graph, then content scores.
+      6. Order by source (ML, graph, content, rule), then by score within a
+         source — the sources score on different scales — and return the
+         top `limit`.
 
     Args:
         user_id: The ID of the user.
         limit: Max recommendations to return.
+        model: 'knn' or 'als'; defaults to the RECOMMENDER_MODEL setting.
 
     Returns:
         List of recommendation dicts with score and reason.
@@ -399,13 +1042,18 @@ def hybrid_recommendation(user_id, limit=5):
     FUTURE SCOPE:
       - Weighted ensemble: alpha * ML_score + (1 - alpha) * rule_score
       - Deep learning model (Graph Neural Networks)
-      - Real-time update: retrain on new interaction events
       - Contextual bandits for exploration vs exploitation
     """
     from models.recommendation import get_rule_based_recommendations
 
     # --- Attempt ML recommendations ---
-    ml_recs = get_ml_recommendations(user_id, limit=limit)
+    model = model or current_app.config.get('RECOMMENDER_MODEL', 'knn')
+    ml_recs = []
+    if model == 'als':
+        from services.als_engine import get_als_recommendations
+        ml_recs = get_als_recommendations(user_id, limit=limit)
+    if not ml_recs:
+        ml_recs = get_ml_recommendations(user_id, limit=limit)
 
     seen_ids = set()
     final = []
@@ -417,7 +1065,29 @@ def hybrid_recommendation(user_id, limit=5):
             final.append(rec)
             seen_ids.add(rec['id'])
 
-    # --- Fill remaining with rule-based (cold-start fallback) ---
+    # --- Then users close in the connection graph ---
+    if len(final) < limit:
+        from services.graph_engine import get_graph_recommendations
+        for rec in get_graph_recommendations(user_id, limit=limit):
+            if rec['id'] not in seen_ids:
+                rec['source'] = 'graph'
+                final.append(rec)
+                seen_ids.add(rec['id'])
+            if len(final) >= limit:
+                break
+
+    # --- Then users with similar profile text (cold-start) ---
+    if len(final) < limit:
+        from services.content_engine import get_content_recommendations
+        for rec in get_content_recommendations(user_id, limit=limit):
+            if rec['id'] not in seen_ids:
+                rec['source'] = 'content'
+                final.append(rec)
+                seen_ids.add(rec['id'])
+            if len(final) >= limit:
+                break
+
+    # --- Fill remaining with rule-based (last resort) ---
     if len(final) < limit:
         rule_recs = get_rule_based_recommendations(user_id, limit=limit * 2)
         for rec in rule_recs:
@@ -428,27 +1098,40 @@ def hybrid_recommendation(user_id, limit=5):
             if len(final) >= limit:
                 break
 
-    # Sort by score descending
-    final.sort(key=lambda x: x['score'], reverse=True)
+    # Fallback sources never outrank ML results; score orders within a source
+    final.sort(key=lambda x: (SOURCE_PRIORITY[x['source']], -x['score']))
 
     logger.info(f"[Hybrid] user_id={user_id} → "
                 f"{sum(1 for r in final if r.get('source')=='ml')} ML + "
+                f"{sum(1 for r in final if r.get('source')=='graph')} graph + "
+                f"{sum(1 for r in final if r.get('source')=='content')} content + "
                 f"{sum(1 for r in final if r.get('source')=='rule')} rule-based")
 
     return final[:limit]
 
 
 # =====================================================================
-# STEP 5:  Log user interactions (for future real-time tracking)
+# STEP 5:  Log user interactions (applied incrementally)
 # =====================================================================
 def log_interaction(user_id, target_user_id, interaction_type):
     """
     Log a user interaction into the user_interactions table.
-    This data feeds into the ML model on next retrain.
+
+    Events go through the in-memory buffer (services/interaction_buffer.py)
+    and are written in batches; the affected rows are refreshed
+    incrementally after each flush, and the next full retrain folds them
+    into the published model. Without a running buffer the row is
+    inserted directly.
 
     interaction_type: 'profile_view', 'job_click', 'mentorship_request',
                       'message', 'connection_request'
     """
+    from services.interaction_buffer import buffer_interaction, is_buffering
+
+    if is_buffering():
+        buffer_interaction(user_id, target_user_id, interaction_type)
+        return
+
     try:
         conn = get_db_connection()
         c = conn.cursor()
@@ -459,6 +1142,7 @@ def log_interaction(user_id, target_user_id, interaction_type):
         )
         conn.commit()
         conn.close()
+        notify_interaction_event(user_id, target_user_id)
     except Exception as e:
         logger.debug(f"Could not log interaction: {e}")
 
@@ -466,24 +1150,81 @@ def log_interaction(user_id, target_user_id, interaction_type):
 # =====================================================================
 # Model initialization helper (called from app startup)
 # =====================================================================
-def init_recommendation_engine(app=None):
+def _seconds_until_retrain():
+    """Time left before the published model is due for a scheduled retrain."""
+    model = get_active_model(force_check=True)
+    if model is None:
+        return 0
+    return max(0, RETRAIN_INTERVAL - (time.time() - model['created_at']))
+
+
+def _trainer_loop(in_context):
     """
-    Initialize the recommendation engine at app startup.
-    Trains the KNN model in a background thread to avoid blocking.
-    
+    Scheduled retrains of the trainer process (runs forever).
+
     Args:
-        app: Flask app instance (required for DB access in background thread)
+        in_context: Calls a function inside the app context.
     """
-    def _train_bg():
+    from services.training_jobs import HEARTBEAT_SECONDS, SKIPPED, run_scheduled_retrain
+
+    while True:
+        trained = False
         try:
-            if app is not None:
-                with app.app_context():
-                    train_knn_model(force=True)
-            else:
-                train_knn_model(force=True)
+            wait = in_context(_seconds_until_retrain)
+            if wait > 0:
+                time.sleep(wait)
+            trained = in_context(run_scheduled_retrain)
         except Exception as e:
             logger.error(f"[ML] Background training failed: {e}")
+        if trained == SKIPPED:
+            time.sleep(HEARTBEAT_SECONDS)  # another job is active — check again later
+        elif not trained:
+            time.sleep(RETRAIN_INTERVAL)  # not enough data yet — try again later
+
+
+def init_recommendation_engine(app=None):
+    """
+    Initialize the recommendation engine at app startup.
+
+    Every process memory-maps the latest published model (no training) and
+    starts a delta worker for hot-swaps and incremental updates.
+    The single process that wins the trainer lock also starts a background
+    thread that retrains every RETRAIN_INTERVAL seconds — immediately only
+    if nothing has been published yet.
+
+    Args:
+        app: Flask app instance (required for DB access in background thread)
+    """
+    def _in_context(fn):
+        if app is not None:
+            with app.app_context():
+                return fn()
+        return fn()
+
+    def _is_trainer():
+        model = get_active_model(force_check=True)
+        if model is not None:
+            logger.info(f"[ML] Using published model version {model['version']}")
+        if not current_app.config.get('RECOMMENDATION_TRAINER_ENABLED', True):
+            return False  # e.g. benchmarks, which train explicitly
+        return acquire_process_lock(TRAINER_LOCK, _lock_dir())
+
+    try:
+        is_trainer = _in_context(_is_trainer)
+    except Exception as e:
+        logger.error(f"[ML] Model store unavailable: {e}")
+        return
+
+    if app is not None:
+        _start_delta_worker(app)
+        from services.interaction_buffer import start_interaction_buffer
+        start_interaction_buffer(app)
+
+    if not is_trainer:
+        logger.info("[ML] Recommendation engine ready (serving published models)")
+        return
 
-    t = threading.Thread(target=_train_bg, daemon=True)
+    t = threading.Thread(target=_trainer_loop, args=(_in_context,), daemon=True,
+                         name='recommendation-trainer')
     t.start()
-    logger.info("[ML] Recommendation engine initialization started (background)")
+    logger.info("[ML] Recommendation trainer started in this process (background)")
@@ -0,0 +1,218 @@
+"""
+services/stats_counters.py
+===========================
+Trigger-maintained statistics counters for the admin screens.
+
+The admin dashboard, analytics, registrations and jobs pages used to run
+a COUNT(*) (or a strftime GROUP BY over `users`) per number shown. Those
+numbers now live in one table:
+
+    stats_counters (metric, dimension, bucket) → value   WITHOUT ROWID
+
+and every read is a primary-key lookup or a range scan of one metric.
+
+MAINTENANCE:
+  AFTER INSERT / DELETE / UPDATE triggers on the source tables add +1 / -1
+  to the affected counters inside the writing transaction, so counters can
+  never disagree with committed rows. Updates subtract the old row's
+  counters and add the new row's (triggers fire only when a counted column
+  changes). Rows deleted by ON DELETE CASCADE fire the triggers too.
+
+  install_stats_counters() (called by init_db) recreates the triggers from
+  COUNTER_SPECS and seeds the table when it is empty. Tables that had no
+  triggers yet (e.g. job_applications, created by scripts/migrate_jobs.py
+  after the first seed) have their metrics recounted in the same step.
+  rebuild_stats_counters() recomputes everything from scratch, e.g. after
+  rows were written with the triggers absent:
+
+      python scripts/rebuild_stats_counters.py
+
+METRICS (dimension, bucket):
+  users                 role, ''
+  users_by_year         role, registration year
+  users_pending         role, ''                (is_approved = 0)
+  registrations         role, ''                (registration_log)
+  meet_registrations    '', year                (alumni_meet_registration)
+  jobs                  approval_status, ''
+  jobs_active           approval_status, ''     (is_active = 1)
+  job_applications      '', ''
+"""
+
+import logging
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# (table, metric, dimension, bucket, condition); {r} is the row (NEW / OLD / table alias)
+COUNTER_SPECS = [
+    ('users', 'users', "{r}.role", "''", None),
+    ('users', 'users_by_year', "{r}.role", "strftime('%Y', {r}.created_at)", None),
+    ('users', 'users_pending', "{r}.role", "''", "{r}.is_approved = 0"),
+    ('registration_log', 'registrations', "{r}.role", "''", None),
+    ('alumni_meet_registration', 'meet_registrations', "''", "strftime('%Y', {r}.created_at)", None),
+    ('jobs', 'jobs', "COALESCE({r}.approval_status, 'approved')", "''", None),
+    ('jobs', 'jobs_active', "COALESCE({r}.approval_status, 'approved')", "''", "{r}.is_active = 1"),
+    ('job_applications', 'job_applications', "''", "''", None),
+]
+
+# Columns whose change moves a row between counters
+_UPDATE_COLUMNS = {
+    'users': ('role', 'created_at', 'is_approved'),
+    'registration_log': ('role',),
+    'alumni_meet_registration': ('created_at',),
+    'jobs': ('approval_status', 'is_active'),
+}
+
+_UPSERT = '''
+    INSERT INTO stats_counters (metric, dimension, bucket, value)
+    SELECT '{metric}', COALESCE({dimension}, ''), COALESCE({bucket}, ''), {delta} WHERE {condition}
+    ON CONFLICT(metric, dimension, bucket) DO UPDATE SET value = value + excluded.value;'''
+
+
+def _specs_for(table):
+    return [spec for spec in COUNTER_SPECS if spec[0] == table]
+
+
+def _upserts(table, row, delta):
+    return ''.join(
+        _UPSERT.format(metric=metric, dimension=dimension.format(r=row), bucket=bucket.format(r=row),
+                       delta=delta, condition=condition.format(r=row) if condition else '1')
+        for _, metric, dimension, bucket, condition in _specs_for(table)
+    )
+
+
+def _trigger_statements(table):
+    """DROP + CREATE statements of the counter triggers of one table."""
+    statements = []
+    events = [('insert', 'AFTER INSERT', _upserts(table, 'NEW', 1)),
+              ('delete', 'AFTER DELETE', _upserts(table, 'OLD', -1))]
+    if table in _UPDATE_COLUMNS:
+        events.append(('update', f"AFTER UPDATE OF {', '.join(_UPDATE_COLUMNS[table])}",
+                       _upserts(table, 'OLD', -1) + _upserts(table, 'NEW', 1)))
+    for suffix, event, body in events:
+        name = f'trg_stats_{table}_{suffix}'
+        statements.append(f'DROP TRIGGER IF EXISTS {name}')
+        statements.append(f'CREATE TRIGGER {name} {event} ON {table} FOR EACH ROW BEGIN{body}\nEND')
+    return statements
+
+
+def _existing_tables(c):
+    return {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def _untriggered_tables(c, tables):
+    """Counted tables that exist but have no counter triggers yet."""
+    triggers = {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    return {table for table in dict.fromkeys(spec[0] for spec in COUNTER_SPECS)
+            if table in tables and f'trg_stats_{table}_insert' not in triggers}
+
+
+def _recount(c, tables, metrics_of=None):
+    """
+    Recount the metrics of `tables` (all metrics when metrics_of is None,
+    otherwise only those of the tables in metrics_of).
+    """
+    if metrics_of is None:
+        c.execute('DELETE FROM stats_counters')
+    else:
+        c.executemany('DELETE FROM stats_counters WHERE metric = ?',
+                      [(spec[1],) for spec in COUNTER_SPECS if spec[0] in metrics_of])
+    for table, metric, dimension, bucket, condition in COUNTER_SPECS:
+        if table not in tables or (metrics_of is not None and table not in metrics_of):
+            continue
+        c.execute(f'''
+            INSERT INTO stats_counters (metric, dimension, bucket, value)
+            SELECT '{metric}', COALESCE({dimension.format(r='r')}, ''),
+                   COALESCE({bucket.format(r='r')}, ''), COUNT(*)
+            FROM {table} r
+            WHERE {condition.format(r='r') if condition else '1'}
+            GROUP BY 2, 3
+        ''')
+
+
+def install_stats_counters(conn):
+    """
+    Create the counters table and (re)create its triggers; seed it when
+    empty, otherwise recount the metrics of tables that had no triggers.
+
+    Runs in one IMMEDIATE transaction, so no write can slip in between
+    the old and the new triggers.
+    """
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            metric TEXT NOT NULL,
+            dimension TEXT NOT NULL DEFAULT '',
+            bucket TEXT NOT NULL DEFAULT '',
+            value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (metric, dimension, bucket)
+        ) WITHOUT ROWID
+    ''')
+    conn.commit()
+
+    c.execute('BEGIN IMMEDIATE')
+    try:
+        tables = _existing_tables(c)
+        untriggered = _untriggered_tables(c, tables)
+        for table in dict.fromkeys(spec[0] for spec in COUNTER_SPECS):
+            if table in tables:
+                for statement in _trigger_statements(table):
+                    c.execute(statement)
+        seeded = c.execute('SELECT 1 FROM stats_counters LIMIT 1').fetchone() is not None
+        if not seeded:
+            _recount(c, tables)
+        elif untriggered:
+            _recount(c, tables, metrics_of=untriggered)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if not seeded:
+        logger.info("[Stats] Counters seeded")
+    elif untriggered:
+        logger.info(f"[Stats] Counters recounted for new tables: {', '.join(sorted(untriggered))}")
+
+
+def rebuild_stats_counters():
+    """
+    Recompute every counter from the source tables.
+
+    Returns:
+        Number of counter rows written.
+    """
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute('BEGIN IMMEDIATE')
+        _recount(c, _existing_tables(c))
+        rows = c.execute('SELECT COUNT(*) FROM stats_counters').fetchone()[0]
+        conn.commit()
+    finally:
+        conn.close()
+    logger.info(f"[Stats] Counters rebuilt ({rows} rows)")
+    return rows
+
+
+# =====================================================================
+# Reading
+# =====================================================================
+def get_counter(conn, metric, dimension='', bucket=''):
+    """One counter value (0 when it was never incremented)."""
+    row = conn.execute(
+        'SELECT value FROM stats_counters WHERE metric = ? AND dimension = ? AND bucket = ?',
+        (metric, dimension, bucket)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def get_metric(conn, metric):
+    """{(dimension, bucket): value} of one metric."""
+    return {(row[0], row[1]): row[2] for row in conn.execute(
+        'SELECT dimension, bucket, value FROM stats_counters WHERE metric = ?', (metric,)
+    )}
+
+
+def get_by_dimension(conn, metric):
+    """{dimension: value} of a metric without buckets (e.g. users per role)."""
+    return {dimension: value for (dimension, _), value in get_metric(conn, metric).items()}
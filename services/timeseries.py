@@ -0,0 +1,246 @@
+"""
+services/timeseries.py
+=======================
+Daily activity time series for the admin reports.
+
+A scheduled job folds new rows of the activity tables into
+
+    stats_daily (metric, day, dimension) → value        WITHOUT ROWID
+
+and the reports API answers any date range at day / week / month
+granularity from that table alone — one PK range scan of a few hundred
+rows per metric, independent of how many raw rows exist.
+
+METRICS (source table, dimension):
+  registrations         users                      role
+  logins                user_activity.last_login   ''   (distinct users per day)
+  messages              private_ / public_messages 'private' | 'public'
+  connection_requests   connection_requests        ''
+  connections_accepted  connections                ''
+  job_postings          jobs                       posted_by_role
+  job_applications      job_applications           ''
+  event_registrations   alumni_meet_registration   ''
+
+INCREMENTAL ROLLUP:
+  Like services/interaction_rollup.py, an id watermark per source table in
+  `rollup_watermarks` ('timeseries:<table>') marks the rows already
+  counted; each run aggregates only newer rows (GROUP BY day, dimension)
+  and adds them with an upsert. The first run backfills all history.
+
+  user_activity keeps only the latest login per user, so logins are
+  sampled: every run records (day, user) for logins since the previous run
+  into `stats_login_days` and rewrites those days' counts. Days before the
+  first run only show the users whose *latest* login fell on them.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# metric → [(table, dimension expression, day expression)]
+ID_SOURCES = {
+    'registrations': [('users', 'role', 'date(created_at)')],
+    'messages': [('private_messages', "'private'", 'date(created_at)'),
+                 ('public_messages', "'public'", 'date(created_at)')],
+    'connection_requests': [('connection_requests', "''", 'date(created_at)')],
+    'connections_accepted': [('connections', "''", 'date(connected_at)')],
+    'job_postings': [('jobs', "COALESCE(posted_by_role, 'admin')", 'date(created_at)')],
+    'job_applications': [('job_applications', "''", 'date(created_at)')],
+    'event_registrations': [('alumni_meet_registration', "''", 'date(created_at)')],
+}
+METRICS = tuple(ID_SOURCES) + ('logins',)
+GRANULARITIES = ('day', 'week', 'month')
+MAX_BUCKETS = 3700
+_BUCKET_DAYS = {'day': 1, 'week': 7, 'month': 28}
+LOGIN_WATERMARK = 'timeseries:user_activity'
+LOGIN_DAYS_KEPT = 7
+
+_UPSERT = '''
+    INSERT INTO stats_daily (metric, day, dimension, value) VALUES (?, ?, ?, ?)
+    ON CONFLICT(metric, day, dimension) DO UPDATE SET value = value + excluded.value
+'''
+
+
+def _watermark(c, source):
+    row = c.execute('SELECT last_id FROM rollup_watermarks WHERE source = ?', (source,)).fetchone()
+    return row[0] if row else 0
+
+
+def _set_watermark(c, source, value):
+    c.execute('INSERT INTO rollup_watermarks (source, last_id) VALUES (?, ?) '
+              'ON CONFLICT(source) DO UPDATE SET last_id = excluded.last_id', (source, value))
+
+
+# =====================================================================
+# Rollup
+# =====================================================================
+def _rollup_table(c, metric, table, dimension, day):
+    source = f'timeseries:{table}'
+    last_id = _watermark(c, source)
+    max_id = c.execute(f'SELECT MAX(id) FROM {table} WHERE id > ?', (last_id,)).fetchone()[0]
+    if not max_id:
+        return 0
+    rows = c.execute(f'''
+        SELECT {day} AS d, COALESCE({dimension}, '') AS dim, COUNT(*)
+        FROM {table}
+        WHERE id > ? AND id <= ? AND {day} IS NOT NULL
+        GROUP BY d, dim
+    ''', (last_id, max_id)).fetchall()
+    c.executemany(_UPSERT, [(metric, row[0], row[1], row[2]) for row in rows])
+    _set_watermark(c, source, max_id)
+    return sum(row[2] for row in rows)
+
+
+def _rollup_logins(c):
+    # Watermark: last_login as the integer YYYYMMDDHHMMSS
+    mark = _watermark(c, LOGIN_WATERMARK)
+    since = datetime.strptime(str(mark), '%Y%m%d%H%M%S').strftime('%Y-%m-%d %H:%M:%S') if mark else ''
+    latest = c.execute('SELECT MAX(last_login) FROM user_activity WHERE last_login >= ?', (since,)).fetchone()[0]
+    if not latest:
+        return 0
+    added = c.execute('''
+        INSERT OR IGNORE INTO stats_login_days (day, user_id)
+        SELECT date(last_login), user_id FROM user_activity
+        WHERE last_login >= ? AND date(last_login) IS NOT NULL
+    ''', (since,)).rowcount
+    # Rewrite the counts of the touched days from the (day, user) set
+    c.execute('''
+        INSERT INTO stats_daily (metric, day, dimension, value)
+        SELECT 'logins', day, '', COUNT(*) FROM stats_login_days
+        WHERE day >= ? GROUP BY day
+        ON CONFLICT(metric, day, dimension) DO UPDATE SET value = excluded.value
+    ''', (since[:10],))
+    c.execute("DELETE FROM stats_login_days WHERE day < date('now', ?)", (f'-{LOGIN_DAYS_KEPT} days',))
+    _set_watermark(c, LOGIN_WATERMARK, int(datetime.strptime(latest[:19], '%Y-%m-%d %H:%M:%S')
+                                          .strftime('%Y%m%d%H%M%S')))
+    return added
+
+
+def rollup_timeseries():
+    """
+    Fold activity added since the last run into stats_daily.
+
+    Returns:
+        {metric: rows (or new login days) folded in} for metrics that changed.
+    """
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute('BEGIN IMMEDIATE')
+        tables = {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        result = {}
+        for metric, sources in ID_SOURCES.items():
+            for table, dimension, day in sources:
+                if table in tables:
+                    n = _rollup_table(c, metric, table, dimension, day)
+                    if n:
+                        result[metric] = result.get(metric, 0) + n
+        if 'user_activity' in tables:
+            n = _rollup_logins(c)
+            if n:
+                result['logins'] = n
+        conn.commit()
+    finally:
+        conn.close()
+
+    if result:
+        logger.info(f"[Timeseries] Rolled up {result}")
+    return result
+
+
+# =====================================================================
+# Reading
+# =====================================================================
+def _parse_day(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a date (YYYY-MM-DD)')
+
+
+def _bucket(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())     # Monday of the week
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _bucket_labels(start, end, granularity):
+    labels, day = [], _bucket(start, granularity)
+    while day <= end:
+        labels.append(day.isoformat() if granularity != 'month' else day.strftime('%Y-%m'))
+        if granularity == 'day':
+            day += timedelta(days=1)
+        elif granularity == 'week':
+            day += timedelta(days=7)
+        else:
+            day = (day + timedelta(days=32)).replace(day=1)
+    return labels
+
+
+_BUCKET_SQL = {
+    'day': 'day',
+    'week': "date(day, 'weekday 0', '-6 days')",
+    'month': 'substr(day, 1, 7)',
+}
+
+
+def get_timeseries(metrics, start=None, end=None, granularity='day', by_dimension=False):
+    """
+    Zero-filled series of metrics over [start, end].
+
+    Args:
+        metrics: Iterable of METRICS names.
+        start, end: 'YYYY-MM-DD' (default: the last 30 days).
+        granularity: 'day', 'week' (Monday-based) or 'month'.
+        by_dimension: Split every metric by its dimension.
+
+    Returns:
+        {'granularity', 'start', 'end', 'buckets': [label],
+         'series': {metric: [value]} or {metric: {dimension: [value]}}}
+
+    Raises:
+        ValueError: unknown metric / granularity, bad dates or a too long range.
+    """
+    metrics = list(dict.fromkeys(metrics))
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown or not metrics:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown) or '(none)'}")
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    end_day = _parse_day(end, 'end') if end else date.today()
+    start_day = _parse_day(start, 'start') if start else end_day - timedelta(days=29)
+    if start_day > end_day:
+        raise ValueError('start is after end')
+    if (end_day - start_day).days // _BUCKET_DAYS[granularity] > MAX_BUCKETS:
+        raise ValueError(f'Range is limited to {MAX_BUCKETS} {granularity}s')
+
+    labels = _bucket_labels(start_day, end_day, granularity)
+    index = {label: i for i, label in enumerate(labels)}
+    ph = ','.join(['?'] * len(metrics))
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(f'''
+            SELECT metric, {_BUCKET_SQL[granularity]} AS bucket, dimension, SUM(value)
+            FROM stats_daily
+            WHERE metric IN ({ph}) AND day BETWEEN ? AND ?
+            GROUP BY metric, bucket, dimension
+        ''', metrics + [start_day.isoformat(), end_day.isoformat()]).fetchall()
+    finally:
+        conn.close()
+
+    series = {m: ({} if by_dimension else [0] * len(labels)) for m in metrics}
+    for metric, bucket, dimension, value in rows:
+        i = index.get(bucket)
+        if i is None:
+            continue
+        if by_dimension:
+            series[metric].setdefault(dimension, [0] * len(labels))[i] += value
+        else:
+            series[metric][i] += value
+    return {'granularity': granularity, 'start': start_day.isoformat(), 'end': end_day.isoformat(),
+            'buckets': labels, 'series': series}
@@ -0,0 +1,206 @@
+"""
+services/training_jobs.py
+==========================
+Background retraining jobs for the recommendation models.
+
+POST /recommendations/retrain no longer trains inside the request: it
+submits a job and returns its id straight away. The job runs on a
+background thread and records its progress in the
+`recommendation_jobs` table, so any gunicorn worker can answer the
+status endpoint:
+
+    queued → running (stage: matrix_build → normalise → fit → publish
+                      [→ als_fit] → content_fit) → succeeded | failed
+
+Each stage's duration is stored as JSON in `stages`.
+
+DE-DUPLICATION:
+  A new job is only created when no other job is queued or running —
+  checked and inserted inside one write transaction, so concurrent
+  requests (in any worker) all receive the id of the same job. The
+  scheduled trainer goes through the same path and skips its run while
+  an admin-triggered job is in progress, polling again every
+  HEARTBEAT_SECONDS. Jobs whose heartbeat is older
+  than JOB_STALE_SECONDS (e.g. the worker died) are marked failed.
+
+HEARTBEAT:
+  updated_at is refreshed at every stage change and, inside the long
+  stages (neighbour-search batches, ALS half-steps), at most every
+  HEARTBEAT_SECONDS, so a slow stage on a large matrix is not mistaken
+  for a dead job.
+"""
+
+import json
+import time
+import logging
+import threading
+
+from flask import current_app
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+JOB_STALE_SECONDS = 1800
+HEARTBEAT_SECONDS = 30
+ACTIVE_STATUSES = ('queued', 'running')
+
+# run_scheduled_retrain() result when another job is active
+SKIPPED = 'skipped'
+
+
+def _row_to_job(row):
+    if row is None:
+        return None
+    job = dict(row)
+    job['stages'] = json.loads(job['stages'] or '{}')
+    end = job['finished_at'] or time.time()
+    job['duration_seconds'] = round(end - job['started_at'], 3) if job['started_at'] else None
+    return job
+
+
+def get_job(job_id):
+    """Job dict (status, stage, per-stage seconds, ...) or None."""
+    conn = get_db_connection()
+    try:
+        row = conn.execute('SELECT * FROM recommendation_jobs WHERE id = ?', (job_id,)).fetchone()
+        return _row_to_job(row)
+    finally:
+        conn.close()
+
+
+def get_recent_jobs(limit=10):
+    """Most recent jobs, newest first."""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute('SELECT * FROM recommendation_jobs ORDER BY id DESC LIMIT ?',
+                            (limit,)).fetchall()
+        return [_row_to_job(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def _claim_job(trigger, requested_by=None):
+    """
+    Create a queued job unless one is already active.
+
+    Returns:
+        (job_id, created) — created is False when an active job was reused.
+    """
+    now = time.time()
+    conn = get_db_connection()
+    try:
+        conn.execute('BEGIN IMMEDIATE')  # serialises claims across workers
+        conn.execute(
+            "UPDATE recommendation_jobs SET status = 'failed', error = 'Abandoned (no heartbeat)', "
+            "finished_at = ? WHERE status IN ('queued', 'running') AND updated_at < ?",
+            (now, now - JOB_STALE_SECONDS)
+        )
+        active = conn.execute(
+            "SELECT id FROM recommendation_jobs WHERE status IN ('queued', 'running') "
+            "ORDER BY id LIMIT 1"
+        ).fetchone()
+        if active:
+            conn.commit()
+            return active['id'], False
+
+        cur = conn.execute(
+            "INSERT INTO recommendation_jobs (status, trigger, requested_by, stages, created_at, updated_at) "
+            "VALUES ('queued', ?, ?, '{}', ?, ?)",
+            (trigger, requested_by, now, now)
+        )
+        conn.commit()
+        return cur.lastrowid, True
+    finally:
+        conn.close()
+
+
+def _update_job(job_id, **fields):
+    fields['updated_at'] = time.time()
+    assignments = ', '.join(f'{key} = ?' for key in fields)
+    conn = get_db_connection()
+    try:
+        conn.execute(f'UPDATE recommendation_jobs SET {assignments} WHERE id = ?',
+                     list(fields.values()) + [job_id])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _run_job(job_id):
+    """Execute a claimed job in the current thread (needs an app context)."""
+    from services.recommendation_engine import retrain_models, get_active_model
+
+    stages = {}
+    current = {'stage': None, 'since': time.time(), 'beat': time.time()}
+
+    def progress(stage):
+        now = time.time()
+        if current['stage']:
+            stages[current['stage']] = round(now - current['since'], 3)
+        current.update(stage=stage, since=now, beat=now)
+        _update_job(job_id, stage=stage, stages=json.dumps(stages))
+
+    def heartbeat():
+        now = time.time()
+        if now - current['beat'] >= HEARTBEAT_SECONDS:
+            current['beat'] = now
+            _update_job(job_id)
+
+    started = time.time()
+    _update_job(job_id, status='running', started_at=started)
+    logger.info(f"[ML] Retrain job {job_id} started")
+
+    try:
+        trained = retrain_models(progress=progress, heartbeat=heartbeat)
+        progress(None)  # close the last stage
+        model = get_active_model()
+        if trained:
+            _update_job(job_id, status='succeeded', finished_at=time.time(),
+                        version=model['version'] if model else None)
+        else:
+            _update_job(job_id, status='failed', finished_at=time.time(),
+                        error='Not enough data to train model')
+    except Exception as e:
+        logger.error(f"[ML] Retrain job {job_id} failed: {e}")
+        _update_job(job_id, status='failed', finished_at=time.time(), error=str(e))
+        trained = False
+
+    logger.info(f"[ML] Retrain job {job_id} finished in {time.time() - started:.2f}s "
+                f"(stages: {stages})")
+    return trained
+
+
+def submit_retrain_job(requested_by=None):
+    """
+    Queue a retrain in a background thread, or join the active job.
+
+    Returns:
+        (job dict, created)
+    """
+    job_id, created = _claim_job('manual', requested_by)
+    if created:
+        app = current_app._get_current_object()
+
+        def _target():
+            with app.app_context():
+                _run_job(job_id)
+
+        threading.Thread(target=_target, daemon=True, name=f'recommendation-retrain-{job_id}').start()
+    return get_job(job_id), created
+
+
+def run_scheduled_retrain():
+    """
+    Synchronous retrain for the trainer thread, skipped while another job
+    is active.
+
+    Returns:
+        True if a model was trained, False if not, SKIPPED if another job
+        is active (the caller should wait instead of claiming again).
+    """
+    job_id, created = _claim_job('schedule')
+    if not created:
+        logger.info(f"[ML] Scheduled retrain skipped — job {job_id} is active")
+        return SKIPPED
+    return _run_job(job_id)
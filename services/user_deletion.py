@@ -0,0 +1,330 @@
+"""
+services/user_deletion.py
+==========================
+Set-based user deletion backed by ON DELETE foreign keys.
+
+Deleting a user used to be a hand-written DELETE per known table, so
+rows in tables added later (messages, conversations, interactions,
+activity, recommendations ...) were left pointing at missing users. Every
+reference to `users` is now a foreign key with an action:
+
+    CASCADE    rows owned by the user (profiles, messages, connections ...)
+    SET NULL   rows that outlive the user (a mentor of a request, the admin
+               who hid a public message or locked messaging)
+
+so one `DELETE FROM users WHERE id IN (...)` on a connection with
+foreign_keys = ON removes everything, in one transaction.
+
+MIGRATION:
+  SQLite cannot add a foreign key to an existing table, so
+  migrate_user_foreign_keys() (called by init_db) rebuilds every table in
+  USER_FOREIGN_KEYS whose keys differ: create the new definition, copy the
+  rows (dropping ones already orphaned, nulling SET NULL columns), drop the
+  old table, rename, and recreate its indexes and triggers — all in one
+  transaction with foreign key enforcement off. The sqlite_sequence
+  high-water mark of an AUTOINCREMENT table is carried over, so ids of
+  deleted rows are not handed out again. Tables that already match
+  are left alone, so the check costs a few PRAGMAs per start.
+
+  Change-tracking tables (profile_changes, user_graph_changes), job
+  audit columns (requested_by) and the time series keep their rows.
+"""
+
+import re
+import time
+import logging
+
+from db_utils import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+PROTECTED_EMAILS = ('admindbit195@college.edu',)
+MAX_BULK_DELETE = 10000
+
+# (table, column, parent table, action)
+USER_FOREIGN_KEYS = [
+    ('student_profile', 'user_id', 'users', 'CASCADE'),
+    ('alumni_profile', 'user_id', 'users', 'CASCADE'),
+    ('faculty_profile', 'user_id', 'users', 'CASCADE'),
+    ('registration_log', 'user_id', 'users', 'CASCADE'),
+    ('alumni_meet_registration', 'user_id', 'users', 'CASCADE'),
+    ('user_activity', 'user_id', 'users', 'CASCADE'),
+    ('connection_requests', 'sender_id', 'users', 'CASCADE'),
+    ('connection_requests', 'receiver_id', 'users', 'CASCADE'),
+    ('connections', 'user_id_1', 'users', 'CASCADE'),
+    ('connections', 'user_id_2', 'users', 'CASCADE'),
+    ('private_messages', 'sender_id', 'users', 'CASCADE'),
+    ('private_messages', 'receiver_id', 'users', 'CASCADE'),
+    ('conversations', 'user_id_1', 'users', 'CASCADE'),
+    ('conversations', 'user_id_2', 'users', 'CASCADE'),
+    ('conversations', 'last_message_id', 'private_messages', 'SET NULL'),
+    ('public_messages', 'sender_id', 'users', 'CASCADE'),
+    ('public_messages', 'deleted_by', 'users', 'SET NULL'),
+    ('messaging_lock', 'locked_by', 'users', 'SET NULL'),
+    ('jobs', 'posted_by', 'users', 'CASCADE'),
+    ('job_applications', 'student_id', 'users', 'CASCADE'),
+    ('job_applications', 'job_id', 'jobs', 'CASCADE'),
+    ('job_notifications', 'user_id', 'users', 'CASCADE'),
+    ('job_notifications', 'job_id', 'jobs', 'CASCADE'),
+    ('mentor_profiles', 'user_id', 'users', 'CASCADE'),
+    ('mentorship_requests', 'student_id', 'users', 'CASCADE'),
+    ('mentorship_requests', 'mentor_id', 'users', 'SET NULL'),
+    ('mentorship_declines', 'request_id', 'mentorship_requests', 'CASCADE'),
+    ('mentorship_declines', 'mentor_id', 'users', 'CASCADE'),
+    ('user_interactions', 'user_id', 'users', 'CASCADE'),
+    ('user_interactions', 'target_user_id', 'users', 'CASCADE'),
+    ('user_interaction_daily', 'user_id', 'users', 'CASCADE'),
+    ('user_interaction_daily', 'target_user_id', 'users', 'CASCADE'),
+    ('user_recommendations', 'user_id', 'users', 'CASCADE'),
+    ('user_recommendations', 'rec_user_id', 'users', 'CASCADE'),
+    ('user_recommendation_state', 'user_id', 'users', 'CASCADE'),
+    ('user_skills', 'user_id', 'users', 'CASCADE'),
+]
+
+_FK_CLAUSE = re.compile(
+    r',\s*FOREIGN\s+KEY\s*\(\s*"?(\w+)"?\s*\)\s*REFERENCES\s+"?\w+"?\s*\(\s*"?\w+"?\s*\)'
+    r'(?:\s+ON\s+(?:DELETE|UPDATE)\s+(?:SET\s+NULL|SET\s+DEFAULT|CASCADE|RESTRICT|NO\s+ACTION))*',
+    re.IGNORECASE
+)
+
+
+def _tables_keys():
+    """{table: {column: (parent, action)}} of USER_FOREIGN_KEYS."""
+    tables = {}
+    for table, column, parent, action in USER_FOREIGN_KEYS:
+        tables.setdefault(table, {})[column] = (parent, action)
+    return tables
+
+
+def _current_keys(c, table):
+    return {row[3]: (row[2], row[6].upper()) for row in c.execute(f'PRAGMA foreign_key_list("{table}")')}
+
+
+# =====================================================================
+# Migration
+# =====================================================================
+def _rebuilt_sql(sql, table, new_name, keys):
+    """The table's CREATE statement under new_name with `keys` as its foreign keys."""
+    sql = re.sub(rf'^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?["`\[]?{table}["`\]]?',
+                 f'CREATE TABLE "{new_name}"', sql, count=1, flags=re.IGNORECASE)
+    sql = _FK_CLAUSE.sub(lambda m: '' if m.group(1) in keys else m.group(0), sql)
+    clauses = ''.join(f',\n    FOREIGN KEY ({column}) REFERENCES {parent}(id) ON DELETE {action}'
+                      for column, (parent, action) in keys.items())
+    end = sql.rindex(')')
+    return sql[:end].rstrip() + clauses + '\n' + sql[end:]
+
+
+def _sequence(c, table):
+    if not c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_sequence'").fetchone():
+        return None
+    row = c.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,)).fetchone()
+    return row[0] if row else None
+
+
+def _rebuild_table(c, table, keys):
+    sql = c.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+    sequence = _sequence(c, table)
+    dependents = [row[0] for row in c.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (table,)
+    )]
+    new_name = f'_migrate_{table}'
+    c.execute(f'DROP TABLE IF EXISTS "{new_name}"')
+    c.execute(_rebuilt_sql(sql, table, new_name, keys))
+
+    # Rows whose parent is already gone would fail foreign_key_check
+    orphaned = nulled = 0
+    for column, (parent, action) in keys.items():
+        missing = f'{column} IS NOT NULL AND {column} NOT IN (SELECT id FROM {parent})'
+        if action == 'SET NULL':
+            nulled += c.execute(f'UPDATE "{table}" SET {column} = NULL WHERE {missing}').rowcount
+        else:
+            orphaned += c.execute(f'DELETE FROM "{table}" WHERE {missing}').rowcount
+
+    columns = ', '.join(f'"{row[1]}"' for row in c.execute(f'PRAGMA table_info("{table}")'))
+    c.execute(f'INSERT INTO "{new_name}" ({columns}) SELECT {columns} FROM "{table}"')
+    c.execute(f'DROP TABLE "{table}"')
+    c.execute(f'ALTER TABLE "{new_name}" RENAME TO "{table}"')
+    if sequence is not None:
+        # The copy only raised the counter to the largest id left, not past deleted ones
+        c.execute('DELETE FROM sqlite_sequence WHERE name = ?', (table,))
+        c.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (table, sequence))
+    for statement in dependents:
+        c.execute(statement)
+    return orphaned, nulled
+
+
+def migrate_user_foreign_keys(conn):
+    """
+    Rebuild the tables whose foreign keys differ from USER_FOREIGN_KEYS.
+
+    Returns:
+        {table: {'orphaned_rows_removed': n, 'values_nulled': n}} of rebuilt tables.
+    """
+    c = conn.cursor()
+    existing = {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    pending = {}
+    for table, keys in _tables_keys().items():
+        if table not in existing or any(parent not in existing for parent, _ in keys.values()):
+            continue
+        current = _current_keys(c, table)
+        if any(current.get(column) != (parent, action) for column, (parent, action) in keys.items()):
+            # Keep foreign keys of other columns as they are
+            merged = {column: (parent, action) for column, (parent, action) in current.items()
+                      if column not in keys}
+            pending[table] = {**merged, **keys}
+    if not pending:
+        return {}
+
+    conn.commit()
+    c.execute('PRAGMA foreign_keys = OFF')
+    c.execute('BEGIN IMMEDIATE')
+    result = {}
+    try:
+        for table, keys in pending.items():
+            orphaned, nulled = _rebuild_table(c, table, keys)
+            result[table] = {'orphaned_rows_removed': orphaned, 'values_nulled': nulled}
+        violations = c.execute('PRAGMA foreign_key_check').fetchall()
+        problems = [row for row in violations if row[0] in pending]
+        if problems:
+            raise RuntimeError(f'Foreign key violations after rebuild: {problems[:5]}')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    logger.info(f"[Users] Rebuilt {len(result)} tables with ON DELETE foreign keys: {result}")
+    return result
+
+
+# =====================================================================
+# Deletion
+# =====================================================================
+def _cascade_condition(table, existing, _memo=None):
+    """
+    WHERE clause matching the rows of `table` that deleting the users in
+    temp.delete_user_ids removes: a CASCADE key points at a deleted user
+    or at a row that is itself removed (e.g. applications to their jobs).
+    None if no such key exists.
+    """
+    memo = {} if _memo is None else _memo
+    if table not in memo:
+        clauses = []
+        for child, column, parent, action in USER_FOREIGN_KEYS:
+            if child != table or action != 'CASCADE' or parent not in existing:
+                continue
+            if parent == 'users':
+                clauses.append(f'{column} IN (SELECT id FROM temp.delete_user_ids)')
+            else:
+                parent_condition = _cascade_condition(parent, existing, memo)
+                if parent_condition:
+                    clauses.append(f'{column} IN (SELECT id FROM "{parent}" WHERE {parent_condition})')
+        memo[table] = ' OR '.join(clauses) or None
+    return memo[table]
+
+
+def _cascaded_counts(c, existing):
+    """
+    {table: rows} the pending DELETE FROM users will remove.
+
+    Counted before the delete through the foreign key columns, so the cost
+    follows the rows being deleted rather than the size of every table.
+    """
+    counts = {'users': c.execute('SELECT COUNT(*) FROM temp.delete_user_ids').fetchone()[0]}
+    memo = {}
+    for table in dict.fromkeys(spec[0] for spec in USER_FOREIGN_KEYS):
+        if table not in existing:
+            continue
+        condition = _cascade_condition(table, existing, memo)
+        if condition:
+            n = c.execute(f'SELECT COUNT(*) FROM "{table}" WHERE {condition}').fetchone()[0]
+            if n:
+                counts[table] = n
+    return counts
+
+
+def delete_users(user_ids, acting_user_id=None, pending_only=False):
+    """
+    Delete many users and everything that references them in one transaction.
+
+    Args:
+        user_ids: Iterable of user ids (at most MAX_BULK_DELETE).
+        acting_user_id: The admin deleting; never deleted themself.
+        pending_only: Skip users approved in the meantime (registration rejects).
+
+    Returns:
+        {'deleted': [id], 'skipped': {id: reason}, 'tables': {table: rows deleted},
+         'nulled': {table.column: rows}, 'seconds': float}
+
+    Raises:
+        ValueError: no ids, too many ids or a non-integer id.
+    """
+    try:
+        ids = sorted({int(uid) for uid in user_ids})
+    except (TypeError, ValueError):
+        raise ValueError('user_ids must be integers')
+    if not ids:
+        raise ValueError('No user ids given')
+    if len(ids) > MAX_BULK_DELETE:
+        raise ValueError(f'At most {MAX_BULK_DELETE} users per request')
+
+    started = time.time()
+    conn = get_db_connection()
+    try:
+        conn.execute('PRAGMA foreign_keys = ON')
+        c = conn.cursor()
+        c.execute('BEGIN IMMEDIATE')
+        c.execute('CREATE TEMP TABLE IF NOT EXISTS delete_user_ids (id INTEGER PRIMARY KEY)')
+        c.execute('DELETE FROM temp.delete_user_ids')
+        c.executemany('INSERT OR IGNORE INTO temp.delete_user_ids (id) VALUES (?)', [(uid,) for uid in ids])
+
+        skipped = {uid: 'not found' for uid in ids}
+        protected = ','.join(['?'] * len(PROTECTED_EMAILS))
+        for row in c.execute(f'''
+            SELECT u.id, u.is_approved, u.email IN ({protected}) AS is_protected
+            FROM users u JOIN temp.delete_user_ids d ON d.id = u.id
+        ''', PROTECTED_EMAILS):
+            if row['is_protected']:
+                skipped[row['id']] = 'protected account'
+            elif row['id'] == acting_user_id:
+                skipped[row['id']] = 'cannot delete yourself'
+            elif pending_only and row['is_approved']:
+                skipped[row['id']] = 'not pending'
+            else:
+                del skipped[row['id']]
+        if skipped:
+            c.executemany('DELETE FROM temp.delete_user_ids WHERE id = ?', [(uid,) for uid in skipped])
+        deleted = [uid for uid in ids if uid not in skipped]
+
+        tables, nulled = {}, {}
+        if deleted:
+            existing = {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for table, column, parent, action in USER_FOREIGN_KEYS:
+                if action == 'SET NULL' and parent == 'users' and table in existing:
+                    n = c.execute(f'SELECT COUNT(*) FROM "{table}" WHERE {column} IN '
+                                  f'(SELECT id FROM temp.delete_user_ids)').fetchone()[0]
+                    if n:
+                        nulled[f'{table}.{column}'] = n
+
+            # Mentorships of deleted mentors go back to the matcher
+            if 'mentorship_requests' in existing:
+                c.execute('''
+                    UPDATE mentorship_requests
+                    SET status = 'pending', mentor_id = NULL, match_score = NULL, matched_at = NULL
+                    WHERE mentor_id IN (SELECT id FROM temp.delete_user_ids)
+                      AND status IN ('proposed', 'accepted')
+                ''')
+            tables = _cascaded_counts(c, existing)
+            c.execute('DELETE FROM users WHERE id IN (SELECT id FROM temp.delete_user_ids)')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    if deleted:
+        from models.recommendation import forget_deleted_users
+        forget_deleted_users(*deleted)
+        logger.info(f"[Users] Deleted {len(deleted)} users in {time.time() - started:.2f}s: {tables}")
+    return {'deleted': deleted, 'skipped': skipped, 'tables': tables, 'nulled': nulled,
+            'seconds': round(time.time() - started, 3)}
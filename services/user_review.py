@@ -0,0 +1,142 @@
+"""
+services/user_review.py
+========================
+Bulk approve / reject of pending alumni and faculty registrations.
+
+Registrations of alumni and faculty wait with is_approved = 0 until an
+admin reviews them. /api/approve-user/<id> and /api/reject-user/<id> do
+that one user per request; bulk_review_users() reviews a selected or
+filtered set at once:
+
+  approve   one IMMEDIATE transaction: executemany of the is_approved
+            update (guarded by is_approved = 0, so users reviewed in the
+            meantime are left alone) and the approval emails queued in
+            `email_queue` (services/email_queue.py) — both or neither.
+  reject    delete_users(pending_only=True) (services/user_deletion.py),
+            one transaction through the ON DELETE CASCADE keys, then the
+            rejection emails queued for the users actually removed.
+
+The set is either explicit user ids or the admin table filters (role,
+department, created_from, created_to, q — see services/user_table.py)
+applied to pending users; at most MAX_BULK_REVIEW per call.
+"""
+
+import json
+import time
+import logging
+from html import escape
+
+from db_utils import get_db_connection
+from services.email_queue import enqueue_emails
+from services.user_table import user_filters
+
+logger = logging.getLogger(__name__)
+
+REVIEW_ACTIONS = ('approve', 'reject')
+REVIEW_FILTERS = ('role', 'department', 'created_from', 'created_to', 'q')
+MAX_BULK_REVIEW = 5000
+
+
+def _approval_email(user):
+    return (user['email'], 'Your DBIT Alumni Hub account has been approved', f'''
+        <p>Hi {escape(user["name"] or "")},</p>
+        <p>Your {user["role"]} registration on DBIT Alumni Hub has been approved by the admin team.
+        You can now log in and access your dashboard.</p>
+        <p>— DBIT Alumni Hub</p>''')
+
+
+def _rejection_email(user):
+    return (user['email'], 'Your DBIT Alumni Hub registration', f'''
+        <p>Hi {escape(user["name"] or "")},</p>
+        <p>Your {user["role"]} registration on DBIT Alumni Hub could not be approved and has been removed.
+        If you believe this is a mistake, please contact the admin team or register again.</p>
+        <p>— DBIT Alumni Hub</p>''')
+
+
+def _select_pending(conn, user_ids, filters):
+    unknown = set(filters) - set(REVIEW_FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown filter: {', '.join(sorted(unknown))}")
+    where, params = user_filters(status='pending', **{k: v for k, v in filters.items() if v})
+    where.append("u.role != 'admin'")
+    if user_ids is not None:
+        try:
+            ids = sorted({int(uid) for uid in user_ids})
+        except (TypeError, ValueError):
+            raise ValueError('user_ids must be integers')
+        if not ids:
+            raise ValueError('No user ids given')
+        where.append('u.id IN (SELECT value FROM json_each(?))')
+        params.append(json.dumps(ids))
+    rows = conn.execute(f'''
+        SELECT u.id, u.name, u.email, u.role FROM users u
+        WHERE {' AND '.join(where)}
+        ORDER BY u.id LIMIT ?
+    ''', params + [MAX_BULK_REVIEW + 1]).fetchall()
+    if len(rows) > MAX_BULK_REVIEW:
+        raise ValueError(f'At most {MAX_BULK_REVIEW} users per request; narrow the filters')
+    return rows
+
+
+def bulk_review_users(action, user_ids=None, filters=None, acting_user_id=None):
+    """
+    Approve or reject a set of pending users.
+
+    Args:
+        action: 'approve' or 'reject'.
+        user_ids: Explicit ids (still limited to pending users), or None.
+        filters: Table filters applied to the pending users, or None.
+        acting_user_id: The reviewing admin.
+
+    Returns:
+        {'action', 'count', 'user_ids': [id], 'by_role': {role: n},
+         'emails_queued': n, 'seconds': float}
+
+    Raises:
+        ValueError: unknown action / filter, neither ids nor filters, bad
+        ids or too many matches.
+    """
+    if action not in REVIEW_ACTIONS:
+        raise ValueError(f"action must be one of {', '.join(REVIEW_ACTIONS)}")
+    if user_ids is None and filters is None:
+        raise ValueError('Give user_ids or filters')
+
+    started = time.time()
+    queued = 0
+    conn = get_db_connection()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        users = _select_pending(conn, user_ids, filters or {})
+        if action == 'approve' and users:
+            conn.executemany('UPDATE users SET is_approved = 1 WHERE id = ? AND is_approved = 0',
+                             [(user['id'],) for user in users])
+            queued = enqueue_emails(conn, [_approval_email(user) for user in users])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    reviewed = users
+    if action == 'reject' and users:
+        from services.user_deletion import delete_users
+
+        result = delete_users([user['id'] for user in users], acting_user_id, pending_only=True)
+        deleted = set(result['deleted'])
+        reviewed = [user for user in users if user['id'] in deleted]
+        conn = get_db_connection()
+        try:
+            queued = enqueue_emails(conn, [_rejection_email(user) for user in reviewed])
+            conn.commit()
+        finally:
+            conn.close()
+
+    by_role = {}
+    for user in reviewed:
+        by_role[user['role']] = by_role.get(user['role'], 0) + 1
+    seconds = round(time.time() - started, 3)
+    logger.info(f"[Users] Bulk {action} of {len(reviewed)} pending users {by_role} by {acting_user_id} "
+                f"in {seconds}s, {queued} emails queued")
+    return {'action': action, 'count': len(reviewed), 'user_ids': [user['id'] for user in reviewed],
+            'by_role': by_role, 'emails_queued': queued, 'seconds': seconds}
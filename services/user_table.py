@@ -0,0 +1,167 @@
+"""
+services/user_table.py
+=======================
+Server-side data table of all users for the admin screens.
+
+dashboard_admin used to LEFT JOIN every user with the three profile
+tables and render the result, and /admin/users/<role> loaded every user of
+a role. Both now render one page and fetch further pages, other sort
+orders and filtered views from `GET /api/admin/users`.
+
+PAGINATION:
+  Keyset cursors as in services/directory.py — a page continues strictly
+  after the (sort key, id) of the last row of the previous one, so page
+  cost does not depend on depth. Sortable keys and their indexes:
+    id          (default, newest first)  users primary key / users(role)
+    name                                 users(name) / users(role, name, id)
+    created_at                           users(created_at) / users(role, created_at)
+  The profile joins only run for the rows of the page.
+
+FILTERS:
+  role, status (pending | active | suspended), department (any profile
+  table), created_from / created_to (YYYY-MM-DD, inclusive) and q
+  (substring of name or email).
+
+COUNTS:
+  Page responses carry the per-role and pending totals from the
+  trigger-maintained stats_counters (services/stats_counters.py) instead
+  of a COUNT(*) of the filtered set.
+"""
+
+from datetime import datetime, timedelta
+
+from db_utils import get_db_connection
+from services.directory import encode_cursor, decode_cursor
+from services.stats_counters import get_by_dimension
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+USER_ROLES = ('student', 'alumni', 'faculty', 'admin')
+SORT_KEYS = {'id': 'u.id', 'name': 'u.name', 'created_at': 'u.created_at'}
+STATUS_FILTERS = {
+    'pending': 'u.is_approved = 0',
+    'active': 'COALESCE(u.is_approved, 1) = 1 AND COALESCE(u.is_suspended, 0) = 0',
+    'suspended': 'u.is_suspended = 1',
+}
+
+_DEPARTMENT_FILTER = '''u.id IN (
+    SELECT user_id FROM student_profile WHERE department = ?
+    UNION ALL SELECT user_id FROM alumni_profile WHERE department = ?
+    UNION ALL SELECT user_id FROM faculty_profile WHERE department = ?)'''
+
+
+def _parse_day(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+
+
+def user_filters(role=None, status=None, department=None, created_from=None, created_to=None, q=None):
+    """
+    WHERE conditions (on alias `u`) and parameters of the table filters.
+
+    Raises:
+        ValueError: unknown role / status or a bad date.
+    """
+    where, params = [], []
+    if role and role != 'all':
+        if role not in USER_ROLES:
+            raise ValueError(f'Unknown role: {role}')
+        where.append('u.role = ?')
+        params.append(role)
+    if status:
+        if status not in STATUS_FILTERS:
+            raise ValueError(f'Unknown status: {status}')
+        where.append(STATUS_FILTERS[status])
+    if department:
+        where.append(_DEPARTMENT_FILTER)
+        params.extend([department] * 3)
+    if created_from:
+        where.append('u.created_at >= ?')
+        params.append(_parse_day(created_from, 'created_from').strftime('%Y-%m-%d'))
+    if created_to:
+        where.append('u.created_at < ?')
+        params.append((_parse_day(created_to, 'created_to') + timedelta(days=1)).strftime('%Y-%m-%d'))
+    if q:
+        where.append('(u.name LIKE ? OR u.email LIKE ?)')
+        params.extend([f'%{q}%'] * 2)
+    return where, params
+
+
+def list_users(cursor=None, limit=DEFAULT_PAGE_SIZE, sort='id', direction='desc', role=None,
+               status=None, department=None, created_from=None, created_to=None, q=None):
+    """
+    One page of the admin user table.
+
+    Args:
+        cursor: next_cursor of the previous page (None = first page).
+        sort: 'id', 'name' or 'created_at'.
+        direction: 'asc' or 'desc'.
+        role: One of USER_ROLES, or None / 'all' for every role.
+        status: A key of STATUS_FILTERS.
+
+    Returns:
+        {'items': [dict], 'next_cursor': str or None, 'sort', 'direction', 'totals'}
+
+    Raises:
+        ValueError: unknown sort / role / status, a bad date or a malformed cursor.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Cannot sort users by '{sort}'")
+    direction = (direction or 'desc').lower()
+    if direction not in ('asc', 'desc'):
+        raise ValueError("direction must be 'asc' or 'desc'")
+    limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    sort_expr = SORT_KEYS[sort]
+
+    where, params = user_filters(role, status, department, created_from, created_to, q)
+    if cursor:
+        cursor_sort, key, last_id = decode_cursor(cursor)
+        if cursor_sort != f'{sort}:{direction}':
+            raise ValueError('Cursor belongs to a different sort order')
+        op = '<' if direction == 'desc' else '>'
+        if sort == 'id':
+            where.append(f'u.id {op} ?')
+            params.append(last_id)
+        else:
+            where.append(f'({sort_expr}, u.id) {op} (?, ?)')
+            params.extend([key, last_id])
+
+    order = f'u.id {direction}' if sort == 'id' else f'{sort_expr} {direction}, u.id {direction}'
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(f'''
+            SELECT u.id, u.name, u.email, u.role, u.created_at, u.profile_pic,
+                   u.is_approved, u.is_suspended,
+                   COALESCE(s.department, a.department, f.department, 'N/A') AS department,
+                   COALESCE(s.semester, a.pass_year, NULL) AS batch_info
+            FROM users u
+            LEFT JOIN student_profile s ON u.id = s.user_id AND u.role = 'student'
+            LEFT JOIN alumni_profile a ON u.id = a.user_id AND u.role = 'alumni'
+            LEFT JOIN faculty_profile f ON u.id = f.user_id AND u.role = 'faculty'
+            {('WHERE ' + ' AND '.join(where)) if where else ''}
+            ORDER BY {order}
+            LIMIT ?
+        ''', params + [limit + 1]).fetchall()
+        totals = user_totals(conn)
+    finally:
+        conn.close()
+
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(f'{sort}:{direction}', last[sort], last['id'])
+    return {'items': items, 'next_cursor': next_cursor, 'sort': sort,
+            'direction': direction, 'totals': totals}
+
+
+def user_totals(conn):
+    """Users per role, all users and pending approvals (counter lookups)."""
+    by_role = get_by_dimension(conn, 'users')
+    totals = {role: by_role.get(role, 0) for role in USER_ROLES}
+    totals['all'] = sum(by_role.values())
+    totals['pending'] = sum(get_by_dimension(conn, 'users_pending').values())
+    return totals
@@ -0,0 +1,62 @@
+"""
+Cold-start guard of get_als_recommendations().
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+from scipy import sparse
+
+from services import als_engine, recommendation_engine
+
+
+def _model(n=40, seed=5):
+    matrix = sparse.random(n, n, density=0.2, format='lil', dtype=np.float32, random_state=seed)
+    matrix[0, :] = 0                       # user 1 has never interacted
+    matrix = matrix.tocsr()
+    matrix.eliminate_zeros()
+    user_factors, item_factors = als_engine.fit_als(matrix, factors=8, iterations=5,
+                                                    regularization=0.1, alpha=2.0)
+    return {
+        'version': 'test',
+        'user_ids': np.arange(1, n + 1, dtype=np.int64),
+        'user_factors': user_factors,
+        'item_factors': item_factors,
+        'is_alumni': np.ones(n, dtype=bool),
+        'interaction_counts': matrix.getnnz(axis=1).astype(np.int32),
+    }
+
+
+def _build(c, candidates, target_role, limit, reason):
+    return [{'id': user_id, 'score': score, 'reason': reason}
+            for user_id, score in candidates[:limit]]
+
+
+class AlsColdStartTest(unittest.TestCase):
+
+    def _recommend(self, model, user_id):
+        with mock.patch.object(als_engine, 'get_active_als_model', return_value=model), \
+                mock.patch.object(als_engine, 'get_db_connection'), \
+                mock.patch.object(recommendation_engine, 'load_exclusions',
+                                  return_value=({user_id}, 'alumni')), \
+                mock.patch.object(recommendation_engine, 'build_recommendations', side_effect=_build):
+            return als_engine.get_als_recommendations(user_id, limit=5)
+
+    def test_user_without_interactions_gets_no_results(self):
+        model = _model()
+        self.assertEqual(model['interaction_counts'][0], 0)
+        self.assertEqual(self._recommend(model, 1), [])
+
+    def test_active_user_still_gets_results(self):
+        model = _model()
+        user_id = int(np.argmax(model['interaction_counts'])) + 1
+        self.assertTrue(self._recommend(model, user_id))
+
+    def test_model_without_counts_serves_no_one(self):
+        model = dict(_model(), interaction_counts=None)
+        self.assertEqual(self._recommend(model, 5), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
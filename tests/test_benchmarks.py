@@ -0,0 +1,56 @@
+"""
+Smoke test of the benchmark runner on a tiny synthetic database.
+
+The runner imports the app, so it runs in a subprocess with its own
+environment; the report and the kept work directory are checked.
+"""
+
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class BenchmarkSmokeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix='alumni-bench-test-')
+        self.addCleanup(shutil.rmtree, self.workdir, ignore_errors=True)
+
+    def test_small_run_reports_and_leaves_the_generated_database_alone(self):
+        output = os.path.join(self.workdir, 'report.json')
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks', '--users', '300', '--eval-users', '20',
+             '--latency-users', '10', '--repeat', '1', '--skip-ann',
+             '--workdir', self.workdir, '--output', output],
+            cwd=ROOT, check=True, timeout=600,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        with open(output) as f:
+            report = json.load(f)
+
+        self.assertGreaterEqual(report['dataset']['users'], 300)  # + the seeded admin
+        self.assertIn('hybrid_recommendation_warm', report['latency'])
+        self.assertEqual(set(report['evaluation']), {'rule', 'knn', 'hybrid'})
+
+        # the holdout deleted from eval.db only
+        bench = sqlite3.connect(os.path.join(self.workdir, 'bench.db'))
+        evaluated = sqlite3.connect(os.path.join(self.workdir, 'eval.db'))
+        try:
+            generated = bench.execute('SELECT COUNT(*) FROM connections').fetchone()[0]
+            remaining = evaluated.execute('SELECT COUNT(*) FROM connections').fetchone()[0]
+        finally:
+            bench.close()
+            evaluated.close()
+        self.assertEqual(generated, report['dataset']['connections'])
+        self.assertLess(remaining, generated)
+
+
+if __name__ == '__main__':
+    unittest.main()
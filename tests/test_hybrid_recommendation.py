@@ -0,0 +1,44 @@
+"""
+Ordering of hybrid_recommendation() across its sources.
+
+The sources score on different scales (graph candidates are scaled so
+the best one is 100), so fill-ins must never outrank ML results.
+"""
+
+import unittest
+from unittest import mock
+
+from services import recommendation_engine
+
+
+def _rec(user_id, score):
+    return {'id': user_id, 'name': f'User {user_id}', 'score': score, 'reason': ''}
+
+
+class HybridOrderingTest(unittest.TestCase):
+
+    def _hybrid(self, ml, graph, content=(), rule=(), limit=5):
+        with mock.patch.object(recommendation_engine, 'get_ml_recommendations', return_value=list(ml)), \
+                mock.patch('services.graph_engine.get_graph_recommendations', return_value=list(graph)), \
+                mock.patch('services.content_engine.get_content_recommendations', return_value=list(content)), \
+                mock.patch('models.recommendation.get_rule_based_recommendations', return_value=list(rule)):
+            return recommendation_engine.hybrid_recommendation(1, limit=limit, model='knn')
+
+    def test_ml_results_come_before_graph_fill_ins(self):
+        final = self._hybrid(ml=[_rec(10, 0.42), _rec(11, 0.91)],
+                             graph=[_rec(20, 100.0), _rec(21, 73.5), _rec(22, 12.0)])
+        self.assertEqual([r['source'] for r in final], ['ml', 'ml', 'graph', 'graph', 'graph'])
+        self.assertEqual([r['id'] for r in final], [11, 10, 20, 21, 22])
+
+    def test_source_priority_over_score_for_every_fallback(self):
+        final = self._hybrid(ml=[_rec(10, 0.1)], graph=[_rec(20, 5.0)],
+                             content=[_rec(30, 99.0)], rule=[_rec(40, 500.0), _rec(41, 1.0)])
+        self.assertEqual([r['source'] for r in final], ['ml', 'graph', 'content', 'rule', 'rule'])
+
+    def test_duplicate_keeps_higher_priority_source(self):
+        final = self._hybrid(ml=[_rec(10, 0.5)], graph=[_rec(10, 100.0), _rec(20, 50.0)], limit=2)
+        self.assertEqual([(r['id'], r['source']) for r in final], [(10, 'ml'), (20, 'graph')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+"""
+Scheduled trainer loop while another retrain job is active.
+"""
+
+import unittest
+from unittest import mock
+
+from services import recommendation_engine, training_jobs
+
+
+class _Stop(BaseException):
+    """Ends the otherwise endless trainer loop."""
+
+
+class TrainerLoopTest(unittest.TestCase):
+
+    def test_active_job_is_polled_once_per_heartbeat(self):
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 3:
+                raise _Stop()
+
+        with mock.patch.object(recommendation_engine, '_seconds_until_retrain', return_value=0), \
+                mock.patch.object(training_jobs, '_claim_job', return_value=(1, False)) as claim, \
+                mock.patch.object(recommendation_engine.time, 'sleep', side_effect=sleep):
+            with self.assertRaises(_Stop):
+                recommendation_engine._trainer_loop(lambda fn: fn())
+
+        self.assertEqual(sleeps, [training_jobs.HEARTBEAT_SECONDS] * 3)
+        self.assertEqual(claim.call_count, 3)   # one claim per wait, not a spin
+
+    def test_skipped_result_is_distinct_from_trained(self):
+        with mock.patch.object(training_jobs, '_claim_job', return_value=(7, False)):
+            self.assertEqual(training_jobs.run_scheduled_retrain(), training_jobs.SKIPPED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+Heartbeats from inside the long retrain stages.
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+from scipy import sparse
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import normalize
+
+from services import recommendation_engine
+from services.als_engine import fit_als
+
+
+def _matrix(n=50, seed=3):
+    matrix = sparse.random(n, n, density=0.2, format='csr', dtype=np.float32, random_state=seed)
+    return normalize(matrix, axis=1, norm='l2').tocsr()
+
+
+class TrainingHeartbeatTest(unittest.TestCase):
+
+    def test_neighbour_table_beats_per_batch_and_matches_one_search(self):
+        matrix = _matrix()
+        heartbeat = mock.Mock()
+        with mock.patch.object(recommendation_engine, 'NEIGHBOUR_BATCH_ROWS', 16):
+            idx, scores = recommendation_engine._compute_neighbour_table(matrix, 5, heartbeat)
+
+        self.assertEqual(heartbeat.call_count, 4)   # 50 rows in batches of 16
+        distances, expected = NearestNeighbors(n_neighbors=5, metric='cosine',
+                                               algorithm='brute').fit(matrix).kneighbors(matrix)
+        np.testing.assert_array_equal(idx, expected)
+        np.testing.assert_allclose(scores, 1.0 - distances, rtol=1e-6)
+
+    def test_als_beats_after_every_half_step(self):
+        heartbeat = mock.Mock()
+        fit_als(_matrix(), factors=4, iterations=3, regularization=0.1, alpha=2.0, heartbeat=heartbeat)
+        self.assertEqual(heartbeat.call_count, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
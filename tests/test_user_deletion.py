@@ -0,0 +1,101 @@
+"""
+migrate_user_foreign_keys() table rebuilds and delete_users() row counts
+on a minimal schema.
+"""
+
+import sqlite3
+import unittest
+
+from services.user_deletion import _cascaded_counts, migrate_user_foreign_keys
+
+
+class ForeignKeyMigrationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.addCleanup(self.conn.close)
+        self.conn.executescript('''
+            CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT);
+            CREATE TABLE mentorship_requests (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id INTEGER NOT NULL,
+                mentor_id INTEGER,
+                FOREIGN KEY (student_id) REFERENCES users(id),
+                FOREIGN KEY (mentor_id) REFERENCES users(id)
+            );
+            CREATE TABLE mentorship_declines (
+                request_id INTEGER NOT NULL,
+                mentor_id INTEGER NOT NULL,
+                PRIMARY KEY (request_id, mentor_id)
+            ) WITHOUT ROWID;
+            INSERT INTO users (name) VALUES ('student'), ('mentor');
+            INSERT INTO mentorship_requests (student_id, mentor_id) VALUES (1, 2), (1, 2), (1, 2);
+            DELETE FROM mentorship_requests WHERE id = 3;
+            INSERT INTO mentorship_declines VALUES (1, 2), (2, 2);
+        ''')
+        self.conn.commit()
+
+    def test_autoincrement_high_water_mark_survives_the_rebuild(self):
+        result = migrate_user_foreign_keys(self.conn)
+
+        self.assertIn('mentorship_requests', result)
+        new_id = self.conn.execute('INSERT INTO mentorship_requests (student_id) VALUES (1)').lastrowid
+        self.assertEqual(new_id, 4)
+
+    def test_declines_cascade_with_their_request(self):
+        migrate_user_foreign_keys(self.conn)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.execute('DELETE FROM mentorship_requests WHERE id = 1')
+
+        self.assertEqual(self.conn.execute('SELECT request_id FROM mentorship_declines').fetchall(), [(2,)])
+
+    def test_second_run_changes_nothing(self):
+        migrate_user_foreign_keys(self.conn)
+        self.assertEqual(migrate_user_foreign_keys(self.conn), {})
+
+
+class CascadedCountsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.addCleanup(self.conn.close)
+        self.conn.executescript('''
+            PRAGMA foreign_keys = ON;
+            CREATE TABLE users (id INTEGER PRIMARY KEY);
+            CREATE TABLE jobs (id INTEGER PRIMARY KEY,
+                               posted_by INTEGER REFERENCES users(id) ON DELETE CASCADE);
+            CREATE TABLE job_applications (
+                id INTEGER PRIMARY KEY,
+                student_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+                job_id INTEGER REFERENCES jobs(id) ON DELETE CASCADE
+            );
+            CREATE TABLE connections (
+                id INTEGER PRIMARY KEY,
+                user_id_1 INTEGER REFERENCES users(id) ON DELETE CASCADE,
+                user_id_2 INTEGER REFERENCES users(id) ON DELETE CASCADE
+            );
+            CREATE TEMP TABLE delete_user_ids (id INTEGER PRIMARY KEY);
+            INSERT INTO users VALUES (1), (2), (3), (4);
+            INSERT INTO jobs VALUES (10, 1), (11, 1), (12, 3);
+            -- 100: student deleted, job kept; 101: job deleted; 102: both; 103: kept
+            INSERT INTO job_applications VALUES (100, 2, 12), (101, 3, 10), (102, 2, 11), (103, 4, 12);
+            INSERT INTO connections VALUES (1, 1, 2), (2, 3, 4), (3, 2, 4);
+            INSERT INTO temp.delete_user_ids VALUES (1), (2);
+        ''')
+
+    def _tables(self):
+        return {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    def test_counts_match_what_the_cascade_removes(self):
+        counts = _cascaded_counts(self.conn.cursor(), self._tables())
+
+        before = {t: self.conn.execute(f'SELECT COUNT(*) FROM {t}').fetchone()[0] for t in counts}
+        self.conn.execute('DELETE FROM users WHERE id IN (SELECT id FROM temp.delete_user_ids)')
+        removed = {t: before[t] - self.conn.execute(f'SELECT COUNT(*) FROM {t}').fetchone()[0] for t in counts}
+
+        self.assertEqual(counts, {'users': 2, 'jobs': 2, 'job_applications': 3, 'connections': 2})
+        self.assertEqual(counts, removed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+utils/process_lock.py
+======================
+Cross-process "owner" locks for work that must run in exactly one process.
+
+Gunicorn starts several workers, and every worker imports `app`. Jobs such
+as model retraining must not run once per worker, so the first process to
+grab the named lock becomes the owner and keeps it until it exits (the OS
+releases the lock automatically, even on a crash).
+
+Usage:
+    from utils.process_lock import acquire_process_lock
+
+    if acquire_process_lock('recommendation-trainer', lock_dir):
+        start_trainer_thread()
+"""
+
+import os
+import logging
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows dev server — single process, always the owner
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# name → open file handle (kept open for the lifetime of the process)
+_held_locks = {}
+_guard = threading.Lock()
+
+
+def acquire_process_lock(name: str, lock_dir: str) -> bool:
+    """
+    Try to become the owner of the named lock without blocking.
+
+    Args:
+        name: Lock name, used as the lock file name.
+        lock_dir: Directory holding the lock files (created if missing).
+
+    Returns:
+        True if this process owns the lock (now or already), False otherwise.
+    """
+    with _guard:
+        if name in _held_locks:
+            return True
+
+        if fcntl is None:
+            _held_locks[name] = None
+            return True
+
+        os.makedirs(lock_dir, exist_ok=True)
+        path = os.path.join(lock_dir, f'{name}.lock')
+        handle = open(path, 'a+')
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()))
+        handle.flush()
+        _held_locks[name] = handle
+        logger.info(f"Process {os.getpid()} acquired owner lock '{name}'")
+        return True
+
+
+def holds_process_lock(name: str) -> bool:
+    """Return True if this process currently owns the named lock."""
+    return name in _held_locks